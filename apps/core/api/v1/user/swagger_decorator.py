@@ -1,5 +1,6 @@
 from drf_yasg import openapi
-from drf_yasg.utils import swagger_auto_schema
+from drf_yasg.utils import no_body, swagger_auto_schema
+from apps.core.filters import CustomUserFilter, filter_parameters
 from apps.core.serializers import CustomUserSerializer
 
 # UserAdminAPIView Decorators
@@ -93,6 +94,7 @@ admin_destroy_user_swagger = swagger_auto_schema(
     operation_description=(
         'This endpoint allows administrators to delete a user account by their ID. '
         'The operation permanently removes the user from the system. '
+        'Users whose wallet has ledger history cannot be deleted, since the ledger is kept for audit; deactivate them instead with the deactivate endpoint. '
         'A successful deletion returns a 204 No Content response. '
         'This operation is restricted to admin users only and requires JWT authentication.'
     ),
@@ -102,6 +104,28 @@ admin_destroy_user_swagger = swagger_auto_schema(
     ],
     responses={
         204: 'User successfully deleted.',
+        400: 'Bad Request: The user has ledger history and can only be deactivated.',
+        401: 'Unauthorized: Valid JWT token required for admin users.',
+        403: 'Forbidden: User is not an admin.',
+        404: 'Not Found: User with the specified ID does not exist.'
+    }
+)
+
+admin_deactivate_user_swagger = swagger_auto_schema(
+    operation_summary='Deactivate a User (Admin)',
+    operation_description=(
+        'This endpoint allows administrators to deactivate a user account by their ID. '
+        'The user and their records, including wallet and ledger history, are kept, but the user can no longer log in '
+        'and their issued tokens are revoked. This is how users with ledger history are removed. '
+        'This operation is restricted to admin users only and requires JWT authentication.'
+    ),
+    tags=['admin.core.user'],
+    request_body=no_body,
+    manual_parameters=[
+        openapi.Parameter('id', openapi.IN_PATH, description="The unique ID of the user to deactivate.", type=openapi.TYPE_INTEGER)
+    ],
+    responses={
+        200: CustomUserSerializer,
         401: 'Unauthorized: Valid JWT token required for admin users.',
         403: 'Forbidden: User is not an admin.',
         404: 'Not Found: User with the specified ID does not exist.'
@@ -113,15 +137,14 @@ admin_list_user_swagger = swagger_auto_schema(
     operation_description=(
         'This endpoint allows administrators to retrieve a list of all user records in the system. '
         'The response includes details for each user, such as ID, username, email, user_role, first_name, last_name, and is_active status. '
-        'Optional search functionality is available using the "search" query parameter to filter users by username or email. '
+        'Optional search functionality is available using the "search" query parameter to filter users by username (at least three characters). '
         'This operation is restricted to admin users only and requires JWT authentication.'
     ),
     tags=['admin.core.user'],
-    manual_parameters=[
-        openapi.Parameter('search', openapi.IN_QUERY, description="Filter users by username or email (partial match).", type=openapi.TYPE_STRING)
-    ],
+    manual_parameters=filter_parameters(CustomUserFilter),
     responses={
         200: CustomUserSerializer(many=True),
+        400: 'Invalid query parameters (e.g., a search shorter than three characters).',
         401: 'Unauthorized: Valid JWT token required for admin users.',
         403: 'Forbidden: User is not an admin.'
     }
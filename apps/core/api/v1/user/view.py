@@ -1,9 +1,17 @@
+from django.db.models import ProtectedError
 from django.utils.decorators import method_decorator
+from django.utils.translation import gettext_lazy as _
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAdminUser, IsAuthenticated, AllowAny
+from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
-from rest_framework import mixins, filters
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework import mixins
+from rest_framework.exceptions import ValidationError
+from django_filters.rest_framework import DjangoFilterBackend
 
+from apps.core.authentication import ClaimsJWTAuthentication
+from apps.core.filters import CustomUserFilter
+from apps.core.pagination import AdminPagination
 from apps.core.models import CustomUser
 from apps.core.serializers import CustomUserSerializer
 from apps.core.api.v1.user.swagger_decorator import (
@@ -12,6 +20,7 @@ from apps.core.api.v1.user.swagger_decorator import (
     admin_update_user_swagger,
     admin_partial_update_user_swagger,
     admin_destroy_user_swagger,
+    admin_deactivate_user_swagger,
     admin_list_user_swagger,
     user_retrieve_user_swagger,
     user_update_user_swagger,
@@ -26,6 +35,7 @@ from apps.core.api.v1.user.swagger_decorator import (
 @method_decorator(name='partial_update', decorator=admin_partial_update_user_swagger)
 @method_decorator(name='destroy', decorator=admin_destroy_user_swagger)
 @method_decorator(name='list', decorator=admin_list_user_swagger)
+@method_decorator(name='deactivate', decorator=admin_deactivate_user_swagger)
 class UserAdminAPIView(
     GenericViewSet,
     mixins.CreateModelMixin,
@@ -37,13 +47,34 @@ class UserAdminAPIView(
     """
     Admin-only API ViewSet for managing user records.
     """
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [ClaimsJWTAuthentication]
     permission_classes = [IsAdminUser]
     serializer_class = CustomUserSerializer
     lookup_field = 'id'
+    pagination_class = AdminPagination
+    pagination_ordering = ('-date_joined', '-id')
     queryset = CustomUser.objects.all()
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['username', 'email']
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = CustomUserFilter
+
+    def perform_destroy(self, instance):
+        """
+        Refuse to delete users whose wallet has ledger history; they are deactivated instead.
+        """
+        try:
+            instance.delete()
+        except ProtectedError:
+            raise ValidationError(_('Users with ledger history cannot be deleted. Deactivate them instead.'))
+
+    @action(detail=True, methods=['post'])
+    def deactivate(self, request, *args, **kwargs):
+        """
+        Deactivate a user, which keeps their records and revokes their tokens.
+        """
+        user = self.get_object()
+        user.is_active = False
+        user.save(update_fields=['is_active'])
+        return Response(self.get_serializer(user).data)
 
 
 @method_decorator(name='retrieve', decorator=user_retrieve_user_swagger)
@@ -57,7 +88,7 @@ class UserAPIView(
     """
     Authenticated user API ViewSet for viewing and updating own user record.
     """
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [ClaimsJWTAuthentication]
     permission_classes = [IsAuthenticated]
     serializer_class = CustomUserSerializer
     lookup_field = 'id'
@@ -1,6 +1,69 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from django.db.models.signals import post_migrate, pre_migrate
+
+
+def create_trigram_extension(using, **kwargs):
+    """
+    Enable pg_trgm before migrations run, for the trigram index on usernames.
+    """
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+
+def create_username_trigram_index(using, **kwargs):
+    """
+    Build the trigram index that serves username searches on PostgreSQL.
+
+    username__icontains compiles to UPPER(username) LIKE UPPER('%...%'),
+    which only a trigram index on the same expression can serve. It is kept
+    out of CustomUser.Meta so the model stays portable to other databases.
+    """
+    from apps.core.models import CustomUser
+
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        table = connection.ops.quote_name(CustomUser._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS core_user_username_trgm ON {table} '
+                f'USING gin (UPPER(username) gin_trgm_ops)'
+            )
+
+
+def require_shared_cache():
+    """
+    Refuse to start with per-process shared caches unless the site runs as a single process.
+
+    Token revocations live in the revocations cache and price versions in
+    the default one; with LocMemCache, a user deactivated or demoted in one
+    process would keep their access in every other one until their access
+    tokens expire.
+    """
+    from apps.core.authentication import REVOCATION_CACHE
+
+    if settings.DEBUG or getattr(settings, 'SINGLE_PROCESS', False):
+        return
+    for alias, setting in (('default', 'DEFAULT_CACHE_BACKEND'), (REVOCATION_CACHE, 'REVOCATION_CACHE_BACKEND')):
+        if isinstance(caches[alias], LocMemCache):
+            raise ImproperlyConfigured(
+                f'The {alias} cache is a per-process LocMemCache, so its state would not reach '
+                f'other processes. Set {setting} to a shared backend such as Redis, or '
+                'SINGLE_PROCESS=True when the site runs as a single process.'
+            )
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.core'
+
+    def ready(self):
+        require_shared_cache()
+        pre_migrate.connect(create_trigram_extension, sender=self)
+        post_migrate.connect(create_username_trigram_index, sender=self)
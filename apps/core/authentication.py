@@ -0,0 +1,119 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+# User fields copied into every token: what permission checks and ownership
+# filters read, plus what the nested user serializer renders, so a request
+# can be served without loading the user row.
+TOKEN_CLAIM_FIELDS = ('username', 'first_name', 'last_name', 'email', 'is_staff', 'user_role')
+
+# Revocations live in a cache of their own that is configured never to evict
+# (see CACHES in the settings): an entry lost to other keys' pressure would
+# let a revoked token through.
+REVOCATION_CACHE = 'revocations'
+REVOKED_CACHE_KEY = 'auth:revoked:{user_id}'
+
+
+def add_user_claims(token, user):
+    """
+    Copy the user's claim fields into a token.
+    """
+    for field in TOKEN_CLAIM_FIELDS:
+        token[field] = getattr(user, field)
+    return token
+
+
+def revoke_user_tokens(user_id):
+    """
+    Reject the claims of every token issued to the user until now.
+
+    The entry only has to outlive the access tokens issued before it; refresh
+    tokens always reload the user. Changes made with QuerySet.update() bypass
+    this. Other processes see the revocation through the revocations cache,
+    which is why the site refuses to start with a per-process one outside
+    DEBUG (see apps.core.apps.require_shared_cache).
+    """
+    timeout = api_settings.ACCESS_TOKEN_LIFETIME.total_seconds()
+    caches[REVOCATION_CACHE].set(REVOKED_CACHE_KEY.format(user_id=user_id), int(time.time()), timeout=timeout)
+
+
+def tokens_revoked(user_id, issued_at):
+    """
+    Tell whether a token issued to the user at `issued_at` has been revoked.
+    """
+    revoked_at = caches[REVOCATION_CACHE].get(REVOKED_CACHE_KEY.format(user_id=user_id))
+    # iat has a one-second resolution, so a token from the second of the
+    # revocation is rejected too; a refresh gives the client a usable one.
+    return revoked_at is not None and (issued_at is None or issued_at <= revoked_at)
+
+
+def user_from_claims(user_id, claims):
+    """
+    Build an active user instance from token claims without a query.
+
+    Fields that are not in the token are deferred, so reading one of them
+    loads it from the database like any `.only()` instance would.
+    """
+    User = get_user_model()
+    values = {api_settings.USER_ID_FIELD: user_id, 'is_active': True, **claims}
+    fields = [field.attname for field in User._meta.concrete_fields if field.attname in values]
+    return User.from_db(None, fields, [values[field] for field in fields])
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that builds `request.user` from the token claims.
+
+    Tokens issued without the claims fall back to loading the user. Tokens
+    with claims are checked against the revocation cache instead, which is
+    filled when a user's role or active status changes.
+    """
+
+    def get_user(self, validated_token):
+        if not all(field in validated_token for field in TOKEN_CLAIM_FIELDS):
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+        if tokens_revoked(user_id, validated_token.get('iat')):
+            raise AuthenticationFailed(_('Token has been revoked.'), code='token_revoked')
+        return user_from_claims(user_id, {field: validated_token[field] for field in TOKEN_CLAIM_FIELDS})
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """
+    Refresh token whose access tokens carry the user claims.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        return add_user_claims(super().for_user(user), user)
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = ClaimsRefreshToken
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refresh access tokens with the user's current claims rather than the ones from login.
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        user = get_user_model().objects.filter(
+            **{api_settings.USER_ID_FIELD: refresh.get(api_settings.USER_ID_CLAIM)}
+        ).first()
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(self.error_messages['no_active_account'], 'no_active_account')
+        add_user_claims(refresh, user)
+        return super().validate({**attrs, 'refresh': str(refresh)})
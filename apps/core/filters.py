@@ -0,0 +1,58 @@
+from django.utils.translation import gettext_lazy as _
+from django_filters import rest_framework as filters
+from drf_yasg import openapi
+
+from apps.core.models import CustomUser
+
+# PostgreSQL can only answer LIKE '%...%' from a trigram index for patterns of
+# at least one trigram; shorter ones would scan every user.
+USERNAME_SEARCH_MIN_LENGTH = 3
+
+
+class CustomUserFilter(filters.FilterSet):
+    """
+    Filter users for the admin user list.
+
+    `search` is a substring match on the username, served by the trigram
+    index on UPPER(username) that migrate builds on PostgreSQL (see
+    apps.core.apps). Emails have no such index, so they are not searched.
+    """
+    search = filters.CharFilter(
+        field_name='username',
+        lookup_expr='icontains',
+        min_length=USERNAME_SEARCH_MIN_LENGTH,
+        help_text=_('Filter by username (partial match, at least three characters).'),
+    )
+
+    class Meta:
+        model = CustomUser
+        fields = []
+
+
+def filter_parameters(filterset_class):
+    """
+    Return the swagger query parameters of a FilterSet, which django-filter no longer describes itself.
+    """
+    parameters = []
+    for name, filter_ in filterset_class.base_filters.items():
+        description = str(filter_.extra.get('help_text') or filter_.label or name)
+        if isinstance(filter_, filters.IsoDateTimeFromToRangeFilter):
+            parameters += [
+                openapi.Parameter(f'{name}_{suffix}', openapi.IN_QUERY, description=description, type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME)
+                for suffix in ('after', 'before')
+            ]
+        elif isinstance(filter_, filters.RangeFilter):
+            parameters += [
+                openapi.Parameter(f'{name}_{suffix}', openapi.IN_QUERY, description=description, type=openapi.TYPE_STRING, format=openapi.FORMAT_DECIMAL)
+                for suffix in ('min', 'max')
+            ]
+        elif isinstance(filter_, filters.ChoiceFilter):
+            choices = [value for value, _label in filter_.extra['choices']]
+            parameters.append(openapi.Parameter(name, openapi.IN_QUERY, description=description, type=openapi.TYPE_STRING, enum=choices))
+        elif isinstance(filter_, filters.BooleanFilter):
+            parameters.append(openapi.Parameter(name, openapi.IN_QUERY, description=description, type=openapi.TYPE_BOOLEAN))
+        elif isinstance(filter_, filters.NumberFilter):
+            parameters.append(openapi.Parameter(name, openapi.IN_QUERY, description=description, type=openapi.TYPE_INTEGER))
+        else:
+            parameters.append(openapi.Parameter(name, openapi.IN_QUERY, description=description, type=openapi.TYPE_STRING))
+    return parameters
@@ -13,5 +13,51 @@ class CustomUser(AbstractUser):
             )
     )
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=['date_joined', 'id']),
+            # The trigram index on UPPER(username) is PostgreSQL-only, so it is
+            # created by apps.core.apps.create_username_trigram_index instead.
+        ]
+
+    # Fields whose change revokes the user's access tokens: the token claims
+    # that grant access, plus deactivation.
+    AUTHORIZATION_FIELDS = ('username', 'is_staff', 'user_role', 'is_active')
+
     def __str__(self):
         return self.username
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_authorization = instance.authorization_state()
+        return instance
+
+    def authorization_state(self):
+        """
+        Return the authorization fields, or None when some of them were not loaded.
+        """
+        if self.get_deferred_fields() & set(self.AUTHORIZATION_FIELDS):
+            return None
+        return tuple(getattr(self, field) for field in self.AUTHORIZATION_FIELDS)
+
+    def save(self, *args, **kwargs):
+        """
+        Revoke issued tokens when the user's authorization changes.
+        """
+        from apps.core.authentication import revoke_user_tokens
+
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        state = self.authorization_state()
+        if not adding and (state is None or state != getattr(self, '_loaded_authorization', None)):
+            revoke_user_tokens(self.pk)
+        self._loaded_authorization = state
+
+    def delete(self, *args, **kwargs):
+        from apps.core.authentication import revoke_user_tokens
+
+        user_id = self.pk
+        result = super().delete(*args, **kwargs)
+        revoke_user_tokens(user_id)
+        return result
@@ -0,0 +1,282 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.db import connections
+from django.db.models import Q
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+def encode_cursor(position, reverse=False):
+    """
+    Encode a keyset position into an opaque, URL-safe cursor string.
+    """
+    payload = {'p': [_dump_value(value) for value in position]}
+    if reverse:
+        payload['r'] = 1
+    data = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(data).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Decode an opaque cursor into a (position, reverse) pair.
+
+    Raises ValueError when the cursor is malformed.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        position = payload['p']
+        reverse = bool(payload.get('r', False))
+    except (TypeError, KeyError, UnicodeEncodeError, binascii.Error, json.JSONDecodeError) as exc:
+        raise ValueError('Invalid cursor') from exc
+    if not isinstance(position, list):
+        raise ValueError('Invalid cursor')
+    return position, reverse
+
+
+def _dump_value(value):
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if isinstance(value, (int, str)) or value is None:
+        return value
+    return str(value)
+
+
+def parse_ordering(ordering):
+    """
+    Split ordering terms such as '-create_date' into (field, descending) pairs.
+    """
+    return [(term.lstrip('-'), term.startswith('-')) for term in ordering]
+
+
+def keyset_filter(ordering, position, reverse=False):
+    """
+    Build a Q object that selects the rows strictly after `position`.
+
+    For an ordering (a, b) this produces `a <op> x OR (a = x AND b <op> y)`,
+    plus a redundant `a <op>= x` bound so the database can turn the first key
+    into an index range scan.
+    """
+    terms = parse_ordering(ordering)
+    condition = Q()
+    equal = Q()
+    for (field, descending), value in zip(terms, position):
+        lookup = 'lt' if descending != reverse else 'gt'
+        condition |= equal & Q(**{f'{field}__{lookup}': value})
+        equal &= Q(**{field: value})
+    first_field, first_descending = terms[0]
+    bound = 'lte' if first_descending != reverse else 'gte'
+    return Q(**{f'{first_field}__{bound}': position[0]}) & condition
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination with opaque cursors.
+
+    Views declare the ordering with a `pagination_ordering` attribute made of
+    a timestamp column followed by `id`, matching a composite index on the
+    model, so every page is an index range scan no matter how deep it is.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    ordering = ('-id',)
+    invalid_cursor_message = _('Invalid cursor')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.setup(request, view)
+        position, reverse = self.decode_request_cursor(request, queryset)
+        queryset = queryset.order_by(*self.get_query_ordering(reverse))
+        if position is not None:
+            queryset = queryset.filter(keyset_filter(self.ordering, position, reverse))
+        return self.finish_page(list(queryset[:self.page_size + 1]), position, reverse)
+
+    def setup(self, request, view):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = tuple(getattr(view, 'pagination_ordering', self.ordering))
+        self.fields = [field for field, _descending in parse_ordering(self.ordering)]
+
+    def get_query_ordering(self, reverse):
+        """
+        Return the ordering to query with, flipped when paging backwards.
+        """
+        if not reverse:
+            return self.ordering
+        return tuple(term[1:] if term.startswith('-') else f'-{term}' for term in self.ordering)
+
+    def finish_page(self, results, position, reverse):
+        """
+        Trim the extra lookahead row and work out which links the page has.
+        """
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+
+        if reverse:
+            results.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+        self.page = results
+        return results
+
+    def get_page_size(self, request):
+        page_size = api_settings.PAGE_SIZE or 50
+        max_page_size = getattr(settings, 'PAGINATION_MAX_PAGE_SIZE', 500)
+        if self.page_size_query_param in request.query_params:
+            try:
+                requested = int(request.query_params[self.page_size_query_param])
+            except (TypeError, ValueError):
+                requested = 0
+            if requested > 0:
+                page_size = requested
+        return min(page_size, max_page_size)
+
+    def decode_request_cursor(self, request, queryset):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None, False
+        try:
+            position, reverse = decode_cursor(cursor)
+            if len(position) != len(self.fields):
+                raise ValueError('Invalid cursor')
+            position = [self.to_python(queryset, field, value) for field, value in zip(self.fields, position)]
+        except (ValueError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def to_python(self, queryset, field_name, value):
+        annotation = queryset.query.annotations.get(field_name)
+        if annotation is not None:
+            return annotation.output_field.to_python(value)
+        try:
+            field = queryset.model._meta.get_field(field_name)
+        except FieldDoesNotExist:
+            return value
+        return field.to_python(value)
+
+    def get_position(self, row):
+        if isinstance(row, dict):
+            return [row[field] for field in self.fields]
+        return [getattr(row, field) for field in self.fields]
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        url = self.request.build_absolute_uri()
+        cursor = encode_cursor(self.get_position(self.page[-1]))
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        url = self.request.build_absolute_uri()
+        cursor = encode_cursor(self.get_position(self.page[0]), reverse=True)
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'The pagination cursor value.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Number of results to return per page.',
+                'schema': {'type': 'integer'},
+            },
+        ]
+
+
+class OffsetPagination(PageNumberPagination):
+    """
+    Page-number pagination with a client-controlled, capped page size.
+    """
+    page_size_query_param = 'page_size'
+
+    @property
+    def max_page_size(self):
+        return getattr(settings, 'PAGINATION_MAX_PAGE_SIZE', 500)
+
+
+class AdminPagination(KeysetPagination):
+    """
+    Keyset pagination that lets the admin UI opt into page numbers with `?page=`.
+    """
+    offset_query_param = 'page'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.offset_paginator = None
+        if self.offset_query_param in request.query_params:
+            self.offset_paginator = OffsetPagination()
+            ordering = getattr(view, 'pagination_ordering', self.ordering)
+            return self.offset_paginator.paginate_queryset(queryset.order_by(*ordering), request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.offset_paginator is not None:
+            return self.offset_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class UnionKeysetPagination(KeysetPagination):
+    """
+    Keyset pagination over a UNION ALL of querysets that share the ordering columns.
+
+    Views return a list of querysets from get_queryset(). The keyset bound and,
+    where the database allows it, the page limit are pushed into every branch
+    before the union, so each branch stays an index range scan.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        querysets = list(queryset)
+        self.setup(request, view)
+        position, reverse = self.decode_request_cursor(request, querysets[0])
+        ordering = self.get_query_ordering(reverse)
+        limit = self.page_size + 1
+
+        branches = []
+        for branch in querysets:
+            if position is not None:
+                branch = branch.filter(keyset_filter(self.ordering, position, reverse))
+            if connections[branch.db].features.supports_slicing_ordering_in_compound:
+                branch = branch.order_by(*ordering)[:limit]
+            else:
+                branch = branch.order_by()
+            branches.append(branch)
+        union = branches[0].union(*branches[1:], all=True).order_by(*ordering)
+        return self.finish_page(list(union[:limit]), position, reverse)
@@ -0,0 +1,65 @@
+import codecs
+import io
+import json
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; without it requests use the stdlib decoder.
+    orjson = None
+
+
+def parse_ndjson_lines(lines):
+    """
+    Yield one object per non-blank line of newline-delimited JSON.
+
+    Raises ValueError naming the line number of the first malformed line.
+    """
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as exc:
+            raise ValueError(f'line {number}: {exc}') from exc
+
+
+class NDJSONParser(BaseParser):
+    """
+    Parse a newline-delimited JSON body into a list of objects, so feeds can stream records one per line.
+    """
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        try:
+            return list(parse_ndjson_lines(codecs.getreader(encoding)(stream)))
+        except ValueError as exc:
+            raise ParseError(f'NDJSON parse error - {exc}')
+
+
+class FastJSONParser(JSONParser):
+    """
+    Parse JSON with orjson when it is installed, into the same data as DRF's JSONParser.
+
+    Bodies orjson refuses, such as non-UTF-8 encodings or malformed JSON,
+    are handed to JSONParser, which parses them or words the error exactly
+    as before. orjson reads integers wider than 64 bits as floats; no field
+    of this API accepts numbers that large, so they fail validation either way.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        encoding = (parser_context or {}).get('encoding', settings.DEFAULT_CHARSET)
+        body = stream.read()
+        if codecs.lookup(encoding).name == 'utf-8':
+            try:
+                return orjson.loads(body)
+            except orjson.JSONDecodeError:
+                pass
+        return super().parse(io.BytesIO(body), media_type, parser_context)
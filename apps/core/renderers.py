@@ -0,0 +1,37 @@
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; without it responses use the stdlib encoder.
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Render JSON with orjson when it is installed, byte for byte like DRF's JSONRenderer.
+
+    Types orjson would encode differently from DRF, such as datetimes, are
+    handed to DRF's own encoder, as are the ones it cannot encode, such as
+    decimals and lazy translations. Raw Decimal values therefore keep their
+    current representation, and serializer decimal fields, which are
+    already strings, pass through untouched. Indented output, non-default
+    JSON settings and anything orjson rejects, such as integers wider than
+    64 bits, fall back to the stdlib encoder. The one difference is that
+    NaN and infinite floats become null instead of failing the response.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Escape the line separators like JSONRenderer, keeping the output a strict JavaScript subset.
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
@@ -1,9 +1,308 @@
-from rest_framework import serializers
+import decimal
+import re
+from functools import partial
+
+from django.core.exceptions import FieldDoesNotExist
+from django.utils import timezone
+from django.utils.encoding import force_str
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
 
 from apps.core.models import CustomUser
 
 
+class SparseFieldsMixin:
+    """
+    Let the request choose the fields of a top-level ModelSerializer and which relations it nests.
+
+    Views put the `fields` and `expand` sets parsed from `?fields=` and
+    `?expand=` in the serializer context. `fields` keeps only the named
+    fields. `expand` names the nested relations to embed and renders the
+    others as their primary key; without it every relation stays nested.
+    Nested serializers are always rendered whole. `extra_fields` names keys
+    that to_representation adds on top of the declared fields, so they can
+    be selected too.
+    """
+    extra_fields = ()
+
+    def is_top_level(self):
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+    def includes(self, name):
+        """
+        Tell whether the request asked for the field or extra key `name`.
+        """
+        fields = self.context.get('fields')
+        return fields is None or name in fields or not self.is_top_level()
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self.is_top_level():
+            return fields
+        selected, expand = self.context.get('fields'), self.context.get('expand')
+        if selected is not None:
+            fields = type(fields)((name, field) for name, field in fields.items() if name in selected)
+        if expand is not None:
+            for name, field in fields.items():
+                if isinstance(field, serializers.BaseSerializer) and name not in expand:
+                    fields[name] = serializers.PrimaryKeyRelatedField(
+                        read_only=True,
+                        source=field.source,
+                        help_text=field.help_text,
+                    )
+        return fields
+
+
 class CustomUserSerializer(serializers.ModelSerializer):
     class Meta:
         model = CustomUser
         fields = ['username', 'first_name', 'last_name', 'email', 'user_role']
+
+
+# Fields whose representation of a value read from the database is the value itself.
+IDENTITY_REPRESENTATIONS = {
+    serializers.BooleanField.to_representation,
+    serializers.CharField.to_representation,
+    serializers.IntegerField.to_representation,
+}
+
+DISPLAY_SOURCE = re.compile(r'get_(\w+)_display')
+
+
+class UnsupportedField(Exception):
+    pass
+
+
+class ValuesSerializer:
+    """
+    Render the read output of a ModelSerializer from `.values()` rows instead of model instances.
+
+    The serializer's readable fields are compiled once into one getter
+    factory per field: model fields read their column and format it like the
+    field's own to_representation, `get_<field>_display` sources look up the
+    choice label, and nested model serializers are compiled the same way
+    over the joined columns. The factories run once per rendered list, so
+    request state such as the active time zone and language is resolved
+    once per page rather than once per row. The output is what the
+    serializer itself would return.
+
+    Build it with for_serializer(), which returns None for serializers it
+    cannot reproduce exactly, such as ones with method fields, reverse or
+    many-to-many relations, or their own to_representation.
+    """
+    _compiled = {}
+
+    def __init__(self, serializer, prefix=''):
+        self.model = serializer.Meta.model
+        self.fields = {}
+        self.factories = []
+        self.field_lookups = {}
+        self.field_relations = {}
+        for field in serializer._readable_fields:
+            lookups, relations = [], []
+            self.factories.append((field.field_name, self.compile_field(field, prefix, lookups, relations)))
+            self.fields[field.field_name] = field
+            self.field_lookups[field.field_name] = lookups
+            self.field_relations[field.field_name] = relations
+
+    @classmethod
+    def for_serializer(cls, serializer_class, fields=None, expand=None):
+        """
+        Return the compiled form of a serializer class, or None when it must be rendered from instances.
+
+        `fields` and `expand` are the sparse fieldset of a SparseFieldsMixin
+        serializer; each distinct fieldset is compiled once.
+        """
+        key = (serializer_class, fields, expand)
+        if key not in cls._compiled:
+            try:
+                serializer = serializer_class(context={'fields': fields, 'expand': expand})
+                compiled = cls(cls.check_serializer(serializer))
+            except UnsupportedField:
+                compiled = None
+            cls._compiled[key] = compiled
+        return cls._compiled[key]
+
+    @staticmethod
+    def check_serializer(serializer):
+        if not isinstance(serializer, serializers.ModelSerializer):
+            raise UnsupportedField(serializer)
+        if type(serializer).to_representation is not serializers.Serializer.to_representation:
+            raise UnsupportedField(serializer)
+        return serializer
+
+    def compile_field(self, field, prefix, lookups, relations):
+        if len(field.source_attrs) != 1:
+            raise UnsupportedField(field)
+        source = field.source_attrs[0]
+
+        display = DISPLAY_SOURCE.fullmatch(source)
+        if display:
+            model_field = self.get_model_field(display.group(1))
+            if not model_field.choices:
+                raise UnsupportedField(field)
+            key = prefix + model_field.name
+            lookups.append(key)
+            return partial(display_getter, key, model_field.flatchoices)
+
+        model_field = self.get_model_field(source)
+        key = prefix + model_field.name
+        lookups.append(key)
+
+        if isinstance(field, serializers.BaseSerializer):
+            if not (model_field.many_to_one or model_field.one_to_one):
+                raise UnsupportedField(field)
+            nested = ValuesSerializer(self.check_serializer(field), f'{key}__')
+            lookups.extend(nested.get_lookups())
+            relations.append(key)
+            relations.extend(nested.get_relations())
+            return partial(nested_getter, key, nested)
+
+        if isinstance(field, serializers.PrimaryKeyRelatedField) and field.pk_field is None and (
+            model_field.many_to_one or model_field.one_to_one
+        ):
+            # The foreign key column is the primary key the field renders.
+            return partial(column_getter, key)
+        if model_field.is_relation or isinstance(field, (serializers.RelatedField, serializers.ManyRelatedField)):
+            raise UnsupportedField(field)
+        represent = type(field).to_representation
+        if represent in IDENTITY_REPRESENTATIONS or (
+            isinstance(field, serializers.ChoiceField) and all(isinstance(value, str) for value in field.choices)
+        ):
+            return partial(column_getter, key)
+        if represent is serializers.DecimalField.to_representation and decimal_string_field(field):
+            return partial(decimal_getter, key, field)
+        if represent is serializers.DateTimeField.to_representation and iso_datetime_field(field):
+            return partial(datetime_getter, key, field)
+        return partial(represented_getter, key, field.to_representation)
+
+    def get_model_field(self, name):
+        try:
+            model_field = self.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            raise UnsupportedField(name)
+        if not model_field.concrete:
+            raise UnsupportedField(name)
+        return model_field
+
+    def get_lookups(self, exclude=()):
+        """
+        Return the `.values()` lookups the readable fields need, leaving out those in `exclude`.
+        """
+        return [
+            lookup
+            for name, lookups in self.field_lookups.items() if name not in exclude
+            for lookup in lookups
+        ]
+
+    def get_relations(self, exclude=()):
+        """
+        Return the relations to join for the nested fields, leaving out those in `exclude`.
+        """
+        return [
+            relation
+            for name, relations in self.field_relations.items() if name not in exclude
+            for relation in relations
+        ]
+
+    def get_getters(self, fixed=None):
+        fixed = fixed or {}
+        return [
+            (name, fixed_getter(self.fields[name].to_representation(fixed[name])) if name in fixed else factory())
+            for name, factory in self.factories
+        ]
+
+    def to_representation(self, rows, fixed=None):
+        """
+        Render a list of rows; `fixed` maps field names to an instance shared by every row, which is rendered once.
+        """
+        getters = self.get_getters(fixed)
+        return [{name: getter(row) for name, getter in getters} for row in rows]
+
+    def iter_representation(self, rows, fixed=None):
+        """
+        Render rows one at a time as they are read, for results too large to hold in memory.
+        """
+        getters = self.get_getters(fixed)
+        for row in rows:
+            yield {name: getter(row) for name, getter in getters}
+
+
+def decimal_string_field(field):
+    return (
+        getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+        and field.decimal_places is not None
+        and not field.localize
+        and not field.normalize_output
+    )
+
+
+def iso_datetime_field(field):
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    return output_format is not None and output_format.lower() == ISO_8601
+
+
+def fixed_getter(data):
+    return lambda row: data
+
+
+def column_getter(key):
+    return lambda row: row[key]
+
+
+def represented_getter(key, represent):
+    return lambda row: None if row[key] is None else represent(row[key])
+
+
+def display_getter(key, choices):
+    labels = {value: force_str(label, strings_only=True) for value, label in choices}
+    return lambda row: labels.get(row[key], row[key])
+
+
+def nested_getter(key, nested):
+    getters = nested.get_getters()
+
+    # The foreign key column tells a missing related row from one with empty columns.
+    def getter(row):
+        if row[key] is None:
+            return None
+        return {name: field_getter(row) for name, field_getter in getters}
+    return getter
+
+
+def decimal_getter(key, field):
+    # The same quantization as DecimalField.to_representation, set up once per list.
+    context = decimal.getcontext().copy()
+    if field.max_digits is not None:
+        context.prec = field.max_digits
+    quantum = decimal.Decimal('.1') ** field.decimal_places
+    rounding = field.rounding
+
+    def getter(row):
+        value = row[key]
+        if value is None:
+            return None
+        if not isinstance(value, decimal.Decimal):
+            return field.to_representation(value)
+        return '{:f}'.format(value.quantize(quantum, rounding=rounding, context=context))
+    return getter
+
+
+def datetime_getter(key, field):
+    # The active time zone is looked up once per list instead of once per value.
+    field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+
+    def getter(row):
+        value = row[key]
+        if value is None:
+            return None
+        if field_timezone is None or timezone.is_naive(value):
+            return field.to_representation(value)
+        value = value.astimezone(field_timezone).isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+    return getter
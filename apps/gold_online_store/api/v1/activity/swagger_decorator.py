@@ -0,0 +1,23 @@
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from apps.gold_online_store.serializers.activity import ActivitySerializer
+
+# ActivityAPIView Decorators
+user_list_activity_swagger = swagger_auto_schema(
+    operation_summary='List Own Activity',
+    operation_description=(
+        'This endpoint allows authenticated users to retrieve their payments, gold sales, gold purchases, money withdrawals and gold withdrawals as one time-ordered list, newest first. '
+        'Each row carries a kind discriminator together with its ID, date, money_amount, gold_amount and status. '
+        'The list is cursor paginated: follow the "next" and "previous" links to page through it. '
+        'This operation requires JWT authentication.'
+    ),
+    tags=['gold_online_store.activity'],
+    manual_parameters=[
+        openapi.Parameter('cursor', openapi.IN_QUERY, description="Opaque pagination cursor taken from a next or previous link.", type=openapi.TYPE_STRING),
+        openapi.Parameter('page_size', openapi.IN_QUERY, description="Number of rows to return per page.", type=openapi.TYPE_INTEGER)
+    ],
+    responses={
+        200: ActivitySerializer(many=True),
+        401: 'Unauthorized: Valid JWT token required.'
+    }
+)
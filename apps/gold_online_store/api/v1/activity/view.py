@@ -0,0 +1,60 @@
+from django.db.models import CharField, DecimalField, F, Value
+from django.utils.decorators import method_decorator
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.viewsets import GenericViewSet
+from rest_framework import mixins
+
+from apps.core.authentication import ClaimsJWTAuthentication
+from apps.core.pagination import UnionKeysetPagination
+from apps.gold_online_store.models.payment import PaymentTransaction
+from apps.gold_online_store.models.transaction import GoldSaleTransaction, GoldPurchaseTransaction
+from apps.gold_online_store.models.withdrawal_requests import MoneyWithdrawalRequest, GoldWithdrawalRequest
+from apps.gold_online_store.serializers.activity import ActivitySerializer
+from apps.gold_online_store.api.v1.activity.swagger_decorator import user_list_activity_swagger
+
+# (kind, model, date field, money field, gold field) for every activity source.
+ACTIVITY_SOURCES = (
+    ('payment', PaymentTransaction, 'payment_date', 'money_amount', None),
+    ('gold_sale', GoldSaleTransaction, 'create_date', 'money_amount', 'gold_amount'),
+    ('gold_purchase', GoldPurchaseTransaction, 'create_date', 'money_amount', 'gold_amount'),
+    ('money_withdrawal', MoneyWithdrawalRequest, 'create_date', 'money_amount', None),
+    ('gold_withdrawal', GoldWithdrawalRequest, 'create_date', None, 'gold_amount'),
+)
+
+
+def _amount(field_name, decimal_places):
+    if field_name is None:
+        return Value(None, output_field=DecimalField(max_digits=15, decimal_places=decimal_places))
+    return F(field_name)
+
+
+@method_decorator(name='list', decorator=user_list_activity_swagger)
+class ActivityAPIView(GenericViewSet, mixins.ListModelMixin):
+    """
+    Authenticated user API ViewSet listing own payments, trades and withdrawals as one feed.
+    """
+    authentication_classes = [ClaimsJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    serializer_class = ActivitySerializer
+    pagination_class = UnionKeysetPagination
+    pagination_ordering = ('-date', '-kind', '-id')
+
+    def get_queryset(self):
+        """
+        Return one uniformly shaped queryset per activity source for the authenticated user.
+
+        The paginator bounds each branch by the cursor and merges them with a
+        single UNION ALL; each branch is served by its (user, date, id) index.
+        """
+        return [
+            model.objects
+            .filter(user_id=self.request.user.id)
+            .annotate(
+                kind=Value(kind, output_field=CharField()),
+                date=F(date_field),
+                money=_amount(money_field, 2),
+                gold=_amount(gold_field, 4),
+            )
+            .values('id', 'status', 'kind', 'date', 'money', 'gold')
+            for kind, model, date_field, money_field, gold_field in ACTIVITY_SOURCES
+        ]
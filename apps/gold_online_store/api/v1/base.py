@@ -0,0 +1,138 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.viewsets import GenericViewSet
+from rest_framework import mixins
+from rest_framework.exceptions import ValidationError
+
+from apps.core.authentication import ClaimsJWTAuthentication
+from apps.gold_online_store.api.v1.idempotency import idempotent
+from apps.gold_online_store.api.v1.values import ValuesListMixin
+
+
+class OwnerScopedReadOnlyViewSet(
+    ValuesListMixin,
+    GenericViewSet,
+    mixins.RetrieveModelMixin,
+    mixins.ListModelMixin,
+):
+    """
+    Base API ViewSet for reading records owned by the authenticated user.
+
+    Records are scoped with a plain `user_id` filter, so other users' records
+    are simply not found, and the object of a detail request is fetched once
+    and reused by every step of the request. The owner is always the
+    authenticated user, so it is attached to loaded records instead of being
+    joined or loaded again; list pages rendered from `.values()` rows share
+    its serialized form instead.
+    """
+    authentication_classes = [ClaimsJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    lookup_field = 'id'
+
+    def get_queryset(self):
+        """
+        Restrict queryset to the authenticated user's records.
+        """
+        return super().get_queryset().filter(user_id=self.request.user.id)
+
+    def get_object(self):
+        """
+        Fetch the requested record once per request.
+        """
+        if not hasattr(self, '_object'):
+            self._object = super().get_object()
+            self.attach_owner([self._object])
+        return self._object
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        # Rows read with .values() get the owner from get_fixed_values() instead.
+        if page is not None and queryset._fields is None:
+            self.attach_owner(page)
+        return page
+
+    def get_fixed_values(self):
+        return {'user': self.request.user}
+
+    def attach_owner(self, objects):
+        for obj in objects:
+            obj.user = self.request.user
+
+
+class OwnerScopedViewSet(
+    OwnerScopedReadOnlyViewSet,
+    mixins.CreateModelMixin,
+    mixins.UpdateModelMixin,
+    mixins.DestroyModelMixin,
+):
+    """
+    Base API ViewSet for records owned and managed by the authenticated user.
+
+    Views of records that are settled by an admin set `pending_status`:
+    owners can then only change or delete records still in that status.
+    The check is repeated in the statement that writes, so a record settled
+    meanwhile is never rolled back to pending or removed.
+    """
+    pending_status = None
+
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        """
+        Prevent setting the user field; records are always created for the authenticated user.
+        """
+        if 'user' in request.data:
+            raise ValidationError({'user': [_('User field cannot be set manually.')]})
+        return super().create(request, *args, **kwargs)
+
+    def perform_create(self, serializer):
+        serializer.save(user_id=self.request.user.id)
+
+    def update(self, request, *args, **kwargs):
+        """
+        Prevent modification of the user field on full and partial updates.
+        """
+        if 'user' in request.data:
+            raise ValidationError({'user': [_('User field cannot be modified.')]})
+        self.check_pending(self.get_object())
+        return super().update(request, *args, **kwargs)
+
+    def perform_update(self, serializer):
+        """
+        Write the changes only if the record is still pending.
+        """
+        if self.pending_status is None:
+            return super().perform_update(serializer)
+        instance = serializer.instance
+        changes = serializer.validated_data
+        if not self.pending_records(instance).update(**changes):
+            raise self.not_pending()
+        for field, value in changes.items():
+            setattr(instance, field, value)
+
+    def destroy(self, request, *args, **kwargs):
+        self.check_pending(self.get_object())
+        return super().destroy(request, *args, **kwargs)
+
+    def perform_destroy(self, instance):
+        """
+        Delete the record only if it is still pending.
+        """
+        if self.pending_status is None:
+            return super().perform_destroy(instance)
+        if not self.pending_records(instance).delete()[0]:
+            raise self.not_pending()
+
+    def pending_records(self, instance):
+        return type(instance)._default_manager.filter(pk=instance.pk, status=self.pending_status)
+
+    def check_pending(self, instance):
+        """
+        Refuse changes to records that have left the pending status.
+        """
+        if self.pending_status is not None and instance.status != self.pending_status:
+            raise self.not_pending()
+
+    def not_pending(self):
+        return ValidationError({'status': [
+            _('Only %(status)s records can be changed.') % {'status': self.pending_status.lower()}
+        ]})
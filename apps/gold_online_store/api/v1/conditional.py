@@ -0,0 +1,86 @@
+import hashlib
+
+from django.core.cache import caches
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Count, Max
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.http import condition
+from rest_framework import status
+from rest_framework.response import Response
+
+
+class ConditionalGetMixin:
+    """
+    Answer list and retrieve requests with 304 Not Modified when the client's copy is still current.
+
+    get_validators() returns a (version, last_modified) pair read from cheap
+    version data, or (None, None) when there is nothing to compare. By
+    default it is the count and latest `validator_field` stamp of the
+    records the request reads, in one aggregate query; views with cheaper
+    version data override it. The ETag hashes the version with the full URL and negotiated
+    media type, so pages and formats never share one. An unchanged response
+    is answered before the queryset is loaded or the serializer runs.
+
+    Views that set `response_cache` to a cache alias also keep the serialized
+    payload of each version there, keyed by the ETag, so a client without
+    the current copy is served it without the queryset or serializer as well.
+    Every write moves the version, so a cached payload is never served stale.
+    """
+    response_cache = None
+    validator_field = 'updated_at'
+
+    def get_validators(self):
+        """
+        Version the records read by the request by their count and latest update stamp.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.action == 'retrieve':
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            queryset = queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        try:
+            stamps = queryset.order_by().aggregate(count=Count('pk'), latest=Max(self.validator_field))
+        except (TypeError, ValueError, DjangoValidationError):
+            # A malformed lookup value; let the view answer its usual 404.
+            return None, None
+        if self.action == 'retrieve' and not stamps['count']:
+            return None, None
+        return f'{stamps["count"]}|{stamps["latest"]}', stamps['latest']
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(super().retrieve, request, *args, **kwargs)
+
+    def conditional_response(self, view, request, *args, **kwargs):
+        version, last_modified = self.get_validators()
+        etag = None
+        if version is not None:
+            # The host is part of the URL since paginated payloads link to it.
+            etag = hashlib.sha256(
+                f'{request.build_absolute_uri()}|{request.accepted_media_type}|{version}'.encode()
+            ).hexdigest()
+            if self.response_cache is not None:
+                view = self.cached(view, etag)
+        response = condition(
+            etag_func=lambda *args, **kwargs: etag,
+            last_modified_func=lambda *args, **kwargs: last_modified,
+        )(view)(request, *args, **kwargs)
+        # The representation depends on who is asking.
+        patch_vary_headers(response, ('Authorization',))
+        return response
+
+    def cached(self, view, etag):
+        cache = caches[self.response_cache]
+        key = f'{self.basename}:{etag}'
+
+        def cached_view(request, *args, **kwargs):
+            data = cache.get(key)
+            if data is not None:
+                return Response(data)
+            response = view(request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                cache.set(key, response.data)
+            return response
+
+        return cached_view
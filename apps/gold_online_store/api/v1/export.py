@@ -0,0 +1,174 @@
+import csv
+import re
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.utils.text import slugify
+from drf_yasg import openapi
+from rest_framework import serializers
+from rest_framework.decorators import action
+
+from apps.core.renderers import FastJSONRenderer
+from apps.core.serializers import ValuesSerializer
+from apps.gold_online_store.serializers.export import ExportQuerySerializer
+
+EXPORT_PARAMETERS = [
+    openapi.Parameter('output', openapi.IN_QUERY, description="Export format: ndjson (default) or csv.", type=openapi.TYPE_STRING, enum=['ndjson', 'csv']),
+]
+
+EXPORT_RANGE_PARAMETERS = [
+    openapi.Parameter('from', openapi.IN_QUERY, description="Start of the date range, inclusive.", type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME),
+    openapi.Parameter('to', openapi.IN_QUERY, description="End of the date range, exclusive.", type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME),
+]
+
+EXPORT_CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+# Spreadsheets run cells starting with these as formulas; tab and carriage
+# return are stripped by some of them before the check.
+CSV_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+# Serialized signed decimals such as -5.00 start with a formula prefix too,
+# but a spreadsheet reads them as the number they are.
+CSV_SIGNED_NUMBER = re.compile(r'[+-]\d+(\.\d+)?')
+
+
+class Echo:
+    """
+    A file-like object that hands back what is written to it, so csv.writer returns each line.
+    """
+
+    def write(self, value):
+        return value
+
+
+def flatten(data, prefix=''):
+    """
+    Yield (column, value) pairs for a representation, naming nested fields like user.username.
+    """
+    for name, value in data.items():
+        if isinstance(value, dict):
+            yield from flatten(value, f'{prefix}{name}.')
+        else:
+            yield f'{prefix}{name}', value
+
+
+def serializer_columns(serializer, prefix=''):
+    """
+    Yield the column names of a serializer's readable fields, naming nested fields like flatten().
+    """
+    for field in serializer._readable_fields:
+        if isinstance(field, serializers.Serializer):
+            yield from serializer_columns(field, f'{prefix}{field.field_name}.')
+        else:
+            yield f'{prefix}{field.field_name}'
+
+
+def csv_cell(value):
+    """
+    Quote a text value that a spreadsheet would otherwise evaluate as a formula.
+    """
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES) and not CSV_SIGNED_NUMBER.fullmatch(value):
+        return f"'{value}"
+    return value
+
+
+def ndjson_chunks(rows, chunk_size):
+    """
+    Encode rows as one JSON document per line, a chunk of rows at a time.
+    """
+    renderer = FastJSONRenderer()
+    lines = []
+    for row in rows:
+        lines.append(renderer.render(row))
+        if len(lines) >= chunk_size:
+            yield b'\n'.join(lines) + b'\n'
+            lines = []
+    if lines:
+        yield b'\n'.join(lines) + b'\n'
+
+
+def csv_chunks(rows, chunk_size, columns=()):
+    """
+    Encode rows as CSV, a chunk of rows at a time.
+
+    The header is taken from the first row, or is `columns` when there are
+    no rows, so an empty export still names its columns.
+    """
+    writer = csv.writer(Echo())
+    header = None
+    lines = []
+    for row in rows:
+        values = dict(flatten(row))
+        if header is None:
+            header = list(values)
+            lines.append(writer.writerow([csv_cell(column) for column in header]))
+        lines.append(writer.writerow([csv_cell(values.get(column)) for column in header]))
+        if len(lines) >= chunk_size:
+            yield ''.join(lines).encode()
+            lines = []
+    if header is None:
+        lines.append(writer.writerow([csv_cell(column) for column in columns]))
+    if lines:
+        yield ''.join(lines).encode()
+
+
+class ExportMixin:
+    """
+    Add an `export` action that streams every matching record as NDJSON or CSV.
+
+    Records are read through a server-side cursor `EXPORT_CHUNK_SIZE` rows at
+    a time and written out as they are read, so memory stays flat however
+    many records match. The list's filters, `?fields=` and `?expand=`
+    apply. Views set `export_date_field` to the indexed column their
+    records are dated by, which `?from=` and `?to=` filter on and the
+    export is ordered by; without one, records are exported by ID.
+    """
+    export_date_field = None
+
+    @action(detail=False, methods=['get'], url_path='export', pagination_class=None)
+    def export(self, request, *args, **kwargs):
+        """
+        Stream the records matching the query parameters as an attachment.
+        """
+        query = ExportQuerySerializer(data=request.query_params, context={'date_field': self.export_date_field})
+        query.is_valid(raise_exception=True)
+        output = query.validated_data['output']
+
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.export_date_field:
+            if 'from' in query.validated_data:
+                queryset = queryset.filter(**{f'{self.export_date_field}__gte': query.validated_data['from']})
+            if 'to' in query.validated_data:
+                queryset = queryset.filter(**{f'{self.export_date_field}__lt': query.validated_data['to']})
+            queryset = queryset.order_by(self.export_date_field, 'id')
+        else:
+            queryset = queryset.order_by('id')
+
+        rows = self.get_export_rows(queryset)
+        if output == 'csv':
+            chunks = csv_chunks(rows, settings.EXPORT_CHUNK_SIZE, list(serializer_columns(self.get_serializer())))
+        else:
+            chunks = ndjson_chunks(rows, settings.EXPORT_CHUNK_SIZE)
+        response = StreamingHttpResponse(chunks, content_type=EXPORT_CONTENT_TYPES[output])
+        filename = slugify(queryset.model._meta.verbose_name_plural)
+        response['Content-Disposition'] = f'attachment; filename="{filename}.{output}"'
+        return response
+
+    def get_export_rows(self, queryset):
+        """
+        Return a lazy iterator over the representation of each record.
+
+        It reads `.values()` rows when the serializer compiles, and model
+        instances otherwise; nothing is queried until the response streams.
+        """
+        chunk_size = settings.EXPORT_CHUNK_SIZE
+        compiled = ValuesSerializer.for_serializer(self.get_serializer_class(), *self.get_fieldset())
+        if compiled is not None:
+            fixed = self.get_fixed_values()
+            rows = queryset.values(*compiled.get_lookups(exclude=fixed)).iterator(chunk_size=chunk_size)
+            return compiled.iter_representation(rows, fixed)
+        serializer = self.get_serializer()
+        return map(serializer.to_representation, queryset.iterator(chunk_size=chunk_size))
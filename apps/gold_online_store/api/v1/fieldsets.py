@@ -0,0 +1,88 @@
+from django.utils.translation import gettext_lazy as _
+from drf_yasg import openapi
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+
+from apps.core.pagination import parse_ordering
+from apps.core.serializers import SparseFieldsMixin, ValuesSerializer
+
+FIELDSET_PARAMETERS = [
+    openapi.Parameter('fields', openapi.IN_QUERY, description="Comma-separated fields to return; all fields when omitted.", type=openapi.TYPE_STRING),
+    openapi.Parameter('expand', openapi.IN_QUERY, description="Comma-separated relations to embed, such as user,gold_price; the others are returned as their ID. All relations are embedded when omitted.", type=openapi.TYPE_STRING),
+]
+
+
+class SparseFieldsetMixin:
+    """
+    Let clients trim responses with `?fields=` and `?expand=`.
+
+    The parsed fieldset is passed to SparseFieldsMixin serializers through
+    the context. Reads also load just what the fieldset renders: the
+    queryset joins only the expanded relations and defers every other
+    column, for serializers that ValuesSerializer can compile.
+    """
+    fieldset_query_params = ('fields', 'expand')
+
+    def get_fixed_values(self):
+        """
+        Return {field name: instance} for fields that are the same on every row, so they are neither queried nor rendered per row.
+        """
+        return {}
+
+    def get_fieldset(self):
+        """
+        Return the requested (fields, expand) pair; each is a frozenset, or None when not given.
+        """
+        if not hasattr(self, '_fieldset'):
+            self._fieldset = self.parse_fieldset()
+        return self._fieldset
+
+    def parse_fieldset(self):
+        serializer_class = self.get_serializer_class()
+        params = self.request.query_params
+        if not issubclass(serializer_class, SparseFieldsMixin) or not any(
+            name in params for name in self.fieldset_query_params
+        ):
+            return None, None
+
+        available = serializer_class().fields
+        names = set(available) | set(serializer_class.extra_fields)
+        relations = {name for name, field in available.items() if isinstance(field, serializers.BaseSerializer)}
+        fields = self.parse_names('fields', names)
+        expand = self.parse_names('expand', relations)
+        # An empty ?fields= asks for nothing in particular, so it returns everything.
+        return fields or None, expand
+
+    def parse_names(self, param, allowed):
+        value = self.request.query_params.get(param)
+        if value is None:
+            return None
+        names = frozenset(name.strip() for name in value.split(',') if name.strip())
+        unknown = sorted(names - allowed)
+        if unknown:
+            raise ValidationError({param: [_('Unknown fields: %(names)s.') % {'names': ', '.join(unknown)}]})
+        return names
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'], context['expand'] = self.get_fieldset()
+        return context
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields, expand = self.get_fieldset()
+        # Writes keep whole instances so saving never meets a deferred column.
+        if (fields is None and expand is None) or self.request.method not in SAFE_METHODS:
+            return queryset
+        compiled = ValuesSerializer.for_serializer(self.get_serializer_class(), fields, expand)
+        if compiled is None:
+            return queryset
+        fixed = self.get_fixed_values()
+        ordering = [field for field, _descending in parse_ordering(getattr(self, 'pagination_ordering', ()))]
+        return (
+            queryset
+            .select_related(None)
+            .select_related(*compiled.get_relations(exclude=fixed))
+            .only(*dict.fromkeys(compiled.get_lookups(exclude=fixed) + ordering))
+        )
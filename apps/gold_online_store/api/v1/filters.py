@@ -0,0 +1,150 @@
+from django.utils.translation import gettext_lazy as _
+from django_filters import rest_framework as filters
+
+from apps.core.filters import USERNAME_SEARCH_MIN_LENGTH
+from apps.gold_online_store.models.gold import GoldPrice, Wallet
+from apps.gold_online_store.models.payment import PaymentTransaction
+from apps.gold_online_store.models.transaction import GoldTransaction
+from apps.gold_online_store.models.withdrawal_requests import (
+    GoldWithdrawalRequest,
+    MoneyWithdrawalRequest,
+    WithdrawalRequest,
+)
+
+
+class UserFilterSet(filters.FilterSet):
+    """
+    Base FilterSet for admin lists of records that belong to a user.
+
+    Filters are exact matches or ranges on indexed columns, so each one
+    narrows an index scan instead of a sequential one. The exception is
+    `search`, a substring match on the owner's username, which is served
+    by the trigram index on UPPER(username) that migrate builds on
+    PostgreSQL (see apps.core.apps) and therefore requires
+    USERNAME_SEARCH_MIN_LENGTH characters.
+    """
+    search = filters.CharFilter(
+        field_name='user__username',
+        lookup_expr='icontains',
+        min_length=USERNAME_SEARCH_MIN_LENGTH,
+        help_text=_('Filter by username (partial match, at least three characters).'),
+    )
+    user = filters.NumberFilter(
+        field_name='user',
+        help_text=_('Filter by user ID.'),
+    )
+
+
+class GoldTransactionFilter(UserFilterSet):
+    """
+    Filter gold sale and purchase transactions.
+    """
+    status = filters.ChoiceFilter(
+        choices=GoldTransaction.STATUS_CHOICES,
+        help_text=_('Filter by status.'),
+    )
+    create_date = filters.IsoDateTimeFromToRangeFilter(
+        help_text=_('Filter by creation date; create_date_after and create_date_before are inclusive.'),
+    )
+    money_amount = filters.RangeFilter(
+        help_text=_('Filter by money amount; money_amount_min and money_amount_max are inclusive.'),
+    )
+    gold_amount = filters.RangeFilter(
+        help_text=_('Filter by gold amount; gold_amount_min and gold_amount_max are inclusive.'),
+    )
+    gold_price = filters.NumberFilter(
+        field_name='gold_price',
+        help_text=_('Filter by gold price ID.'),
+    )
+
+    class Meta:
+        model = GoldTransaction
+        fields = []
+
+
+class PaymentTransactionFilter(UserFilterSet):
+    """
+    Filter payment transactions.
+    """
+    status = filters.ChoiceFilter(
+        choices=PaymentTransaction.STATUS_CHOICES,
+        help_text=_('Filter by status.'),
+    )
+    payment_date = filters.IsoDateTimeFromToRangeFilter(
+        help_text=_('Filter by payment date; payment_date_after and payment_date_before are inclusive.'),
+    )
+    money_amount = filters.RangeFilter(
+        help_text=_('Filter by money amount; money_amount_min and money_amount_max are inclusive.'),
+    )
+
+    class Meta:
+        model = PaymentTransaction
+        fields = []
+
+
+class WithdrawalRequestFilter(UserFilterSet):
+    """
+    Filter money and gold withdrawal requests.
+    """
+    status = filters.ChoiceFilter(
+        choices=WithdrawalRequest.STATUS_CHOICES,
+        help_text=_('Filter by status.'),
+    )
+    create_date = filters.IsoDateTimeFromToRangeFilter(
+        help_text=_('Filter by creation date; create_date_after and create_date_before are inclusive.'),
+    )
+
+    class Meta:
+        model = WithdrawalRequest
+        fields = []
+
+
+class MoneyWithdrawalRequestFilter(WithdrawalRequestFilter):
+    money_amount = filters.RangeFilter(
+        help_text=_('Filter by money amount; money_amount_min and money_amount_max are inclusive.'),
+    )
+
+    class Meta(WithdrawalRequestFilter.Meta):
+        model = MoneyWithdrawalRequest
+
+
+class GoldWithdrawalRequestFilter(WithdrawalRequestFilter):
+    gold_amount = filters.RangeFilter(
+        help_text=_('Filter by gold amount; gold_amount_min and gold_amount_max are inclusive.'),
+    )
+
+    class Meta(WithdrawalRequestFilter.Meta):
+        model = GoldWithdrawalRequest
+
+
+class WalletFilter(UserFilterSet):
+    """
+    Filter wallets.
+    """
+    money_stock = filters.RangeFilter(
+        help_text=_('Filter by money balance; money_stock_min and money_stock_max are inclusive.'),
+    )
+    gold_stock = filters.RangeFilter(
+        help_text=_('Filter by gold balance; gold_stock_min and gold_stock_max are inclusive.'),
+    )
+
+    class Meta:
+        model = Wallet
+        fields = []
+
+
+class GoldPriceFilter(filters.FilterSet):
+    """
+    Filter gold prices by the indexed date range and by whether they are active.
+    """
+    date = filters.IsoDateTimeFromToRangeFilter(
+        help_text=_('Filter by price date; date_after and date_before are inclusive.'),
+    )
+    active = filters.BooleanFilter(
+        help_text=_('Filter by active status.'),
+    )
+
+    class Meta:
+        model = GoldPrice
+        fields = []
+
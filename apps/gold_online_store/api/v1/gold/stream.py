@@ -0,0 +1,64 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.translation import gettext_lazy as _
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import AuthenticationFailed
+
+from apps.core.authentication import ClaimsJWTAuthentication
+from apps.gold_online_store.services.price_provider import get_active_gold_price
+from apps.gold_online_store.services.price_stream import get_price_broadcaster, price_message
+
+# Seconds between keep-alive comments, so proxies do not close idle streams.
+HEARTBEAT_INTERVAL = 15
+
+
+def sse_event(message):
+    return f'event: price\ndata: {message}\n\n'
+
+
+async def price_events(initial_message):
+    """
+    Yield the current price, then every newly activated price, as server-sent events.
+    """
+    broadcaster = get_price_broadcaster()
+    subscription = broadcaster.subscribe()
+    try:
+        if initial_message is not None:
+            yield sse_event(initial_message)
+        while True:
+            try:
+                message = await subscription.next(HEARTBEAT_INTERVAL)
+            except asyncio.TimeoutError:
+                yield ': keep-alive\n\n'
+                continue
+            yield sse_event(message)
+    finally:
+        broadcaster.unsubscribe(subscription)
+
+
+@require_GET
+async def gold_price_stream(request):
+    """
+    Stream the active gold price to an authenticated client as server-sent events.
+
+    Only served under ASGI, where an idle stream costs no thread.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({'detail': _('The price stream is only available under ASGI.')}, status=501)
+    try:
+        authenticated = await sync_to_async(ClaimsJWTAuthentication().authenticate)(request)
+    except AuthenticationFailed as exc:
+        return JsonResponse({'detail': exc.detail}, status=exc.status_code)
+    if authenticated is None:
+        return JsonResponse({'detail': _('Authentication credentials were not provided.')}, status=401)
+
+    gold_price = await sync_to_async(get_active_gold_price)()
+    initial_message = price_message(gold_price) if gold_price is not None else None
+    response = StreamingHttpResponse(price_events(initial_message), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream.
+    response['X-Accel-Buffering'] = 'no'
+    return response
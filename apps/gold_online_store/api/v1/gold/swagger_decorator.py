@@ -1,6 +1,18 @@
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
-from apps.gold_online_store.serializers.gold import WalletSerializer, GoldPriceSerializer
+from apps.gold_online_store.api.v1.export import EXPORT_PARAMETERS
+from apps.gold_online_store.api.v1.fieldsets import FIELDSET_PARAMETERS
+from apps.core.filters import filter_parameters
+from apps.gold_online_store.api.v1.filters import GoldPriceFilter, WalletFilter
+from apps.gold_online_store.serializers.gold import (
+    WalletSerializer,
+    GoldPriceSerializer,
+    GoldPriceCandleSerializer,
+    GoldPriceTickSerializer,
+    GoldPriceIngestResultSerializer,
+    GoldPriceRepriceSerializer,
+    GoldPriceAsOfTransactionSerializer,
+)
 
 # WalletAdminAPIView Decorators
 admin_create_wallet_swagger = swagger_auto_schema(
@@ -32,7 +44,8 @@ admin_retrieve_wallet_swagger = swagger_auto_schema(
     ),
     tags=['admin.gold_online_store.wallet'],
     manual_parameters=[
-        openapi.Parameter('id', openapi.IN_PATH, description="The unique ID of the wallet to retrieve.", type=openapi.TYPE_INTEGER)
+        openapi.Parameter('id', openapi.IN_PATH, description="The unique ID of the wallet to retrieve.", type=openapi.TYPE_INTEGER),
+        *FIELDSET_PARAMETERS,
     ],
     responses={
         200: WalletSerializer,
@@ -113,12 +126,13 @@ admin_list_wallet_swagger = swagger_auto_schema(
     operation_description=(
         'This endpoint allows administrators to retrieve a list of all wallet records in the system. '
         'The response includes details for each wallet, such as ID, associated user, money_stock, gold_stock, and total_value. '
-        'Optional search functionality is available using the "search" query parameter to filter wallets by username. '
+        'Results can be filtered by user and balance range, and by username with the "search" query parameter (at least three characters). '
         'This operation is restricted to admin users only and requires JWT authentication.'
     ),
     tags=['admin.gold_online_store.wallet'],
     manual_parameters=[
-        openapi.Parameter('search', openapi.IN_QUERY, description="Filter wallets by username (partial match).", type=openapi.TYPE_STRING)
+        *filter_parameters(WalletFilter),
+        *FIELDSET_PARAMETERS,
     ],
     responses={
         200: WalletSerializer(many=True),
@@ -127,26 +141,30 @@ admin_list_wallet_swagger = swagger_auto_schema(
     }
 )
 
-# WalletAPIView Decorators
-user_create_wallet_swagger = swagger_auto_schema(
-    operation_summary='Create a New Wallet (User)',
+admin_export_wallet_swagger = swagger_auto_schema(
+    operation_summary='Export All Wallets (Admin)',
     operation_description=(
-        'This endpoint allows authenticated users to create a new wallet for themselves. '
-        'The request must include money_stock and gold_stock, both of which must be non-negative and within reasonable limits. '
-        'The user field is automatically set to the authenticated user and cannot be modified. '
-        'The response returns the created wallet’s details, including the total value calculated based on the latest active gold price. '
-        'This operation requires JWT authentication.'
+        'This endpoint allows administrators to download every wallet record matching the query as a streamed attachment, one record per line. '
+        'Records are written as NDJSON by default, or as CSV with "output=csv", where nested fields become columns such as user.username. '
+        'Records are exported in ID order; wallets cannot be filtered by date. '
+        'The filters of the list endpoint and its "fields" and "expand" query parameters apply. '
+        'This operation is restricted to admin users only and requires JWT authentication.'
     ),
-    tags=['gold_online_store.wallet'],
-    request_body=WalletSerializer,
+    tags=['admin.gold_online_store.wallet'],
+    manual_parameters=[
+        *EXPORT_PARAMETERS,
+        *filter_parameters(WalletFilter),
+        *FIELDSET_PARAMETERS,
+    ],
     responses={
-        201: WalletSerializer,
-        400: 'Invalid input data (e.g., negative amounts or attempting to set user field).',
-        401: 'Unauthorized: Valid JWT token required.',
-        403: 'Forbidden: User can only create their own wallet.'
+        200: 'The matching records as an NDJSON or CSV attachment.',
+        400: 'Invalid query parameters (e.g., an unknown output format).',
+        401: 'Unauthorized: Valid JWT token required for admin users.',
+        403: 'Forbidden: User is not an admin.'
     }
 )
 
+# WalletAPIView Decorators
 user_retrieve_wallet_swagger = swagger_auto_schema(
     operation_summary='Retrieve Own Wallet Details',
     operation_description=(
@@ -157,7 +175,8 @@ user_retrieve_wallet_swagger = swagger_auto_schema(
     ),
     tags=['gold_online_store.wallet'],
     manual_parameters=[
-        openapi.Parameter('id', openapi.IN_PATH, description="The ID of the authenticated user’s wallet.", type=openapi.TYPE_INTEGER)
+        openapi.Parameter('id', openapi.IN_PATH, description="The ID of the authenticated user’s wallet.", type=openapi.TYPE_INTEGER),
+        *FIELDSET_PARAMETERS,
     ],
     responses={
         200: WalletSerializer,
@@ -167,75 +186,6 @@ user_retrieve_wallet_swagger = swagger_auto_schema(
     }
 )
 
-user_update_wallet_swagger = swagger_auto_schema(
-    operation_summary='Fully Update Own Wallet',
-    operation_description=(
-        'This endpoint allows authenticated users to fully update their own wallet identified by its ID. '
-        'The request body must include all required fields (e.g., money_stock, gold_stock) even if some fields remain unchanged. '
-        'The money_stock and gold_stock must be non-negative and within reasonable limits. '
-        'The user field cannot be modified and must match the authenticated user. '
-        'The response returns the updated wallet’s details, including the total value. '
-        'This operation requires JWT authentication.'
-    ),
-    tags=['gold_online_store.wallet'],
-    request_body=WalletSerializer,
-    manual_parameters=[
-        openapi.Parameter('id', openapi.IN_PATH, description="The ID of the authenticated user’s wallet to update.", type=openapi.TYPE_INTEGER)
-    ],
-    responses={
-        200: WalletSerializer,
-        400: 'Invalid input data (e.g., negative amounts or attempting to modify user field).',
-        401: 'Unauthorized: Valid JWT token required.',
-        403: 'Forbidden: User can only update their own wallet.',
-        404: 'Not Found: Wallet with the specified ID does not exist.'
-    }
-)
-
-user_partial_update_wallet_swagger = swagger_auto_schema(
-    operation_summary='Partially Update Own Wallet',
-    operation_description=(
-        'This endpoint allows authenticated users to partially update their own wallet identified by its ID. '
-        'Only the provided fields in the request body will be updated (e.g., updating only money_stock or gold_stock). '
-        'The money_stock and gold_stock must be non-negative and within reasonable limits. '
-        'The user field cannot be modified and must match the authenticated user. '
-        'The response returns the updated wallet’s details, including the total value. '
-        'This operation requires JWT authentication.'
-    ),
-    tags=['gold_online_store.wallet'],
-    request_body=WalletSerializer,
-    manual_parameters=[
-        openapi.Parameter('id', openapi.IN_PATH, description="The ID of the authenticated user’s wallet to partially update.", type=openapi.TYPE_INTEGER)
-    ],
-    responses={
-        200: WalletSerializer,
-        400: 'Invalid input data (e.g., negative amounts or attempting to modify user field).',
-        401: 'Unauthorized: Valid JWT token required.',
-        403: 'Forbidden: User can only update their own wallet.',
-        404: 'Not Found: Wallet with the specified ID does not exist.'
-    }
-)
-
-user_destroy_wallet_swagger = swagger_auto_schema(
-    operation_summary='Delete Own Wallet',
-    operation_description=(
-        'This endpoint allows authenticated users to delete their own wallet by its ID. '
-        'The operation permanently removes the wallet from the system. '
-        'The wallet ID must correspond to the authenticated user’s wallet. '
-        'A successful deletion returns a 204 No Content response. '
-        'This operation requires JWT authentication.'
-    ),
-    tags=['gold_online_store.wallet'],
-    manual_parameters=[
-        openapi.Parameter('id', openapi.IN_PATH, description="The ID of the authenticated user’s wallet to delete.", type=openapi.TYPE_INTEGER)
-    ],
-    responses={
-        204: 'Wallet successfully deleted.',
-        401: 'Unauthorized: Valid JWT token required.',
-        403: 'Forbidden: User can only delete their own wallet.',
-        404: 'Not Found: Wallet with the specified ID does not exist.'
-    }
-)
-
 user_list_wallet_swagger = swagger_auto_schema(
     operation_summary='List Own Wallet',
     operation_description=(
@@ -244,6 +194,7 @@ user_list_wallet_swagger = swagger_auto_schema(
         'Users can only access their own wallet. This operation requires JWT authentication.'
     ),
     tags=['gold_online_store.wallet'],
+    manual_parameters=FIELDSET_PARAMETERS,
     responses={
         200: WalletSerializer(many=True),
         401: 'Unauthorized: Valid JWT token required.',
@@ -280,7 +231,8 @@ admin_retrieve_gold_price_swagger = swagger_auto_schema(
     ),
     tags=['admin.gold_online_store.gold_price'],
     manual_parameters=[
-        openapi.Parameter('id', openapi.IN_PATH, description="The unique ID of the gold price record to retrieve.", type=openapi.TYPE_INTEGER)
+        openapi.Parameter('id', openapi.IN_PATH, description="The unique ID of the gold price record to retrieve.", type=openapi.TYPE_INTEGER),
+        *FIELDSET_PARAMETERS,
     ],
     responses={
         200: GoldPriceSerializer,
@@ -361,16 +313,94 @@ admin_list_gold_price_swagger = swagger_auto_schema(
     operation_description=(
         'This endpoint allows administrators to retrieve a list of all gold price records in the system. '
         'The response includes details for each record, such as ID, date, sale_price, price_difference, total_gold_stock, stock_status, and active status. '
-        'Optional search functionality is available using the "search" query parameter to filter by date. '
+        'Results can be filtered by a date range with the "date_after" and "date_before" query parameters, and by active status. '
         'This operation is restricted to admin users only and requires JWT authentication. Non-admin users have no access.'
     ),
     tags=['admin.gold_online_store.gold_price'],
     manual_parameters=[
-        openapi.Parameter('search', openapi.IN_QUERY, description="Filter gold prices by date (partial match in YYYY-MM-DD format).", type=openapi.TYPE_STRING)
+        *filter_parameters(GoldPriceFilter),
+        *FIELDSET_PARAMETERS,
     ],
     responses={
         200: GoldPriceSerializer(many=True),
         401: 'Unauthorized: Valid JWT token required for admin users.',
         403: 'Forbidden: User is not an admin.'
     }
-)
\ No newline at end of file
+)
+admin_ingest_gold_price_swagger = swagger_auto_schema(
+    operation_summary='Ingest Gold Price Ticks in Bulk (Admin)',
+    operation_description=(
+        'This endpoint allows administrators and pricing feeds to store a burst of gold price ticks in one request. '
+        'The body is a JSON array of ticks, or newline-delimited JSON (Content-Type: application/x-ndjson) with one tick per line. '
+        'Each tick carries its own date; ticks must be in strictly increasing date order and newer than every stored price. '
+        'All ticks are stored in one transaction and only the newest becomes the active price. '
+        'The response returns the number of ticks stored and the new active price. '
+        'This operation is restricted to admin users only and requires JWT authentication.'
+    ),
+    tags=['admin.gold_online_store.gold_price'],
+    request_body=GoldPriceTickSerializer(many=True),
+    responses={
+        201: GoldPriceIngestResultSerializer,
+        400: 'Invalid input data (e.g., negative prices, an empty batch or out-of-order dates).',
+        401: 'Unauthorized: Valid JWT token required for admin users.',
+        403: 'Forbidden: User is not an admin.'
+    }
+)
+admin_reprice_gold_price_swagger = swagger_auto_schema(
+    operation_summary='Reprice Gold Transactions As Of Their Creation (Admin)',
+    operation_description=(
+        'This endpoint allows administrators to audit gold sale or purchase transactions against the price history. '
+        'The request lists transaction IDs of one type; the response gives, for each ID in request order, the gold price in effect when the transaction was created, '
+        'which is the latest price dated at or before its create date. '
+        'Unknown IDs and transactions older than every price have a null gold_price. '
+        'This operation is restricted to admin users only and requires JWT authentication.'
+    ),
+    tags=['admin.gold_online_store.gold_price'],
+    request_body=GoldPriceRepriceSerializer,
+    responses={
+        200: GoldPriceAsOfTransactionSerializer(many=True),
+        400: 'Invalid input data (e.g., an unknown transaction type or too many IDs).',
+        401: 'Unauthorized: Valid JWT token required for admin users.',
+        403: 'Forbidden: User is not an admin.'
+    }
+)
+# GoldPriceAPIView Decorators
+user_candles_gold_price_swagger = swagger_auto_schema(
+    operation_summary='Gold Price Candles',
+    operation_description=(
+        'This endpoint allows authenticated users to chart gold price history. '
+        'The response lists open, high, low and close sale prices and the tick count for every bucket of the chosen interval that has prices, oldest first. '
+        'Buckets are UTC minutes, hours or days; the range may span up to one maximum page of buckets and defaults to one page before "to". '
+        'This operation requires JWT authentication.'
+    ),
+    tags=['gold_online_store.gold_price'],
+    manual_parameters=[
+        openapi.Parameter('interval', openapi.IN_QUERY, description="Candle interval: 1m, 1h or 1d (default 1h).", type=openapi.TYPE_STRING, enum=['1m', '1h', '1d']),
+        openapi.Parameter('from', openapi.IN_QUERY, description="Start of the range (ISO 8601).", type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME),
+        openapi.Parameter('to', openapi.IN_QUERY, description="End of the range, exclusive (ISO 8601); defaults to now.", type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME),
+    ],
+    responses={
+        200: GoldPriceCandleSerializer(many=True),
+        400: 'Invalid interval or range.',
+        401: 'Unauthorized: Valid JWT token required.'
+    }
+)
+
+user_as_of_gold_price_swagger = swagger_auto_schema(
+    operation_summary='Gold Price As Of an Instant',
+    operation_description=(
+        'This endpoint allows authenticated users to look up the gold price that was in effect at any instant, '
+        'which is the latest price dated at or before it. '
+        'This operation requires JWT authentication.'
+    ),
+    tags=['gold_online_store.gold_price'],
+    manual_parameters=[
+        openapi.Parameter('at', openapi.IN_QUERY, description="The instant to resolve (ISO 8601).", type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME, required=True),
+    ],
+    responses={
+        200: GoldPriceSerializer,
+        400: 'Missing or invalid instant.',
+        401: 'Unauthorized: Valid JWT token required.',
+        404: 'Not Found: No gold price is that old.'
+    }
+)
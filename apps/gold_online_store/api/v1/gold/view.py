@@ -1,13 +1,46 @@
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import transaction
+from django.db.models import ProtectedError
+from django.http import Http404
 from django.utils.decorators import method_decorator
 from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
-from rest_framework import mixins, filters
-from rest_framework_simplejwt.authentication import JWTAuthentication
-from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework import mixins
+from rest_framework.exceptions import NotFound, ValidationError
+from django_filters.rest_framework import DjangoFilterBackend
 
+from apps.core.authentication import ClaimsJWTAuthentication
+from apps.core.pagination import AdminPagination
+from apps.core.parsers import FastJSONParser, NDJSONParser
+from apps.core.serializers import CustomUserSerializer
+from apps.gold_online_store.models.candle import GoldPriceCandle
 from apps.gold_online_store.models.gold import Wallet, GoldPrice
-from apps.gold_online_store.serializers.gold import WalletSerializer, GoldPriceSerializer
+from apps.gold_online_store.models.transaction import GoldSaleTransaction, GoldPurchaseTransaction
+from apps.gold_online_store.serializers.gold import (
+    WalletSerializer,
+    GoldPriceSerializer,
+    GoldPriceCandleSerializer,
+    GoldPriceCandleQuerySerializer,
+    GoldPriceTickSerializer,
+    GoldPriceIngestResultSerializer,
+    GoldPriceAsOfQuerySerializer,
+    GoldPriceRepriceSerializer,
+    GoldPriceAsOfTransactionSerializer,
+)
+from apps.gold_online_store.services.ledger import post_adjustment
+from apps.gold_online_store.services.price_ingest import PriceIngestError, ingest_ticks
+from apps.gold_online_store.services.price_provider import get_active_gold_price, get_price_changed_at, get_price_version
+from apps.gold_online_store.api.v1.export import ExportMixin
+from apps.gold_online_store.api.v1.filters import GoldPriceFilter, WalletFilter
+from apps.gold_online_store.api.v1.base import OwnerScopedReadOnlyViewSet
+from apps.gold_online_store.api.v1.conditional import ConditionalGetMixin
+from apps.gold_online_store.api.v1.fieldsets import SparseFieldsetMixin
+from apps.gold_online_store.api.v1.values import ValuesListMixin
 from apps.gold_online_store.api.v1.gold.swagger_decorator import (
     admin_create_wallet_swagger,
     admin_retrieve_wallet_swagger,
@@ -15,11 +48,8 @@ from apps.gold_online_store.api.v1.gold.swagger_decorator import (
     admin_partial_update_wallet_swagger,
     admin_destroy_wallet_swagger,
     admin_list_wallet_swagger,
-    user_create_wallet_swagger,
+    admin_export_wallet_swagger,
     user_retrieve_wallet_swagger,
-    user_update_wallet_swagger,
-    user_partial_update_wallet_swagger,
-    user_destroy_wallet_swagger,
     user_list_wallet_swagger,
     admin_create_gold_price_swagger,
     admin_retrieve_gold_price_swagger,
@@ -27,16 +57,95 @@ from apps.gold_online_store.api.v1.gold.swagger_decorator import (
     admin_partial_update_gold_price_swagger,
     admin_destroy_gold_price_swagger,
     admin_list_gold_price_swagger,
+    admin_ingest_gold_price_swagger,
+    admin_reprice_gold_price_swagger,
+    user_candles_gold_price_swagger,
+    user_as_of_gold_price_swagger,
 )
 
 
+class WalletValuationMixin:
+    """
+    Value wallets in SQL against the active gold price, resolved once per request.
+    """
+
+    def get_active_gold_price(self):
+        """
+        Return the active gold price snapshot used for this request.
+        """
+        if not hasattr(self, '_active_gold_price'):
+            self._active_gold_price = get_active_gold_price()
+        return self._active_gold_price
+
+    def get_valued_queryset(self, queryset):
+        """
+        Annotate total_value on the given queryset.
+        """
+        return queryset.with_total_value(self.get_active_gold_price())
+
+    def get_serializer_context(self):
+        """
+        Share the request's gold price snapshot with the serializer.
+        """
+        context = super().get_serializer_context()
+        context['active_gold_price'] = self.get_active_gold_price()
+        return context
+
+
+class WalletLedgerMixin:
+    """
+    Book direct wallet balance edits to the ledger so it stays in step with the wallet.
+    """
+
+    def perform_create(self, serializer):
+        """
+        Create the wallet and book its opening balances.
+        """
+        with transaction.atomic():
+            super().perform_create(serializer)
+            instance = serializer.instance
+            post_adjustment(instance.pk, instance.money_stock, instance.gold_stock, reference_type='OPENING')
+
+    def perform_update(self, serializer):
+        """
+        Save the wallet and book the difference from its locked previous balances.
+        """
+        with transaction.atomic():
+            previous = (
+                Wallet.objects
+                .select_for_update()
+                .values('money_stock', 'gold_stock')
+                .get(pk=serializer.instance.pk)
+            )
+            instance = serializer.save()
+            post_adjustment(
+                instance.pk,
+                instance.money_stock - previous['money_stock'],
+                instance.gold_stock - previous['gold_stock'],
+            )
+
+    def perform_destroy(self, instance):
+        """
+        Refuse to delete wallets that have ledger history.
+        """
+        try:
+            instance.delete()
+        except ProtectedError:
+            raise ValidationError(_('Wallets with ledger history cannot be deleted.'))
+
+
 @method_decorator(name='create', decorator=admin_create_wallet_swagger)
 @method_decorator(name='retrieve', decorator=admin_retrieve_wallet_swagger)
 @method_decorator(name='update', decorator=admin_update_wallet_swagger)
 @method_decorator(name='partial_update', decorator=admin_partial_update_wallet_swagger)
 @method_decorator(name='destroy', decorator=admin_destroy_wallet_swagger)
 @method_decorator(name='list', decorator=admin_list_wallet_swagger)
+@method_decorator(name='export', decorator=admin_export_wallet_swagger)
 class WalletAdminAPIView(
+    ExportMixin,
+    SparseFieldsetMixin,
+    WalletLedgerMixin,
+    WalletValuationMixin,
     GenericViewSet,
     mixins.CreateModelMixin,
     mixins.RetrieveModelMixin,
@@ -47,91 +156,77 @@ class WalletAdminAPIView(
     """
     Admin-only API ViewSet for managing wallet records.
     """
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [ClaimsJWTAuthentication]
     permission_classes = [IsAdminUser]
     serializer_class = WalletSerializer
     lookup_field = 'id'
+    pagination_class = AdminPagination
+    pagination_ordering = ('-id',)
     queryset = Wallet.objects.all()
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['user__username']
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = WalletFilter
+
+    def get_queryset(self):
+        """
+        Value all wallets and join their owners in a single query instead of once per row.
+        """
+        return self.get_valued_queryset(super().get_queryset().select_related('user'))
 
 
-@method_decorator(name='create', decorator=user_create_wallet_swagger)
 @method_decorator(name='retrieve', decorator=user_retrieve_wallet_swagger)
-@method_decorator(name='update', decorator=user_update_wallet_swagger)
-@method_decorator(name='partial_update', decorator=user_partial_update_wallet_swagger)
-@method_decorator(name='destroy', decorator=user_destroy_wallet_swagger)
 @method_decorator(name='list', decorator=user_list_wallet_swagger)
 class WalletAPIView(
-    GenericViewSet,
-    mixins.CreateModelMixin,
-    mixins.RetrieveModelMixin,
-    mixins.UpdateModelMixin,
-    mixins.DestroyModelMixin,
-    mixins.ListModelMixin,
+    ConditionalGetMixin,
+    WalletValuationMixin,
+    OwnerScopedReadOnlyViewSet,
 ):
     """
-    Authenticated user API ViewSet for managing own wallet record.
+    Authenticated user API ViewSet for reading own wallet record.
+
+    Balances only change through settled transactions and withdrawals, or
+    through adjustments booked by an admin, so owners cannot write them.
     """
-    authentication_classes = [JWTAuthentication]
-    permission_classes = [IsAuthenticated]
     serializer_class = WalletSerializer
-    lookup_field = 'id'
+    pagination_ordering = ('-id',)
+    queryset = Wallet.objects.all()
+    response_cache = 'wallets'
 
     def get_queryset(self):
         """
-        Restrict queryset to the authenticated user's wallet.
-        """
-        return Wallet.objects.filter(user__username=self.request.user.username)
-
-    def create(self, request, *args, **kwargs):
-        """
-        Set user to authenticated user and prevent modification of user field.
+        Value the authenticated user's wallet in the same query that loads it.
         """
-        if 'user' in request.data:
-            raise ValidationError(_('User field cannot be set manually.'))
-        request.data['user'] = self.request.user.id
-        return super().create(request, *args, **kwargs)
+        return self.get_valued_queryset(super().get_queryset())
 
-    def update(self, request, *args, **kwargs):
+    def get_validators(self):
         """
-        Ensure the user can only update their own wallet and prevent user field modification.
-        """
-        instance = self.get_object()
-        if instance.user != self.request.user:
-            raise PermissionDenied(_('You can only update your own wallet.'))
-        if 'user' in request.data:
-            raise ValidationError(_('User field cannot be modified.'))
-        return super().update(request, *args, **kwargs)
+        Version wallet reads by the owner, the wallets' update stamps and the price that values them.
 
-    def partial_update(self, request, *args, **kwargs):
-        """
-        Ensure the user can only partially update their own wallet and prevent user field modification.
-        """
-        instance = self.get_object()
-        if instance.user != self.request.user:
-            raise PermissionDenied(_('You can only update your own wallet.'))
-        if 'user' in request.data:
-            raise ValidationError(_('User field cannot be modified.'))
-        return super().partial_update(request, *args, **kwargs)
-
-    def destroy(self, request, *args, **kwargs):
-        """
-        Ensure the user can only delete their own wallet.
+        The stamps are read from the wallets the action renders, which are
+        loaded here once and reused by the action, so a conditional read
+        costs no query beyond the one that serves it.
         """
-        instance = self.get_object()
-        if instance.user != self.request.user:
-            raise PermissionDenied(_('You can only delete your own wallet.'))
-        return super().destroy(request, *args, **kwargs)
+        if self.action == 'retrieve':
+            try:
+                wallets = [self.get_object()]
+            except Http404:
+                # Let the view answer its usual 404.
+                return None, None
+        else:
+            wallets = self.paginate_queryset(self.filter_queryset(self.get_queryset()))
+        user = self.request.user
+        stamps = [(wallet.id, wallet.updated_at) for wallet in wallets]
+        owner = [getattr(user, field, None) for field in CustomUserSerializer.Meta.fields]
+        price_changed_at = datetime.fromtimestamp(get_price_changed_at(), tz=dt_timezone.utc)
+        version = f'{user.id}|{stamps}|{owner}|{get_price_version()}'
+        return version, max([updated_at for _, updated_at in stamps] + [price_changed_at])
 
-    def retrieve(self, request, *args, **kwargs):
+    def paginate_queryset(self, queryset):
         """
-        Ensure the user can only retrieve their own wallet.
+        Paginate once per request, so the list reuses the page get_validators() loaded.
         """
-        instance = self.get_object()
-        if instance.user != self.request.user:
-            raise PermissionDenied(_('You can only access your own wallet.'))
-        return super().retrieve(request, *args, **kwargs)
+        if not hasattr(self, '_page'):
+            self._page = super().paginate_queryset(queryset)
+        return self._page
 
 
 @method_decorator(name='create', decorator=admin_create_gold_price_swagger)
@@ -140,7 +235,11 @@ class WalletAPIView(
 @method_decorator(name='partial_update', decorator=admin_partial_update_gold_price_swagger)
 @method_decorator(name='destroy', decorator=admin_destroy_gold_price_swagger)
 @method_decorator(name='list', decorator=admin_list_gold_price_swagger)
+@method_decorator(name='ingest', decorator=admin_ingest_gold_price_swagger)
+@method_decorator(name='reprice', decorator=admin_reprice_gold_price_swagger)
 class GoldPriceAdminAPIView(
+    ConditionalGetMixin,
+    ValuesListMixin,
     GenericViewSet,
     mixins.CreateModelMixin,
     mixins.RetrieveModelMixin,
@@ -151,10 +250,94 @@ class GoldPriceAdminAPIView(
     """
     Admin-only API ViewSet for managing gold price records.
     """
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [ClaimsJWTAuthentication]
     permission_classes = [IsAdminUser]
     serializer_class = GoldPriceSerializer
     lookup_field = 'id'
+    pagination_class = AdminPagination
+    pagination_ordering = ('-date', '-id')
+    queryset = GoldPrice.objects.all()
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = GoldPriceFilter
+    reprice_models = {
+        'sale': GoldSaleTransaction,
+        'purchase': GoldPurchaseTransaction,
+    }
+
+    def get_validators(self):
+        """
+        Version price reads by the gold price version, which every change to a price bumps.
+        """
+        return get_price_version(), datetime.fromtimestamp(get_price_changed_at(), tz=dt_timezone.utc)
+
+    @action(
+        detail=False,
+        methods=['post'],
+        parser_classes=[FastJSONParser, NDJSONParser],
+        serializer_class=GoldPriceTickSerializer,
+    )
+    def ingest(self, request, *args, **kwargs):
+        """
+        Store a burst of price ticks in one transaction and activate the newest.
+        """
+        serializer = self.get_serializer(data=request.data, many=True, allow_empty=False)
+        serializer.is_valid(raise_exception=True)
+        try:
+            gold_prices = ingest_ticks(serializer.validated_data)
+        except PriceIngestError as exc:
+            raise ValidationError({'date': [str(exc)]})
+        result = {'count': len(gold_prices), 'active': gold_prices[-1]}
+        return Response(GoldPriceIngestResultSerializer(result).data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['post'], url_path='as-of', serializer_class=GoldPriceRepriceSerializer)
+    def reprice(self, request, *args, **kwargs):
+        """
+        Resolve the price in effect when each listed transaction was created, in one query.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        model = self.reprice_models[serializer.validated_data['transaction_type']]
+        ids = serializer.validated_data['ids']
+        prices = GoldPrice.objects.as_of_transactions(model, ids)
+        results = [{'transaction': transaction_id, 'gold_price': prices.get(transaction_id)} for transaction_id in ids]
+        return Response(GoldPriceAsOfTransactionSerializer(results, many=True).data)
+
+
+@method_decorator(name='candles', decorator=user_candles_gold_price_swagger)
+@method_decorator(name='as_of', decorator=user_as_of_gold_price_swagger)
+class GoldPriceAPIView(GenericViewSet):
+    """
+    Authenticated user API ViewSet for reading gold price history.
+    """
+    authentication_classes = [ClaimsJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    serializer_class = GoldPriceSerializer
     queryset = GoldPrice.objects.all()
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['date']
\ No newline at end of file
+    # Candle responses are bounded by their time range instead of pages.
+    pagination_class = None
+
+    @action(detail=False, methods=['get'], serializer_class=GoldPriceCandleSerializer)
+    def candles(self, request, *args, **kwargs):
+        """
+        Serve the candles of one interval in a time range from the rollup, oldest first.
+        """
+        query = GoldPriceCandleQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        candles = GoldPriceCandle.objects.filter(
+            interval=query.validated_data['interval'],
+            bucket__gte=query.validated_data['from'],
+            bucket__lt=query.validated_data['to'],
+        ).order_by('bucket')
+        return Response(self.get_serializer(candles, many=True).data)
+
+    @action(detail=False, methods=['get'], url_path='as-of')
+    def as_of(self, request, *args, **kwargs):
+        """
+        Serve the price that was in effect at the given instant.
+        """
+        query = GoldPriceAsOfQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        gold_price = GoldPrice.objects.as_of(query.validated_data['at'])
+        if gold_price is None:
+            raise NotFound(_('No gold price was in effect at that time.'))
+        return Response(self.get_serializer(gold_price).data)
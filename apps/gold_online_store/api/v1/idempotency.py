@@ -0,0 +1,116 @@
+import hashlib
+import json
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.response import Response
+
+from apps.gold_online_store.models.idempotency import IdempotencyKey
+
+IDEMPOTENCY_KEY_HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+
+
+class IdempotencyKeyInUse(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = _('A request with this Idempotency-Key is still being processed.')
+    default_code = 'idempotency_key_in_use'
+
+
+class IdempotencyKeyMismatch(APIException):
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = _('This Idempotency-Key was already used with a different request.')
+    default_code = 'idempotency_key_mismatch'
+
+
+def request_fingerprint(request):
+    """
+    Hash the request method, path and body so a reused key can be told apart from a retry.
+    """
+    data = request.data
+    if hasattr(data, 'lists'):
+        data = dict(data.lists())
+    body = json.dumps(data, sort_keys=True, separators=(',', ':'), default=str)
+    payload = f'{request.method}\n{request.path}\n{body}'
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def claim_key(user, key, fingerprint):
+    """
+    Insert the key for this user, or return the record that already holds it.
+
+    Returns a (created, record) pair. Concurrent duplicates race on the unique
+    (user, key) insert, so exactly one of them gets created=True.
+    """
+    now = timezone.now()
+    expires_at = now + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+    for _attempt in range(2):
+        try:
+            with transaction.atomic():
+                record = IdempotencyKey.objects.create(
+                    user=user,
+                    key=key,
+                    fingerprint=fingerprint,
+                    expires_at=expires_at,
+                )
+            return True, record
+        except IntegrityError:
+            record = IdempotencyKey.objects.filter(user=user, key=key).first()
+            if record is None:
+                continue
+            if record.expires_at <= now:
+                IdempotencyKey.objects.filter(pk=record.pk, expires_at__lte=now).delete()
+                continue
+            return False, record
+    raise IdempotencyKeyInUse()
+
+
+def replay(record, fingerprint):
+    """
+    Return the stored response of an earlier request with the same key.
+    """
+    if record.fingerprint != fingerprint:
+        raise IdempotencyKeyMismatch()
+    if record.status_code is None:
+        raise IdempotencyKeyInUse()
+    return Response(record.response_body, status=record.status_code, headers={REPLAYED_HEADER: 'true'})
+
+
+def idempotent(view_method):
+    """
+    Make a create() view method safe to retry with an Idempotency-Key header.
+
+    The first request with a key runs normally and its response is stored in
+    the same transaction as its writes. Retries with the same key and body get
+    the stored response back without validation or writes; a failed request
+    stores nothing, so it can be retried.
+    """
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_KEY_HEADER)
+        if key is None:
+            return view_method(self, request, *args, **kwargs)
+        if not key or len(key) > 255:
+            raise ValidationError({IDEMPOTENCY_KEY_HEADER: [_('Idempotency-Key must be 1 to 255 characters long.')]})
+
+        fingerprint = request_fingerprint(request)
+        with transaction.atomic():
+            created, record = claim_key(request.user, key, fingerprint)
+            if not created:
+                return replay(record, fingerprint)
+            response = view_method(self, request, *args, **kwargs)
+            if response.status_code >= 500:
+                transaction.set_rollback(True)
+                return response
+            record.status_code = response.status_code
+            record.response_body = response.data
+            record.save(update_fields=['status_code', 'response_body'])
+        return response
+
+    return wrapper
@@ -1,6 +1,10 @@
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
-from apps.gold_online_store.serializers.payment import PaymentTransactionSerializer
+from apps.gold_online_store.api.v1.export import EXPORT_PARAMETERS, EXPORT_RANGE_PARAMETERS
+from apps.gold_online_store.api.v1.fieldsets import FIELDSET_PARAMETERS
+from apps.core.filters import filter_parameters
+from apps.gold_online_store.api.v1.filters import PaymentTransactionFilter
+from apps.gold_online_store.serializers.payment import OwnerPaymentTransactionSerializer, PaymentTransactionSerializer
 
 # PaymentTransactionAdminAPIView Decorators
 admin_create_payment_transaction_swagger = swagger_auto_schema(
@@ -32,7 +36,8 @@ admin_retrieve_payment_transaction_swagger = swagger_auto_schema(
     ),
     tags=['admin.gold_online_store.payment_transaction'],
     manual_parameters=[
-        openapi.Parameter('id', openapi.IN_PATH, description="The unique ID of the payment transaction to retrieve.", type=openapi.TYPE_INTEGER)
+        openapi.Parameter('id', openapi.IN_PATH, description="The unique ID of the payment transaction to retrieve.", type=openapi.TYPE_INTEGER),
+        *FIELDSET_PARAMETERS,
     ],
     responses={
         200: PaymentTransactionSerializer,
@@ -113,12 +118,13 @@ admin_list_payment_transaction_swagger = swagger_auto_schema(
     operation_description=(
         'This endpoint allows administrators to retrieve a list of all payment transaction records in the system. '
         'The response includes details for each transaction, such as ID, associated user, payment_date, money_amount, status, and status display. '
-        'Optional search functionality is available using the "search" query parameter to filter transactions by username or status. '
+        'Results can be filtered by status, user, date range and amount range, and by username with the "search" query parameter (at least three characters). '
         'This operation is restricted to admin users only and requires JWT authentication.'
     ),
     tags=['admin.gold_online_store.payment_transaction'],
     manual_parameters=[
-        openapi.Parameter('search', openapi.IN_QUERY, description="Filter transactions by username or status (partial match).", type=openapi.TYPE_STRING)
+        *filter_parameters(PaymentTransactionFilter),
+        *FIELDSET_PARAMETERS,
     ],
     responses={
         200: PaymentTransactionSerializer(many=True),
@@ -127,12 +133,36 @@ admin_list_payment_transaction_swagger = swagger_auto_schema(
     }
 )
 
+admin_export_payment_transaction_swagger = swagger_auto_schema(
+    operation_summary='Export All Payment Transactions (Admin)',
+    operation_description=(
+        'This endpoint allows administrators to download every payment transaction record matching the query as a streamed attachment, one record per line. '
+        'Records are written as NDJSON by default, or as CSV with "output=csv", where nested fields become columns such as user.username. '
+        'The optional "from" and "to" query parameters restrict the export to a payment_date range, and records are exported in payment_date order. '
+        'The filters of the list endpoint and its "fields" and "expand" query parameters apply. '
+        'This operation is restricted to admin users only and requires JWT authentication.'
+    ),
+    tags=['admin.gold_online_store.payment_transaction'],
+    manual_parameters=[
+        *EXPORT_PARAMETERS,
+        *EXPORT_RANGE_PARAMETERS,
+        *filter_parameters(PaymentTransactionFilter),
+        *FIELDSET_PARAMETERS,
+    ],
+    responses={
+        200: 'The matching records as an NDJSON or CSV attachment.',
+        400: 'Invalid query parameters (e.g., "from" not earlier than "to").',
+        401: 'Unauthorized: Valid JWT token required for admin users.',
+        403: 'Forbidden: User is not an admin.'
+    }
+)
+
 # PaymentTransactionAPIView Decorators
 user_create_payment_transaction_swagger = swagger_auto_schema(
     operation_summary='Create a New Payment Transaction (User)',
     operation_description=(
         'This endpoint allows authenticated users to create a new payment transaction for themselves. '
-        'The request must include money_amount and status (PENDING, SUCCESS, or FAILED). '
+        'The request must include money_amount. New records start as PENDING; only settlement changes their status. '
         'The money_amount must be non-negative and within reasonable limits. '
         'The payment_date is automatically set to the current time if not provided. '
         'The user field is automatically set to the authenticated user and cannot be modified. '
@@ -140,10 +170,13 @@ user_create_payment_transaction_swagger = swagger_auto_schema(
         'This operation requires JWT authentication.'
     ),
     tags=['gold_online_store.payment_transaction'],
-    request_body=PaymentTransactionSerializer,
+    request_body=OwnerPaymentTransactionSerializer,
+    manual_parameters=[
+        openapi.Parameter('Idempotency-Key', openapi.IN_HEADER, description="Optional unique key; retries with the same key and body replay the original response.", type=openapi.TYPE_STRING, required=False)
+    ],
     responses={
-        201: PaymentTransactionSerializer,
-        400: 'Invalid input data (e.g., negative amount or invalid status).',
+        201: OwnerPaymentTransactionSerializer,
+        400: 'Invalid input data (e.g., negative amount).',
         401: 'Unauthorized: Valid JWT token required.'
     }
 )
@@ -158,10 +191,11 @@ user_retrieve_payment_transaction_swagger = swagger_auto_schema(
     ),
     tags=['gold_online_store.payment_transaction'],
     manual_parameters=[
-        openapi.Parameter('id', openapi.IN_PATH, description="The ID of the authenticated user’s payment transaction.", type=openapi.TYPE_INTEGER)
+        openapi.Parameter('id', openapi.IN_PATH, description="The ID of the authenticated user’s payment transaction.", type=openapi.TYPE_INTEGER),
+        *FIELDSET_PARAMETERS,
     ],
     responses={
-        200: PaymentTransactionSerializer,
+        200: OwnerPaymentTransactionSerializer,
         401: 'Unauthorized: Valid JWT token required.',
         403: 'Forbidden: User can only access their own payment transaction.',
         404: 'Not Found: Payment transaction with the specified ID does not exist.'
@@ -172,20 +206,20 @@ user_update_payment_transaction_swagger = swagger_auto_schema(
     operation_summary='Fully Update Own Payment Transaction',
     operation_description=(
         'This endpoint allows authenticated users to fully update their own payment transaction identified by its ID. '
-        'The request body must include all required fields (e.g., money_amount, status) even if some fields remain unchanged. '
-        'The money_amount must be non-negative and within reasonable limits, and status must be one of PENDING, SUCCESS, or FAILED. '
+        'The request body must include all required fields (e.g., money_amount) even if some fields remain unchanged. '
+        'The money_amount must be non-negative and within reasonable limits. Only PENDING records can be updated, and their status cannot be changed. '
         'The user field cannot be modified and must match the authenticated user. '
         'The response returns the updated transaction’s details. '
         'This operation requires JWT authentication.'
     ),
     tags=['gold_online_store.payment_transaction'],
-    request_body=PaymentTransactionSerializer,
+    request_body=OwnerPaymentTransactionSerializer,
     manual_parameters=[
         openapi.Parameter('id', openapi.IN_PATH, description="The ID of the authenticated user’s payment transaction to update.", type=openapi.TYPE_INTEGER)
     ],
     responses={
-        200: PaymentTransactionSerializer,
-        400: 'Invalid input data (e.g., negative amount or invalid status).',
+        200: OwnerPaymentTransactionSerializer,
+        400: 'Invalid input data (e.g., negative amount, or a record that is no longer PENDING).',
         401: 'Unauthorized: Valid JWT token required.',
         403: 'Forbidden: User can only update their own payment transaction.',
         404: 'Not Found: Payment transaction with the specified ID does not exist.'
@@ -196,20 +230,20 @@ user_partial_update_payment_transaction_swagger = swagger_auto_schema(
     operation_summary='Partially Update Own Payment Transaction',
     operation_description=(
         'This endpoint allows authenticated users to partially update their own payment transaction identified by its ID. '
-        'Only the provided fields in the request body will be updated (e.g., updating only money_amount or status). '
-        'The money_amount must be non-negative and within reasonable limits, and status must be one of PENDING, SUCCESS, or FAILED. '
+        'Only the provided fields in the request body will be updated (e.g., updating only money_amount). '
+        'The money_amount must be non-negative and within reasonable limits. Only PENDING records can be updated, and their status cannot be changed. '
         'The user field cannot be modified and must match the authenticated user. '
         'The response returns the updated transaction’s details. '
         'This operation requires JWT authentication.'
     ),
     tags=['gold_online_store.payment_transaction'],
-    request_body=PaymentTransactionSerializer,
+    request_body=OwnerPaymentTransactionSerializer,
     manual_parameters=[
         openapi.Parameter('id', openapi.IN_PATH, description="The ID of the authenticated user’s payment transaction to partially update.", type=openapi.TYPE_INTEGER)
     ],
     responses={
-        200: PaymentTransactionSerializer,
-        400: 'Invalid input data (e.g., negative amount or invalid status).',
+        200: OwnerPaymentTransactionSerializer,
+        400: 'Invalid input data (e.g., negative amount, or a record that is no longer PENDING).',
         401: 'Unauthorized: Valid JWT token required.',
         403: 'Forbidden: User can only update their own payment transaction.',
         404: 'Not Found: Payment transaction with the specified ID does not exist.'
@@ -221,6 +255,7 @@ user_destroy_payment_transaction_swagger = swagger_auto_schema(
     operation_description=(
         'This endpoint allows authenticated users to delete their own payment transaction by its ID. '
         'The operation permanently removes the transaction from the system. '
+        'Only PENDING records can be deleted. '
         'The transaction ID must correspond to a transaction belonging to the authenticated user. '
         'A successful deletion returns a 204 No Content response. '
         'This operation requires JWT authentication.'
@@ -231,6 +266,7 @@ user_destroy_payment_transaction_swagger = swagger_auto_schema(
     ],
     responses={
         204: 'Payment transaction successfully deleted.',
+        400: 'Bad Request: The record is no longer PENDING.',
         401: 'Unauthorized: Valid JWT token required.',
         403: 'Forbidden: User can only delete their own payment transaction.',
         404: 'Not Found: Payment transaction with the specified ID does not exist.'
@@ -247,10 +283,11 @@ user_list_payment_transaction_swagger = swagger_auto_schema(
     ),
     tags=['gold_online_store.payment_transaction'],
     manual_parameters=[
-        openapi.Parameter('search', openapi.IN_QUERY, description="Filter transactions by status (partial match).", type=openapi.TYPE_STRING)
+        openapi.Parameter('search', openapi.IN_QUERY, description="Filter transactions by status (partial match).", type=openapi.TYPE_STRING),
+        *FIELDSET_PARAMETERS,
     ],
     responses={
-        200: PaymentTransactionSerializer(many=True),
+        200: OwnerPaymentTransactionSerializer(many=True),
         401: 'Unauthorized: Valid JWT token required.',
         403: 'Forbidden: User can only access their own payment transactions.'
     }
@@ -1,6 +1,9 @@
+from django.urls import path
 from rest_framework.routers import DefaultRouter
 
-from apps.gold_online_store.api.v1.gold.view import WalletAdminAPIView, GoldPriceAdminAPIView, WalletAPIView
+from apps.gold_online_store.api.v1.activity.view import ActivityAPIView
+from apps.gold_online_store.api.v1.gold.view import WalletAdminAPIView, GoldPriceAdminAPIView, WalletAPIView, GoldPriceAPIView
+from apps.gold_online_store.api.v1.gold.stream import gold_price_stream
 from apps.gold_online_store.api.v1.payment.view import PaymentTransactionAdminAPIView, PaymentTransactionAPIView
 from apps.gold_online_store.api.v1.transaction.view import GoldSaleTransactionAdminAPIView, \
     GoldPurchaseTransactionAdminAPIView, GoldSaleTransactionAPIView, GoldPurchaseTransactionAPIView
@@ -78,6 +81,20 @@ router.register(
     GoldWithdrawalRequestAPIView,
     basename='gold-withdrawal-request'
 )
+router.register(
+    r'gold-prices',
+    GoldPriceAPIView,
+    basename='gold-price'
+)
+router.register(
+    r'activity',
+    ActivityAPIView,
+    basename='activity'
+)
 
 # URL patterns
-urlpatterns = router.urls
+urlpatterns = [
+    path('gold-prices/stream/', gold_price_stream, name='gold-price-stream'),
+]
+
+urlpatterns += router.urls
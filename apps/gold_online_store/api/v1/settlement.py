@@ -0,0 +1,99 @@
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from apps.gold_online_store.serializers.transaction import BatchSettlementSerializer
+from apps.gold_online_store.services.jobs import enqueue
+from apps.gold_online_store.services.settlement import SettlementError, settle_gold_price_batch
+
+
+class SettlementMixin:
+    """
+    Settle records in the same database transaction that moves them to their settled status.
+
+    Views set `settle_with` to the settlement service (as a staticmethod) and
+    `settled_status` to the status that triggers it; `pending_status` is the
+    status records wait in until then.
+
+    Views that also set `settle_job` to a Job kind let clients send
+    `Prefer: respond-async`: the record is left pending, a job that settles
+    it is queued in the same transaction and the response is 202 Accepted,
+    so the request never waits on the wallet update.
+    """
+    settle_with = None
+    settle_job = None
+    pending_status = 'WAITING'
+    settled_status = 'ACCEPTED'
+
+    def perform_create(self, serializer):
+        """
+        Create the record as pending and settle it if it was submitted as settled.
+        """
+        with transaction.atomic():
+            settle = serializer.validated_data.get('status') == self.settled_status
+            if settle:
+                serializer.validated_data['status'] = self.pending_status
+            instance = serializer.save()
+            if settle:
+                self.settle(instance)
+
+    def perform_update(self, serializer):
+        """
+        Settle the record when its status moves to the settled status.
+        """
+        current_status = serializer.instance.status
+        new_status = serializer.validated_data.get('status', current_status)
+        if current_status == self.settled_status and new_status != self.settled_status:
+            raise ValidationError({'status': [_('Settled records cannot change status.')]})
+        with transaction.atomic():
+            settle = new_status == self.settled_status and current_status != self.settled_status
+            if settle:
+                serializer.validated_data['status'] = current_status
+            instance = serializer.save()
+            if settle:
+                self.settle(instance)
+
+    def settle(self, instance):
+        """
+        Run the settlement service, or queue it when the client prefers, and report failed balance checks as validation errors.
+        """
+        if self.settle_job is not None and self.prefers_async():
+            enqueue(self.settle_job, instance)
+            self.settlement_queued = True
+            return
+        try:
+            self.settle_with(instance)
+        except SettlementError as exc:
+            raise ValidationError({'status': [str(exc)]})
+
+    def prefers_async(self):
+        preferences = self.request.headers.get('Prefer', '')
+        return 'respond-async' in [preference.strip().lower() for preference in preferences.split(',')]
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        """
+        Answer 202 Accepted when the settlement was queued instead of run.
+        """
+        if getattr(self, 'settlement_queued', False) and response.status_code in (200, 201):
+            response.status_code = 202
+            response['Preference-Applied'] = 'respond-async'
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class BatchSettlementMixin:
+    """
+    Add a `settle-batch` action that settles every waiting trade of one gold price.
+    """
+
+    @action(detail=False, methods=['post'], url_path='settle-batch')
+    def settle_batch(self, request, *args, **kwargs):
+        """
+        Accept or reject all waiting transactions of the given gold price in one pass.
+        """
+        serializer = BatchSettlementSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        gold_price = serializer.validated_data['gold_price']
+        result = settle_gold_price_batch(gold_price.pk, model=self.queryset.model)
+        return Response(BatchSettlementSerializer({'gold_price': gold_price, **result}).data)
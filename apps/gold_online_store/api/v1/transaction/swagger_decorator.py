@@ -1,6 +1,16 @@
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
-from apps.gold_online_store.serializers.transaction import GoldSaleTransactionSerializer, GoldPurchaseTransactionSerializer
+from apps.gold_online_store.api.v1.export import EXPORT_PARAMETERS, EXPORT_RANGE_PARAMETERS
+from apps.gold_online_store.api.v1.fieldsets import FIELDSET_PARAMETERS
+from apps.core.filters import filter_parameters
+from apps.gold_online_store.api.v1.filters import GoldTransactionFilter
+from apps.gold_online_store.serializers.transaction import (
+    GoldSaleTransactionSerializer,
+    GoldPurchaseTransactionSerializer,
+    OwnerGoldSaleTransactionSerializer,
+    OwnerGoldPurchaseTransactionSerializer,
+    BatchSettlementSerializer,
+)
 
 # GoldSaleTransactionAdminAPIView Decorators
 admin_create_gold_sale_transaction_swagger = swagger_auto_schema(
@@ -32,7 +42,8 @@ admin_retrieve_gold_sale_transaction_swagger = swagger_auto_schema(
     ),
     tags=['admin.gold_online_store.gold_sale_transaction'],
     manual_parameters=[
-        openapi.Parameter('id', openapi.IN_PATH, description="The unique ID of the gold sale transaction to retrieve.", type=openapi.TYPE_INTEGER)
+        openapi.Parameter('id', openapi.IN_PATH, description="The unique ID of the gold sale transaction to retrieve.", type=openapi.TYPE_INTEGER),
+        *FIELDSET_PARAMETERS,
     ],
     responses={
         200: GoldSaleTransactionSerializer,
@@ -113,12 +124,13 @@ admin_list_gold_sale_transaction_swagger = swagger_auto_schema(
     operation_description=(
         'This endpoint allows administrators to retrieve a list of all gold sale transaction records in the system. '
         'The response includes details for each transaction, such as ID, associated user, create_date, money_amount, gold_amount, gold_price, status, and status display. '
-        'Optional search functionality is available using the "search" query parameter to filter transactions by username or status. '
+        'Results can be filtered by status, user, date range and amount range, and by username with the "search" query parameter (at least three characters). '
         'This operation is restricted to admin users only and requires JWT authentication.'
     ),
     tags=['admin.gold_online_store.gold_sale_transaction'],
     manual_parameters=[
-        openapi.Parameter('search', openapi.IN_QUERY, description="Filter transactions by username or status (partial match).", type=openapi.TYPE_STRING)
+        *filter_parameters(GoldTransactionFilter),
+        *FIELDSET_PARAMETERS,
     ],
     responses={
         200: GoldSaleTransactionSerializer(many=True),
@@ -127,12 +139,54 @@ admin_list_gold_sale_transaction_swagger = swagger_auto_schema(
     }
 )
 
+admin_settle_batch_gold_sale_transaction_swagger = swagger_auto_schema(
+    operation_summary='Settle Waiting Gold Sale Transactions in Batch (Admin)',
+    operation_description=(
+        'This endpoint allows administrators to settle every waiting gold sale transaction booked against one gold price in a single pass. '
+        'Transactions are filled oldest first against the wallet balances and the remaining total_gold_stock; those that cannot be filled are rejected. '
+        'The response lists the IDs of the accepted and rejected transactions. '
+        'This operation is restricted to admin users only and requires JWT authentication.'
+    ),
+    tags=['admin.gold_online_store.gold_sale_transaction'],
+    request_body=BatchSettlementSerializer,
+    responses={
+        200: BatchSettlementSerializer,
+        400: 'Invalid input data (e.g., unknown gold price ID).',
+        401: 'Unauthorized: Valid JWT token required for admin users.',
+        403: 'Forbidden: User is not an admin.'
+    }
+)
+
+admin_export_gold_sale_transaction_swagger = swagger_auto_schema(
+    operation_summary='Export All Gold Sale Transactions (Admin)',
+    operation_description=(
+        'This endpoint allows administrators to download every gold sale transaction record matching the query as a streamed attachment, one record per line. '
+        'Records are written as NDJSON by default, or as CSV with "output=csv", where nested fields become columns such as user.username. '
+        'The optional "from" and "to" query parameters restrict the export to a create_date range, and records are exported in create_date order. '
+        'The filters of the list endpoint and its "fields" and "expand" query parameters apply. '
+        'This operation is restricted to admin users only and requires JWT authentication.'
+    ),
+    tags=['admin.gold_online_store.gold_sale_transaction'],
+    manual_parameters=[
+        *EXPORT_PARAMETERS,
+        *EXPORT_RANGE_PARAMETERS,
+        *filter_parameters(GoldTransactionFilter),
+        *FIELDSET_PARAMETERS,
+    ],
+    responses={
+        200: 'The matching records as an NDJSON or CSV attachment.',
+        400: 'Invalid query parameters (e.g., "from" not earlier than "to").',
+        401: 'Unauthorized: Valid JWT token required for admin users.',
+        403: 'Forbidden: User is not an admin.'
+    }
+)
+
 # GoldSaleTransactionAPIView Decorators
 user_create_gold_sale_transaction_swagger = swagger_auto_schema(
     operation_summary='Create a New Gold Sale Transaction (User)',
     operation_description=(
         'This endpoint allows authenticated users to create a new gold sale transaction for themselves. '
-        'The request must include money_amount, gold_amount, gold_price ID, and status (ACCEPTED, WAITING, or REJECTED). '
+        'The request must include money_amount, gold_amount and gold_price ID. New records start as WAITING; only settlement changes their status. '
         'The money_amount and gold_amount must be non-negative and within reasonable limits. '
         'The create_date is automatically set to the current time if not provided. '
         'The user field is automatically set to the authenticated user and cannot be modified. '
@@ -140,10 +194,13 @@ user_create_gold_sale_transaction_swagger = swagger_auto_schema(
         'This operation requires JWT authentication.'
     ),
     tags=['gold_online_store.gold_sale_transaction'],
-    request_body=GoldSaleTransactionSerializer,
+    request_body=OwnerGoldSaleTransactionSerializer,
+    manual_parameters=[
+        openapi.Parameter('Idempotency-Key', openapi.IN_HEADER, description="Optional unique key; retries with the same key and body replay the original response.", type=openapi.TYPE_STRING, required=False)
+    ],
     responses={
-        201: GoldSaleTransactionSerializer,
-        400: 'Invalid input data (e.g., negative amounts or invalid status).',
+        201: OwnerGoldSaleTransactionSerializer,
+        400: 'Invalid input data (e.g., negative amounts).',
         401: 'Unauthorized: Valid JWT token required.'
     }
 )
@@ -158,10 +215,11 @@ user_retrieve_gold_sale_transaction_swagger = swagger_auto_schema(
     ),
     tags=['gold_online_store.gold_sale_transaction'],
     manual_parameters=[
-        openapi.Parameter('id', openapi.IN_PATH, description="The ID of the authenticated user’s gold sale transaction.", type=openapi.TYPE_INTEGER)
+        openapi.Parameter('id', openapi.IN_PATH, description="The ID of the authenticated user’s gold sale transaction.", type=openapi.TYPE_INTEGER),
+        *FIELDSET_PARAMETERS,
     ],
     responses={
-        200: GoldSaleTransactionSerializer,
+        200: OwnerGoldSaleTransactionSerializer,
         401: 'Unauthorized: Valid JWT token required.',
         403: 'Forbidden: User can only access their own gold sale transaction.',
         404: 'Not Found: Gold sale transaction with the specified ID does not exist.'
@@ -172,20 +230,20 @@ user_update_gold_sale_transaction_swagger = swagger_auto_schema(
     operation_summary='Fully Update Own Gold Sale Transaction',
     operation_description=(
         'This endpoint allows authenticated users to fully update their own gold sale transaction identified by its ID. '
-        'The request body must include all required fields (e.g., money_amount, gold_amount, gold_price, status) even if some fields remain unchanged. '
-        'The money_amount and gold_amount must be non-negative, and status must be one of ACCEPTED, WAITING, or REJECTED. '
+        'The request body must include all required fields (e.g., money_amount, gold_amount, gold_price) even if some fields remain unchanged. '
+        'The money_amount and gold_amount must be non-negative. Only WAITING records can be updated, and their status cannot be changed. '
         'The user field cannot be modified and must match the authenticated user. '
         'The response returns the updated transaction’s details. '
         'This operation requires JWT authentication.'
     ),
     tags=['gold_online_store.gold_sale_transaction'],
-    request_body=GoldSaleTransactionSerializer,
+    request_body=OwnerGoldSaleTransactionSerializer,
     manual_parameters=[
         openapi.Parameter('id', openapi.IN_PATH, description="The ID of the authenticated user’s gold sale transaction to update.", type=openapi.TYPE_INTEGER)
     ],
     responses={
-        200: GoldSaleTransactionSerializer,
-        400: 'Invalid input data (e.g., negative amounts or invalid status).',
+        200: OwnerGoldSaleTransactionSerializer,
+        400: 'Invalid input data (e.g., negative amounts, or a record that is no longer WAITING).',
         401: 'Unauthorized: Valid JWT token required.',
         403: 'Forbidden: User can only update their own gold sale transaction.',
         404: 'Not Found: Gold sale transaction with the specified ID does not exist.'
@@ -196,20 +254,20 @@ user_partial_update_gold_sale_transaction_swagger = swagger_auto_schema(
     operation_summary='Partially Update Own Gold Sale Transaction',
     operation_description=(
         'This endpoint allows authenticated users to partially update their own gold sale transaction identified by its ID. '
-        'Only the provided fields in the request body will be updated (e.g., updating only money_amount or status). '
-        'The money_amount and gold_amount must be non-negative, and status must be one of ACCEPTED, WAITING, or REJECTED. '
+        'Only the provided fields in the request body will be updated (e.g., updating only money_amount). '
+        'The money_amount and gold_amount must be non-negative. Only WAITING records can be updated, and their status cannot be changed. '
         'The user field cannot be modified and must match the authenticated user. '
         'The response returns the updated transaction’s details. '
         'This operation requires JWT authentication.'
     ),
     tags=['gold_online_store.gold_sale_transaction'],
-    request_body=GoldSaleTransactionSerializer,
+    request_body=OwnerGoldSaleTransactionSerializer,
     manual_parameters=[
         openapi.Parameter('id', openapi.IN_PATH, description="The ID of the authenticated user’s gold sale transaction to partially update.", type=openapi.TYPE_INTEGER)
     ],
     responses={
-        200: GoldSaleTransactionSerializer,
-        400: 'Invalid input data (e.g., negative amounts or invalid status).',
+        200: OwnerGoldSaleTransactionSerializer,
+        400: 'Invalid input data (e.g., negative amounts, or a record that is no longer WAITING).',
         401: 'Unauthorized: Valid JWT token required.',
         403: 'Forbidden: User can only update their own gold sale transaction.',
         404: 'Not Found: Gold sale transaction with the specified ID does not exist.'
@@ -221,6 +279,7 @@ user_destroy_gold_sale_transaction_swagger = swagger_auto_schema(
     operation_description=(
         'This endpoint allows authenticated users to delete their own gold sale transaction by its ID. '
         'The operation permanently removes the transaction from the system. '
+        'Only WAITING records can be deleted. '
         'The transaction ID must correspond to a transaction belonging to the authenticated user. '
         'A successful deletion returns a 204 No Content response. '
         'This operation requires JWT authentication.'
@@ -231,6 +290,7 @@ user_destroy_gold_sale_transaction_swagger = swagger_auto_schema(
     ],
     responses={
         204: 'Gold sale transaction successfully deleted.',
+        400: 'Bad Request: The record is no longer WAITING.',
         401: 'Unauthorized: Valid JWT token required.',
         403: 'Forbidden: User can only delete their own gold sale transaction.',
         404: 'Not Found: Gold sale transaction with the specified ID does not exist.'
@@ -247,10 +307,11 @@ user_list_gold_sale_transaction_swagger = swagger_auto_schema(
     ),
     tags=['gold_online_store.gold_sale_transaction'],
     manual_parameters=[
-        openapi.Parameter('search', openapi.IN_QUERY, description="Filter transactions by status (partial match).", type=openapi.TYPE_STRING)
+        openapi.Parameter('search', openapi.IN_QUERY, description="Filter transactions by status (partial match).", type=openapi.TYPE_STRING),
+        *FIELDSET_PARAMETERS,
     ],
     responses={
-        200: GoldSaleTransactionSerializer(many=True),
+        200: OwnerGoldSaleTransactionSerializer(many=True),
         401: 'Unauthorized: Valid JWT token required.',
         403: 'Forbidden: User can only access their own gold sale transactions.'
     }
@@ -286,7 +347,8 @@ admin_retrieve_gold_purchase_transaction_swagger = swagger_auto_schema(
     ),
     tags=['admin.gold_online_store.gold_purchase_transaction'],
     manual_parameters=[
-        openapi.Parameter('id', openapi.IN_PATH, description="The unique ID of the gold purchase transaction to retrieve.", type=openapi.TYPE_INTEGER)
+        openapi.Parameter('id', openapi.IN_PATH, description="The unique ID of the gold purchase transaction to retrieve.", type=openapi.TYPE_INTEGER),
+        *FIELDSET_PARAMETERS,
     ],
     responses={
         200: GoldPurchaseTransactionSerializer,
@@ -367,12 +429,13 @@ admin_list_gold_purchase_transaction_swagger = swagger_auto_schema(
     operation_description=(
         'This endpoint allows administrators to retrieve a list of all gold purchase transaction records in the system. '
         'The response includes details for each transaction, such as ID, associated user, create_date, money_amount, gold_amount, gold_price, status, and status display. '
-        'Optional search functionality is available using the "search" query parameter to filter transactions by username or status. '
+        'Results can be filtered by status, user, date range and amount range, and by username with the "search" query parameter (at least three characters). '
         'This operation is restricted to admin users only and requires JWT authentication.'
     ),
     tags=['admin.gold_online_store.gold_purchase_transaction'],
     manual_parameters=[
-        openapi.Parameter('search', openapi.IN_QUERY, description="Filter transactions by username or status (partial match).", type=openapi.TYPE_STRING)
+        *filter_parameters(GoldTransactionFilter),
+        *FIELDSET_PARAMETERS,
     ],
     responses={
         200: GoldPurchaseTransactionSerializer(many=True),
@@ -381,12 +444,54 @@ admin_list_gold_purchase_transaction_swagger = swagger_auto_schema(
     }
 )
 
+admin_settle_batch_gold_purchase_transaction_swagger = swagger_auto_schema(
+    operation_summary='Settle Waiting Gold Purchase Transactions in Batch (Admin)',
+    operation_description=(
+        'This endpoint allows administrators to settle every waiting gold purchase transaction booked against one gold price in a single pass. '
+        'Transactions are filled oldest first against the wallet balances and the remaining total_gold_stock; those that cannot be filled are rejected. '
+        'The response lists the IDs of the accepted and rejected transactions. '
+        'This operation is restricted to admin users only and requires JWT authentication.'
+    ),
+    tags=['admin.gold_online_store.gold_purchase_transaction'],
+    request_body=BatchSettlementSerializer,
+    responses={
+        200: BatchSettlementSerializer,
+        400: 'Invalid input data (e.g., unknown gold price ID).',
+        401: 'Unauthorized: Valid JWT token required for admin users.',
+        403: 'Forbidden: User is not an admin.'
+    }
+)
+
+admin_export_gold_purchase_transaction_swagger = swagger_auto_schema(
+    operation_summary='Export All Gold Purchase Transactions (Admin)',
+    operation_description=(
+        'This endpoint allows administrators to download every gold purchase transaction record matching the query as a streamed attachment, one record per line. '
+        'Records are written as NDJSON by default, or as CSV with "output=csv", where nested fields become columns such as user.username. '
+        'The optional "from" and "to" query parameters restrict the export to a create_date range, and records are exported in create_date order. '
+        'The filters of the list endpoint and its "fields" and "expand" query parameters apply. '
+        'This operation is restricted to admin users only and requires JWT authentication.'
+    ),
+    tags=['admin.gold_online_store.gold_purchase_transaction'],
+    manual_parameters=[
+        *EXPORT_PARAMETERS,
+        *EXPORT_RANGE_PARAMETERS,
+        *filter_parameters(GoldTransactionFilter),
+        *FIELDSET_PARAMETERS,
+    ],
+    responses={
+        200: 'The matching records as an NDJSON or CSV attachment.',
+        400: 'Invalid query parameters (e.g., "from" not earlier than "to").',
+        401: 'Unauthorized: Valid JWT token required for admin users.',
+        403: 'Forbidden: User is not an admin.'
+    }
+)
+
 # GoldPurchaseTransactionAPIView Decorators
 user_create_gold_purchase_transaction_swagger = swagger_auto_schema(
     operation_summary='Create a New Gold Purchase Transaction (User)',
     operation_description=(
         'This endpoint allows authenticated users to create a new gold purchase transaction for themselves. '
-        'The request must include money_amount, gold_amount, gold_price ID, and status (ACCEPTED, WAITING, or REJECTED). '
+        'The request must include money_amount, gold_amount and gold_price ID. New records start as WAITING; only settlement changes their status. '
         'The money_amount and gold_amount must be non-negative and within reasonable limits. '
         'The create_date is automatically set to the current time if not provided. '
         'The user field is automatically set to the authenticated user and cannot be modified. '
@@ -394,10 +499,13 @@ user_create_gold_purchase_transaction_swagger = swagger_auto_schema(
         'This operation requires JWT authentication.'
     ),
     tags=['gold_online_store.gold_purchase_transaction'],
-    request_body=GoldPurchaseTransactionSerializer,
+    request_body=OwnerGoldPurchaseTransactionSerializer,
+    manual_parameters=[
+        openapi.Parameter('Idempotency-Key', openapi.IN_HEADER, description="Optional unique key; retries with the same key and body replay the original response.", type=openapi.TYPE_STRING, required=False)
+    ],
     responses={
-        201: GoldPurchaseTransactionSerializer,
-        400: 'Invalid input data (e.g., negative amounts or invalid status).',
+        201: OwnerGoldPurchaseTransactionSerializer,
+        400: 'Invalid input data (e.g., negative amounts).',
         401: 'Unauthorized: Valid JWT token required.'
     }
 )
@@ -412,10 +520,11 @@ user_retrieve_gold_purchase_transaction_swagger = swagger_auto_schema(
     ),
     tags=['gold_online_store.gold_purchase_transaction'],
     manual_parameters=[
-        openapi.Parameter('id', openapi.IN_PATH, description="The ID of the authenticated user’s gold purchase transaction.", type=openapi.TYPE_INTEGER)
+        openapi.Parameter('id', openapi.IN_PATH, description="The ID of the authenticated user’s gold purchase transaction.", type=openapi.TYPE_INTEGER),
+        *FIELDSET_PARAMETERS,
     ],
     responses={
-        200: GoldPurchaseTransactionSerializer,
+        200: OwnerGoldPurchaseTransactionSerializer,
         401: 'Unauthorized: Valid JWT token required.',
         403: 'Forbidden: User can only access their own gold purchase transaction.',
         404: 'Not Found: Gold purchase transaction with the specified ID does not exist.'
@@ -426,20 +535,20 @@ user_update_gold_purchase_transaction_swagger = swagger_auto_schema(
     operation_summary='Fully Update Own Gold Purchase Transaction',
     operation_description=(
         'This endpoint allows authenticated users to fully update their own gold purchase transaction identified by its ID. '
-        'The request body must include all required fields (e.g., money_amount, gold_amount, gold_price, status) even if some fields remain unchanged. '
-        'The money_amount and gold_amount must be non-negative, and status must be one of ACCEPTED, WAITING, or REJECTED. '
+        'The request body must include all required fields (e.g., money_amount, gold_amount, gold_price) even if some fields remain unchanged. '
+        'The money_amount and gold_amount must be non-negative. Only WAITING records can be updated, and their status cannot be changed. '
         'The user field cannot be modified and must match the authenticated user. '
         'The response returns the updated transaction’s details. '
         'This operation requires JWT authentication.'
     ),
     tags=['gold_online_store.gold_purchase_transaction'],
-    request_body=GoldPurchaseTransactionSerializer,
+    request_body=OwnerGoldPurchaseTransactionSerializer,
     manual_parameters=[
         openapi.Parameter('id', openapi.IN_PATH, description="The ID of the authenticated user’s gold purchase transaction to update.", type=openapi.TYPE_INTEGER)
     ],
     responses={
-        200: GoldPurchaseTransactionSerializer,
-        400: 'Invalid input data (e.g., negative amounts or invalid status).',
+        200: OwnerGoldPurchaseTransactionSerializer,
+        400: 'Invalid input data (e.g., negative amounts, or a record that is no longer WAITING).',
         401: 'Unauthorized: Valid JWT token required.',
         403: 'Forbidden: User can only update their own gold purchase transaction.',
         404: 'Not Found: Gold purchase transaction with the specified ID does not exist.'
@@ -450,20 +559,20 @@ user_partial_update_gold_purchase_transaction_swagger = swagger_auto_schema(
     operation_summary='Partially Update Own Gold Purchase Transaction',
     operation_description=(
         'This endpoint allows authenticated users to partially update their own gold purchase transaction identified by its ID. '
-        'Only the provided fields in the request body will be updated (e.g., updating only money_amount or status). '
-        'The money_amount and gold_amount must be non-negative, and status must be one of ACCEPTED, WAITING, or REJECTED. '
+        'Only the provided fields in the request body will be updated (e.g., updating only money_amount). '
+        'The money_amount and gold_amount must be non-negative. Only WAITING records can be updated, and their status cannot be changed. '
         'The user field cannot be modified and must match the authenticated user. '
         'The response returns the updated transaction’s details. '
         'This operation requires JWT authentication.'
     ),
     tags=['gold_online_store.gold_purchase_transaction'],
-    request_body=GoldPurchaseTransactionSerializer,
+    request_body=OwnerGoldPurchaseTransactionSerializer,
     manual_parameters=[
         openapi.Parameter('id', openapi.IN_PATH, description="The ID of the authenticated user’s gold purchase transaction to partially update.", type=openapi.TYPE_INTEGER)
     ],
     responses={
-        200: GoldPurchaseTransactionSerializer,
-        400: 'Invalid input data (e.g., negative amounts or invalid status).',
+        200: OwnerGoldPurchaseTransactionSerializer,
+        400: 'Invalid input data (e.g., negative amounts, or a record that is no longer WAITING).',
         401: 'Unauthorized: Valid JWT token required.',
         403: 'Forbidden: User can only update their own gold purchase transaction.',
         404: 'Not Found: Gold purchase transaction with the specified ID does not exist.'
@@ -475,6 +584,7 @@ user_destroy_gold_purchase_transaction_swagger = swagger_auto_schema(
     operation_description=(
         'This endpoint allows authenticated users to delete their own gold purchase transaction by its ID. '
         'The operation permanently removes the transaction from the system. '
+        'Only WAITING records can be deleted. '
         'The transaction ID must correspond to a transaction belonging to the authenticated user. '
         'A successful deletion returns a 204 No Content response. '
         'This operation requires JWT authentication.'
@@ -485,6 +595,7 @@ user_destroy_gold_purchase_transaction_swagger = swagger_auto_schema(
     ],
     responses={
         204: 'Gold purchase transaction successfully deleted.',
+        400: 'Bad Request: The record is no longer WAITING.',
         401: 'Unauthorized: Valid JWT token required.',
         403: 'Forbidden: User can only delete their own gold purchase transaction.',
         404: 'Not Found: Gold purchase transaction with the specified ID does not exist.'
@@ -501,10 +612,11 @@ user_list_gold_purchase_transaction_swagger = swagger_auto_schema(
     ),
     tags=['gold_online_store.gold_purchase_transaction'],
     manual_parameters=[
-        openapi.Parameter('search', openapi.IN_QUERY, description="Filter transactions by status (partial match).", type=openapi.TYPE_STRING)
+        openapi.Parameter('search', openapi.IN_QUERY, description="Filter transactions by status (partial match).", type=openapi.TYPE_STRING),
+        *FIELDSET_PARAMETERS,
     ],
     responses={
-        200: GoldPurchaseTransactionSerializer(many=True),
+        200: OwnerGoldPurchaseTransactionSerializer(many=True),
         401: 'Unauthorized: Valid JWT token required.',
         403: 'Forbidden: User can only access their own gold purchase transactions.'
     }
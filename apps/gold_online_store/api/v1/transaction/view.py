@@ -1,13 +1,24 @@
 from django.utils.decorators import method_decorator
-from django.utils.translation import gettext_lazy as _
-from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.permissions import IsAdminUser
 from rest_framework.viewsets import GenericViewSet
-from rest_framework import mixins, filters
-from rest_framework_simplejwt.authentication import JWTAuthentication
-from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework import mixins
+from django_filters.rest_framework import DjangoFilterBackend
 
+from apps.core.authentication import ClaimsJWTAuthentication
+from apps.core.pagination import AdminPagination
 from apps.gold_online_store.models.transaction import GoldSaleTransaction, GoldPurchaseTransaction
-from apps.gold_online_store.serializers.transaction import GoldSaleTransactionSerializer, GoldPurchaseTransactionSerializer
+from apps.gold_online_store.serializers.transaction import (
+    GoldSaleTransactionSerializer,
+    GoldPurchaseTransactionSerializer,
+    OwnerGoldSaleTransactionSerializer,
+    OwnerGoldPurchaseTransactionSerializer,
+)
+from apps.gold_online_store.services.settlement import settle_gold_transaction
+from apps.gold_online_store.api.v1.settlement import BatchSettlementMixin, SettlementMixin
+from apps.gold_online_store.api.v1.export import ExportMixin
+from apps.gold_online_store.api.v1.filters import GoldTransactionFilter
+from apps.gold_online_store.api.v1.base import OwnerScopedViewSet
+from apps.gold_online_store.api.v1.values import ValuesListMixin
 from apps.gold_online_store.api.v1.transaction.swagger_decorator import (
     admin_create_gold_sale_transaction_swagger,
     admin_retrieve_gold_sale_transaction_swagger,
@@ -15,6 +26,8 @@ from apps.gold_online_store.api.v1.transaction.swagger_decorator import (
     admin_partial_update_gold_sale_transaction_swagger,
     admin_destroy_gold_sale_transaction_swagger,
     admin_list_gold_sale_transaction_swagger,
+    admin_settle_batch_gold_sale_transaction_swagger,
+    admin_export_gold_sale_transaction_swagger,
     user_create_gold_sale_transaction_swagger,
     user_retrieve_gold_sale_transaction_swagger,
     user_update_gold_sale_transaction_swagger,
@@ -27,6 +40,8 @@ from apps.gold_online_store.api.v1.transaction.swagger_decorator import (
     admin_partial_update_gold_purchase_transaction_swagger,
     admin_destroy_gold_purchase_transaction_swagger,
     admin_list_gold_purchase_transaction_swagger,
+    admin_settle_batch_gold_purchase_transaction_swagger,
+    admin_export_gold_purchase_transaction_swagger,
     user_create_gold_purchase_transaction_swagger,
     user_retrieve_gold_purchase_transaction_swagger,
     user_update_gold_purchase_transaction_swagger,
@@ -42,7 +57,13 @@ from apps.gold_online_store.api.v1.transaction.swagger_decorator import (
 @method_decorator(name='partial_update', decorator=admin_partial_update_gold_sale_transaction_swagger)
 @method_decorator(name='destroy', decorator=admin_destroy_gold_sale_transaction_swagger)
 @method_decorator(name='list', decorator=admin_list_gold_sale_transaction_swagger)
+@method_decorator(name='settle_batch', decorator=admin_settle_batch_gold_sale_transaction_swagger)
+@method_decorator(name='export', decorator=admin_export_gold_sale_transaction_swagger)
 class GoldSaleTransactionAdminAPIView(
+    ExportMixin,
+    SettlementMixin,
+    ValuesListMixin,
+    BatchSettlementMixin,
     GenericViewSet,
     mixins.CreateModelMixin,
     mixins.RetrieveModelMixin,
@@ -53,13 +74,18 @@ class GoldSaleTransactionAdminAPIView(
     """
     Admin-only API ViewSet for managing gold sale transaction records.
     """
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [ClaimsJWTAuthentication]
     permission_classes = [IsAdminUser]
     serializer_class = GoldSaleTransactionSerializer
     lookup_field = 'id'
+    pagination_class = AdminPagination
+    pagination_ordering = ('-create_date', '-id')
+    export_date_field = 'create_date'
+    settle_with = staticmethod(settle_gold_transaction)
+    settle_job = 'settle_transaction'
     queryset = GoldSaleTransaction.objects.all()
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['user__username', 'status']
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = GoldTransactionFilter
 
 
 @method_decorator(name='create', decorator=user_create_gold_sale_transaction_swagger)
@@ -68,76 +94,14 @@ class GoldSaleTransactionAdminAPIView(
 @method_decorator(name='partial_update', decorator=user_partial_update_gold_sale_transaction_swagger)
 @method_decorator(name='destroy', decorator=user_destroy_gold_sale_transaction_swagger)
 @method_decorator(name='list', decorator=user_list_gold_sale_transaction_swagger)
-class GoldSaleTransactionAPIView(
-    GenericViewSet,
-    mixins.CreateModelMixin,
-    mixins.RetrieveModelMixin,
-    mixins.UpdateModelMixin,
-    mixins.DestroyModelMixin,
-    mixins.ListModelMixin,
-):
+class GoldSaleTransactionAPIView(OwnerScopedViewSet):
     """
     Authenticated user API ViewSet for managing own gold sale transaction records.
     """
-    authentication_classes = [JWTAuthentication]
-    permission_classes = [IsAuthenticated]
-    serializer_class = GoldSaleTransactionSerializer
-    lookup_field = 'id'
-
-    def get_queryset(self):
-        """
-        Restrict queryset to the authenticated user's gold sale transactions.
-        """
-        return GoldSaleTransaction.objects.filter(user__username=self.request.user.username)
-
-    def create(self, request, *args, **kwargs):
-        """
-        Set user to authenticated user and prevent modification of user field.
-        """
-        if 'user' in request.data:
-            raise ValidationError(_('User field cannot be set manually.'))
-        request.data['user'] = self.request.user.id
-        return super().create(request, *args, **kwargs)
-
-    def update(self, request, *args, **kwargs):
-        """
-        Ensure the user can only update their own gold sale transaction and prevent user field modification.
-        """
-        instance = self.get_object()
-        if instance.user != self.request.user:
-            raise PermissionDenied(_('You can only update your own gold sale transaction.'))
-        if 'user' in request.data:
-            raise ValidationError(_('User field cannot be modified.'))
-        return super().update(request, *args, **kwargs)
-
-    def partial_update(self, request, *args, **kwargs):
-        """
-        Ensure the user can only partially update their own gold sale transaction and prevent user field modification.
-        """
-        instance = self.get_object()
-        if instance.user != self.request.user:
-            raise PermissionDenied(_('You can only update your own gold sale transaction.'))
-        if 'user' in request.data:
-            raise ValidationError(_('User field cannot be modified.'))
-        return super().partial_update(request, *args, **kwargs)
-
-    def destroy(self, request, *args, **kwargs):
-        """
-        Ensure the user can only delete their own gold sale transaction.
-        """
-        instance = self.get_object()
-        if instance.user != self.request.user:
-            raise PermissionDenied(_('You can only delete your own gold sale transaction.'))
-        return super().destroy(request, *args, **kwargs)
-
-    def retrieve(self, request, *args, **kwargs):
-        """
-        Ensure the user can only retrieve their own gold sale transaction.
-        """
-        instance = self.get_object()
-        if instance.user != self.request.user:
-            raise PermissionDenied(_('You can only access your own gold sale transaction.'))
-        return super().retrieve(request, *args, **kwargs)
+    serializer_class = OwnerGoldSaleTransactionSerializer
+    pagination_ordering = ('-create_date', '-id')
+    pending_status = 'WAITING'
+    queryset = GoldSaleTransaction.objects.select_related('gold_price')
 
 
 @method_decorator(name='create', decorator=admin_create_gold_purchase_transaction_swagger)
@@ -146,7 +110,13 @@ class GoldSaleTransactionAPIView(
 @method_decorator(name='partial_update', decorator=admin_partial_update_gold_purchase_transaction_swagger)
 @method_decorator(name='destroy', decorator=admin_destroy_gold_purchase_transaction_swagger)
 @method_decorator(name='list', decorator=admin_list_gold_purchase_transaction_swagger)
+@method_decorator(name='settle_batch', decorator=admin_settle_batch_gold_purchase_transaction_swagger)
+@method_decorator(name='export', decorator=admin_export_gold_purchase_transaction_swagger)
 class GoldPurchaseTransactionAdminAPIView(
+    ExportMixin,
+    SettlementMixin,
+    ValuesListMixin,
+    BatchSettlementMixin,
     GenericViewSet,
     mixins.CreateModelMixin,
     mixins.RetrieveModelMixin,
@@ -157,13 +127,18 @@ class GoldPurchaseTransactionAdminAPIView(
     """
     Admin-only API ViewSet for managing gold purchase transaction records.
     """
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [ClaimsJWTAuthentication]
     permission_classes = [IsAdminUser]
     serializer_class = GoldPurchaseTransactionSerializer
     lookup_field = 'id'
+    pagination_class = AdminPagination
+    pagination_ordering = ('-create_date', '-id')
+    export_date_field = 'create_date'
+    settle_with = staticmethod(settle_gold_transaction)
+    settle_job = 'settle_transaction'
     queryset = GoldPurchaseTransaction.objects.all()
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['user__username', 'status']
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = GoldTransactionFilter
 
 
 @method_decorator(name='create', decorator=user_create_gold_purchase_transaction_swagger)
@@ -172,73 +147,11 @@ class GoldPurchaseTransactionAdminAPIView(
 @method_decorator(name='partial_update', decorator=user_partial_update_gold_purchase_transaction_swagger)
 @method_decorator(name='destroy', decorator=user_destroy_gold_purchase_transaction_swagger)
 @method_decorator(name='list', decorator=user_list_gold_purchase_transaction_swagger)
-class GoldPurchaseTransactionAPIView(
-    GenericViewSet,
-    mixins.CreateModelMixin,
-    mixins.RetrieveModelMixin,
-    mixins.UpdateModelMixin,
-    mixins.DestroyModelMixin,
-    mixins.ListModelMixin,
-):
+class GoldPurchaseTransactionAPIView(OwnerScopedViewSet):
     """
     Authenticated user API ViewSet for managing own gold purchase transaction records.
     """
-    authentication_classes = [JWTAuthentication]
-    permission_classes = [IsAuthenticated]
-    serializer_class = GoldPurchaseTransactionSerializer
-    lookup_field = 'id'
-
-    def get_queryset(self):
-        """
-        Restrict queryset to the authenticated user's gold purchase transactions.
-        """
-        return GoldPurchaseTransaction.objects.filter(user__username=self.request.user.username)
-
-    def create(self, request, *args, **kwargs):
-        """
-        Set user to authenticated user and prevent modification of user field.
-        """
-        if 'user' in request.data:
-            raise ValidationError(_('User field cannot be set manually.'))
-        request.data['user'] = self.request.user.id
-        return super().create(request, *args, **kwargs)
-
-    def update(self, request, *args, **kwargs):
-        """
-        Ensure the user can only update their own gold purchase transaction and prevent user field modification.
-        """
-        instance = self.get_object()
-        if instance.user != self.request.user:
-            raise PermissionDenied(_('You can only update your own gold purchase transaction.'))
-        if 'user' in request.data:
-            raise ValidationError(_('User field cannot be modified.'))
-        return super().update(request, *args, **kwargs)
-
-    def partial_update(self, request, *args, **kwargs):
-        """
-        Ensure the user can only partially update their own gold purchase transaction and prevent user field modification.
-        """
-        instance = self.get_object()
-        if instance.user != self.request.user:
-            raise PermissionDenied(_('You can only update your own gold purchase transaction.'))
-        if 'user' in request.data:
-            raise ValidationError(_('User field cannot be modified.'))
-        return super().partial_update(request, *args, **kwargs)
-
-    def destroy(self, request, *args, **kwargs):
-        """
-        Ensure the user can only delete their own gold purchase transaction.
-        """
-        instance = self.get_object()
-        if instance.user != self.request.user:
-            raise PermissionDenied(_('You can only delete your own gold purchase transaction.'))
-        return super().destroy(request, *args, **kwargs)
-
-    def retrieve(self, request, *args, **kwargs):
-        """
-        Ensure the user can only retrieve their own gold purchase transaction.
-        """
-        instance = self.get_object()
-        if instance.user != self.request.user:
-            raise PermissionDenied(_('You can only access your own gold purchase transaction.'))
-        return super().retrieve(request, *args, **kwargs)
\ No newline at end of file
+    serializer_class = OwnerGoldPurchaseTransactionSerializer
+    pagination_ordering = ('-create_date', '-id')
+    pending_status = 'WAITING'
+    queryset = GoldPurchaseTransaction.objects.select_related('gold_price')
@@ -0,0 +1,32 @@
+from rest_framework.response import Response
+
+from apps.core.pagination import parse_ordering
+from apps.core.serializers import ValuesSerializer
+from apps.gold_online_store.api.v1.fieldsets import SparseFieldsetMixin
+
+
+class ValuesListMixin(SparseFieldsetMixin):
+    """
+    Serve list actions from `.values()` rows instead of model instances.
+
+    When the serializer compiles to a ValuesSerializer, a page is read as
+    plain rows of just the columns it renders, so no model instance is built
+    and DRF's field machinery does not run per row; the payload is the same.
+    Other serializers take the regular list path.
+    """
+
+    def list(self, request, *args, **kwargs):
+        serializer = ValuesSerializer.for_serializer(self.get_serializer_class(), *self.get_fieldset())
+        if serializer is None:
+            return super().list(request, *args, **kwargs)
+
+        fixed = self.get_fixed_values()
+        # Keyset pagination reads its cursor position from the ordering columns.
+        ordering = [field for field, _descending in parse_ordering(getattr(self, 'pagination_ordering', ()))]
+        lookups = dict.fromkeys(serializer.get_lookups(exclude=fixed) + ordering)
+        queryset = self.filter_queryset(self.get_queryset()).values(*lookups)
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serializer.to_representation(page, fixed))
+        return Response(serializer.to_representation(queryset, fixed))
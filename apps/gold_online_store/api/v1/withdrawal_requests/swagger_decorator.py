@@ -1,6 +1,15 @@
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
-from apps.gold_online_store.serializers.withdrawal_requests import MoneyWithdrawalRequestSerializer, GoldWithdrawalRequestSerializer
+from apps.gold_online_store.api.v1.export import EXPORT_PARAMETERS, EXPORT_RANGE_PARAMETERS
+from apps.gold_online_store.api.v1.fieldsets import FIELDSET_PARAMETERS
+from apps.core.filters import filter_parameters
+from apps.gold_online_store.api.v1.filters import GoldWithdrawalRequestFilter, MoneyWithdrawalRequestFilter
+from apps.gold_online_store.serializers.withdrawal_requests import (
+    MoneyWithdrawalRequestSerializer,
+    GoldWithdrawalRequestSerializer,
+    OwnerMoneyWithdrawalRequestSerializer,
+    OwnerGoldWithdrawalRequestSerializer,
+)
 
 # MoneyWithdrawalRequestAdminAPIView Decorators
 admin_create_money_withdrawal_request_swagger = swagger_auto_schema(
@@ -32,7 +41,8 @@ admin_retrieve_money_withdrawal_request_swagger = swagger_auto_schema(
     ),
     tags=['admin.gold_online_store.money_withdrawal_request'],
     manual_parameters=[
-        openapi.Parameter('id', openapi.IN_PATH, description="The unique ID of the money withdrawal request to retrieve.", type=openapi.TYPE_INTEGER)
+        openapi.Parameter('id', openapi.IN_PATH, description="The unique ID of the money withdrawal request to retrieve.", type=openapi.TYPE_INTEGER),
+        *FIELDSET_PARAMETERS,
     ],
     responses={
         200: MoneyWithdrawalRequestSerializer,
@@ -113,12 +123,13 @@ admin_list_money_withdrawal_request_swagger = swagger_auto_schema(
     operation_description=(
         'This endpoint allows administrators to retrieve a list of all money withdrawal request records in the system. '
         'The response includes details for each request, such as ID, associated user, create_date, money_amount, status, and status display. '
-        'Optional search functionality is available using the "search" query parameter to filter requests by username or status. '
+        'Results can be filtered by status, user, date range and amount range, and by username with the "search" query parameter (at least three characters). '
         'This operation is restricted to admin users only and requires JWT authentication.'
     ),
     tags=['admin.gold_online_store.money_withdrawal_request'],
     manual_parameters=[
-        openapi.Parameter('search', openapi.IN_QUERY, description="Filter requests by username or status (partial match).", type=openapi.TYPE_STRING)
+        *filter_parameters(MoneyWithdrawalRequestFilter),
+        *FIELDSET_PARAMETERS,
     ],
     responses={
         200: MoneyWithdrawalRequestSerializer(many=True),
@@ -127,12 +138,36 @@ admin_list_money_withdrawal_request_swagger = swagger_auto_schema(
     }
 )
 
+admin_export_money_withdrawal_request_swagger = swagger_auto_schema(
+    operation_summary='Export All Money Withdrawal Requests (Admin)',
+    operation_description=(
+        'This endpoint allows administrators to download every money withdrawal request record matching the query as a streamed attachment, one record per line. '
+        'Records are written as NDJSON by default, or as CSV with "output=csv", where nested fields become columns such as user.username. '
+        'The optional "from" and "to" query parameters restrict the export to a create_date range, and records are exported in create_date order. '
+        'The filters of the list endpoint and its "fields" and "expand" query parameters apply. '
+        'This operation is restricted to admin users only and requires JWT authentication.'
+    ),
+    tags=['admin.gold_online_store.money_withdrawal_request'],
+    manual_parameters=[
+        *EXPORT_PARAMETERS,
+        *EXPORT_RANGE_PARAMETERS,
+        *filter_parameters(MoneyWithdrawalRequestFilter),
+        *FIELDSET_PARAMETERS,
+    ],
+    responses={
+        200: 'The matching records as an NDJSON or CSV attachment.',
+        400: 'Invalid query parameters (e.g., "from" not earlier than "to").',
+        401: 'Unauthorized: Valid JWT token required for admin users.',
+        403: 'Forbidden: User is not an admin.'
+    }
+)
+
 # MoneyWithdrawalRequestAPIView Decorators
 user_create_money_withdrawal_request_swagger = swagger_auto_schema(
     operation_summary='Create a New Money Withdrawal Request (User)',
     operation_description=(
         'This endpoint allows authenticated users to create a new money withdrawal request for themselves. '
-        'The request must include money_amount and status (ACCEPTED, WAITING, or REJECTED). '
+        'The request must include money_amount. New records start as WAITING; only settlement changes their status. '
         'The money_amount must be non-negative and within reasonable limits. '
         'The create_date is automatically set to the current time if not provided. '
         'The user field is automatically set to the authenticated user and cannot be modified. '
@@ -140,10 +175,13 @@ user_create_money_withdrawal_request_swagger = swagger_auto_schema(
         'This operation requires JWT authentication.'
     ),
     tags=['gold_online_store.money_withdrawal_request'],
-    request_body=MoneyWithdrawalRequestSerializer,
+    request_body=OwnerMoneyWithdrawalRequestSerializer,
+    manual_parameters=[
+        openapi.Parameter('Idempotency-Key', openapi.IN_HEADER, description="Optional unique key; retries with the same key and body replay the original response.", type=openapi.TYPE_STRING, required=False)
+    ],
     responses={
-        201: MoneyWithdrawalRequestSerializer,
-        400: 'Invalid input data (e.g., negative amount or invalid status).',
+        201: OwnerMoneyWithdrawalRequestSerializer,
+        400: 'Invalid input data (e.g., negative amount).',
         401: 'Unauthorized: Valid JWT token required.'
     }
 )
@@ -158,10 +196,11 @@ user_retrieve_money_withdrawal_request_swagger = swagger_auto_schema(
     ),
     tags=['gold_online_store.money_withdrawal_request'],
     manual_parameters=[
-        openapi.Parameter('id', openapi.IN_PATH, description="The ID of the authenticated user’s money withdrawal request.", type=openapi.TYPE_INTEGER)
+        openapi.Parameter('id', openapi.IN_PATH, description="The ID of the authenticated user’s money withdrawal request.", type=openapi.TYPE_INTEGER),
+        *FIELDSET_PARAMETERS,
     ],
     responses={
-        200: MoneyWithdrawalRequestSerializer,
+        200: OwnerMoneyWithdrawalRequestSerializer,
         401: 'Unauthorized: Valid JWT token required.',
         403: 'Forbidden: User can only access their own money withdrawal request.',
         404: 'Not Found: Money withdrawal request with the specified ID does not exist.'
@@ -172,20 +211,20 @@ user_update_money_withdrawal_request_swagger = swagger_auto_schema(
     operation_summary='Fully Update Own Money Withdrawal Request',
     operation_description=(
         'This endpoint allows authenticated users to fully update their own money withdrawal request identified by its ID. '
-        'The request body must include all required fields (e.g., money_amount, status) even if some fields remain unchanged. '
-        'The money_amount must be non-negative, and status must be one of ACCEPTED, WAITING, or REJECTED. '
+        'The request body must include all required fields (e.g., money_amount) even if some fields remain unchanged. '
+        'The money_amount must be non-negative. Only WAITING records can be updated, and their status cannot be changed. '
         'The user field cannot be modified and must match the authenticated user. '
         'The response returns the updated request’s details. '
         'This operation requires JWT authentication.'
     ),
     tags=['gold_online_store.money_withdrawal_request'],
-    request_body=MoneyWithdrawalRequestSerializer,
+    request_body=OwnerMoneyWithdrawalRequestSerializer,
     manual_parameters=[
         openapi.Parameter('id', openapi.IN_PATH, description="The ID of the authenticated user’s money withdrawal request to update.", type=openapi.TYPE_INTEGER)
     ],
     responses={
-        200: MoneyWithdrawalRequestSerializer,
-        400: 'Invalid input data (e.g., negative amount or invalid status).',
+        200: OwnerMoneyWithdrawalRequestSerializer,
+        400: 'Invalid input data (e.g., negative amount, or a record that is no longer WAITING).',
         401: 'Unauthorized: Valid JWT token required.',
         403: 'Forbidden: User can only update their own money withdrawal request.',
         404: 'Not Found: Money withdrawal request with the specified ID does not exist.'
@@ -196,20 +235,20 @@ user_partial_update_money_withdrawal_request_swagger = swagger_auto_schema(
     operation_summary='Partially Update Own Money Withdrawal Request',
     operation_description=(
         'This endpoint allows authenticated users to partially update their own money withdrawal request identified by its ID. '
-        'Only the provided fields in the request body will be updated (e.g., updating only money_amount or status). '
-        'The money_amount must be non-negative, and status must be one of ACCEPTED, WAITING, or REJECTED. '
+        'Only the provided fields in the request body will be updated (e.g., updating only money_amount). '
+        'The money_amount must be non-negative. Only WAITING records can be updated, and their status cannot be changed. '
         'The user field cannot be modified and must match the authenticated user. '
         'The response returns the updated request’s details. '
         'This operation requires JWT authentication.'
     ),
     tags=['gold_online_store.money_withdrawal_request'],
-    request_body=MoneyWithdrawalRequestSerializer,
+    request_body=OwnerMoneyWithdrawalRequestSerializer,
     manual_parameters=[
         openapi.Parameter('id', openapi.IN_PATH, description="The ID of the authenticated user’s money withdrawal request to partially update.", type=openapi.TYPE_INTEGER)
     ],
     responses={
-        200: MoneyWithdrawalRequestSerializer,
-        400: 'Invalid input data (e.g., negative amount or invalid status).',
+        200: OwnerMoneyWithdrawalRequestSerializer,
+        400: 'Invalid input data (e.g., negative amount, or a record that is no longer WAITING).',
         401: 'Unauthorized: Valid JWT token required.',
         403: 'Forbidden: User can only update their own money withdrawal request.',
         404: 'Not Found: Money withdrawal request with the specified ID does not exist.'
@@ -221,6 +260,7 @@ user_destroy_money_withdrawal_request_swagger = swagger_auto_schema(
     operation_description=(
         'This endpoint allows authenticated users to delete their own money withdrawal request by its ID. '
         'The operation permanently removes the request from the system. '
+        'Only WAITING records can be deleted. '
         'The request ID must correspond to a request belonging to the authenticated user. '
         'A successful deletion returns a 204 No Content response. '
         'This operation requires JWT authentication.'
@@ -231,6 +271,7 @@ user_destroy_money_withdrawal_request_swagger = swagger_auto_schema(
     ],
     responses={
         204: 'Money withdrawal request successfully deleted.',
+        400: 'Bad Request: The record is no longer WAITING.',
         401: 'Unauthorized: Valid JWT token required.',
         403: 'Forbidden: User can only delete their own money withdrawal request.',
         404: 'Not Found: Money withdrawal request with the specified ID does not exist.'
@@ -247,10 +288,11 @@ user_list_money_withdrawal_request_swagger = swagger_auto_schema(
     ),
     tags=['gold_online_store.money_withdrawal_request'],
     manual_parameters=[
-        openapi.Parameter('search', openapi.IN_QUERY, description="Filter requests by status (partial match).", type=openapi.TYPE_STRING)
+        openapi.Parameter('search', openapi.IN_QUERY, description="Filter requests by status (partial match).", type=openapi.TYPE_STRING),
+        *FIELDSET_PARAMETERS,
     ],
     responses={
-        200: MoneyWithdrawalRequestSerializer(many=True),
+        200: OwnerMoneyWithdrawalRequestSerializer(many=True),
         401: 'Unauthorized: Valid JWT token required.',
         403: 'Forbidden: User can only access their own money withdrawal requests.'
     }
@@ -286,7 +328,8 @@ admin_retrieve_gold_withdrawal_request_swagger = swagger_auto_schema(
     ),
     tags=['admin.gold_online_store.gold_withdrawal_request'],
     manual_parameters=[
-        openapi.Parameter('id', openapi.IN_PATH, description="The unique ID of the gold withdrawal request to retrieve.", type=openapi.TYPE_INTEGER)
+        openapi.Parameter('id', openapi.IN_PATH, description="The unique ID of the gold withdrawal request to retrieve.", type=openapi.TYPE_INTEGER),
+        *FIELDSET_PARAMETERS,
     ],
     responses={
         200: GoldWithdrawalRequestSerializer,
@@ -367,12 +410,13 @@ admin_list_gold_withdrawal_request_swagger = swagger_auto_schema(
     operation_description=(
         'This endpoint allows administrators to retrieve a list of all gold withdrawal request records in the system. '
         'The response includes details for each request, such as ID, associated user, create_date, gold_amount, status, and status display. '
-        'Optional search functionality is available using the "search" query parameter to filter requests by username or status. '
+        'Results can be filtered by status, user, date range and amount range, and by username with the "search" query parameter (at least three characters). '
         'This operation is restricted to admin users only and requires JWT authentication.'
     ),
     tags=['admin.gold_online_store.gold_withdrawal_request'],
     manual_parameters=[
-        openapi.Parameter('search', openapi.IN_QUERY, description="Filter requests by username or status (partial match).", type=openapi.TYPE_STRING)
+        *filter_parameters(GoldWithdrawalRequestFilter),
+        *FIELDSET_PARAMETERS,
     ],
     responses={
         200: GoldWithdrawalRequestSerializer(many=True),
@@ -381,12 +425,36 @@ admin_list_gold_withdrawal_request_swagger = swagger_auto_schema(
     }
 )
 
+admin_export_gold_withdrawal_request_swagger = swagger_auto_schema(
+    operation_summary='Export All Gold Withdrawal Requests (Admin)',
+    operation_description=(
+        'This endpoint allows administrators to download every gold withdrawal request record matching the query as a streamed attachment, one record per line. '
+        'Records are written as NDJSON by default, or as CSV with "output=csv", where nested fields become columns such as user.username. '
+        'The optional "from" and "to" query parameters restrict the export to a create_date range, and records are exported in create_date order. '
+        'The filters of the list endpoint and its "fields" and "expand" query parameters apply. '
+        'This operation is restricted to admin users only and requires JWT authentication.'
+    ),
+    tags=['admin.gold_online_store.gold_withdrawal_request'],
+    manual_parameters=[
+        *EXPORT_PARAMETERS,
+        *EXPORT_RANGE_PARAMETERS,
+        *filter_parameters(GoldWithdrawalRequestFilter),
+        *FIELDSET_PARAMETERS,
+    ],
+    responses={
+        200: 'The matching records as an NDJSON or CSV attachment.',
+        400: 'Invalid query parameters (e.g., "from" not earlier than "to").',
+        401: 'Unauthorized: Valid JWT token required for admin users.',
+        403: 'Forbidden: User is not an admin.'
+    }
+)
+
 # GoldWithdrawalRequestAPIView Decorators
 user_create_gold_withdrawal_request_swagger = swagger_auto_schema(
     operation_summary='Create a New Gold Withdrawal Request (User)',
     operation_description=(
         'This endpoint allows authenticated users to create a new gold withdrawal request for themselves. '
-        'The request must include gold_amount and status (ACCEPTED, WAITING, or REJECTED). '
+        'The request must include gold_amount. New records start as WAITING; only settlement changes their status. '
         'The gold_amount must be non-negative and within reasonable limits. '
         'The create_date is automatically set to the current time if not provided. '
         'The user field is automatically set to the authenticated user and cannot be modified. '
@@ -394,10 +462,13 @@ user_create_gold_withdrawal_request_swagger = swagger_auto_schema(
         'This operation requires JWT authentication.'
     ),
     tags=['gold_online_store.gold_withdrawal_request'],
-    request_body=GoldWithdrawalRequestSerializer,
+    request_body=OwnerGoldWithdrawalRequestSerializer,
+    manual_parameters=[
+        openapi.Parameter('Idempotency-Key', openapi.IN_HEADER, description="Optional unique key; retries with the same key and body replay the original response.", type=openapi.TYPE_STRING, required=False)
+    ],
     responses={
-        201: GoldWithdrawalRequestSerializer,
-        400: 'Invalid input data (e.g., negative amount or invalid status).',
+        201: OwnerGoldWithdrawalRequestSerializer,
+        400: 'Invalid input data (e.g., negative amount).',
         401: 'Unauthorized: Valid JWT token required.'
     }
 )
@@ -412,10 +483,11 @@ user_retrieve_gold_withdrawal_request_swagger = swagger_auto_schema(
     ),
     tags=['gold_online_store.gold_withdrawal_request'],
     manual_parameters=[
-        openapi.Parameter('id', openapi.IN_PATH, description="The ID of the authenticated user’s gold withdrawal request.", type=openapi.TYPE_INTEGER)
+        openapi.Parameter('id', openapi.IN_PATH, description="The ID of the authenticated user’s gold withdrawal request.", type=openapi.TYPE_INTEGER),
+        *FIELDSET_PARAMETERS,
     ],
     responses={
-        200: GoldWithdrawalRequestSerializer,
+        200: OwnerGoldWithdrawalRequestSerializer,
         401: 'Unauthorized: Valid JWT token required.',
         403: 'Forbidden: User can only access their own gold withdrawal request.',
         404: 'Not Found: Gold withdrawal request with the specified ID does not exist.'
@@ -426,20 +498,20 @@ user_update_gold_withdrawal_request_swagger = swagger_auto_schema(
     operation_summary='Fully Update Own Gold Withdrawal Request',
     operation_description=(
         'This endpoint allows authenticated users to fully update their own gold withdrawal request identified by its ID. '
-        'The request body must include all required fields (e.g., gold_amount, status) even if some fields remain unchanged. '
-        'The gold_amount must be non-negative, and status must be one of ACCEPTED, WAITING, or REJECTED. '
+        'The request body must include all required fields (e.g., gold_amount) even if some fields remain unchanged. '
+        'The gold_amount must be non-negative. Only WAITING records can be updated, and their status cannot be changed. '
         'The user field cannot be modified and must match the authenticated user. '
         'The response returns the updated request’s details. '
         'This operation requires JWT authentication.'
     ),
     tags=['gold_online_store.gold_withdrawal_request'],
-    request_body=GoldWithdrawalRequestSerializer,
+    request_body=OwnerGoldWithdrawalRequestSerializer,
     manual_parameters=[
         openapi.Parameter('id', openapi.IN_PATH, description="The ID of the authenticated user’s gold withdrawal request to update.", type=openapi.TYPE_INTEGER)
     ],
     responses={
-        200: GoldWithdrawalRequestSerializer,
-        400: 'Invalid input data (e.g., negative amount or invalid status).',
+        200: OwnerGoldWithdrawalRequestSerializer,
+        400: 'Invalid input data (e.g., negative amount, or a record that is no longer WAITING).',
         401: 'Unauthorized: Valid JWT token required.',
         403: 'Forbidden: User can only update their own gold withdrawal request.',
         404: 'Not Found: Gold withdrawal request with the specified ID does not exist.'
@@ -450,20 +522,20 @@ user_partial_update_gold_withdrawal_request_swagger = swagger_auto_schema(
     operation_summary='Partially Update Own Gold Withdrawal Request',
     operation_description=(
         'This endpoint allows authenticated users to partially update their own gold withdrawal request identified by its ID. '
-        'Only the provided fields in the request body will be updated (e.g., updating only gold_amount or status). '
-        'The gold_amount must be non-negative, and status must be one of ACCEPTED, WAITING, or REJECTED. '
+        'Only the provided fields in the request body will be updated (e.g., updating only gold_amount). '
+        'The gold_amount must be non-negative. Only WAITING records can be updated, and their status cannot be changed. '
         'The user field cannot be modified and must match the authenticated user. '
         'The response returns the updated request’s details. '
         'This operation requires JWT authentication.'
     ),
     tags=['gold_online_store.gold_withdrawal_request'],
-    request_body=GoldWithdrawalRequestSerializer,
+    request_body=OwnerGoldWithdrawalRequestSerializer,
     manual_parameters=[
         openapi.Parameter('id', openapi.IN_PATH, description="The ID of the authenticated user’s gold withdrawal request to partially update.", type=openapi.TYPE_INTEGER)
     ],
     responses={
-        200: GoldWithdrawalRequestSerializer,
-        400: 'Invalid input data (e.g., negative amount or invalid status).',
+        200: OwnerGoldWithdrawalRequestSerializer,
+        400: 'Invalid input data (e.g., negative amount, or a record that is no longer WAITING).',
         401: 'Unauthorized: Valid JWT token required.',
         403: 'Forbidden: User can only update their own gold withdrawal request.',
         404: 'Not Found: Gold withdrawal request with the specified ID does not exist.'
@@ -475,6 +547,7 @@ user_destroy_gold_withdrawal_request_swagger = swagger_auto_schema(
     operation_description=(
         'This endpoint allows authenticated users to delete their own gold withdrawal request by its ID. '
         'The operation permanently removes the request from the system. '
+        'Only WAITING records can be deleted. '
         'The request ID must correspond to a request belonging to the authenticated user. '
         'A successful deletion returns a 204 No Content response. '
         'This operation requires JWT authentication.'
@@ -485,6 +558,7 @@ user_destroy_gold_withdrawal_request_swagger = swagger_auto_schema(
     ],
     responses={
         204: 'Gold withdrawal request successfully deleted.',
+        400: 'Bad Request: The record is no longer WAITING.',
         401: 'Unauthorized: Valid JWT token required.',
         403: 'Forbidden: User can only delete their own gold withdrawal request.',
         404: 'Not Found: Gold withdrawal request with the specified ID does not exist.'
@@ -501,10 +575,11 @@ user_list_gold_withdrawal_request_swagger = swagger_auto_schema(
     ),
     tags=['gold_online_store.gold_withdrawal_request'],
     manual_parameters=[
-        openapi.Parameter('search', openapi.IN_QUERY, description="Filter requests by status (partial match).", type=openapi.TYPE_STRING)
+        openapi.Parameter('search', openapi.IN_QUERY, description="Filter requests by status (partial match).", type=openapi.TYPE_STRING),
+        *FIELDSET_PARAMETERS,
     ],
     responses={
-        200: GoldWithdrawalRequestSerializer(many=True),
+        200: OwnerGoldWithdrawalRequestSerializer(many=True),
         401: 'Unauthorized: Valid JWT token required.',
         403: 'Forbidden: User can only access their own gold withdrawal requests.'
     }
@@ -1,13 +1,24 @@
 from django.utils.decorators import method_decorator
-from django.utils.translation import gettext_lazy as _
-from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.permissions import IsAdminUser
 from rest_framework.viewsets import GenericViewSet
-from rest_framework import mixins, filters
-from rest_framework_simplejwt.authentication import JWTAuthentication
-from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework import mixins
+from django_filters.rest_framework import DjangoFilterBackend
 
+from apps.core.authentication import ClaimsJWTAuthentication
+from apps.core.pagination import AdminPagination
 from apps.gold_online_store.models.withdrawal_requests import MoneyWithdrawalRequest, GoldWithdrawalRequest
-from apps.gold_online_store.serializers.withdrawal_requests import MoneyWithdrawalRequestSerializer, GoldWithdrawalRequestSerializer
+from apps.gold_online_store.serializers.withdrawal_requests import (
+    MoneyWithdrawalRequestSerializer,
+    GoldWithdrawalRequestSerializer,
+    OwnerMoneyWithdrawalRequestSerializer,
+    OwnerGoldWithdrawalRequestSerializer,
+)
+from apps.gold_online_store.services.settlement import settle_withdrawal
+from apps.gold_online_store.api.v1.settlement import SettlementMixin
+from apps.gold_online_store.api.v1.export import ExportMixin
+from apps.gold_online_store.api.v1.filters import GoldWithdrawalRequestFilter, MoneyWithdrawalRequestFilter
+from apps.gold_online_store.api.v1.base import OwnerScopedViewSet
+from apps.gold_online_store.api.v1.values import ValuesListMixin
 from apps.gold_online_store.api.v1.withdrawal_requests.swagger_decorator import (
     admin_create_money_withdrawal_request_swagger,
     admin_retrieve_money_withdrawal_request_swagger,
@@ -15,6 +26,7 @@ from apps.gold_online_store.api.v1.withdrawal_requests.swagger_decorator import
     admin_partial_update_money_withdrawal_request_swagger,
     admin_destroy_money_withdrawal_request_swagger,
     admin_list_money_withdrawal_request_swagger,
+    admin_export_money_withdrawal_request_swagger,
     user_create_money_withdrawal_request_swagger,
     user_retrieve_money_withdrawal_request_swagger,
     user_update_money_withdrawal_request_swagger,
@@ -27,6 +39,7 @@ from apps.gold_online_store.api.v1.withdrawal_requests.swagger_decorator import
     admin_partial_update_gold_withdrawal_request_swagger,
     admin_destroy_gold_withdrawal_request_swagger,
     admin_list_gold_withdrawal_request_swagger,
+    admin_export_gold_withdrawal_request_swagger,
     user_create_gold_withdrawal_request_swagger,
     user_retrieve_gold_withdrawal_request_swagger,
     user_update_gold_withdrawal_request_swagger,
@@ -42,7 +55,11 @@ from apps.gold_online_store.api.v1.withdrawal_requests.swagger_decorator import
 @method_decorator(name='partial_update', decorator=admin_partial_update_money_withdrawal_request_swagger)
 @method_decorator(name='destroy', decorator=admin_destroy_money_withdrawal_request_swagger)
 @method_decorator(name='list', decorator=admin_list_money_withdrawal_request_swagger)
+@method_decorator(name='export', decorator=admin_export_money_withdrawal_request_swagger)
 class MoneyWithdrawalRequestAdminAPIView(
+    ExportMixin,
+    SettlementMixin,
+    ValuesListMixin,
     GenericViewSet,
     mixins.CreateModelMixin,
     mixins.RetrieveModelMixin,
@@ -53,13 +70,18 @@ class MoneyWithdrawalRequestAdminAPIView(
     """
     Admin-only API ViewSet for managing money withdrawal request records.
     """
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [ClaimsJWTAuthentication]
     permission_classes = [IsAdminUser]
     serializer_class = MoneyWithdrawalRequestSerializer
     lookup_field = 'id'
+    pagination_class = AdminPagination
+    pagination_ordering = ('-create_date', '-id')
+    export_date_field = 'create_date'
+    settle_with = staticmethod(settle_withdrawal)
+    settle_job = 'process_withdrawal'
     queryset = MoneyWithdrawalRequest.objects.all()
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['user__username', 'status']
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = MoneyWithdrawalRequestFilter
 
 
 @method_decorator(name='create', decorator=user_create_money_withdrawal_request_swagger)
@@ -68,76 +90,14 @@ class MoneyWithdrawalRequestAdminAPIView(
 @method_decorator(name='partial_update', decorator=user_partial_update_money_withdrawal_request_swagger)
 @method_decorator(name='destroy', decorator=user_destroy_money_withdrawal_request_swagger)
 @method_decorator(name='list', decorator=user_list_money_withdrawal_request_swagger)
-class MoneyWithdrawalRequestAPIView(
-    GenericViewSet,
-    mixins.CreateModelMixin,
-    mixins.RetrieveModelMixin,
-    mixins.UpdateModelMixin,
-    mixins.DestroyModelMixin,
-    mixins.ListModelMixin,
-):
+class MoneyWithdrawalRequestAPIView(OwnerScopedViewSet):
     """
     Authenticated user API ViewSet for managing own money withdrawal request records.
     """
-    authentication_classes = [JWTAuthentication]
-    permission_classes = [IsAuthenticated]
-    serializer_class = MoneyWithdrawalRequestSerializer
-    lookup_field = 'id'
-
-    def get_queryset(self):
-        """
-        Restrict queryset to the authenticated user's money withdrawal requests.
-        """
-        return MoneyWithdrawalRequest.objects.filter(user__username=self.request.user.username)
-
-    def create(self, request, *args, **kwargs):
-        """
-        Set user to authenticated user and prevent modification of user field.
-        """
-        if 'user' in request.data:
-            raise ValidationError(_('User field cannot be set manually.'))
-        request.data['user'] = self.request.user.id
-        return super().create(request, *args, **kwargs)
-
-    def update(self, request, *args, **kwargs):
-        """
-        Ensure the user can only update their own money withdrawal request and prevent user field modification.
-        """
-        instance = self.get_object()
-        if instance.user != self.request.user:
-            raise PermissionDenied(_('You can only update your own money withdrawal request.'))
-        if 'user' in request.data:
-            raise ValidationError(_('User field cannot be modified.'))
-        return super().update(request, *args, **kwargs)
-
-    def partial_update(self, request, *args, **kwargs):
-        """
-        Ensure the user can only partially update their own money withdrawal request and prevent user field modification.
-        """
-        instance = self.get_object()
-        if instance.user != self.request.user:
-            raise PermissionDenied(_('You can only update your own money withdrawal request.'))
-        if 'user' in request.data:
-            raise ValidationError(_('User field cannot be modified.'))
-        return super().partial_update(request, *args, **kwargs)
-
-    def destroy(self, request, *args, **kwargs):
-        """
-        Ensure the user can only delete their own money withdrawal request.
-        """
-        instance = self.get_object()
-        if instance.user != self.request.user:
-            raise PermissionDenied(_('You can only delete your own money withdrawal request.'))
-        return super().destroy(request, *args, **kwargs)
-
-    def retrieve(self, request, *args, **kwargs):
-        """
-        Ensure the user can only retrieve their own money withdrawal request.
-        """
-        instance = self.get_object()
-        if instance.user != self.request.user:
-            raise PermissionDenied(_('You can only access your own money withdrawal request.'))
-        return super().retrieve(request, *args, **kwargs)
+    serializer_class = OwnerMoneyWithdrawalRequestSerializer
+    pagination_ordering = ('-create_date', '-id')
+    pending_status = 'WAITING'
+    queryset = MoneyWithdrawalRequest.objects.all()
 
 
 @method_decorator(name='create', decorator=admin_create_gold_withdrawal_request_swagger)
@@ -146,7 +106,11 @@ class MoneyWithdrawalRequestAPIView(
 @method_decorator(name='partial_update', decorator=admin_partial_update_gold_withdrawal_request_swagger)
 @method_decorator(name='destroy', decorator=admin_destroy_gold_withdrawal_request_swagger)
 @method_decorator(name='list', decorator=admin_list_gold_withdrawal_request_swagger)
+@method_decorator(name='export', decorator=admin_export_gold_withdrawal_request_swagger)
 class GoldWithdrawalRequestAdminAPIView(
+    ExportMixin,
+    SettlementMixin,
+    ValuesListMixin,
     GenericViewSet,
     mixins.CreateModelMixin,
     mixins.RetrieveModelMixin,
@@ -157,13 +121,18 @@ class GoldWithdrawalRequestAdminAPIView(
     """
     Admin-only API ViewSet for managing gold withdrawal request records.
     """
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [ClaimsJWTAuthentication]
     permission_classes = [IsAdminUser]
     serializer_class = GoldWithdrawalRequestSerializer
     lookup_field = 'id'
+    pagination_class = AdminPagination
+    pagination_ordering = ('-create_date', '-id')
+    export_date_field = 'create_date'
+    settle_with = staticmethod(settle_withdrawal)
+    settle_job = 'process_withdrawal'
     queryset = GoldWithdrawalRequest.objects.all()
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['user__username', 'status']
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = GoldWithdrawalRequestFilter
 
 
 @method_decorator(name='create', decorator=user_create_gold_withdrawal_request_swagger)
@@ -172,73 +141,11 @@ class GoldWithdrawalRequestAdminAPIView(
 @method_decorator(name='partial_update', decorator=user_partial_update_gold_withdrawal_request_swagger)
 @method_decorator(name='destroy', decorator=user_destroy_gold_withdrawal_request_swagger)
 @method_decorator(name='list', decorator=user_list_gold_withdrawal_request_swagger)
-class GoldWithdrawalRequestAPIView(
-    GenericViewSet,
-    mixins.CreateModelMixin,
-    mixins.RetrieveModelMixin,
-    mixins.UpdateModelMixin,
-    mixins.DestroyModelMixin,
-    mixins.ListModelMixin,
-):
+class GoldWithdrawalRequestAPIView(OwnerScopedViewSet):
     """
     Authenticated user API ViewSet for managing own gold withdrawal request records.
     """
-    authentication_classes = [JWTAuthentication]
-    permission_classes = [IsAuthenticated]
-    serializer_class = GoldWithdrawalRequestSerializer
-    lookup_field = 'id'
-
-    def get_queryset(self):
-        """
-        Restrict queryset to the authenticated user's gold withdrawal requests.
-        """
-        return GoldWithdrawalRequest.objects.filter(user__username=self.request.user.username)
-
-    def create(self, request, *args, **kwargs):
-        """
-        Set user to authenticated user and prevent modification of user field.
-        """
-        if 'user' in request.data:
-            raise ValidationError(_('User field cannot be set manually.'))
-        request.data['user'] = self.request.user.id
-        return super().create(request, *args, **kwargs)
-
-    def update(self, request, *args, **kwargs):
-        """
-        Ensure the user can only update their own gold withdrawal request and prevent user field modification.
-        """
-        instance = self.get_object()
-        if instance.user != self.request.user:
-            raise PermissionDenied(_('You can only update your own gold withdrawal request.'))
-        if 'user' in request.data:
-            raise ValidationError(_('User field cannot be modified.'))
-        return super().update(request, *args, **kwargs)
-
-    def partial_update(self, request, *args, **kwargs):
-        """
-        Ensure the user can only partially update their own gold withdrawal request and prevent user field modification.
-        """
-        instance = self.get_object()
-        if instance.user != self.request.user:
-            raise PermissionDenied(_('You can only update your own gold withdrawal request.'))
-        if 'user' in request.data:
-            raise ValidationError(_('User field cannot be modified.'))
-        return super().partial_update(request, *args, **kwargs)
-
-    def destroy(self, request, *args, **kwargs):
-        """
-        Ensure the user can only delete their own gold withdrawal request.
-        """
-        instance = self.get_object()
-        if instance.user != self.request.user:
-            raise PermissionDenied(_('You can only delete your own gold withdrawal request.'))
-        return super().destroy(request, *args, **kwargs)
-
-    def retrieve(self, request, *args, **kwargs):
-        """
-        Ensure the user can only retrieve their own gold withdrawal request.
-        """
-        instance = self.get_object()
-        if instance.user != self.request.user:
-            raise PermissionDenied(_('You can only access your own gold withdrawal request.'))
-        return super().retrieve(request, *args, **kwargs)
\ No newline at end of file
+    serializer_class = OwnerGoldWithdrawalRequestSerializer
+    pagination_ordering = ('-create_date', '-id')
+    pending_status = 'WAITING'
+    queryset = GoldWithdrawalRequest.objects.all()
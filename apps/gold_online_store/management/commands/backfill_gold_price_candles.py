@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+from django.utils.dateparse import parse_datetime
+from django.utils.timezone import is_naive, make_aware
+
+from apps.gold_online_store.models.gold import GoldPrice
+from apps.gold_online_store.services.candles import rebuild_candles
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild the gold price candles from the price history, one UTC day per transaction. '
+        'Days thinned by compact_gold_prices no longer hold every tick, so rebuild only newer ranges.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='start', help='Start of the range (ISO 8601); defaults to the first price.')
+        parser.add_argument('--to', dest='end', help='End of the range (ISO 8601); defaults to the last price.')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Ticks read and candles written per batch.')
+
+    def handle(self, *args, **options):
+        bounds = GoldPrice.objects.aggregate(first=Min('date'), last=Max('date'))
+        start = self.parse(options['start']) or bounds['first']
+        end = self.parse(options['end']) or bounds['last']
+        if start is None or end is None:
+            self.stdout.write('No gold prices to build candles from.')
+            return
+        if start > end:
+            raise CommandError('--from must not be later than --to.')
+
+        written = rebuild_candles(start, end, batch_size=options['batch_size'])
+        self.stdout.write(f'Wrote {written} candles from {start.isoformat()} to {end.isoformat()}.')
+
+    def parse(self, value):
+        if value is None:
+            return None
+        date = parse_datetime(value)
+        if date is None:
+            raise CommandError(f'"{value}" is not an ISO 8601 date and time.')
+        return make_aware(date) if is_naive(date) else date
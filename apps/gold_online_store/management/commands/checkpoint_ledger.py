@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from apps.gold_online_store.models.gold import Wallet
+from apps.gold_online_store.models.ledger import LedgerEntry
+from apps.gold_online_store.services.ledger import checkpoint_wallet, post_adjustment, wallet_balance
+
+
+class Command(BaseCommand):
+    help = 'Open ledger accounts for wallets without entries and checkpoint every wallet balance.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='Compare every ledger balance with the wallet columns and fail on any mismatch.',
+        )
+
+    def handle(self, *args, **options):
+        opened = checkpoints = 0
+        mismatches = []
+        for wallet_id in Wallet.objects.order_by('id').values_list('id', flat=True).iterator():
+            if self.open_wallet(wallet_id):
+                opened += 1
+            if checkpoint_wallet(wallet_id) is not None:
+                checkpoints += 1
+            if options['verify']:
+                mismatch = self.verify_wallet(wallet_id)
+                if mismatch:
+                    mismatches.append(mismatch)
+
+        self.stdout.write(f'Opened {opened} wallets, created {checkpoints} checkpoints.')
+        if mismatches:
+            for mismatch in mismatches:
+                self.stderr.write(mismatch)
+            raise CommandError(f'{len(mismatches)} wallets do not match the ledger.')
+
+    def open_wallet(self, wallet_id):
+        """
+        Book opening balances for a wallet that predates the ledger.
+        """
+        with transaction.atomic():
+            # Locking the wallet waits out any settlement that is booking it.
+            wallet = Wallet.objects.select_for_update().get(pk=wallet_id)
+            if LedgerEntry.objects.filter(wallet_id=wallet_id).exists():
+                return False
+            post_adjustment(wallet_id, wallet.money_stock, wallet.gold_stock, reference_type='OPENING')
+        return True
+
+    def verify_wallet(self, wallet_id):
+        with transaction.atomic():
+            wallet = Wallet.objects.select_for_update().get(pk=wallet_id)
+            balances = wallet_balance(wallet_id)
+        if balances['MONEY'] != wallet.money_stock or balances['GOLD'] != wallet.gold_stock:
+            return (
+                f'Wallet {wallet_id}: ledger money {balances["MONEY"]}, gold {balances["GOLD"]}; '
+                f'wallet money {wallet.money_stock}, gold {wallet.gold_stock}'
+            )
+        return None
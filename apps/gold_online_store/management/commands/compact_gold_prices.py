@@ -0,0 +1,61 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.gold_online_store.models.gold import GoldPrice
+from apps.gold_online_store.services.retention import compact_gold_prices, gold_price_table_size, vacuum_gold_prices
+
+
+class Command(BaseCommand):
+    help = (
+        'Thin old gold price history to one price per minute, then one per hour, '
+        'keeping the active price and prices booked by transactions. Safe to stop and run again.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--raw-days',
+            type=int,
+            default=settings.GOLD_PRICE_RAW_RETENTION_DAYS,
+            help=(
+                'Days of raw ticks to keep before thinning to one per minute; at least '
+                'GOLD_PRICE_RAW_RETENTION_DAYS, which candle rebuilds rely on.'
+            ),
+        )
+        parser.add_argument(
+            '--minute-days',
+            type=int,
+            default=settings.GOLD_PRICE_MINUTE_RETENTION_DAYS,
+            help='Days of per-minute prices to keep before thinning to one per hour.',
+        )
+        parser.add_argument('--batch-size', type=int, default=5000, help='Prices deleted per transaction.')
+        parser.add_argument('--vacuum', action='store_true', help='VACUUM the table afterwards (PostgreSQL only).')
+
+    def handle(self, *args, **options):
+        if options['raw_days'] < 0 or options['minute_days'] < options['raw_days']:
+            raise CommandError('--minute-days must be at least --raw-days, and both must not be negative.')
+        # Candle rebuilds treat days inside the retention setting as still raw.
+        if options['raw_days'] < settings.GOLD_PRICE_RAW_RETENTION_DAYS:
+            raise CommandError(
+                f'--raw-days must be at least GOLD_PRICE_RAW_RETENTION_DAYS '
+                f'({settings.GOLD_PRICE_RAW_RETENTION_DAYS}); lower the setting to keep fewer raw ticks.'
+            )
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive.')
+
+        now = timezone.now()
+        size_before = gold_price_table_size()
+        deleted = compact_gold_prices(
+            now - timedelta(days=options['raw_days']),
+            now - timedelta(days=options['minute_days']),
+            batch_size=options['batch_size'],
+        )
+        if options['vacuum']:
+            vacuum_gold_prices()
+
+        self.stdout.write(f'Deleted {deleted} gold prices; {GoldPrice.objects.count()} remain.')
+        size_after = gold_price_table_size()
+        if size_before is not None:
+            self.stdout.write(f'Table size: {size_before} bytes before, {size_after} bytes after.')
@@ -0,0 +1,184 @@
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max
+from django.utils import timezone
+
+from apps.core.models import CustomUser
+from apps.gold_online_store.models.gold import Wallet, GoldPrice
+from apps.gold_online_store.models.payment import PaymentTransaction
+from apps.gold_online_store.models.transaction import GoldSaleTransaction, GoldPurchaseTransaction
+from apps.gold_online_store.models.withdrawal_requests import MoneyWithdrawalRequest, GoldWithdrawalRequest
+from apps.gold_online_store.services.ledger import adjustment_legs, post_many
+from apps.gold_online_store.services.bulk import batched, insert_objects
+from apps.gold_online_store.services.candles import rebuild_candles
+from apps.gold_online_store.services.price_provider import bump_price_version
+
+TRADE_STATUSES = (('ACCEPTED', 80), ('WAITING', 15), ('REJECTED', 5))
+PAYMENT_STATUSES = (('SUCCESS', 85), ('FAILED', 10), ('PENDING', 5))
+
+
+class Command(BaseCommand):
+    help = 'Bulk-generate synthetic users, wallets, gold price ticks, trades, payments and withdrawals.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000, help='Number of users, each with a wallet.')
+        parser.add_argument('--ticks', type=int, default=1440, help='Number of gold price ticks, one per minute.')
+        parser.add_argument('--trades', type=int, default=100000, help='Number of gold sale and purchase transactions.')
+        parser.add_argument('--payments', type=int, default=50000, help='Number of payment transactions.')
+        parser.add_argument('--withdrawals', type=int, default=20000, help='Number of money and gold withdrawal requests.')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows written per COPY or bulk insert.')
+        parser.add_argument('--prefix', default='load', help='Username prefix of the generated users.')
+        parser.add_argument('--password', default='load-password', help='Password shared by the generated users.')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed, so runs are reproducible.')
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or options['ticks'] < 1:
+            raise CommandError('At least one user and one tick are required.')
+        prefix = options['prefix']
+        if CustomUser.objects.filter(username__startswith=f'{prefix}-').exists():
+            raise CommandError(f'Users with the prefix "{prefix}" already exist; pick another --prefix.')
+
+        self.random = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.end = timezone.now()
+        self.start = self.end - timedelta(minutes=options['ticks'])
+
+        user_ids = self.generate_users(prefix, options['users'], options['password'])
+        self.generate_wallets(user_ids)
+        ticks = self.generate_ticks(options['ticks'])
+        self.generate_trades(user_ids, ticks, options['trades'])
+        self.generate_payments(user_ids, options['payments'])
+        self.generate_withdrawals(user_ids, options['withdrawals'])
+        # Bulk inserts skip GoldPrice.save, which keeps the candles up to date.
+        self.report('gold price candles', rebuild_candles(self.start, self.end, self.batch_size))
+        bump_price_version()
+
+    def report(self, label, count):
+        self.stdout.write(f'{label}: {count}')
+
+    def insert(self, label, model, objects):
+        self.report(label, insert_objects(model, objects, self.batch_size))
+
+    def moment(self):
+        return self.start + (self.end - self.start) * self.random.random()
+
+    def status(self, choices):
+        return self.random.choices([status for status, _weight in choices], [weight for _status, weight in choices])[0]
+
+    def tick_for(self, ticks, moment):
+        index = int((moment - self.start) / (self.end - self.start) * len(ticks))
+        return ticks[min(index, len(ticks) - 1)]
+
+    def generate_users(self, prefix, count, password):
+        # Hashing once keeps the run fast; every user shares the password.
+        password_hash = make_password(password)
+        self.insert('users', CustomUser, (
+            CustomUser(
+                username=f'{prefix}-{index}',
+                password=password_hash,
+                email=f'{prefix}-{index}@example.com',
+                date_joined=self.start - timedelta(days=self.random.randint(0, 365)),
+            )
+            for index in range(count)
+        ))
+        return list(
+            CustomUser.objects
+            .filter(username__startswith=f'{prefix}-')
+            .order_by('id')
+            .values_list('id', flat=True)
+        )
+
+    def generate_wallets(self, user_ids):
+        self.insert('wallets', Wallet, (
+            Wallet(
+                user_id=user_id,
+                money_stock=Decimal(self.random.randint(0, 5_000_000_000)) / 100,
+                gold_stock=Decimal(self.random.randint(0, 1_000_000)) / 10000,
+            )
+            for user_id in user_ids
+        ))
+        # Book the generated balances so the ledger agrees with the wallets.
+        wallets = Wallet.objects.filter(user_id__in=user_ids).values_list('id', 'money_stock', 'gold_stock')
+        for batch in batched(wallets.iterator(), self.batch_size):
+            post_many([
+                ('OPENING', wallet_id, adjustment_legs(wallet_id, money_stock, gold_stock))
+                for wallet_id, money_stock, gold_stock in batch
+            ])
+
+    def generate_ticks(self, count):
+        GoldPrice.objects.filter(active=True).update(active=False)
+        last_id = GoldPrice.objects.aggregate(last_id=Max('id'))['last_id'] or 0
+        price = Decimal('2500000.00')
+        ticks = []
+        for index in range(count):
+            price = max(Decimal('1000000.00'), price + Decimal(self.random.randint(-5000, 5000)))
+            ticks.append(GoldPrice(
+                date=self.start + timedelta(minutes=index + 1),
+                sale_price=price,
+                price_difference=Decimal('10000.00'),
+                total_gold_stock=Decimal(self.random.randint(100_000, 1_000_000)),
+                active=index == count - 1,
+            ))
+        self.insert('gold price ticks', GoldPrice, ticks)
+        return list(
+            GoldPrice.objects
+            .filter(id__gt=last_id)
+            .order_by('date', 'id')
+            .values_list('id', 'sale_price')
+        )
+
+    def generate_trades(self, user_ids, ticks, count):
+        sales = count // 2
+
+        def trades(model, total):
+            for _index in range(total):
+                moment = self.moment()
+                gold_price_id, sale_price = self.tick_for(ticks, moment)
+                gold_amount = Decimal(self.random.randint(1, 100000)) / 10000
+                yield model(
+                    user_id=self.random.choice(user_ids),
+                    gold_price_id=gold_price_id,
+                    create_date=moment,
+                    gold_amount=gold_amount,
+                    money_amount=(gold_amount * sale_price).quantize(Decimal('0.01')),
+                    status=self.status(TRADE_STATUSES),
+                )
+
+        self.insert('gold sale transactions', GoldSaleTransaction, trades(GoldSaleTransaction, sales))
+        self.insert('gold purchase transactions', GoldPurchaseTransaction, trades(GoldPurchaseTransaction, count - sales))
+
+    def generate_payments(self, user_ids, count):
+        self.insert('payment transactions', PaymentTransaction, (
+            PaymentTransaction(
+                user_id=self.random.choice(user_ids),
+                payment_date=self.moment(),
+                money_amount=Decimal(self.random.randint(100_000, 100_000_000)) / 100,
+                status=self.status(PAYMENT_STATUSES),
+            )
+            for _index in range(count)
+        ))
+
+    def generate_withdrawals(self, user_ids, count):
+        money = count // 2
+        self.insert('money withdrawal requests', MoneyWithdrawalRequest, (
+            MoneyWithdrawalRequest(
+                user_id=self.random.choice(user_ids),
+                create_date=self.moment(),
+                money_amount=Decimal(self.random.randint(100_000, 10_000_000)) / 100,
+                status=self.status(TRADE_STATUSES),
+            )
+            for _index in range(money)
+        ))
+        self.insert('gold withdrawal requests', GoldWithdrawalRequest, (
+            GoldWithdrawalRequest(
+                user_id=self.random.choice(user_ids),
+                create_date=self.moment(),
+                gold_amount=Decimal(self.random.randint(1, 100000)) / 10000,
+                status=self.status(TRADE_STATUSES),
+            )
+            for _index in range(count - money)
+        ))
@@ -0,0 +1,39 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.parsers import parse_ndjson_lines
+from apps.gold_online_store.serializers.gold import GoldPriceTickSerializer
+from apps.gold_online_store.services.bulk import batched
+from apps.gold_online_store.services.price_ingest import PriceIngestError, ingest_ticks
+
+
+class Command(BaseCommand):
+    help = (
+        'Ingest gold price ticks from newline-delimited JSON, one transaction per batch; '
+        'the newest tick becomes the active price.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default='-', help='NDJSON file of ticks, oldest first; "-" reads standard input.')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Ticks validated and stored per transaction.')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive.')
+        stream = sys.stdin if options['path'] == '-' else open(options['path'], encoding='utf-8')
+        stored = 0
+        try:
+            for batch in batched(parse_ndjson_lines(stream), options['batch_size']):
+                serializer = GoldPriceTickSerializer(data=batch, many=True)
+                if not serializer.is_valid():
+                    raise CommandError(f'Invalid ticks after {stored} stored: {serializer.errors}')
+                stored += len(ingest_ticks(serializer.validated_data, batch_size=options['batch_size']))
+        except ValueError as exc:
+            raise CommandError(f'Malformed NDJSON after {stored} stored ticks, {exc}')
+        except PriceIngestError as exc:
+            raise CommandError(f'{exc} ({stored} ticks stored before the rejected batch.)')
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        self.stdout.write(f'Stored {stored} gold price ticks.')
@@ -0,0 +1,78 @@
+import multiprocessing
+import os
+import signal
+import socket
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from apps.gold_online_store.models.job import Job
+from apps.gold_online_store.services.jobs import run_worker
+
+
+def work(name, options, stop, results):
+    # Ctrl-C reaches the whole process group; only the parent decides when to stop.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    results.put(run_worker(
+        name,
+        batch_size=options['batch_size'],
+        poll_interval=options['poll_interval'],
+        burst=options['burst'],
+        stop=stop,
+    ))
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = (
+        'Run background job workers that claim queued jobs with SELECT ... FOR UPDATE SKIP LOCKED. '
+        'Run it on as many hosts as needed; workers never wait on each other.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=1, help='Worker processes to start.')
+        parser.add_argument('--batch-size', type=int, default=10, help='Jobs claimed per round trip.')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds to sleep when the queue is empty.')
+        parser.add_argument('--burst', action='store_true', help='Exit once the queue is empty instead of polling.')
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1 or options['batch_size'] < 1:
+            raise CommandError('--workers and --batch-size must be positive.')
+
+        prefix = f'{socket.gethostname()}:{os.getpid()}'
+        context = multiprocessing.get_context('fork')
+        stop = context.Event()
+        signal.signal(signal.SIGTERM, lambda *args: stop.set())
+
+        if options['workers'] == 1:
+            try:
+                outcomes = run_worker(
+                    f'{prefix}:0',
+                    batch_size=options['batch_size'],
+                    poll_interval=options['poll_interval'],
+                    burst=options['burst'],
+                    stop=stop,
+                )
+            except KeyboardInterrupt:
+                outcomes = Counter()
+        else:
+            # Children must open their own connections instead of sharing the parent's socket.
+            connections.close_all()
+            results = context.Queue()
+            processes = [
+                context.Process(target=work, args=(f'{prefix}:{index}', options, stop, results), daemon=True)
+                for index in range(options['workers'])
+            ]
+            for process in processes:
+                process.start()
+            try:
+                outcomes = sum((results.get() for _ in processes), Counter())
+            except KeyboardInterrupt:
+                stop.set()
+                outcomes = sum((results.get() for _ in processes), Counter())
+            for process in processes:
+                process.join()
+
+        summary = ', '.join(f'{count} {status.lower()}' for status, count in sorted(outcomes.items())) or 'no jobs'
+        self.stdout.write(f'Ran {summary}; {Job.objects.filter(status="QUEUED").count()} queued.')
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.gold_online_store.models.gold import GoldPrice
+from apps.gold_online_store.models.transaction import GoldPurchaseTransaction, GoldSaleTransaction
+from apps.gold_online_store.services.settlement import settle_gold_price_batch
+
+MODELS = {
+    'purchase': GoldPurchaseTransaction,
+    'sale': GoldSaleTransaction,
+}
+
+
+class Command(BaseCommand):
+    help = 'Settle every waiting gold trade booked against one gold price in a single pass.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('gold_price_id', type=int, help='ID of the gold price to settle.')
+        parser.add_argument(
+            '--kind',
+            choices=['purchase', 'sale', 'all'],
+            default='all',
+            help='Which trades to settle; with "all", sales run first so their gold can fill purchases.',
+        )
+
+    def handle(self, *args, **options):
+        gold_price_id = options['gold_price_id']
+        if not GoldPrice.objects.filter(pk=gold_price_id).exists():
+            raise CommandError(f'Gold price {gold_price_id} does not exist.')
+
+        kinds = ['sale', 'purchase'] if options['kind'] == 'all' else [options['kind']]
+        for kind in kinds:
+            result = settle_gold_price_batch(gold_price_id, model=MODELS[kind])
+            self.stdout.write(
+                f'{kind}: accepted {len(result["accepted"])}, rejected {len(result["rejected"])}'
+            )
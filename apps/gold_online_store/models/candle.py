@@ -0,0 +1,74 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class GoldPriceCandle(models.Model):
+    """
+    Open, high, low and close sale price of the GoldPrice ticks in one time bucket.
+
+    Candles are kept up to date as prices are saved and can be rebuilt from
+    the ticks with the backfill_gold_price_candles command.
+    """
+    INTERVAL_CHOICES = (
+        ('1m', _('One minute')),
+        ('1h', _('One hour')),
+        ('1d', _('One day')),
+    )
+
+    interval = models.CharField(
+        max_length=2,
+        choices=INTERVAL_CHOICES,
+        verbose_name=_('interval'),
+        help_text=_('The length of the bucket.')
+    )
+    bucket = models.DateTimeField(
+        verbose_name=_('bucket'),
+        help_text=_('The start of the bucket, in UTC.')
+    )
+    open = models.DecimalField(
+        max_digits=15,
+        decimal_places=2,
+        verbose_name=_('open'),
+        help_text=_('The sale price of the first tick in the bucket.')
+    )
+    high = models.DecimalField(
+        max_digits=15,
+        decimal_places=2,
+        verbose_name=_('high'),
+        help_text=_('The highest sale price in the bucket.')
+    )
+    low = models.DecimalField(
+        max_digits=15,
+        decimal_places=2,
+        verbose_name=_('low'),
+        help_text=_('The lowest sale price in the bucket.')
+    )
+    close = models.DecimalField(
+        max_digits=15,
+        decimal_places=2,
+        verbose_name=_('close'),
+        help_text=_('The sale price of the last tick in the bucket.')
+    )
+    open_date = models.DateTimeField(
+        verbose_name=_('open date'),
+        help_text=_('The date of the first tick, so late ticks land in the right place.')
+    )
+    close_date = models.DateTimeField(
+        verbose_name=_('close date'),
+        help_text=_('The date of the last tick, so late ticks land in the right place.')
+    )
+    tick_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_('tick count'),
+        help_text=_('The number of price ticks in the bucket.')
+    )
+
+    class Meta:
+        verbose_name = _('gold price candle')
+        verbose_name_plural = _('gold price candles')
+        constraints = [
+            models.UniqueConstraint(fields=['interval', 'bucket'], name='unique_gold_price_candle_bucket'),
+        ]
+
+    def __str__(self):
+        return f"{self.interval} candle at {self.bucket.strftime('%Y-%m-%d %H:%M')}"
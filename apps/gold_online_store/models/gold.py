@@ -1,10 +1,37 @@
-from django.db import models
+from django.db import IntegrityError, connections, models, transaction
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from apps.core.models import CustomUser
 
 
+class WalletQuerySet(models.QuerySet):
+    """
+    QuerySet for wallets with set-based valuation helpers.
+    """
+
+    def update(self, **kwargs):
+        """
+        Stamp updated_at on every bulk update, as save() does, so conditional GETs see the change.
+        """
+        kwargs.setdefault('updated_at', timezone.now())
+        return super().update(**kwargs)
+
+    def with_total_value(self, gold_price):
+        """
+        Annotate each wallet with its total value at the given gold price.
+        """
+        total_value = models.F('money_stock')
+        if gold_price is not None:
+            total_value = total_value + models.F('gold_stock') * models.Value(gold_price.sale_price)
+        return self.annotate(
+            valued_total=models.ExpressionWrapper(
+                total_value,
+                output_field=models.DecimalField(max_digits=32, decimal_places=6),
+            )
+        )
+
+
 class Wallet(models.Model):
     """
     Represents a user's wallet with money and gold stock balances.
@@ -30,6 +57,13 @@ class Wallet(models.Model):
         verbose_name=_('gold stock'),
         help_text=_('The amount of gold in the wallet (in grams).')
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name=_('updated at'),
+        help_text=_('When the balances last changed; the version that wallet reads are revalidated against.')
+    )
+
+    objects = WalletQuerySet.as_manager()
 
     class Meta:
         verbose_name = _('wallet')
@@ -38,17 +72,81 @@ class Wallet(models.Model):
     def __str__(self):
         return f"Wallet of {self.user.username}"
 
+    def save(self, *args, **kwargs):
+        """
+        Drop any valuation annotation, which is stale once balances change.
+        """
+        self.__dict__.pop('valued_total', None)
+        super().save(*args, **kwargs)
+
     @property
     def total_value(self):
         """
         Calculate the total value of the wallet based on current gold price.
         """
-        latest_gold_price = GoldPrice.objects.filter(active=True).order_by('-date').first()
+        if 'valued_total' in self.__dict__:
+            return self.valued_total
+
+        from apps.gold_online_store.services.price_provider import get_active_gold_price
+
+        latest_gold_price = get_active_gold_price()
         if latest_gold_price:
             return self.money_stock + (self.gold_stock * latest_gold_price.sale_price)
         return self.money_stock
 
 
+class GoldPriceQuerySet(models.QuerySet):
+    """
+    QuerySet for gold prices with point-in-time lookups.
+
+    The price in effect at an instant is the latest price dated at or before
+    it, found with one backwards seek on the (date, id) index.
+    """
+
+    def as_of(self, timestamp):
+        """
+        Return the price in effect at timestamp, or None if no price is that old.
+        """
+        return self.filter(date__lte=timestamp).order_by('-date', '-id').first()
+
+    def as_of_transactions(self, model, ids):
+        """
+        Return {transaction id: price in effect at its create_date} for the given ids of a GoldTransaction model.
+
+        PostgreSQL resolves every transaction with one LATERAL join, an index
+        seek per row, so the lookup stays linear in the number of ids. Other
+        backends use a correlated subquery and load the prices in a second
+        query. Unknown ids and transactions older than every price are left out.
+        """
+        ids = list(ids)
+        if not ids:
+            return {}
+        if connections[self.db].vendor == 'postgresql':
+            quote_name = connections[self.db].ops.quote_name
+            prices = self.raw(
+                f'SELECT p.*, t.id AS transaction_id '
+                f'FROM {quote_name(model._meta.db_table)} AS t '
+                f'CROSS JOIN LATERAL ('
+                f'SELECT * FROM {quote_name(self.model._meta.db_table)} AS g '
+                f'WHERE g.date <= t.create_date ORDER BY g.date DESC, g.id DESC LIMIT 1'
+                f') AS p '
+                f'WHERE t.id = ANY(%s)',
+                [ids],
+            )
+            return {price.transaction_id: price for price in prices}
+
+        as_of_price = self.filter(date__lte=models.OuterRef('create_date')).order_by('-date', '-id').values('pk')[:1]
+        price_ids = dict(
+            model.objects
+            .filter(pk__in=ids)
+            .annotate(as_of_price=models.Subquery(as_of_price))
+            .exclude(as_of_price=None)
+            .values_list('pk', 'as_of_price')
+        )
+        prices = self.in_bulk(set(price_ids.values()))
+        return {transaction_id: prices[price_id] for transaction_id, price_id in price_ids.items()}
+
+
 class GoldPrice(models.Model):
     """
     Stores gold price information with timestamp and stock status.
@@ -90,21 +188,103 @@ class GoldPrice(models.Model):
         help_text=_('Indicates if this price record is currently active.')
     )
 
+    objects = GoldPriceQuerySet.as_manager()
+
     class Meta:
         verbose_name = _('gold price')
         verbose_name_plural = _('gold prices')
+        constraints = [
+            # At most one active price; the index only holds that row, so
+            # finding the current price is a single index lookup.
+            models.UniqueConstraint(
+                fields=['active'],
+                condition=models.Q(active=True),
+                name='unique_active_gold_price',
+            ),
+        ]
         indexes = [
-            models.Index(fields=['date']),
-            models.Index(fields=['active']),
+            models.Index(fields=['date', 'id']),
         ]
 
+    ACTIVATION_ATTEMPTS = 3
+
     def __str__(self):
         return f"Gold Price on {self.date.strftime('%Y-%m-%d %H:%M')}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if not instance.get_deferred_fields() & {'date', 'sale_price'}:
+            instance._loaded_tick = instance.tick()
+        return instance
+
+    def tick(self):
+        """
+        Return the (date, sale_price) pair that the price candles are built from.
+        """
+        return self.date, self._meta.get_field('sale_price').to_python(self.sale_price)
+
     def save(self, *args, **kwargs):
         """
-        Ensure only one GoldPrice instance is active at a time.
+        Ensure only one GoldPrice instance is active at a time, announce the active one
+        and keep the price candles up to date.
         """
+        from apps.gold_online_store.services.candles import has_raw_ticks, rebuild_candles, record_tick
+        from apps.gold_online_store.services.price_provider import bump_price_version
+        from apps.gold_online_store.services.price_stream import publish_price
+
+        adding = self._state.adding
+        with transaction.atomic():
+            if self.active:
+                self.save_active(*args, **kwargs)
+            else:
+                super().save(*args, **kwargs)
+            tick = self.tick()
+            loaded_tick = getattr(self, '_loaded_tick', None)
+            if adding:
+                record_tick(*tick)
+            elif tick != loaded_tick:
+                # A moved or repriced tick cannot be taken back out of a
+                # candle, so the days it left and joined are rebuilt, unless
+                # they were compacted and their candles outlive their ticks.
+                for date in {tick[0], loaded_tick[0] if loaded_tick else tick[0]}:
+                    if has_raw_ticks(date):
+                        rebuild_candles(date, date)
+            self._loaded_tick = tick
+        bump_price_version()
         if self.active:
-            GoldPrice.objects.filter(active=True).exclude(pk=self.pk).update(active=False)
-        super().save(*args, **kwargs)
\ No newline at end of file
+            publish_price(self)
+
+    def save_active(self, *args, **kwargs):
+        """
+        Deactivate the current price and write this one as active in one transaction.
+
+        Two concurrent activations can both deactivate the old price before
+        either commits; the unique index then rejects the later one, which
+        retries and deactivates the price that won.
+        """
+        for attempt in range(1, self.ACTIVATION_ATTEMPTS + 1):
+            try:
+                with transaction.atomic():
+                    GoldPrice.objects.filter(active=True).exclude(pk=self.pk).update(active=False)
+                    super().save(*args, **kwargs)
+                return
+            except IntegrityError:
+                if attempt == self.ACTIVATION_ATTEMPTS:
+                    raise
+
+    def delete(self, *args, **kwargs):
+        """
+        Invalidate the cached active price and the candles of a removed price record.
+
+        Candles of days already compacted are left as they are.
+        """
+        from apps.gold_online_store.services.candles import has_raw_ticks, rebuild_candles
+        from apps.gold_online_store.services.price_provider import bump_price_version
+
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            if has_raw_ticks(self.date):
+                rebuild_candles(self.date, self.date)
+        bump_price_version()
+        return result
\ No newline at end of file
@@ -0,0 +1,61 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from apps.core.models import CustomUser
+
+
+class IdempotencyKey(models.Model):
+    """
+    Stored outcome of a create request sent with an Idempotency-Key header.
+
+    The (user, key) pair is unique, so concurrent retries race on the insert
+    and only one of them runs the request.
+    """
+    user = models.ForeignKey(
+        CustomUser,
+        on_delete=models.CASCADE,
+        related_name='idempotency_keys',
+        verbose_name=_('user'),
+        help_text=_('The user who sent the request.')
+    )
+    key = models.CharField(
+        max_length=255,
+        verbose_name=_('key'),
+        help_text=_('The client supplied Idempotency-Key header value.')
+    )
+    fingerprint = models.CharField(
+        max_length=64,
+        verbose_name=_('fingerprint'),
+        help_text=_('SHA-256 of the request method, path and body.')
+    )
+    status_code = models.PositiveSmallIntegerField(
+        null=True,
+        blank=True,
+        verbose_name=_('status code'),
+        help_text=_('The HTTP status of the stored response, empty while the request runs.')
+    )
+    response_body = models.JSONField(
+        null=True,
+        blank=True,
+        encoder=DjangoJSONEncoder,
+        verbose_name=_('response body'),
+        help_text=_('The serialized response returned to retries.')
+    )
+    expires_at = models.DateTimeField(
+        verbose_name=_('expires at'),
+        help_text=_('After this time the key may be reused and the record purged.')
+    )
+
+    class Meta:
+        verbose_name = _('idempotency key')
+        verbose_name_plural = _('idempotency keys')
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='unique_idempotency_key_per_user'),
+        ]
+        indexes = [
+            models.Index(fields=['expires_at']),
+        ]
+
+    def __str__(self):
+        return f"Idempotency key {self.key} for user {self.user_id}"
@@ -0,0 +1,115 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class Job(models.Model):
+    """
+    A unit of background work, such as settling a record, run by the run_workers command.
+
+    Workers claim QUEUED jobs with SELECT ... FOR UPDATE SKIP LOCKED, so any
+    number of them share the queue without waiting on each other. Failed
+    jobs are queued again with exponential backoff until they run out of
+    attempts and become DEAD.
+    """
+    KIND_CHOICES = (
+        ('settle_transaction', _('Settle gold transaction')),
+        ('process_withdrawal', _('Process withdrawal request')),
+        ('post_payment', _('Post payment')),
+    )
+    STATUS_CHOICES = (
+        ('QUEUED', _('Queued')),
+        ('RUNNING', _('Running')),
+        ('SUCCEEDED', _('Succeeded')),
+        ('DEAD', _('Dead')),
+    )
+
+    kind = models.CharField(
+        max_length=32,
+        choices=KIND_CHOICES,
+        verbose_name=_('kind'),
+        help_text=_('The work the job does.')
+    )
+    payload = models.JSONField(
+        encoder=DjangoJSONEncoder,
+        verbose_name=_('payload'),
+        help_text=_('The arguments of the job, such as the record to settle.')
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='QUEUED',
+        verbose_name=_('status'),
+        help_text=_('Where the job is in its lifecycle.')
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name=_('attempts'),
+        help_text=_('How many times a worker has claimed the job.')
+    )
+    max_attempts = models.PositiveSmallIntegerField(
+        default=5,
+        verbose_name=_('max attempts'),
+        help_text=_('Attempts after which a failing job is dead-lettered.')
+    )
+    run_after = models.DateTimeField(
+        default=timezone.now,
+        verbose_name=_('run after'),
+        help_text=_('The job is not claimed before this time; pushed back after each failure.')
+    )
+    created_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name=_('created at'),
+        help_text=_('When the job was queued.')
+    )
+    started_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_('started at'),
+        help_text=_('When a worker last claimed the job.')
+    )
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_('finished at'),
+        help_text=_('When the job succeeded or was dead-lettered.')
+    )
+    duration_ms = models.FloatField(
+        null=True,
+        blank=True,
+        verbose_name=_('duration (ms)'),
+        help_text=_('How long the last attempt ran, in milliseconds.')
+    )
+    worker = models.CharField(
+        max_length=255,
+        blank=True,
+        verbose_name=_('worker'),
+        help_text=_('The worker that last claimed the job.')
+    )
+    last_error = models.TextField(
+        blank=True,
+        verbose_name=_('last error'),
+        help_text=_('The error of the last failed attempt.')
+    )
+
+    class Meta:
+        verbose_name = _('job')
+        verbose_name_plural = _('jobs')
+        indexes = [
+            # Only waiting jobs are indexed, so claiming stays one short
+            # index scan however much finished history the table holds.
+            models.Index(
+                fields=['run_after', 'id'],
+                condition=models.Q(status='QUEUED'),
+                name='job_queued_run_after_idx',
+            ),
+            models.Index(
+                fields=['started_at'],
+                condition=models.Q(status='RUNNING'),
+                name='job_running_started_at_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} job {self.pk} ({self.status})"
@@ -0,0 +1,147 @@
+import uuid
+
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from apps.gold_online_store.models.gold import Wallet
+
+
+class LedgerEntry(models.Model):
+    """
+    Append-only double-entry ledger line moving money or gold between accounts.
+
+    Entries sharing a posting id form one balanced posting: for every asset the
+    amounts of its entries sum to zero.
+    """
+    ACCOUNT_CHOICES = (
+        ('WALLET', _('Wallet')),
+        ('HOUSE', _('House')),
+        ('EXTERNAL', _('External')),
+    )
+    ASSET_CHOICES = (
+        ('MONEY', _('Money')),
+        ('GOLD', _('Gold')),
+    )
+
+    posting = models.UUIDField(
+        default=uuid.uuid4,
+        editable=False,
+        verbose_name=_('posting'),
+        help_text=_('Identifier shared by all entries of one balanced posting.')
+    )
+    account = models.CharField(
+        max_length=20,
+        choices=ACCOUNT_CHOICES,
+        verbose_name=_('account'),
+        help_text=_('The kind of account this entry is booked to.')
+    )
+    # The ledger is kept for audit, so a wallet with entries, and the user it
+    # cascades from, cannot be deleted; such users are deactivated instead.
+    wallet = models.ForeignKey(
+        Wallet,
+        null=True,
+        blank=True,
+        on_delete=models.PROTECT,
+        related_name='ledger_entries',
+        verbose_name=_('wallet'),
+        help_text=_('The wallet booked by this entry, for wallet accounts.')
+    )
+    asset = models.CharField(
+        max_length=10,
+        choices=ASSET_CHOICES,
+        verbose_name=_('asset'),
+        help_text=_('The asset moved by this entry.')
+    )
+    amount = models.DecimalField(
+        max_digits=19,
+        decimal_places=4,
+        verbose_name=_('amount'),
+        help_text=_('Signed amount: positive credits the account, negative debits it.')
+    )
+    reference_type = models.CharField(
+        max_length=40,
+        verbose_name=_('reference type'),
+        help_text=_('The kind of business record that caused this posting.')
+    )
+    reference_id = models.BigIntegerField(
+        null=True,
+        blank=True,
+        verbose_name=_('reference id'),
+        help_text=_('The id of the business record that caused this posting.')
+    )
+    create_date = models.DateTimeField(
+        default=timezone.now,
+        verbose_name=_('create date'),
+        help_text=_('The date and time the entry was booked.')
+    )
+
+    class Meta:
+        verbose_name = _('ledger entry')
+        verbose_name_plural = _('ledger entries')
+        indexes = [
+            models.Index(fields=['wallet', 'id']),
+            models.Index(fields=['reference_type', 'reference_id']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_account_display()} {self.asset} {self.amount} ({self.reference_type} {self.reference_id})"
+
+    def save(self, *args, **kwargs):
+        """
+        Only allow inserting new entries; booked entries are immutable.
+        """
+        if not self._state.adding:
+            raise ValidationError(_('Ledger entries cannot be modified.'))
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValidationError(_('Ledger entries cannot be deleted.'))
+
+
+class WalletBalanceCheckpoint(models.Model):
+    """
+    Snapshot of a wallet's ledger balances up to and including an entry id.
+    """
+    wallet = models.ForeignKey(
+        Wallet,
+        on_delete=models.CASCADE,
+        related_name='balance_checkpoints',
+        verbose_name=_('wallet'),
+        help_text=_('The wallet this checkpoint summarizes.')
+    )
+    last_entry_id = models.BigIntegerField(
+        default=0,
+        verbose_name=_('last entry id'),
+        help_text=_('The id of the last ledger entry included in this checkpoint.')
+    )
+    money_balance = models.DecimalField(
+        max_digits=19,
+        decimal_places=4,
+        default=0,
+        verbose_name=_('money balance'),
+        help_text=_('The money balance as of the last included entry.')
+    )
+    gold_balance = models.DecimalField(
+        max_digits=19,
+        decimal_places=4,
+        default=0,
+        verbose_name=_('gold balance'),
+        help_text=_('The gold balance as of the last included entry.')
+    )
+    create_date = models.DateTimeField(
+        default=timezone.now,
+        verbose_name=_('create date'),
+        help_text=_('The date and time the checkpoint was taken.')
+    )
+
+    class Meta:
+        verbose_name = _('wallet balance checkpoint')
+        verbose_name_plural = _('wallet balance checkpoints')
+        indexes = [
+            models.Index(fields=['wallet', 'last_entry_id']),
+        ]
+
+    def __str__(self):
+        return f"Checkpoint of wallet {self.wallet_id} at entry {self.last_entry_id}"
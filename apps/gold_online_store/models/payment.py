@@ -47,8 +47,9 @@ class PaymentTransaction(models.Model):
         verbose_name = _('payment transaction')
         verbose_name_plural = _('payment transactions')
         indexes = [
-            models.Index(fields=['payment_date']),
-            models.Index(fields=['status']),
+            models.Index(fields=['status', 'payment_date', 'id']),
+            models.Index(fields=['payment_date', 'id']),
+            models.Index(fields=['user', 'payment_date', 'id']),
         ]
 
     def __str__(self):
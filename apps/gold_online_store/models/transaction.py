@@ -60,8 +60,9 @@ class GoldTransaction(models.Model):
     class Meta:
         abstract = True
         indexes = [
-            models.Index(fields=['create_date']),
-            models.Index(fields=['status']),
+            models.Index(fields=['status', 'create_date', 'id']),
+            models.Index(fields=['create_date', 'id']),
+            models.Index(fields=['user', 'create_date', 'id']),
         ]
 
     def __str__(self):
@@ -89,7 +90,7 @@ class GoldSaleTransaction(GoldTransaction):
     """
     Represents a transaction for selling gold by a user.
     """
-    class Meta:
+    class Meta(GoldTransaction.Meta):
         verbose_name = _('gold sale transaction')
         verbose_name_plural = _('gold sale transactions')
 
@@ -98,6 +99,6 @@ class GoldPurchaseTransaction(GoldTransaction):
     """
     Represents a transaction for purchasing gold by a user.
     """
-    class Meta:
+    class Meta(GoldTransaction.Meta):
         verbose_name = _('gold purchase transaction')
         verbose_name_plural = _('gold purchase transactions')
\ No newline at end of file
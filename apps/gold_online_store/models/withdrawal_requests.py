@@ -38,8 +38,9 @@ class WithdrawalRequest(models.Model):
     class Meta:
         abstract = True
         indexes = [
-            models.Index(fields=['create_date']),
-            models.Index(fields=['status']),
+            models.Index(fields=['status', 'create_date', 'id']),
+            models.Index(fields=['create_date', 'id']),
+            models.Index(fields=['user', 'create_date', 'id']),
         ]
 
     def __str__(self):
@@ -47,9 +48,9 @@ class WithdrawalRequest(models.Model):
 
     def save(self, *args, **kwargs):
         """
-        Ensure request_date is set to current time if not provided.
+        Ensure create_date is set to current time if not provided.
         """
-        if not self.request_date:
+        if not self.create_date:
             self.create_date = timezone.now()
         super().save(*args, **kwargs)
 
@@ -66,7 +67,7 @@ class MoneyWithdrawalRequest(WithdrawalRequest):
         help_text=_('The amount of money to withdraw (in IRR).')
     )
 
-    class Meta:
+    class Meta(WithdrawalRequest.Meta):
         verbose_name = _('money withdrawal request')
         verbose_name_plural = _('money withdrawal requests')
 
@@ -90,7 +91,7 @@ class GoldWithdrawalRequest(WithdrawalRequest):
         help_text=_('The amount of gold to withdraw (in grams).')
     )
 
-    class Meta:
+    class Meta(WithdrawalRequest.Meta):
         verbose_name = _('gold withdrawal request')
         verbose_name_plural = _('gold withdrawal requests')
 
@@ -0,0 +1,49 @@
+from rest_framework import serializers
+from django.utils.translation import gettext_lazy as _
+
+
+class ActivitySerializer(serializers.Serializer):
+    """
+    Serializer for one row of the merged payment, trade and withdrawal history.
+    """
+    KIND_CHOICES = (
+        ('payment', _('Payment')),
+        ('gold_sale', _('Gold sale')),
+        ('gold_purchase', _('Gold purchase')),
+        ('money_withdrawal', _('Money withdrawal')),
+        ('gold_withdrawal', _('Gold withdrawal')),
+    )
+
+    kind = serializers.ChoiceField(
+        choices=KIND_CHOICES,
+        read_only=True,
+        help_text=_('The kind of record this activity row comes from.')
+    )
+    id = serializers.IntegerField(
+        read_only=True,
+        help_text=_('The ID of the record within its kind.')
+    )
+    date = serializers.DateTimeField(
+        read_only=True,
+        help_text=_('The date and time the record was made.')
+    )
+    money_amount = serializers.DecimalField(
+        source='money',
+        max_digits=15,
+        decimal_places=2,
+        read_only=True,
+        allow_null=True,
+        help_text=_('The money amount of the record, if it moves money.')
+    )
+    gold_amount = serializers.DecimalField(
+        source='gold',
+        max_digits=15,
+        decimal_places=4,
+        read_only=True,
+        allow_null=True,
+        help_text=_('The gold amount of the record, if it moves gold.')
+    )
+    status = serializers.CharField(
+        read_only=True,
+        help_text=_('The status of the record.')
+    )
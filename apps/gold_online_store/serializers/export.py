@@ -0,0 +1,45 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework import serializers
+
+
+class ExportQuerySerializer(serializers.Serializer):
+    """
+    Serializer for the output format and date range query parameters of the export endpoints.
+
+    The view passes the column its records are dated by as the `date_field`
+    context; views without one export every record and reject a range.
+    """
+    OUTPUT_CHOICES = (
+        ('ndjson', 'NDJSON'),
+        ('csv', 'CSV'),
+    )
+
+    output = serializers.ChoiceField(
+        choices=OUTPUT_CHOICES,
+        default='ndjson',
+        help_text=_('The export format.')
+    )
+    to = serializers.DateTimeField(
+        required=False,
+        help_text=_('End of the range, exclusive.')
+    )
+
+    def get_fields(self):
+        # "from" is a Python keyword, so it cannot be declared as a class attribute.
+        fields = super().get_fields()
+        fields['from'] = serializers.DateTimeField(
+            required=False,
+            help_text=_('Start of the range, inclusive.')
+        )
+        return fields
+
+    def validate(self, attrs):
+        """
+        Check the range is ordered and that the exported records can be filtered by date.
+        """
+        start, end = attrs.get('from'), attrs.get('to')
+        if (start or end) and not self.context.get('date_field'):
+            raise serializers.ValidationError(_('This export cannot be filtered by date.'))
+        if start and end and start >= end:
+            raise serializers.ValidationError({'from': [_('"from" must be earlier than "to".')]})
+        return attrs
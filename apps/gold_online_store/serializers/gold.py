@@ -1,11 +1,17 @@
+from django.conf import settings
+from django.utils import timezone
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 from django.utils.translation import gettext_lazy as _
 
-from apps.core.serializers import CustomUserSerializer
+from apps.core.serializers import CustomUserSerializer, SparseFieldsMixin
+from apps.gold_online_store.models.candle import GoldPriceCandle
 from apps.gold_online_store.models.gold import Wallet, GoldPrice
+from apps.gold_online_store.services.candles import INTERVALS, truncate
+from apps.gold_online_store.services.price_provider import get_active_gold_price
 
 
-class GoldPriceSerializer(serializers.ModelSerializer):
+class GoldPriceSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for GoldPrice model to handle gold price data.
     """
@@ -21,6 +27,9 @@ class GoldPriceSerializer(serializers.ModelSerializer):
             'active',
         ]
         read_only_fields = ['id', 'date']
+        # Saving an active price deactivates the current one, so the unique
+        # active constraint must not turn activation into a validation error.
+        extra_kwargs = {'active': {'validators': []}}
 
     def validate(self, attrs):
         """
@@ -34,17 +43,39 @@ class GoldPriceSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(_('Total gold stock cannot be negative.'))
         return attrs
 
-    def create(self, validated_data):
-        """
-        Set active=True for new GoldPrice instances and ensure only one is active.
-        """
-        instance = super().create(validated_data)
-        if instance.active:
-            GoldPrice.objects.filter(active=True).exclude(pk=instance.pk).update(active=False)
-        return instance
+
+class GoldPriceTickSerializer(GoldPriceSerializer):
+    """
+    Serializer for one price tick of the bulk ingest endpoint, which carries its own date.
+    """
+    class Meta(GoldPriceSerializer.Meta):
+        fields = [
+            'date',
+            'sale_price',
+            'price_difference',
+            'total_gold_stock',
+            'stock_status',
+        ]
+        read_only_fields = []
+        # Ticks are stored at the feed's timestamps, not at the time they arrive.
+        extra_kwargs = {'date': {'required': True}}
+
+
+class GoldPriceIngestResultSerializer(serializers.Serializer):
+    """
+    Serializer for the outcome of a bulk tick ingest.
+    """
+    count = serializers.IntegerField(
+        read_only=True,
+        help_text=_('The number of ticks stored.')
+    )
+    active = GoldPriceSerializer(
+        read_only=True,
+        help_text=_('The newest tick, which is now the active gold price.')
+    )
 
 
-class WalletSerializer(serializers.ModelSerializer):
+class WalletSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for Wallet model to handle wallet data and related user information.
     """
@@ -56,6 +87,8 @@ class WalletSerializer(serializers.ModelSerializer):
         help_text=_('The total value of the wallet (money + gold value in USD).')
     )
 
+    extra_fields = ('latest_gold_price',)
+
     class Meta:
         model = Wallet
         fields = ['id', 'user', 'money_stock', 'gold_stock', 'total_value']
@@ -83,8 +116,115 @@ class WalletSerializer(serializers.ModelSerializer):
         Include the latest active gold price in the wallet representation for context.
         """
         representation = super().to_representation(instance)
-        latest_gold_price = GoldPrice.objects.filter(active=True).order_by('-date').first()
+        if not self.includes('latest_gold_price'):
+            return representation
+        if 'active_gold_price' in self.context:
+            # List views resolve the price once per request and share its
+            # serialized form across every row.
+            if '_latest_gold_price_data' not in self.context:
+                latest_gold_price = self.context['active_gold_price']
+                self.context['_latest_gold_price_data'] = (
+                    GoldPriceSerializer(latest_gold_price).data if latest_gold_price else None
+                )
+            representation['latest_gold_price'] = self.context['_latest_gold_price_data']
+            return representation
+        latest_gold_price = get_active_gold_price()
         representation['latest_gold_price'] = (
             GoldPriceSerializer(latest_gold_price).data if latest_gold_price else None
         )
-        return representation
\ No newline at end of file
+        return representation
+
+
+class GoldPriceCandleSerializer(serializers.ModelSerializer):
+    """
+    Serializer for GoldPriceCandle model to chart gold price history.
+    """
+    class Meta:
+        model = GoldPriceCandle
+        fields = ['interval', 'bucket', 'open', 'high', 'low', 'close', 'tick_count']
+        read_only_fields = fields
+
+
+class GoldPriceCandleQuerySerializer(serializers.Serializer):
+    """
+    Serializer for the interval and time range query parameters of the candles endpoint.
+    """
+    interval = serializers.ChoiceField(
+        choices=GoldPriceCandle.INTERVAL_CHOICES,
+        default='1h',
+        help_text=_('The candle interval.')
+    )
+    to = serializers.DateTimeField(
+        required=False,
+        help_text=_('End of the range, exclusive; defaults to now.')
+    )
+
+    def get_fields(self):
+        # "from" is a Python keyword, so it cannot be declared as a class attribute.
+        fields = super().get_fields()
+        fields['from'] = serializers.DateTimeField(
+            required=False,
+            help_text=_('Start of the range; defaults to one page of candles before "to".')
+        )
+        return fields
+
+    def validate(self, attrs):
+        """
+        Fill in the default range and keep it within the maximum number of candles per response.
+        """
+        step = INTERVALS[attrs['interval']]
+        end = attrs.get('to') or timezone.now()
+        start = attrs.get('from') or end - step * api_settings.PAGE_SIZE
+        if start >= end:
+            raise serializers.ValidationError({'from': [_('"from" must be earlier than "to".')]})
+        if (end - start) / step > settings.PAGINATION_MAX_PAGE_SIZE:
+            raise serializers.ValidationError(
+                _('The range spans more than %(count)s candles.') % {'count': settings.PAGINATION_MAX_PAGE_SIZE}
+            )
+        attrs['from'], attrs['to'] = truncate(start, attrs['interval']), end
+        return attrs
+
+
+class GoldPriceAsOfQuerySerializer(serializers.Serializer):
+    """
+    Serializer for the instant query parameter of the as-of price endpoint.
+    """
+    at = serializers.DateTimeField(
+        help_text=_('The instant to resolve the price in effect at.')
+    )
+
+
+class GoldPriceRepriceSerializer(serializers.Serializer):
+    """
+    Serializer for resolving the price in effect when each of a list of gold transactions was created.
+    """
+    TRANSACTION_TYPE_CHOICES = (
+        ('sale', _('Gold sale')),
+        ('purchase', _('Gold purchase')),
+    )
+
+    transaction_type = serializers.ChoiceField(
+        choices=TRANSACTION_TYPE_CHOICES,
+        help_text=_('Whether the ids are gold sale or gold purchase transactions.')
+    )
+    ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        min_length=1,
+        max_length=settings.PAGINATION_MAX_PAGE_SIZE,
+        help_text=_('The transaction ids to reprice.')
+    )
+
+
+class GoldPriceAsOfTransactionSerializer(serializers.Serializer):
+    """
+    Serializer for the price in effect when one gold transaction was created.
+    """
+    transaction = serializers.IntegerField(
+        read_only=True,
+        help_text=_('The transaction id.')
+    )
+    gold_price = GoldPriceSerializer(
+        read_only=True,
+        allow_null=True,
+        help_text=_('The price in effect at the transaction\'s create date; null for unknown ids or when no price is that old.')
+    )
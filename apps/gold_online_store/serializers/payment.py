@@ -2,11 +2,11 @@ from django.utils import timezone
 from rest_framework import serializers
 from django.utils.translation import gettext_lazy as _
 
-from apps.core.serializers import CustomUserSerializer
+from apps.core.serializers import CustomUserSerializer, SparseFieldsMixin
 from apps.gold_online_store.models.payment import PaymentTransaction
 
 
-class PaymentTransactionSerializer(serializers.ModelSerializer):
+class PaymentTransactionSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for PaymentTransaction model to handle payment transaction data.
     """
@@ -48,9 +48,10 @@ class PaymentTransactionSerializer(serializers.ModelSerializer):
             validated_data['payment_date'] = timezone.now()
         return super().create(validated_data)
 
-    def to_representation(self, instance):
-        """
-        Customize the output to include additional context if needed.
-        """
-        representation = super().to_representation(instance)
-        return representation
\ No newline at end of file
+
+class OwnerPaymentTransactionSerializer(PaymentTransactionSerializer):
+    """
+    Serializer for a user's own payment transactions, whose status only settlement changes.
+    """
+    class Meta(PaymentTransactionSerializer.Meta):
+        read_only_fields = PaymentTransactionSerializer.Meta.read_only_fields + ['status']
@@ -2,12 +2,13 @@ from django.utils import timezone
 from rest_framework import serializers
 from django.utils.translation import gettext_lazy as _
 
-from apps.core.serializers import CustomUserSerializer
+from apps.core.serializers import CustomUserSerializer, SparseFieldsMixin
+from apps.gold_online_store.models.gold import GoldPrice
 from apps.gold_online_store.models.transaction import GoldSaleTransaction, GoldPurchaseTransaction
 from apps.gold_online_store.serializers.gold import GoldPriceSerializer
 
 
-class GoldTransactionSerializer(serializers.ModelSerializer):
+class GoldTransactionSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Base serializer for gold-related transactions (sale or purchase).
     """
@@ -79,4 +80,40 @@ class GoldPurchaseTransactionSerializer(GoldTransactionSerializer):
     class Meta(GoldTransactionSerializer.Meta):
         model = GoldPurchaseTransaction
         verbose_name = _('gold purchase transaction')
-        verbose_name_plural = _('gold purchase transactions')
\ No newline at end of file
+        verbose_name_plural = _('gold purchase transactions')
+
+
+class OwnerGoldSaleTransactionSerializer(GoldSaleTransactionSerializer):
+    """
+    Serializer for a user's own gold sale transactions, whose status only settlement changes.
+    """
+    class Meta(GoldSaleTransactionSerializer.Meta):
+        read_only_fields = GoldSaleTransactionSerializer.Meta.read_only_fields + ['status']
+
+
+class OwnerGoldPurchaseTransactionSerializer(GoldPurchaseTransactionSerializer):
+    """
+    Serializer for a user's own gold purchase transactions, whose status only settlement changes.
+    """
+    class Meta(GoldPurchaseTransactionSerializer.Meta):
+        read_only_fields = GoldPurchaseTransactionSerializer.Meta.read_only_fields + ['status']
+
+
+class BatchSettlementSerializer(serializers.Serializer):
+    """
+    Serializer for settling every waiting transaction of one gold price at once.
+    """
+    gold_price = serializers.PrimaryKeyRelatedField(
+        queryset=GoldPrice.objects.all(),
+        help_text=_('The gold price whose waiting transactions should be settled.')
+    )
+    accepted = serializers.ListField(
+        child=serializers.IntegerField(),
+        read_only=True,
+        help_text=_('IDs of the transactions that were accepted.')
+    )
+    rejected = serializers.ListField(
+        child=serializers.IntegerField(),
+        read_only=True,
+        help_text=_('IDs of the transactions that could not be filled and were rejected.')
+    )
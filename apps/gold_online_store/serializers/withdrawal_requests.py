@@ -2,11 +2,11 @@ from django.utils import timezone
 from rest_framework import serializers
 from django.utils.translation import gettext_lazy as _
 
-from apps.core.serializers import CustomUserSerializer
+from apps.core.serializers import CustomUserSerializer, SparseFieldsMixin
 from apps.gold_online_store.models.withdrawal_requests import MoneyWithdrawalRequest, GoldWithdrawalRequest
 
 
-class WithdrawalRequestSerializer(serializers.ModelSerializer):
+class WithdrawalRequestSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Base serializer for withdrawal requests (money or gold).
     """
@@ -87,4 +87,20 @@ class GoldWithdrawalRequestSerializer(WithdrawalRequestSerializer):
             raise serializers.ValidationError(_('Gold amount cannot be negative.'))
         if gold_amount > 10**6:  # Arbitrary limit for sanity check
             raise serializers.ValidationError(_('Gold amount exceeds maximum allowed value.'))
-        return attrs
\ No newline at end of file
+        return attrs
+
+
+class OwnerMoneyWithdrawalRequestSerializer(MoneyWithdrawalRequestSerializer):
+    """
+    Serializer for a user's own money withdrawal requests, whose status only settlement changes.
+    """
+    class Meta(MoneyWithdrawalRequestSerializer.Meta):
+        read_only_fields = MoneyWithdrawalRequestSerializer.Meta.read_only_fields + ['status']
+
+
+class OwnerGoldWithdrawalRequestSerializer(GoldWithdrawalRequestSerializer):
+    """
+    Serializer for a user's own gold withdrawal requests, whose status only settlement changes.
+    """
+    class Meta(GoldWithdrawalRequestSerializer.Meta):
+        read_only_fields = GoldWithdrawalRequestSerializer.Meta.read_only_fields + ['status']
@@ -0,0 +1,160 @@
+from datetime import timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Greatest, Least
+from django.utils import timezone
+
+from apps.gold_online_store.models.candle import GoldPriceCandle
+from apps.gold_online_store.models.gold import GoldPrice
+
+INTERVALS = {
+    '1m': timedelta(minutes=1),
+    '1h': timedelta(hours=1),
+    '1d': timedelta(days=1),
+}
+
+
+def truncate(date, interval):
+    """
+    Return the start of the UTC bucket of the given interval that contains date.
+    """
+    date = date.astimezone(dt_timezone.utc)
+    if interval == '1m':
+        return date.replace(second=0, microsecond=0)
+    if interval == '1h':
+        return date.replace(minute=0, second=0, microsecond=0)
+    return date.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def record_tick(date, price):
+    """
+    Fold one new price tick into its candle of every interval.
+    """
+    record_ticks([(date, price)])
+
+
+def record_ticks(ticks):
+    """
+    Fold new (date, price) ticks, given in date order, into the stored candles.
+
+    Buckets that already have a candle are merged with one relative UPDATE
+    each; the rest are inserted together.
+    """
+    candles = fold_ticks(ticks)
+    existing = set(
+        GoldPriceCandle.objects
+        .filter(bucket__in={candle.bucket for candle in candles})
+        .values_list('interval', 'bucket')
+    )
+    new_candles = []
+    for candle in candles:
+        if (candle.interval, candle.bucket) in existing:
+            _merge_candle(candle)
+        else:
+            new_candles.append(candle)
+    if not new_candles:
+        return
+    try:
+        with transaction.atomic():
+            GoldPriceCandle.objects.bulk_create(new_candles)
+    except IntegrityError:
+        # Another writer opened some of the buckets first.
+        for candle in new_candles:
+            _merge_or_create_candle(candle)
+
+
+def _merge_or_create_candle(candle):
+    if _merge_candle(candle):
+        return
+    try:
+        with transaction.atomic():
+            candle.pk = None
+            candle.save(force_insert=True)
+    except IntegrityError:
+        _merge_candle(candle)
+
+
+def _merge_candle(candle):
+    # Every SET expression reads the row as it was before the update, so the
+    # open and close checks compare against the old open and close dates.
+    return GoldPriceCandle.objects.filter(interval=candle.interval, bucket=candle.bucket).update(
+        open=Case(When(open_date__gt=candle.open_date, then=Value(candle.open)), default=F('open')),
+        high=Greatest(F('high'), Value(candle.high)),
+        low=Least(F('low'), Value(candle.low)),
+        close=Case(When(close_date__lte=candle.close_date, then=Value(candle.close)), default=F('close')),
+        open_date=Least(F('open_date'), Value(candle.open_date)),
+        close_date=Greatest(F('close_date'), Value(candle.close_date)),
+        tick_count=F('tick_count') + candle.tick_count,
+    )
+
+
+def has_raw_ticks(date):
+    """
+    Tell whether every raw tick of the UTC day containing date may still be stored.
+
+    compact_gold_prices thins the ticks of days that start before the raw
+    retention cutoff, so their candles, which were rolled up from the raw
+    ticks, can no longer be rebuilt without losing highs, lows and counts.
+    The command refuses a raw window shorter than the setting read here.
+    """
+    cutoff = timezone.now() - timedelta(days=settings.GOLD_PRICE_RAW_RETENTION_DAYS)
+    return truncate(date, '1d') >= cutoff
+
+
+def rebuild_candles(start, end, batch_size=5000):
+    """
+    Rebuild every candle between start and end from the price ticks, one UTC day at a time.
+
+    Each day is replaced in its own transaction, so the work can be resumed
+    and a day never holds more than its own ticks in memory. Returns the
+    number of candles written.
+    """
+    day = truncate(start, '1d')
+    written = 0
+    while day <= end:
+        next_day = day + INTERVALS['1d']
+        with transaction.atomic():
+            GoldPriceCandle.objects.filter(bucket__gte=day, bucket__lt=next_day).delete()
+            ticks = (
+                GoldPrice.objects
+                .filter(date__gte=day, date__lt=next_day)
+                .order_by('date', 'id')
+                .values_list('date', 'sale_price')
+            )
+            candles = fold_ticks(ticks.iterator(chunk_size=batch_size))
+            GoldPriceCandle.objects.bulk_create(candles, batch_size=batch_size)
+        written += len(candles)
+        day = next_day
+    return written
+
+
+def fold_ticks(ticks):
+    """
+    Build the candles of (date, price) ticks given in date order.
+    """
+    candles = {}
+    for date, price in ticks:
+        for interval in INTERVALS:
+            bucket = truncate(date, interval)
+            candle = candles.get((interval, bucket))
+            if candle is None:
+                candles[interval, bucket] = GoldPriceCandle(
+                    interval=interval,
+                    bucket=bucket,
+                    open=price,
+                    high=price,
+                    low=price,
+                    close=price,
+                    open_date=date,
+                    close_date=date,
+                    tick_count=1,
+                )
+                continue
+            candle.high = max(candle.high, price)
+            candle.low = min(candle.low, price)
+            candle.close = price
+            candle.close_date = date
+            candle.tick_count += 1
+    return list(candles.values())
@@ -0,0 +1,168 @@
+import logging
+import random
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.apps import apps
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from apps.gold_online_store.models.job import Job
+from apps.gold_online_store.services.settlement import (
+    AlreadySettled,
+    SettlementError,
+    settle_gold_transaction,
+    settle_payment,
+    settle_withdrawal,
+)
+
+logger = logging.getLogger(__name__)
+
+# Seconds before the first retry; doubled on every further attempt.
+RETRY_BASE_DELAY = 2
+RETRY_MAX_DELAY = 60 * 10
+
+# A RUNNING job whose worker has been silent this long is assumed lost with
+# its worker and is queued again.
+LEASE_TIMEOUT = timedelta(minutes=5)
+
+JOB_SERVICES = {
+    'settle_transaction': settle_gold_transaction,
+    'process_withdrawal': settle_withdrawal,
+    'post_payment': settle_payment,
+}
+
+
+def enqueue(kind, instance, **kwargs):
+    """
+    Queue a job that runs the `kind` service on a saved record.
+
+    Call it inside the transaction that makes the record ready, so workers
+    can only see the job once the record is committed.
+    """
+    return Job.objects.create(
+        kind=kind,
+        payload={'model': instance._meta.label_lower, 'id': instance.pk},
+        **kwargs,
+    )
+
+
+def claim_jobs(worker, limit):
+    """
+    Mark up to `limit` due jobs as RUNNING by this worker and return them.
+
+    Rows locked by other workers are skipped instead of waited on, and the
+    claim commits at once, so no lock is held while the jobs run.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            Job.objects
+            .select_for_update(skip_locked=True)
+            .filter(status='QUEUED', run_after__lte=now)
+            .order_by('run_after', 'id')
+            .values_list('id', flat=True)[:limit]
+        )
+        if not ids:
+            return []
+        Job.objects.filter(pk__in=ids).update(
+            status='RUNNING',
+            worker=worker,
+            started_at=now,
+            attempts=F('attempts') + 1,
+        )
+    return list(Job.objects.filter(pk__in=ids).order_by('run_after', 'id'))
+
+
+def run_job(job):
+    """
+    Run a claimed job and record its outcome and timing; returns the new status.
+
+    SettlementError is a business outcome, such as insufficient balance,
+    that a retry cannot change, so it dead-letters the job at once. Any
+    other error is retried with exponential backoff and jitter. A record
+    that is already settled counts as success: a slow run requeued after
+    its lease ran out may have settled it before this one started.
+    """
+    started = time.perf_counter()
+    try:
+        record = apps.get_model(job.payload['model']).objects.get(pk=job.payload['id'])
+        JOB_SERVICES[job.kind](record)
+    except AlreadySettled:
+        return _finish(job, started, 'SUCCEEDED')
+    except SettlementError as exc:
+        return _finish(job, started, 'DEAD', str(exc))
+    except Exception as exc:
+        logger.exception('Job %s failed on attempt %s.', job.pk, job.attempts)
+        if job.attempts >= job.max_attempts:
+            return _finish(job, started, 'DEAD', repr(exc))
+        return _finish(job, started, 'QUEUED', repr(exc), run_after=timezone.now() + retry_delay(job.attempts))
+    return _finish(job, started, 'SUCCEEDED')
+
+
+def retry_delay(attempts):
+    """
+    Return the backoff before the next attempt of a job that has failed `attempts` times.
+    """
+    delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (attempts - 1))
+    # Jitter keeps jobs that failed together from retrying together.
+    return timedelta(seconds=delay * random.uniform(0.5, 1))
+
+
+def _finish(job, started, status, error='', run_after=None):
+    changes = {
+        'status': status,
+        'duration_ms': (time.perf_counter() - started) * 1000,
+        'last_error': error,
+    }
+    if run_after is not None:
+        changes['run_after'] = run_after
+    else:
+        changes['finished_at'] = timezone.now()
+    # Only the claiming worker may record the outcome; a job requeued after
+    # its lease ran out belongs to someone else now.
+    Job.objects.filter(pk=job.pk, status='RUNNING', worker=job.worker).update(**changes)
+    for field, value in changes.items():
+        setattr(job, field, value)
+    return status
+
+
+def requeue_stale_jobs(lease=LEASE_TIMEOUT):
+    """
+    Queue again the RUNNING jobs whose worker has held them longer than the lease.
+    """
+    return Job.objects.filter(status='RUNNING', started_at__lt=timezone.now() - lease).update(
+        status='QUEUED',
+        run_after=timezone.now(),
+    )
+
+
+def run_worker(worker, batch_size=10, poll_interval=1.0, burst=False, stop=None):
+    """
+    Claim and run jobs until `stop` is set, or until the queue is drained in burst mode.
+
+    Returns a Counter of the outcomes. `stop` is a threading or
+    multiprocessing Event; without one the worker runs until interrupted.
+    """
+    outcomes = Counter()
+    while stop is None or not stop.is_set():
+        if not connection.in_atomic_block:
+            # Drop broken or expired connections between rounds, as requests do.
+            close_old_connections()
+        jobs = claim_jobs(worker, batch_size)
+        if not jobs:
+            requeue_stale_jobs()
+            if burst:
+                break
+            if stop is not None:
+                stop.wait(poll_interval)
+            else:
+                time.sleep(poll_interval)
+            continue
+        for job in jobs:
+            status = run_job(job)
+            outcomes[status] += 1
+            logger.info('Job %s (%s) %s in %.1f ms.', job.pk, job.kind, status, job.duration_ms)
+    return outcomes
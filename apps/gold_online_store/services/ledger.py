@@ -0,0 +1,210 @@
+import uuid
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db.models import Sum
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from apps.gold_online_store.models.ledger import LedgerEntry, WalletBalanceCheckpoint
+
+# Entries younger than this are left out of checkpoints: ids are allocated
+# before commit, so a slow transaction can still make a lower id visible.
+CHECKPOINT_LAG = timedelta(minutes=5)
+
+
+class LedgerError(Exception):
+    """
+    Raised when a posting would break the double-entry invariant.
+    """
+
+
+def post(reference_type, reference_id, legs):
+    """
+    Append one balanced posting made of (account, wallet_id, asset, amount) legs.
+
+    All legs are inserted with a single statement and share a posting id.
+    """
+    return post_many([(reference_type, reference_id, legs)])
+
+
+def post_many(postings):
+    """
+    Append several (reference_type, reference_id, legs) postings with a single insert.
+    """
+    now = timezone.now()
+    entries = []
+    for reference_type, reference_id, legs in postings:
+        totals = defaultdict(Decimal)
+        for _account, _wallet_id, asset, amount in legs:
+            totals[asset] += amount
+        if any(totals.values()):
+            raise LedgerError(_('Posting is not balanced.'))
+
+        posting = uuid.uuid4()
+        entries.extend(
+            LedgerEntry(
+                posting=posting,
+                account=account,
+                wallet_id=wallet_id,
+                asset=asset,
+                amount=amount,
+                reference_type=reference_type,
+                reference_id=reference_id,
+                create_date=now,
+            )
+            for account, wallet_id, asset, amount in legs
+            if amount
+        )
+    return LedgerEntry.objects.bulk_create(entries)
+
+
+def gold_purchase_legs(wallet_id, money_amount, gold_amount):
+    """
+    Legs of a purchase: the wallet pays money to the house and receives gold.
+    """
+    return [
+        ('WALLET', wallet_id, 'MONEY', -money_amount),
+        ('HOUSE', None, 'MONEY', money_amount),
+        ('HOUSE', None, 'GOLD', -gold_amount),
+        ('WALLET', wallet_id, 'GOLD', gold_amount),
+    ]
+
+
+def gold_sale_legs(wallet_id, money_amount, gold_amount):
+    """
+    Legs of a sale: the wallet delivers gold to the house and receives money.
+    """
+    return [
+        ('WALLET', wallet_id, 'GOLD', -gold_amount),
+        ('HOUSE', None, 'GOLD', gold_amount),
+        ('HOUSE', None, 'MONEY', -money_amount),
+        ('WALLET', wallet_id, 'MONEY', money_amount),
+    ]
+
+
+def post_gold_purchase(wallet_id, gold_transaction):
+    """
+    Book an accepted gold purchase.
+    """
+    legs = gold_purchase_legs(wallet_id, gold_transaction.money_amount, gold_transaction.gold_amount)
+    return post('GOLD_PURCHASE', gold_transaction.pk, legs)
+
+
+def post_gold_sale(wallet_id, gold_transaction):
+    """
+    Book an accepted gold sale.
+    """
+    legs = gold_sale_legs(wallet_id, gold_transaction.money_amount, gold_transaction.gold_amount)
+    return post('GOLD_SALE', gold_transaction.pk, legs)
+
+
+def post_payment(wallet_id, payment):
+    """
+    Book a successful payment: external money is credited to the wallet.
+    """
+    return post('PAYMENT', payment.pk, [
+        ('EXTERNAL', None, 'MONEY', -payment.money_amount),
+        ('WALLET', wallet_id, 'MONEY', payment.money_amount),
+    ])
+
+
+def post_withdrawal(wallet_id, withdrawal, asset, amount):
+    """
+    Book an accepted withdrawal: the wallet pays the asset out to the outside.
+    """
+    return post(f'{asset}_WITHDRAWAL', withdrawal.pk, [
+        ('WALLET', wallet_id, asset, -amount),
+        ('EXTERNAL', None, asset, amount),
+    ])
+
+
+def adjustment_legs(wallet_id, money_delta, gold_delta):
+    """
+    Legs of a balance change that comes from outside the trading flows.
+    """
+    return [
+        ('EXTERNAL', None, 'MONEY', -money_delta),
+        ('WALLET', wallet_id, 'MONEY', money_delta),
+        ('EXTERNAL', None, 'GOLD', -gold_delta),
+        ('WALLET', wallet_id, 'GOLD', gold_delta),
+    ]
+
+
+def post_adjustment(wallet_id, money_delta, gold_delta, reference_type='ADJUSTMENT'):
+    """
+    Book a manual balance change made outside the trading flows.
+    """
+    return post(reference_type, wallet_id, adjustment_legs(wallet_id, money_delta, gold_delta))
+
+
+def wallet_balance(wallet_id):
+    """
+    Return the wallet's ledger balances as {'MONEY': ..., 'GOLD': ...}.
+
+    Reads the latest checkpoint plus the sum of the entries booked after it,
+    which is a range scan on the (wallet, id) index.
+    """
+    checkpoint = (
+        WalletBalanceCheckpoint.objects
+        .filter(wallet_id=wallet_id)
+        .order_by('-last_entry_id')
+        .first()
+    )
+    balances = {'MONEY': Decimal('0'), 'GOLD': Decimal('0')}
+    last_entry_id = 0
+    if checkpoint is not None:
+        balances = {'MONEY': checkpoint.money_balance, 'GOLD': checkpoint.gold_balance}
+        last_entry_id = checkpoint.last_entry_id
+
+    rows = (
+        LedgerEntry.objects
+        .filter(wallet_id=wallet_id, id__gt=last_entry_id)
+        .values('asset')
+        .annotate(total=Sum('amount'))
+        .order_by()
+    )
+    for row in rows:
+        balances[row['asset']] += row['total']
+    return balances
+
+
+def checkpoint_wallet(wallet_id):
+    """
+    Record a new balance checkpoint for the wallet, or return None if nothing changed.
+    """
+    latest = (
+        WalletBalanceCheckpoint.objects
+        .filter(wallet_id=wallet_id)
+        .order_by('-last_entry_id')
+        .first()
+    )
+    last_entry_id = latest.last_entry_id if latest else 0
+    entries = LedgerEntry.objects.filter(wallet_id=wallet_id, id__gt=last_entry_id)
+    new_last_entry_id = (
+        entries.filter(create_date__lte=timezone.now() - CHECKPOINT_LAG)
+        .order_by('-id')
+        .values_list('id', flat=True)
+        .first()
+    )
+    if new_last_entry_id is None:
+        return None
+
+    balances = {'MONEY': Decimal('0'), 'GOLD': Decimal('0')}
+    if latest is not None:
+        balances = {'MONEY': latest.money_balance, 'GOLD': latest.gold_balance}
+    rows = (
+        entries.filter(id__lte=new_last_entry_id)
+        .values('asset')
+        .annotate(total=Sum('amount'))
+        .order_by()
+    )
+    for row in rows:
+        balances[row['asset']] += row['total']
+    return WalletBalanceCheckpoint.objects.create(
+        wallet_id=wallet_id,
+        last_entry_id=new_last_entry_id,
+        money_balance=balances['MONEY'],
+        gold_balance=balances['GOLD'],
+    )
@@ -0,0 +1,64 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Max
+from django.utils.translation import gettext_lazy as _
+
+from apps.gold_online_store.models.gold import GoldPrice
+from apps.gold_online_store.services.candles import record_ticks
+from apps.gold_online_store.services.price_provider import bump_price_version
+from apps.gold_online_store.services.price_stream import publish_price
+
+
+class PriceIngestError(Exception):
+    """
+    Raised when a batch of price ticks is not newer than the stored prices or not in date order.
+    """
+
+
+def ingest_ticks(ticks, batch_size=1000):
+    """
+    Store a batch of price ticks, oldest first, and make the newest one the active price.
+
+    `ticks` are GoldPrice field dicts as validated by GoldPriceTickSerializer.
+    The whole batch is written in one transaction with a fixed number of
+    statements: the previous price is deactivated with one UPDATE, the ticks
+    are inserted with bulk_create and their candles are merged once per
+    bucket, instead of one save() per tick. Returns the created prices.
+    """
+    if not ticks:
+        return []
+    dates = [tick['date'] for tick in ticks]
+    if any(later <= earlier for earlier, later in zip(dates, dates[1:])):
+        raise PriceIngestError(_('Ticks must be in strictly increasing date order.'))
+
+    for attempt in range(1, GoldPrice.ACTIVATION_ATTEMPTS + 1):
+        try:
+            with transaction.atomic():
+                gold_prices = _insert_ticks(ticks, batch_size)
+            break
+        except IntegrityError:
+            # Only reachable when no price was active to lock: a concurrent
+            # activation won the unique active index, so the batch retries.
+            if attempt == GoldPrice.ACTIVATION_ATTEMPTS:
+                raise
+
+    bump_price_version()
+    publish_price(gold_prices[-1])
+    return gold_prices
+
+
+def _insert_ticks(ticks, batch_size):
+    # Locking the active price queues concurrent batches, so each one checks
+    # its dates against the prices the previous batch committed.
+    list(GoldPrice.objects.select_for_update().filter(active=True).values_list('pk', flat=True))
+    latest = GoldPrice.objects.aggregate(latest=Max('date'))['latest']
+    if latest is not None and ticks[0]['date'] <= latest:
+        raise PriceIngestError(_('Ticks must be newer than the latest gold price.'))
+
+    GoldPrice.objects.filter(active=True).update(active=False)
+    last = len(ticks) - 1
+    gold_prices = GoldPrice.objects.bulk_create(
+        [GoldPrice(**tick, active=index == last) for index, tick in enumerate(ticks)],
+        batch_size=batch_size,
+    )
+    record_ticks(gold_price.tick() for gold_price in gold_prices)
+    return gold_prices
@@ -0,0 +1,98 @@
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+from apps.gold_online_store.models.gold import GoldPrice
+
+PRICE_VERSION_CACHE_KEY = 'gold_online_store:active_gold_price:version'
+PRICE_CACHE_KEY = 'gold_online_store:active_gold_price:{version}'
+PRICE_CACHE_TIMEOUT = 60 * 60
+PRICE_CHANGED_CACHE_KEY = 'gold_online_store:active_gold_price:changed_at'
+
+# Sentinel stored in the shared cache when no active price exists, so that
+# "no price" is cached as well instead of hitting the database every time.
+_NO_PRICE = 'none'
+
+# (version, price) pair replaced as a whole so readers never see a torn entry.
+_process_cache = {'entry': (None, None)}
+
+
+def get_price_version():
+    """
+    Return the current active gold price version.
+
+    Processes only agree on it when the default cache is shared between them.
+    """
+    version = cache.get(PRICE_VERSION_CACHE_KEY)
+    if version is None:
+        # Seed with a timestamp so a cache restart can never reissue a version
+        # that an in-process cache still holds.
+        cache.add(PRICE_VERSION_CACHE_KEY, int(time.time() * 1000), None)
+        version = cache.get(PRICE_VERSION_CACHE_KEY)
+    return version
+
+
+def bump_price_version():
+    """
+    Invalidate every cached copy of the active gold price.
+
+    The version is bumped immediately, so the current transaction reads its own
+    write, and again on commit, so other processes cannot keep a copy they
+    fetched before the write became visible.
+    """
+    _bump()
+    transaction.on_commit(_bump)
+
+
+def _bump():
+    try:
+        cache.incr(PRICE_VERSION_CACHE_KEY)
+    except ValueError:
+        cache.add(PRICE_VERSION_CACHE_KEY, int(time.time() * 1000), None)
+    cache.set(PRICE_CHANGED_CACHE_KEY, time.time(), None)
+
+
+def get_price_changed_at():
+    """
+    Return the Unix time of the last gold price change, for Last-Modified headers.
+
+    When the shared cache has lost it, the current time is recorded, which
+    only makes clients fetch prices once more.
+    """
+    changed_at = cache.get(PRICE_CHANGED_CACHE_KEY)
+    if changed_at is None:
+        cache.add(PRICE_CHANGED_CACHE_KEY, time.time(), None)
+        changed_at = cache.get(PRICE_CHANGED_CACHE_KEY)
+    return changed_at
+
+
+def get_active_gold_price():
+    """
+    Return the active GoldPrice, or None when no price is active.
+
+    Lookups go through the in-process cache first, then the shared Django
+    cache, and only hit the database when the price version has changed.
+    """
+    version = get_price_version()
+    cached_version, price = _process_cache['entry']
+    if cached_version == version:
+        return price
+
+    key = PRICE_CACHE_KEY.format(version=version)
+    price = cache.get(key)
+    if price is None:
+        price = GoldPrice.objects.filter(active=True).first()
+        cache.set(key, price if price is not None else _NO_PRICE, PRICE_CACHE_TIMEOUT)
+    elif price == _NO_PRICE:
+        price = None
+
+    _process_cache['entry'] = (version, price)
+    return price
+
+
+def clear_local_price_cache():
+    """
+    Drop the in-process copy of the active gold price.
+    """
+    _process_cache['entry'] = (None, None)
@@ -0,0 +1,180 @@
+import asyncio
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.db import connection, transaction
+
+logger = logging.getLogger(__name__)
+
+PRICE_CHANNEL = 'gold_price'
+
+# Seconds to wait before listening again after the broker connection fails.
+RECONNECT_DELAY = 1
+
+
+class InMemoryPriceBroker:
+    """
+    Carry price messages between the threads and event loops of one process.
+
+    Used where there is no PostgreSQL to carry them between processes, such
+    as tests and SQLite development setups.
+    """
+
+    def __init__(self):
+        self.listeners = set()
+
+    def publish(self, message):
+        for loop, queue in list(self.listeners):
+            loop.call_soon_threadsafe(queue.put_nowait, message)
+
+    async def listen(self):
+        listener = (asyncio.get_running_loop(), asyncio.Queue())
+        self.listeners.add(listener)
+        try:
+            while True:
+                yield await listener[1].get()
+        finally:
+            self.listeners.discard(listener)
+
+
+class PostgresPriceBroker:
+    """
+    Carry price messages between processes with PostgreSQL LISTEN/NOTIFY.
+    """
+
+    def publish(self, message):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [PRICE_CHANNEL, message])
+
+    def connect(self):
+        # A connection of its own: Django's connections are per thread and
+        # return to the pool, while a listener has to stay subscribed.
+        listener = connection.get_new_connection(connection.get_connection_params())
+        listener.autocommit = True
+        with listener.cursor() as cursor:
+            cursor.execute(f'LISTEN {PRICE_CHANNEL}')
+        return listener
+
+    async def listen(self):
+        listener = await sync_to_async(self.connect, thread_sensitive=False)()
+        loop = asyncio.get_running_loop()
+        readable = asyncio.Event()
+        loop.add_reader(listener.fileno(), readable.set)
+        try:
+            while True:
+                await readable.wait()
+                readable.clear()
+                listener.poll()
+                while listener.notifies:
+                    yield listener.notifies.pop(0).payload
+        finally:
+            loop.remove_reader(listener.fileno())
+            listener.close()
+
+
+_brokers = {}
+
+
+def get_price_broker():
+    """
+    Return the broker for the default database: LISTEN/NOTIFY on PostgreSQL, in-memory elsewhere.
+    """
+    vendor = connection.vendor
+    if vendor not in _brokers:
+        _brokers[vendor] = PostgresPriceBroker() if vendor == 'postgresql' else InMemoryPriceBroker()
+    return _brokers[vendor]
+
+
+def price_message(gold_price):
+    """
+    Serialize a gold price the way the gold price endpoints render it.
+    """
+    from apps.gold_online_store.serializers.gold import GoldPriceSerializer
+
+    return json.dumps(GoldPriceSerializer(gold_price).data)
+
+
+def publish_price(gold_price):
+    """
+    Announce a newly activated gold price to every stream subscriber once the transaction commits.
+    """
+    message = price_message(gold_price)
+    transaction.on_commit(lambda: get_price_broker().publish(message))
+
+
+class Subscription:
+    """
+    One stream client's view of the broadcast: only the latest price is kept,
+    so a slow client skips prices instead of queueing them.
+    """
+
+    def __init__(self):
+        self.message = None
+        self.ready = asyncio.Event()
+
+    def push(self, message):
+        self.message = message
+        self.ready.set()
+
+    async def next(self, timeout):
+        """
+        Wait for the next price message; raise TimeoutError when none arrives in time.
+        """
+        await asyncio.wait_for(self.ready.wait(), timeout)
+        self.ready.clear()
+        return self.message
+
+
+class PriceBroadcaster:
+    """
+    Fan broker messages out to every subscriber of one event loop.
+
+    The broker is listened to by a single task that runs while the loop has
+    subscribers, so a worker holds one database listener however many
+    clients are connected.
+    """
+
+    def __init__(self, broker):
+        self.broker = broker
+        self.subscribers = set()
+        self.task = None
+
+    def subscribe(self):
+        subscription = Subscription()
+        self.subscribers.add(subscription)
+        if self.task is None:
+            self.task = asyncio.ensure_future(self.run())
+        return subscription
+
+    def unsubscribe(self, subscription):
+        self.subscribers.discard(subscription)
+        if not self.subscribers and self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    async def run(self):
+        while True:
+            try:
+                async for message in self.broker.listen():
+                    for subscription in self.subscribers:
+                        subscription.push(message)
+            except Exception:
+                logger.exception('Gold price listener failed; listening again.')
+                await asyncio.sleep(RECONNECT_DELAY)
+
+
+_broadcasters = {}
+
+
+def get_price_broadcaster():
+    """
+    Return the broadcaster of the running event loop, which is one per ASGI worker.
+    """
+    loop = asyncio.get_running_loop()
+    broadcaster = _broadcasters.get(loop)
+    if broadcaster is None:
+        for stale_loop in [stale_loop for stale_loop in _broadcasters if stale_loop.is_closed()]:
+            del _broadcasters[stale_loop]
+        broadcaster = _broadcasters[loop] = PriceBroadcaster(get_price_broker())
+    return broadcaster
@@ -0,0 +1,103 @@
+from django.db import connection, transaction
+from django.db.models import Exists, Min, OuterRef
+
+from apps.gold_online_store.models.gold import GoldPrice
+from apps.gold_online_store.services.bulk import batched
+from apps.gold_online_store.services.candles import INTERVALS, truncate
+from apps.gold_online_store.services.price_provider import bump_price_version
+
+
+def referenced_by_transactions():
+    """
+    Return {relation name: Exists()} for every model that points at a gold price, such as booked trades.
+    """
+    return {
+        f'referenced_by_{relation.related_model._meta.model_name}': Exists(
+            relation.related_model.objects.filter(**{relation.field.name: OuterRef('pk')})
+        )
+        for relation in GoldPrice._meta.related_objects
+    }
+
+
+def compact_gold_prices(raw_cutoff, minute_cutoff, batch_size=5000):
+    """
+    Downsample the gold price history older than raw_cutoff, one UTC day at a time.
+
+    Ticks older than raw_cutoff are thinned to one row per minute and those
+    older than minute_cutoff to one row per hour. The kept row is the last
+    tick of its bucket, so as_of() is still exact at every bucket's end.
+    The active price and prices referenced by other rows are never deleted.
+
+    Every batch of deletes commits on its own and only touches rows that
+    are no longer written to, so the run holds no long locks and can be
+    stopped and started again at any point. Candles are left alone, since
+    they were rolled up from the raw ticks. Returns the number of deleted rows.
+    """
+    first = GoldPrice.objects.filter(date__lt=raw_cutoff).aggregate(first=Min('date'))['first']
+    if first is None:
+        return 0
+    day = truncate(first, '1d')
+    deleted = 0
+    while day < raw_cutoff:
+        next_day = day + INTERVALS['1d']
+        doomed = _downsampled_ids(day, min(next_day, raw_cutoff), minute_cutoff, batch_size)
+        for batch in batched(doomed, batch_size):
+            deleted += _delete_unprotected(batch)
+        day = next_day
+    if deleted:
+        # Cached and conditional reads of the price list are versioned by it.
+        bump_price_version()
+    return deleted
+
+
+def _downsampled_ids(start, end, minute_cutoff, batch_size):
+    references = referenced_by_transactions()
+    ticks = (
+        GoldPrice.objects
+        .filter(date__gte=start, date__lt=end)
+        .annotate(**references)
+        .order_by('date', 'id')
+        .values_list('id', 'date', 'active', *references)
+    )
+    doomed = []
+    previous_id = previous_bucket = None
+    for price_id, date, active, *referenced in ticks.iterator(chunk_size=batch_size):
+        interval = '1h' if date < minute_cutoff else '1m'
+        bucket = (interval, truncate(date, interval))
+        # A tick is only dropped once a later tick in its bucket is seen.
+        if previous_id is not None and bucket == previous_bucket:
+            doomed.append(previous_id)
+        previous_bucket = bucket
+        previous_id = None if active or any(referenced) else price_id
+    return doomed
+
+
+def _delete_unprotected(ids):
+    # Protection is checked again at delete time, so a trade booked against
+    # one of these prices since they were listed keeps it.
+    with transaction.atomic():
+        queryset = GoldPrice.objects.filter(pk__in=ids, active=False)
+        for referenced in referenced_by_transactions().values():
+            queryset = queryset.filter(~referenced)
+        return queryset.delete()[0]
+
+
+def gold_price_table_size():
+    """
+    Return the on-disk size of the gold price table and its indexes in bytes, or None off PostgreSQL.
+    """
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_total_relation_size(%s)', [GoldPrice._meta.db_table])
+        return cursor.fetchone()[0]
+
+
+def vacuum_gold_prices():
+    """
+    Return the space of deleted gold prices to PostgreSQL and refresh the planner statistics.
+    """
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'VACUUM (ANALYZE) {connection.ops.quote_name(GoldPrice._meta.db_table)}')
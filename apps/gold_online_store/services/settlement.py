@@ -0,0 +1,248 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import Case, DecimalField, F, Value, When
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from apps.gold_online_store.models.gold import Wallet, GoldPrice
+from apps.gold_online_store.models.transaction import GoldPurchaseTransaction
+from apps.gold_online_store.models.withdrawal_requests import MoneyWithdrawalRequest
+from apps.gold_online_store.services import ledger
+from apps.gold_online_store.services.price_provider import bump_price_version
+
+
+class SettlementError(Exception):
+    """
+    Raised when a transaction cannot be settled against the current balances.
+    """
+
+
+class AlreadySettled(SettlementError):
+    """
+    Raised when a record to settle is already in the status settling would move it to.
+    """
+
+
+def settle_gold_transaction(gold_transaction):
+    """
+    Accept a WAITING gold sale or purchase and move its money and gold.
+
+    Every change is a conditional UPDATE with F() expressions, so balances are
+    never read into Python and each row is locked only for its own statement.
+    Rows are always touched in the same order (transaction, wallet, gold price)
+    so concurrent settlements on one wallet queue up instead of deadlocking.
+    A failed balance guard rolls the whole settlement back.
+    """
+    model = type(gold_transaction)
+    money_amount = gold_transaction.money_amount
+    gold_amount = gold_transaction.gold_amount
+    is_purchase = isinstance(gold_transaction, GoldPurchaseTransaction)
+
+    with transaction.atomic():
+        _transition(model, gold_transaction.pk, 'WAITING', 'ACCEPTED')
+        wallet_id = _wallet_id(gold_transaction.user_id)
+        wallets = Wallet.objects.filter(pk=wallet_id)
+        gold_prices = GoldPrice.objects.filter(pk=gold_transaction.gold_price_id)
+        if is_purchase:
+            updated = wallets.filter(money_stock__gte=money_amount).update(
+                money_stock=F('money_stock') - money_amount,
+                gold_stock=F('gold_stock') + gold_amount,
+            )
+            if not updated:
+                raise SettlementError(_('Insufficient money in wallet.'))
+            updated = gold_prices.filter(total_gold_stock__gte=gold_amount).update(
+                total_gold_stock=F('total_gold_stock') - gold_amount,
+            )
+            if not updated:
+                raise SettlementError(_('Insufficient gold stock.'))
+            ledger.post_gold_purchase(wallet_id, gold_transaction)
+        else:
+            updated = wallets.filter(gold_stock__gte=gold_amount).update(
+                money_stock=F('money_stock') + money_amount,
+                gold_stock=F('gold_stock') - gold_amount,
+            )
+            if not updated:
+                raise SettlementError(_('Insufficient gold in wallet.'))
+            gold_prices.update(total_gold_stock=F('total_gold_stock') + gold_amount)
+            ledger.post_gold_sale(wallet_id, gold_transaction)
+
+        # The house stock is part of the cached active price.
+        bump_price_version()
+
+    gold_transaction.status = 'ACCEPTED'
+    return gold_transaction
+
+
+def settle_gold_price_batch(gold_price_id, model=GoldPurchaseTransaction):
+    """
+    Settle every WAITING trade of `model` booked against one gold price in a single pass.
+
+    The trades, their wallets and the gold price are locked in the same order
+    as settle_gold_transaction() uses, then filled oldest first in Python
+    against the locked balances and house stock. Trades that cannot be filled
+    are rejected. All wallet deltas are applied with one UPDATE, so the cost
+    no longer grows with one round trip per trade.
+
+    Returns a dict with the accepted and rejected transaction ids.
+    """
+    is_purchase = model is GoldPurchaseTransaction
+    with transaction.atomic():
+        trades = list(
+            model.objects
+            .select_for_update()
+            .filter(gold_price_id=gold_price_id, status='WAITING')
+            .order_by('create_date', 'id')
+            .values_list('id', 'user_id', 'money_amount', 'gold_amount')
+        )
+        if not trades:
+            return {'accepted': [], 'rejected': []}
+        wallets = {
+            user_id: [wallet_id, money_stock, gold_stock]
+            for wallet_id, user_id, money_stock, gold_stock in (
+                Wallet.objects
+                .select_for_update()
+                .filter(user_id__in={user_id for _id, user_id, _money, _gold in trades})
+                .order_by('id')
+                .values_list('id', 'user_id', 'money_stock', 'gold_stock')
+            )
+        }
+        house_stock = (
+            GoldPrice.objects
+            .select_for_update()
+            .values_list('total_gold_stock', flat=True)
+            .get(pk=gold_price_id)
+        )
+
+        accepted, rejected, postings = [], [], []
+        deltas = defaultdict(lambda: [Decimal('0'), Decimal('0')])
+        stock_delta = Decimal('0')
+        for trade_id, user_id, money_amount, gold_amount in trades:
+            wallet = wallets.get(user_id)
+            if wallet is None:
+                rejected.append(trade_id)
+                continue
+            wallet_id, money_stock, gold_stock = wallet
+            if is_purchase:
+                if money_stock < money_amount or house_stock + stock_delta < gold_amount:
+                    rejected.append(trade_id)
+                    continue
+                money_change, gold_change = -money_amount, gold_amount
+                legs = ledger.gold_purchase_legs(wallet_id, money_amount, gold_amount)
+            else:
+                if gold_stock < gold_amount:
+                    rejected.append(trade_id)
+                    continue
+                money_change, gold_change = money_amount, -gold_amount
+                legs = ledger.gold_sale_legs(wallet_id, money_amount, gold_amount)
+            wallet[1] += money_change
+            wallet[2] += gold_change
+            deltas[wallet_id][0] += money_change
+            deltas[wallet_id][1] += gold_change
+            stock_delta -= gold_change
+            accepted.append(trade_id)
+            postings.append(('GOLD_PURCHASE' if is_purchase else 'GOLD_SALE', trade_id, legs))
+
+        if accepted:
+            model.objects.filter(pk__in=accepted).update(status='ACCEPTED')
+            apply_wallet_deltas(deltas)
+            GoldPrice.objects.filter(pk=gold_price_id).update(
+                total_gold_stock=F('total_gold_stock') + stock_delta,
+            )
+            ledger.post_many(postings)
+            bump_price_version()
+        if rejected:
+            model.objects.filter(pk__in=rejected).update(status='REJECTED')
+
+    return {'accepted': accepted, 'rejected': rejected}
+
+
+def apply_wallet_deltas(deltas):
+    """
+    Add {wallet_id: (money_delta, gold_delta)} to the wallets with a single UPDATE.
+    """
+    if not deltas:
+        return
+    if connection.vendor == 'postgresql':
+        table = connection.ops.quote_name(Wallet._meta.db_table)
+        rows = ', '.join(['(%s::bigint, %s::numeric, %s::numeric)'] * len(deltas))
+        params = [value for wallet_id, (money, gold) in deltas.items() for value in (wallet_id, money, gold)]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'UPDATE {table} AS w '
+                f'SET money_stock = w.money_stock + v.money_delta, gold_stock = w.gold_stock + v.gold_delta, '
+                f'updated_at = %s '
+                f'FROM (VALUES {rows}) AS v (id, money_delta, gold_delta) '
+                f'WHERE w.id = v.id',
+                [timezone.now(), *params],
+            )
+        return
+
+    # Other backends have no UPDATE ... FROM (VALUES); a CASE per column is
+    # still a single statement and keeps the update relative to the row.
+    def delta_case(index):
+        return Case(
+            *[When(pk=wallet_id, then=Value(delta[index])) for wallet_id, delta in deltas.items()],
+            default=Value(Decimal('0')),
+            output_field=DecimalField(max_digits=15, decimal_places=4),
+        )
+
+    Wallet.objects.filter(pk__in=list(deltas)).update(
+        money_stock=F('money_stock') + delta_case(0),
+        gold_stock=F('gold_stock') + delta_case(1),
+    )
+
+
+def settle_payment(payment):
+    """
+    Mark a PENDING payment as SUCCESS and credit its money to the user's wallet.
+    """
+    with transaction.atomic():
+        _transition(type(payment), payment.pk, 'PENDING', 'SUCCESS')
+        wallet_id = _wallet_id(payment.user_id)
+        Wallet.objects.filter(pk=wallet_id).update(money_stock=F('money_stock') + payment.money_amount)
+        ledger.post_payment(wallet_id, payment)
+
+    payment.status = 'SUCCESS'
+    return payment
+
+
+def settle_withdrawal(withdrawal):
+    """
+    Accept a WAITING money or gold withdrawal and debit it from the user's wallet.
+    """
+    if isinstance(withdrawal, MoneyWithdrawalRequest):
+        asset, field, amount = 'MONEY', 'money_stock', withdrawal.money_amount
+    else:
+        asset, field, amount = 'GOLD', 'gold_stock', withdrawal.gold_amount
+
+    with transaction.atomic():
+        _transition(type(withdrawal), withdrawal.pk, 'WAITING', 'ACCEPTED')
+        wallet_id = _wallet_id(withdrawal.user_id)
+        updated = Wallet.objects.filter(pk=wallet_id, **{f'{field}__gte': amount}).update(
+            **{field: F(field) - amount}
+        )
+        if not updated:
+            raise SettlementError(_('Insufficient balance in wallet.'))
+        ledger.post_withdrawal(wallet_id, withdrawal, asset, amount)
+
+    withdrawal.status = 'ACCEPTED'
+    return withdrawal
+
+
+def _transition(model, pk, from_status, to_status):
+    """
+    Move a row between statuses only if it is still in the expected one.
+    """
+    if not model.objects.filter(pk=pk, status=from_status).update(status=to_status):
+        if model.objects.filter(pk=pk, status=to_status).exists():
+            raise AlreadySettled(_('Only %(status)s records can be settled.') % {'status': from_status.lower()})
+        raise SettlementError(_('Only %(status)s records can be settled.') % {'status': from_status.lower()})
+
+
+def _wallet_id(user_id):
+    wallet_id = Wallet.objects.filter(user_id=user_id).values_list('id', flat=True).first()
+    if wallet_id is None:
+        raise SettlementError(_('User has no wallet.'))
+    return wallet_id
@@ -0,0 +1,18 @@
+import pytest
+from django.core.cache import caches
+
+from apps.gold_online_store.services.price_provider import clear_local_price_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """
+    Start every test with empty caches so cached prices never leak between tests.
+    """
+    for backend in caches.all():
+        backend.clear()
+    clear_local_price_cache()
+    yield
+    for backend in caches.all():
+        backend.clear()
+    clear_local_price_cache()
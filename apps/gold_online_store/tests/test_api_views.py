@@ -1,14 +1,48 @@
-from django.test import TestCase
+import asyncio
+import csv
+import json
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.db import connection
+from django.test import AsyncClient, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
 from django.urls import reverse
 from django.utils import timezone
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
 from apps.core.models import CustomUser
+from apps.gold_online_store.api.v1.conditional import ConditionalGetMixin
+from apps.gold_online_store.api.v1.export import csv_cell
+from apps.gold_online_store.api.v1.idempotency import idempotent
+from apps.gold_online_store.models.candle import GoldPriceCandle
 from apps.gold_online_store.models.gold import Wallet, GoldPrice
+from apps.gold_online_store.models.idempotency import IdempotencyKey
+from apps.gold_online_store.models.job import Job
+from apps.gold_online_store.models.ledger import LedgerEntry
 from apps.gold_online_store.models.payment import PaymentTransaction
 from apps.gold_online_store.models.transaction import GoldSaleTransaction, GoldPurchaseTransaction
 from apps.gold_online_store.models.withdrawal_requests import MoneyWithdrawalRequest, GoldWithdrawalRequest
+from apps.gold_online_store.serializers.gold import WalletSerializer
+from apps.gold_online_store.api.v1.payment.view import PaymentTransactionAPIView
+from apps.gold_online_store.serializers.payment import OwnerPaymentTransactionSerializer, PaymentTransactionSerializer
+from apps.gold_online_store.serializers.transaction import GoldSaleTransactionSerializer
+from apps.gold_online_store.services.price_provider import get_active_gold_price
+from apps.gold_online_store.services.settlement import settle_payment
+from rest_framework.renderers import JSONRenderer
+from rest_framework.parsers import JSONParser
+from rest_framework.exceptions import ParseError
+from apps.core.parsers import FastJSONParser
+from apps.core.renderers import FastJSONRenderer
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework.views import APIView
+from rest_framework.viewsets import GenericViewSet
+from rest_framework import mixins
+from django.core.management import call_command
+from datetime import timedelta
+from io import BytesIO, StringIO
 from decimal import Decimal
 
 class BaseTestCase(APITestCase):
@@ -46,6 +80,41 @@ class BaseTestCase(APITestCase):
     def clear_credentials(self):
         self.client.credentials()
 
+# UserAdminAPIView Tests
+class UserAdminAPIViewTests(BaseTestCase):
+    def test_user_admin_destroy(self):
+        self.authenticate_admin()
+        Wallet.objects.create(user=self.regular_user)
+        response = self.client.delete(reverse('user-admin-detail', kwargs={'id': self.regular_user.id}))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(CustomUser.objects.filter(id=self.regular_user.id).exists())
+
+    def test_user_admin_destroy_refuses_ledger_history(self):
+        self.authenticate_admin()
+        wallet = Wallet.objects.create(user=self.regular_user)
+        settle_payment(PaymentTransaction.objects.create(user=self.regular_user, money_amount=Decimal('50.00')))
+        response = self.client.delete(reverse('user-admin-detail', kwargs={'id': self.regular_user.id}))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('Deactivate them instead', response.data[0])
+        self.assertTrue(LedgerEntry.objects.filter(wallet=wallet).exists())
+        response = self.client.post(reverse('user-admin-deactivate', kwargs={'id': self.regular_user.id}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.regular_user.refresh_from_db()
+        self.assertFalse(self.regular_user.is_active)
+        self.authenticate_user()
+        self.assertEqual(self.client.get(reverse('wallet-list')).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_user_admin_list_search_matches_username_only(self):
+        self.authenticate_admin()
+        url = reverse('user-admin-list')
+        response = self.client.get(url, {'search': 'USE'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([user['username'] for user in response.data['results']], [self.regular_user.username])
+        self.assertEqual(self.client.get(url, {'search': 'example.com'}).data['results'], [])
+        response = self.client.get(url, {'search': 'us'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('search', response.data)
+
 # WalletAdminAPIView Tests
 class WalletAdminAPIViewTests(BaseTestCase):
     def test_wallet_admin_list(self):
@@ -54,15 +123,35 @@ class WalletAdminAPIViewTests(BaseTestCase):
         Wallet.objects.create(user=CustomUser.objects.create_user(username='user2', password='pass123'), money_stock=Decimal('2000.00'), gold_stock=Decimal('20.0000'))
         response = self.client.get(reverse('admin-wallet-list'))
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 2)
+        self.assertEqual(len(response.data['results']), 2)
 
     def test_wallet_admin_list_search(self):
         self.authenticate_admin()
         wallet = Wallet.objects.create(user=self.regular_user, money_stock=Decimal('1000.00'), gold_stock=Decimal('10.0000'))
         response = self.client.get(reverse('admin-wallet-list'), {'search': self.regular_user.username})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['user']['username'], self.regular_user.username)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['user']['username'], self.regular_user.username)
+
+    def test_wallet_admin_list_query_count(self):
+        self.authenticate_admin()
+        for index in range(5):
+            user = CustomUser.objects.create_user(username=f'valued{index}', password='pass123')
+            Wallet.objects.create(user=user, money_stock=Decimal('1000.00'), gold_stock=Decimal('10.0000'))
+        get_active_gold_price()
+        # One query authenticates the admin, one loads and values every wallet.
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('admin-wallet-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 5)
+
+    def test_wallet_admin_list_matches_per_row_valuation(self):
+        self.authenticate_admin()
+        Wallet.objects.create(user=self.regular_user, money_stock=Decimal('1000.55'), gold_stock=Decimal('10.1234'))
+        Wallet.objects.create(user=CustomUser.objects.create_user(username='user2', password='pass123'), money_stock=Decimal('0.00'), gold_stock=Decimal('0.0001'))
+        response = self.client.get(reverse('admin-wallet-list'))
+        expected = WalletSerializer(Wallet.objects.order_by('-id'), many=True).data
+        self.assertEqual(JSONRenderer().render(response.data['results']), JSONRenderer().render(expected))
 
     def test_wallet_admin_create(self):
         self.authenticate_admin()
@@ -117,22 +206,23 @@ class WalletAPIViewTests(BaseTestCase):
         Wallet.objects.create(user=self.regular_user, money_stock=Decimal('1000.00'), gold_stock=Decimal('10.0000'))
         response = self.client.get(reverse('wallet-list'))
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['user']['username'], self.regular_user.username)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['user']['username'], self.regular_user.username)
 
     def test_wallet_user_create(self):
         self.authenticate_user()
         data = {'money_stock': '1000.00', 'gold_stock': '10.0000'}
         response = self.client.post(reverse('wallet-list'), data)
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        self.assertTrue(Wallet.objects.filter(user=self.regular_user, money_stock=Decimal('1000.00'), gold_stock=Decimal('10.0000')).exists())
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+        self.assertFalse(Wallet.objects.filter(user=self.regular_user).exists())
+        self.assertFalse(LedgerEntry.objects.exists())
 
     def test_wallet_user_create_user_field_protected(self):
         self.authenticate_user()
         data = {'user': 999, 'money_stock': '1000.00', 'gold_stock': '10.0000'}
         response = self.client.post(reverse('wallet-list'), data)
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertIn('user', response.data)
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+        self.assertFalse(Wallet.objects.exists())
 
     def test_wallet_user_retrieve(self):
         self.authenticate_user()
@@ -152,11 +242,11 @@ class WalletAPIViewTests(BaseTestCase):
         self.authenticate_user()
         wallet = Wallet.objects.create(user=self.regular_user, money_stock=Decimal('1000.00'), gold_stock=Decimal('10.0000'))
         data = {'money_stock': '2000.00', 'gold_stock': '20.0000'}
-        response = self.client.put(reverse('wallet-detail', kwargs={'pk': wallet.id}), data)
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.put(reverse('wallet-detail', kwargs={'id': wallet.id}), data)
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
         wallet.refresh_from_db()
-        self.assertEqual(wallet.money_stock, Decimal('2000.00'))
-        self.assertEqual(wallet.gold_stock, Decimal('20.0000'))
+        self.assertEqual(wallet.money_stock, Decimal('1000.00'))
+        self.assertEqual(wallet.gold_stock, Decimal('10.0000'))
 
     def test_wallet_user_update_unauthorized(self):
         self.authenticate_user()
@@ -170,17 +260,19 @@ class WalletAPIViewTests(BaseTestCase):
         self.authenticate_user()
         wallet = Wallet.objects.create(user=self.regular_user, money_stock=Decimal('1000.00'), gold_stock=Decimal('10.0000'))
         data = {'money_stock': '1500.00'}
-        response = self.client.patch(reverse('wallet-detail', kwargs={'pk': wallet.id}), data)
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.patch(reverse('wallet-detail', kwargs={'id': wallet.id}), data)
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
         wallet.refresh_from_db()
-        self.assertEqual(wallet.money_stock, Decimal('1500.00'))
+        self.assertEqual(wallet.money_stock, Decimal('1000.00'))
+        # Nothing the owner sends is booked as an adjustment.
+        self.assertFalse(LedgerEntry.objects.filter(reference_type='ADJUSTMENT').exists())
 
     def test_wallet_user_destroy(self):
         self.authenticate_user()
         wallet = Wallet.objects.create(user=self.regular_user, money_stock=Decimal('1000.00'), gold_stock=Decimal('10.0000'))
-        response = self.client.delete(reverse('wallet-detail', kwargs={'pk': wallet.id}))
-        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
-        self.assertFalse(Wallet.objects.filter(id=wallet.id).exists())
+        response = self.client.delete(reverse('wallet-detail', kwargs={'id': wallet.id}))
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+        self.assertTrue(Wallet.objects.filter(id=wallet.id).exists())
 
     def test_wallet_user_destroy_unauthorized(self):
         self.authenticate_user()
@@ -189,6 +281,72 @@ class WalletAPIViewTests(BaseTestCase):
         response = self.client.delete(reverse('wallet-detail', kwargs={'pk': wallet.id}))
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
+    def test_wallet_user_retrieve_not_modified(self):
+        self.authenticate_user()
+        wallet = Wallet.objects.create(user=self.regular_user, money_stock=Decimal('1000.00'), gold_stock=Decimal('10.0000'))
+        url = reverse('wallet-detail', kwargs={'id': wallet.id})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+        self.assertTrue(response.has_header('Last-Modified'))
+        # The authenticated user and the wallet, whose update stamp versions it; nothing is serialized.
+        with self.assertNumQueries(2):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        Wallet.objects.filter(pk=wallet.pk).update(money_stock=Decimal('900.00'))
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['money_stock'], '900.00')
+
+        etag = response['ETag']
+        GoldPrice.objects.create(sale_price=Decimal('2600000.00'), active=True)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_wallet_user_reads_are_cached_until_a_write(self):
+        self.authenticate_user()
+        wallet = Wallet.objects.create(user=self.regular_user, money_stock=Decimal('1000.00'), gold_stock=Decimal('10.0000'))
+        url = reverse('wallet-detail', kwargs={'id': wallet.id})
+        first = self.client.get(url)
+        # The authenticated user and the wallet, whose update stamp versions it; the payload comes from the cache.
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, first.data)
+
+        payment = PaymentTransaction.objects.create(user=self.regular_user, money_amount=Decimal('50.00'))
+        settle_payment(payment)
+        self.assertEqual(self.client.get(url).data['money_stock'], '1050.00')
+        self.authenticate_admin()
+        self.client.patch(reverse('admin-wallet-detail', kwargs={'id': wallet.id}), {'money_stock': '70.00'})
+        self.authenticate_user()
+        self.assertEqual(self.client.get(url).data['money_stock'], '70.00')
+        self.assertEqual(self.client.get(reverse('wallet-list')).data['results'][0]['money_stock'], '70.00')
+        GoldPrice.objects.create(sale_price=Decimal('1.00'), active=True)
+        self.assertEqual(self.client.get(url).data['total_value'], '80.00')
+
+    def test_wallet_user_reads_load_the_wallet_once(self):
+        self.authenticate_user()
+        wallet = Wallet.objects.create(user=self.regular_user, money_stock=Decimal('1000.00'), gold_stock=Decimal('10.0000'))
+        get_active_gold_price()
+        # The authenticated user and the wallet, which both versions and renders the response.
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('wallet-detail', kwargs={'id': wallet.id}))
+        self.assertEqual(response.data['money_stock'], '1000.00')
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('wallet-list'))
+        self.assertEqual(response.data['results'][0]['id'], wallet.id)
+
+    def test_wallet_user_list_etag_varies_by_page(self):
+        self.authenticate_user()
+        Wallet.objects.create(user=self.regular_user, money_stock=Decimal('1000.00'), gold_stock=Decimal('10.0000'))
+        url = reverse('wallet-list')
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(self.client.get(url, {'page_size': 1}, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(reverse('wallet-detail', kwargs={'id': 0}), HTTP_IF_NONE_MATCH='*').status_code, status.HTTP_404_NOT_FOUND)
+
 # GoldPriceAdminAPIView Tests
 class GoldPriceAdminAPIViewTests(BaseTestCase):
     def test_gold_price_admin_list(self):
@@ -196,14 +354,23 @@ class GoldPriceAdminAPIViewTests(BaseTestCase):
         GoldPrice.objects.create(date=timezone.now(), sale_price=Decimal('2500000.00'), price_difference=Decimal('10000.00'), total_gold_stock=Decimal('1000.0000'), stock_status=True, active=True)
         response = self.client.get(reverse('admin-gold-price-list'))
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data['results']), 1)
 
-    def test_gold_price_admin_list_search(self):
+    def test_gold_price_admin_list_filters_by_date(self):
         self.authenticate_admin()
-        gold_price = GoldPrice.objects.create(date=timezone.now(), sale_price=Decimal('2500000.00'), price_difference=Decimal('10000.00'), total_gold_stock=Decimal('1000.0000'), stock_status=True, active=True)
-        response = self.client.get(reverse('admin-gold-price-list'), {'search': str(gold_price.date.date())})
+        gold_price = GoldPrice.objects.create(date=timezone.now() - timedelta(days=10), sale_price=Decimal('2500000.00'), price_difference=Decimal('10000.00'), total_gold_stock=Decimal('1000.0000'), stock_status=True, active=False)
+        GoldPrice.objects.create(date=timezone.now() - timedelta(days=3), sale_price=Decimal('2400000.00'), price_difference=Decimal('10000.00'), total_gold_stock=Decimal('1000.0000'), stock_status=True, active=False)
+        day = gold_price.date.replace(hour=0, minute=0, second=0, microsecond=0)
+        response = self.client.get(reverse('admin-gold-price-list'), {
+            'date_after': day.isoformat(),
+            'date_before': (day + timedelta(days=1)).isoformat(),
+        })
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual([item['id'] for item in response.data['results']], [gold_price.id])
+        response = self.client.get(reverse('admin-gold-price-list'), {'active': 'false'})
+        self.assertEqual(len(response.data['results']), 2)
+        response = self.client.get(reverse('admin-gold-price-list'), {'date_after': 'yesterday'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
     def test_gold_price_admin_create(self):
         self.authenticate_admin()
@@ -259,11 +426,96 @@ class GoldPriceAdminAPIViewTests(BaseTestCase):
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         self.assertFalse(GoldPrice.objects.filter(id=gold_price.id).exists())
 
+    def test_gold_price_admin_list_not_modified(self):
+        self.authenticate_admin()
+        url = reverse('admin-gold-price-list')
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+        GoldPrice.objects.create(sale_price=Decimal('2600000.00'), active=True)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 2)
+
     def test_gold_price_admin_unauthorized(self):
         self.authenticate_user()
         response = self.client.get(reverse('admin-gold-price-list'))
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
+    def ticks(self, count, start):
+        return [
+            {'date': (start + timedelta(seconds=index)).isoformat(), 'sale_price': f'{2600000 + index}.00', 'total_gold_stock': '1000.0000'}
+            for index in range(count)
+        ]
+
+    def test_gold_price_admin_ingest_activates_newest_tick(self):
+        self.authenticate_admin()
+        start = self.gold_price.date + timedelta(seconds=1)
+        response = self.client.post(reverse('admin-gold-price-ingest'), self.ticks(5, start), format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['count'], 5)
+        self.assertEqual(response.data['active']['sale_price'], '2600004.00')
+        self.assertEqual(list(GoldPrice.objects.filter(active=True).values_list('sale_price', flat=True)), [Decimal('2600004.00')])
+        self.assertEqual(get_active_gold_price().sale_price, Decimal('2600004.00'))
+        day = GoldPriceCandle.objects.get(interval='1d')
+        self.assertEqual((day.close, day.tick_count), (Decimal('2600004.00'), 6))
+
+    def test_gold_price_admin_ingest_accepts_ndjson(self):
+        self.authenticate_admin()
+        body = '\n'.join(json.dumps(tick) for tick in self.ticks(3, self.gold_price.date + timedelta(seconds=1)))
+        response = self.client.post(reverse('admin-gold-price-ingest'), body + '\n', content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['count'], 3)
+        response = self.client.post(reverse('admin-gold-price-ingest'), '{"date": ', content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_gold_price_admin_ingest_query_count_does_not_grow_with_ticks(self):
+        self.authenticate_admin()
+        url = reverse('admin-gold-price-ingest')
+        # Each burst opens fresh candles, so both take the same statements.
+        tomorrow = timezone.now().replace(hour=10, minute=0, second=0, microsecond=0) + timedelta(days=1)
+        counts = []
+        for days, count in ((0, 10), (1, 100)):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(url, self.ticks(count, tomorrow + timedelta(days=days)), format='json')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+        self.assertEqual(GoldPrice.objects.count(), 111)
+
+    def test_gold_price_admin_ingest_rejects_out_of_order_ticks(self):
+        self.authenticate_admin()
+        url = reverse('admin-gold-price-ingest')
+        start = self.gold_price.date + timedelta(seconds=1)
+        unordered = self.ticks(3, start)
+        unordered[1], unordered[2] = unordered[2], unordered[1]
+        stale = self.ticks(2, self.gold_price.date - timedelta(seconds=5))
+        for ticks in (unordered, stale, []):
+            response = self.client.post(url, ticks, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(GoldPrice.objects.count(), 1)
+        self.assertTrue(GoldPrice.objects.get(pk=self.gold_price.pk).active)
+
+    def test_gold_price_admin_reprice_transactions(self):
+        self.authenticate_admin()
+        earlier = GoldPrice.objects.create(date=self.gold_price.date - timedelta(hours=1), sale_price=Decimal('2400000.00'), active=False)
+        disputed = GoldSaleTransaction.objects.create(user=self.regular_user, money_amount=Decimal('200.00'), gold_amount=Decimal('1.0000'), gold_price=self.gold_price, create_date=self.gold_price.date - timedelta(minutes=30))
+        current = GoldSaleTransaction.objects.create(user=self.regular_user, money_amount=Decimal('200.00'), gold_amount=Decimal('1.0000'), gold_price=self.gold_price)
+        url = reverse('admin-gold-price-reprice')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url, {'transaction_type': 'sale', 'ids': [current.id, disputed.id, 0]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['transaction'] for row in response.data], [current.id, disputed.id, 0])
+        self.assertEqual([row['gold_price'] and row['gold_price']['id'] for row in response.data], [self.gold_price.id, earlier.id, None])
+        # The authenticated user, then the prices.
+        self.assertLessEqual(len(queries), 3)
+        response = self.client.post(url, {'transaction_type': 'payment', 'ids': [current.id]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_gold_price_admin_ingest_unauthorized(self):
+        self.authenticate_user()
+        response = self.client.post(reverse('admin-gold-price-ingest'), self.ticks(1, timezone.now()), format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
 # PaymentTransactionAdminAPIView Tests
 class PaymentTransactionAdminAPIViewTests(BaseTestCase):
     def test_payment_transaction_admin_list(self):
@@ -271,15 +523,15 @@ class PaymentTransactionAdminAPIViewTests(BaseTestCase):
         PaymentTransaction.objects.create(user=self.regular_user, money_amount=Decimal('500.00'), status='PENDING')
         response = self.client.get(reverse('admin-payment-transaction-list'))
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data['results']), 1)
 
     def test_payment_transaction_admin_list_search(self):
         self.authenticate_admin()
         payment = PaymentTransaction.objects.create(user=self.regular_user, money_amount=Decimal('500.00'), status='PENDING')
         response = self.client.get(reverse('admin-payment-transaction-list'), {'search': self.regular_user.username})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['user']['username'], self.regular_user.username)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['user']['username'], self.regular_user.username)
 
     def test_payment_transaction_admin_create(self):
         self.authenticate_admin()
@@ -305,6 +557,34 @@ class PaymentTransactionAdminAPIViewTests(BaseTestCase):
         self.assertEqual(payment.money_amount, Decimal('700.00'))
         self.assertEqual(payment.status, 'SUCCESS')
 
+    def test_payment_transaction_admin_success_credits_wallet(self):
+        self.authenticate_admin()
+        wallet = Wallet.objects.create(user=self.regular_user, money_stock=Decimal('100.00'), gold_stock=Decimal('0.0000'))
+        payment = PaymentTransaction.objects.create(user=self.regular_user, money_amount=Decimal('500.00'), status='PENDING')
+        response = self.client.patch(reverse('admin-payment-transaction-detail', kwargs={'id': payment.id}), {'status': 'SUCCESS'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        wallet.refresh_from_db()
+        self.assertEqual(wallet.money_stock, Decimal('600.00'))
+        self.assertTrue(LedgerEntry.objects.filter(wallet=wallet, reference_type='PAYMENT', reference_id=payment.id).exists())
+
+    def test_payment_transaction_admin_success_can_be_queued(self):
+        self.authenticate_admin()
+        wallet = Wallet.objects.create(user=self.regular_user, money_stock=Decimal('100.00'), gold_stock=Decimal('0.0000'))
+        payment = PaymentTransaction.objects.create(user=self.regular_user, money_amount=Decimal('500.00'), status='PENDING')
+        url = reverse('admin-payment-transaction-detail', kwargs={'id': payment.id})
+        response = self.client.patch(url, {'status': 'SUCCESS'}, HTTP_PREFER='respond-async')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response['Preference-Applied'], 'respond-async')
+        self.assertEqual(response.data['status'], 'PENDING')
+        wallet.refresh_from_db()
+        self.assertEqual(wallet.money_stock, Decimal('100.00'))
+        self.assertEqual(Job.objects.get().payload, {'model': 'gold_online_store.paymenttransaction', 'id': payment.id})
+        call_command('run_workers', '--burst', stdout=StringIO())
+        wallet.refresh_from_db()
+        self.assertEqual(wallet.money_stock, Decimal('600.00'))
+        payment.refresh_from_db()
+        self.assertEqual(payment.status, 'SUCCESS')
+
     def test_payment_transaction_admin_partial_update(self):
         self.authenticate_admin()
         payment = PaymentTransaction.objects.create(user=self.regular_user, money_amount=Decimal('500.00'), status='PENDING')
@@ -333,8 +613,8 @@ class PaymentTransactionAPIViewTests(BaseTestCase):
         PaymentTransaction.objects.create(user=self.regular_user, money_amount=Decimal('500.00'), status='PENDING')
         response = self.client.get(reverse('payment-transaction-list'))
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['user']['username'], self.regular_user.username)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['user']['username'], self.regular_user.username)
 
     def test_payment_transaction_user_create(self):
         self.authenticate_user()
@@ -395,15 +675,29 @@ class GoldSaleTransactionAdminAPIViewTests(BaseTestCase):
         GoldSaleTransaction.objects.create(user=self.regular_user, money_amount=Decimal('500.00'), gold_amount=Decimal('10.0000'), gold_price=self.gold_price, status='WAITING')
         response = self.client.get(reverse('admin-gold-sale-transaction-list'))
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data['results']), 1)
 
     def test_gold_sale_transaction_admin_list_search(self):
         self.authenticate_admin()
         transaction = GoldSaleTransaction.objects.create(user=self.regular_user, money_amount=Decimal('500.00'), gold_amount=Decimal('10.0000'), gold_price=self.gold_price, status='WAITING')
         response = self.client.get(reverse('admin-gold-sale-transaction-list'), {'search': self.regular_user.username})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['user']['username'], self.regular_user.username)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['user']['username'], self.regular_user.username)
+
+    def test_gold_sale_transaction_admin_list_matches_serializer(self):
+        self.authenticate_admin()
+        for index, sale_status in enumerate(['WAITING', 'ACCEPTED', 'REJECTED']):
+            GoldSaleTransaction.objects.create(user=self.regular_user, money_amount=Decimal('500.50') + index, gold_amount=Decimal('1.2345'), gold_price=self.gold_price, status=sale_status)
+        expected = json.loads(JSONRenderer().render(GoldSaleTransactionSerializer(
+            GoldSaleTransaction.objects.order_by('-create_date', '-id'), many=True
+        ).data))
+        # The list is rendered from one query of plain rows, after the authenticated user.
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('admin-gold-sale-transaction-list'))
+        self.assertEqual(json.loads(response.content)['results'], expected)
+        response = self.client.get(reverse('admin-gold-sale-transaction-list'), {'page': 1})
+        self.assertEqual(json.loads(response.content)['results'], expected)
 
     def test_gold_sale_transaction_admin_create(self):
         self.authenticate_admin()
@@ -470,8 +764,8 @@ class GoldSaleTransactionAPIViewTests(BaseTestCase):
         GoldSaleTransaction.objects.create(user=self.regular_user, money_amount=Decimal('500.00'), gold_amount=Decimal('10.0000'), gold_price=self.gold_price, status='WAITING')
         response = self.client.get(reverse('gold-sale-transaction-list'))
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['user']['username'], self.regular_user.username)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['user']['username'], self.regular_user.username)
 
     def test_gold_sale_transaction_user_create(self):
         self.authenticate_user()
@@ -549,15 +843,15 @@ class GoldPurchaseTransactionAdminAPIViewTests(BaseTestCase):
         GoldPurchaseTransaction.objects.create(user=self.regular_user, money_amount=Decimal('500.00'), gold_amount=Decimal('10.0000'), gold_price=self.gold_price, status='WAITING')
         response = self.client.get(reverse('admin-gold-purchase-transaction-list'))
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data['results']), 1)
 
     def test_gold_purchase_transaction_admin_list_search(self):
         self.authenticate_admin()
         transaction = GoldPurchaseTransaction.objects.create(user=self.regular_user, money_amount=Decimal('500.00'), gold_amount=Decimal('10.0000'), gold_price=self.gold_price, status='WAITING')
         response = self.client.get(reverse('admin-gold-purchase-transaction-list'), {'search': self.regular_user.username})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['user']['username'], self.regular_user.username)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['user']['username'], self.regular_user.username)
 
     def test_gold_purchase_transaction_admin_create(self):
         self.authenticate_admin()
@@ -605,6 +899,44 @@ class GoldPurchaseTransactionAdminAPIViewTests(BaseTestCase):
         transaction.refresh_from_db()
         self.assertEqual(transaction.status, 'ACCEPTED')
 
+    def test_gold_purchase_transaction_admin_accept_settles_wallet(self):
+        self.authenticate_admin()
+        wallet = Wallet.objects.create(user=self.regular_user, money_stock=Decimal('1000.00'), gold_stock=Decimal('0.0000'))
+        transaction = GoldPurchaseTransaction.objects.create(user=self.regular_user, money_amount=Decimal('500.00'), gold_amount=Decimal('10.0000'), gold_price=self.gold_price, status='WAITING')
+        response = self.client.patch(reverse('admin-gold-purchase-transaction-detail', kwargs={'id': transaction.id}), {'status': 'ACCEPTED'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'ACCEPTED')
+        wallet.refresh_from_db()
+        self.gold_price.refresh_from_db()
+        self.assertEqual(wallet.money_stock, Decimal('500.00'))
+        self.assertEqual(wallet.gold_stock, Decimal('10.0000'))
+        self.assertEqual(self.gold_price.total_gold_stock, Decimal('990.0000'))
+
+    def test_gold_purchase_transaction_admin_accept_insufficient_money(self):
+        self.authenticate_admin()
+        Wallet.objects.create(user=self.regular_user, money_stock=Decimal('100.00'), gold_stock=Decimal('0.0000'))
+        transaction = GoldPurchaseTransaction.objects.create(user=self.regular_user, money_amount=Decimal('500.00'), gold_amount=Decimal('10.0000'), gold_price=self.gold_price, status='WAITING')
+        response = self.client.patch(reverse('admin-gold-purchase-transaction-detail', kwargs={'id': transaction.id}), {'status': 'ACCEPTED'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('status', response.data)
+        transaction.refresh_from_db()
+        self.assertEqual(transaction.status, 'WAITING')
+
+    def test_gold_purchase_transaction_admin_settle_batch(self):
+        self.authenticate_admin()
+        Wallet.objects.create(user=self.regular_user, money_stock=Decimal('700.00'), gold_stock=Decimal('0.0000'))
+        accepted = GoldPurchaseTransaction.objects.create(user=self.regular_user, money_amount=Decimal('500.00'), gold_amount=Decimal('1.0000'), gold_price=self.gold_price, status='WAITING')
+        rejected = GoldPurchaseTransaction.objects.create(user=self.regular_user, money_amount=Decimal('500.00'), gold_amount=Decimal('1.0000'), gold_price=self.gold_price, status='WAITING')
+        response = self.client.post(reverse('admin-gold-purchase-transaction-settle-batch'), {'gold_price': self.gold_price.id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['accepted'], [accepted.id])
+        self.assertEqual(response.data['rejected'], [rejected.id])
+
+    def test_gold_purchase_transaction_admin_settle_batch_unauthorized(self):
+        self.authenticate_user()
+        response = self.client.post(reverse('admin-gold-purchase-transaction-settle-batch'), {'gold_price': self.gold_price.id})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
     def test_gold_purchase_transaction_admin_destroy(self):
         self.authenticate_admin()
         transaction = GoldPurchaseTransaction.objects.create(user=self.regular_user, money_amount=Decimal('500.00'), gold_amount=Decimal('10.0000'), gold_price=self.gold_price, status='WAITING')
@@ -624,8 +956,8 @@ class GoldPurchaseTransactionAPIViewTests(BaseTestCase):
         GoldPurchaseTransaction.objects.create(user=self.regular_user, money_amount=Decimal('500.00'), gold_amount=Decimal('10.0000'), gold_price=self.gold_price, status='WAITING')
         response = self.client.get(reverse('gold-purchase-transaction-list'))
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['user']['username'], self.regular_user.username)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['user']['username'], self.regular_user.username)
 
     def test_gold_purchase_transaction_user_create(self):
         self.authenticate_user()
@@ -703,15 +1035,15 @@ class MoneyWithdrawalRequestAdminAPIViewTests(BaseTestCase):
         MoneyWithdrawalRequest.objects.create(user=self.regular_user, money_amount=Decimal('200.00'), status='WAITING')
         response = self.client.get(reverse('admin-money-withdrawal-request-list'))
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data['results']), 1)
 
     def test_money_withdrawal_request_admin_list_search(self):
         self.authenticate_admin()
         request = MoneyWithdrawalRequest.objects.create(user=self.regular_user, money_amount=Decimal('200.00'), status='WAITING')
         response = self.client.get(reverse('admin-money-withdrawal-request-list'), {'search': self.regular_user.username})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['user']['username'], self.regular_user.username)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['user']['username'], self.regular_user.username)
 
     def test_money_withdrawal_request_admin_create(self):
         self.authenticate_admin()
@@ -765,8 +1097,8 @@ class MoneyWithdrawalRequestAPIViewTests(BaseTestCase):
         MoneyWithdrawalRequest.objects.create(user=self.regular_user, money_amount=Decimal('200.00'), status='WAITING')
         response = self.client.get(reverse('money-withdrawal-request-list'))
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['user']['username'], self.regular_user.username)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['user']['username'], self.regular_user.username)
 
     def test_money_withdrawal_request_user_create(self):
         self.authenticate_user()
@@ -843,15 +1175,15 @@ class GoldWithdrawalRequestAdminAPIViewTests(BaseTestCase):
         GoldWithdrawalRequest.objects.create(user=self.regular_user, gold_amount=Decimal('5.0000'), status='WAITING')
         response = self.client.get(reverse('admin-gold-withdrawal-request-list'))
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data['results']), 1)
 
     def test_gold_withdrawal_request_admin_list_search(self):
         self.authenticate_admin()
         request = GoldWithdrawalRequest.objects.create(user=self.regular_user, gold_amount=Decimal('5.0000'), status='WAITING')
         response = self.client.get(reverse('admin-gold-withdrawal-request-list'), {'search': self.regular_user.username})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['user']['username'], self.regular_user.username)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['user']['username'], self.regular_user.username)
 
     def test_gold_withdrawal_request_admin_create(self):
         self.authenticate_admin()
@@ -905,8 +1237,8 @@ class GoldWithdrawalRequestAPIViewTests(BaseTestCase):
         GoldWithdrawalRequest.objects.create(user=self.regular_user, gold_amount=Decimal('5.0000'), status='WAITING')
         response = self.client.get(reverse('gold-withdrawal-request-list'))
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['user']['username'], self.regular_user.username)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['user']['username'], self.regular_user.username)
 
     def test_gold_withdrawal_request_user_create(self):
         self.authenticate_user()
@@ -976,6 +1308,760 @@ class GoldWithdrawalRequestAPIViewTests(BaseTestCase):
         response = self.client.delete(reverse('gold-withdrawal-request-detail', kwargs={'pk': request.id}))
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
+# ConditionalGetMixin Tests
+class ConditionalWalletView(ConditionalGetMixin, GenericViewSet, mixins.ListModelMixin, mixins.RetrieveModelMixin):
+    serializer_class = WalletSerializer
+    queryset = Wallet.objects.all()
+    lookup_field = 'id'
+    pagination_class = None
+
+class ConditionalGetMixinTests(BaseTestCase):
+    def get(self, action, etag=None, **kwargs):
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag is not None else {}
+        request = APIRequestFactory().get('/wallets/', **headers)
+        force_authenticate(request, user=self.admin_user)
+        return ConditionalWalletView.as_view({'get': action})(request, **kwargs)
+
+    def test_default_validators_follow_count_and_update_stamps(self):
+        wallet = Wallet.objects.create(user=self.regular_user, money_stock=Decimal('1000.00'), gold_stock=Decimal('10.0000'))
+        etag = self.get('list')['ETag']
+        # One aggregate query versions the records; none are loaded.
+        with self.assertNumQueries(1):
+            response = self.get('list', etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(self.get('retrieve', self.get('retrieve', id=wallet.id)['ETag'], id=wallet.id).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        Wallet.objects.create(user=self.admin_user)
+        self.assertEqual(self.get('list', etag).status_code, status.HTTP_200_OK)
+        etag = self.get('list')['ETag']
+        Wallet.objects.filter(pk=wallet.pk).update(money_stock=Decimal('900.00'))
+        self.assertEqual(self.get('list', etag).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.get('retrieve', '*', id=0).status_code, status.HTTP_404_NOT_FOUND)
+
+# Pagination Tests
+class PaginationTests(BaseTestCase):
+    def create_payments(self, count, payment_date=None):
+        payment_date = payment_date or timezone.now()
+        return [
+            PaymentTransaction.objects.create(user=self.regular_user, money_amount=Decimal('100.00'), payment_date=payment_date)
+            for _ in range(count)
+        ]
+
+    def test_keyset_pagination_walks_all_pages(self):
+        self.authenticate_admin()
+        now = timezone.now()
+        payments = [
+            PaymentTransaction.objects.create(user=self.regular_user, money_amount=Decimal('100.00'), payment_date=now - timedelta(minutes=index % 3))
+            for index in range(7)
+        ]
+        expected = [payment.id for payment in sorted(payments, key=lambda payment: (payment.payment_date, payment.id), reverse=True)]
+        seen = []
+        url = reverse('admin-payment-transaction-list') + '?page_size=3'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(seen, expected)
+
+    def test_keyset_pagination_previous_link(self):
+        self.authenticate_admin()
+        self.create_payments(5, payment_date=timezone.now())
+        first = self.client.get(reverse('admin-payment-transaction-list'), {'page_size': 2})
+        self.assertIsNone(first.data['previous'])
+        second = self.client.get(first.data['next'])
+        back = self.client.get(second.data['previous'])
+        self.assertEqual(back.data['results'], first.data['results'])
+
+    def test_keyset_pagination_page_size_cap(self):
+        self.authenticate_admin()
+        self.create_payments(4)
+        with self.settings(PAGINATION_MAX_PAGE_SIZE=3):
+            response = self.client.get(reverse('admin-payment-transaction-list'), {'page_size': 100})
+        self.assertEqual(len(response.data['results']), 3)
+        self.assertIsNotNone(response.data['next'])
+
+    def test_keyset_pagination_invalid_cursor(self):
+        self.authenticate_admin()
+        response = self.client.get(reverse('admin-payment-transaction-list'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_admin_offset_pagination_opt_in(self):
+        self.authenticate_admin()
+        self.create_payments(3)
+        response = self.client.get(reverse('admin-payment-transaction-list'), {'page': 2, 'page_size': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_user_list_ignores_offset_pagination(self):
+        self.authenticate_user()
+        self.create_payments(3)
+        response = self.client.get(reverse('payment-transaction-list'), {'page': 2, 'page_size': 2})
+        self.assertNotIn('count', response.data)
+        self.assertEqual(len(response.data['results']), 2)
+
+# OwnerScopedViewSet Tests
+class OwnerScopedViewSetTests(BaseTestCase):
+    def test_detail_request_query_count(self):
+        self.authenticate_user()
+        payment = PaymentTransaction.objects.create(user=self.regular_user, money_amount=Decimal('500.00'), status='PENDING')
+        # One query loads the authenticated user, one loads the payment.
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('payment-transaction-detail', kwargs={'id': payment.id}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['user']['username'], self.regular_user.username)
+
+    def test_trade_detail_request_query_count(self):
+        self.authenticate_user()
+        sale = GoldSaleTransaction.objects.create(user=self.regular_user, money_amount=Decimal('500.00'), gold_amount=Decimal('1.0000'), gold_price=self.gold_price)
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('gold-sale-transaction-detail', kwargs={'id': sale.id}))
+        self.assertEqual(response.data['gold_price']['id'], self.gold_price.id)
+
+    def test_list_request_query_count(self):
+        self.authenticate_user()
+        for amount in ('500.00', '600.00'):
+            PaymentTransaction.objects.create(user=self.regular_user, money_amount=Decimal(amount), status='PENDING')
+        PaymentTransaction.objects.create(user=self.admin_user, money_amount=Decimal('700.00'), status='PENDING')
+        expected = json.loads(JSONRenderer().render(PaymentTransactionSerializer(
+            PaymentTransaction.objects.filter(user=self.regular_user).order_by('-payment_date', '-id'), many=True
+        ).data))
+        # The owner is rendered once from the authenticated user instead of being joined.
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('payment-transaction-list'))
+        self.assertEqual(json.loads(response.content)['results'], expected)
+
+    def test_update_fetches_object_once(self):
+        self.authenticate_user()
+        payment = PaymentTransaction.objects.create(user=self.regular_user, money_amount=Decimal('500.00'), status='PENDING')
+        # Authenticated user, payment, update.
+        with self.assertNumQueries(3):
+            response = self.client.patch(reverse('payment-transaction-detail', kwargs={'id': payment.id}), {'money_amount': '600.00'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_other_users_records_are_not_found(self):
+        self.authenticate_user()
+        payment = PaymentTransaction.objects.create(user=self.admin_user, money_amount=Decimal('500.00'), status='PENDING')
+        url = reverse('payment-transaction-detail', kwargs={'id': payment.id})
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.patch(url, {'money_amount': '1.00'}).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.delete(url).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertTrue(PaymentTransaction.objects.filter(id=payment.id).exists())
+
+    def test_create_assigns_authenticated_user(self):
+        self.authenticate_user()
+        response = self.client.post(reverse('payment-transaction-list'), {'money_amount': '600.00', 'status': 'PENDING'})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(PaymentTransaction.objects.get(id=response.data['id']).user, self.regular_user)
+
+    def test_owner_cannot_set_status(self):
+        self.authenticate_user()
+        response = self.client.post(reverse('payment-transaction-list'), {'money_amount': '600.00', 'status': 'SUCCESS'})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['status'], 'PENDING')
+        url = reverse('payment-transaction-detail', kwargs={'id': response.data['id']})
+        response = self.client.patch(url, {'status': 'SUCCESS', 'money_amount': '700.00'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data['status'], response.data['money_amount']), ('PENDING', '700.00'))
+
+    def test_settled_records_cannot_be_changed_by_owner(self):
+        wallet = Wallet.objects.create(user=self.regular_user, money_stock=Decimal('0.00'))
+        payment = PaymentTransaction.objects.create(user=self.regular_user, money_amount=Decimal('500.00'))
+        self.authenticate_admin()
+        admin_url = reverse('admin-payment-transaction-detail', kwargs={'id': payment.id})
+        self.assertEqual(self.client.patch(admin_url, {'status': 'SUCCESS'}).status_code, status.HTTP_200_OK)
+
+        self.authenticate_user()
+        url = reverse('payment-transaction-detail', kwargs={'id': payment.id})
+        self.assertEqual(self.client.patch(url, {'status': 'PENDING'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.patch(url, {'money_amount': '900.00'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.delete(url).status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.authenticate_admin()
+        self.client.patch(admin_url, {'status': 'SUCCESS'})
+        payment.refresh_from_db()
+        wallet.refresh_from_db()
+        self.assertEqual((payment.status, payment.money_amount), ('SUCCESS', Decimal('500.00')))
+        self.assertEqual(wallet.money_stock, Decimal('500.00'))
+        self.assertEqual(LedgerEntry.objects.filter(wallet=wallet).count(), 1)
+
+    def test_settled_trades_cannot_be_deleted_by_owner(self):
+        self.authenticate_user()
+        sale = GoldSaleTransaction.objects.create(user=self.regular_user, money_amount=Decimal('500.00'), gold_amount=Decimal('1.0000'), gold_price=self.gold_price, status='ACCEPTED')
+        url = reverse('gold-sale-transaction-detail', kwargs={'id': sale.id})
+        self.assertEqual(self.client.delete(url).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertTrue(GoldSaleTransaction.objects.filter(id=sale.id).exists())
+        GoldSaleTransaction.objects.filter(id=sale.id).update(status='WAITING')
+        self.assertEqual(self.client.delete(url).status_code, status.HTTP_204_NO_CONTENT)
+
+    def test_owner_update_loses_to_a_concurrent_settlement(self):
+        payment = PaymentTransaction.objects.create(user=self.regular_user, money_amount=Decimal('500.00'))
+        serializer = OwnerPaymentTransactionSerializer(payment, data={'money_amount': '900.00'}, partial=True)
+        serializer.is_valid(raise_exception=True)
+        # Settled after the owner's request loaded the payment as pending.
+        PaymentTransaction.objects.filter(pk=payment.pk).update(status='SUCCESS')
+        with self.assertRaises(ValidationError):
+            PaymentTransactionAPIView().perform_update(serializer)
+        self.assertEqual(PaymentTransaction.objects.get(pk=payment.pk).money_amount, Decimal('500.00'))
+
+# ClaimsJWTAuthentication Tests
+class ClaimsJWTAuthenticationTests(BaseTestCase):
+    def login(self, username, password):
+        response = self.client.post(reverse('token_obtain_pair'), {'username': username, 'password': password})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def use_token(self, token):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_login_token_carries_user_claims(self):
+        token = AccessToken(self.login('user', 'user123')['access'])
+        self.assertEqual(token['username'], 'user')
+        self.assertEqual(token['user_role'], 'customer')
+        self.assertFalse(token['is_staff'])
+
+    def test_detail_request_skips_user_query(self):
+        self.use_token(self.login('user', 'user123')['access'])
+        payment = PaymentTransaction.objects.create(user=self.regular_user, money_amount=Decimal('500.00'), status='PENDING')
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('payment-transaction-detail', kwargs={'id': payment.id}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['user']['email'], 'user@example.com')
+
+    def test_create_and_permissions_work_from_claims(self):
+        self.use_token(self.login('user', 'user123')['access'])
+        response = self.client.post(reverse('payment-transaction-list'), {'money_amount': '600.00', 'status': 'PENDING'}, HTTP_IDEMPOTENCY_KEY='claims')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(PaymentTransaction.objects.get(id=response.data['id']).user, self.regular_user)
+        self.assertEqual(self.client.get(reverse('admin-payment-transaction-list')).status_code, status.HTTP_403_FORBIDDEN)
+        self.use_token(self.login('admin', 'admin123')['access'])
+        self.assertEqual(self.client.get(reverse('admin-payment-transaction-list')).status_code, status.HTTP_200_OK)
+
+    def test_deactivation_revokes_issued_tokens(self):
+        self.use_token(self.login('user', 'user123')['access'])
+        self.assertEqual(self.client.get(reverse('wallet-list')).status_code, status.HTTP_200_OK)
+        self.regular_user.is_active = False
+        self.regular_user.save()
+        self.assertEqual(self.client.get(reverse('wallet-list')).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_profile_changes_do_not_revoke_tokens(self):
+        self.use_token(self.login('user', 'user123')['access'])
+        user = CustomUser.objects.get(pk=self.regular_user.pk)
+        user.first_name = 'Renamed'
+        user.save()
+        self.assertEqual(self.client.get(reverse('wallet-list')).status_code, status.HTTP_200_OK)
+
+    def test_startup_requires_shared_cache_outside_debug(self):
+        from django.core.exceptions import ImproperlyConfigured
+        from apps.core.apps import require_shared_cache
+
+        locmem = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+        shared = {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}
+        for caches_setting in ({'default': locmem, 'revocations': shared}, {'default': shared, 'revocations': locmem}):
+            with self.settings(DEBUG=False, SINGLE_PROCESS=False, CACHES=caches_setting):
+                with self.assertRaises(ImproperlyConfigured):
+                    require_shared_cache()
+            with self.settings(DEBUG=False, SINGLE_PROCESS=True, CACHES=caches_setting):
+                require_shared_cache()
+        with self.settings(DEBUG=False, SINGLE_PROCESS=False, CACHES={'default': shared, 'revocations': shared}):
+            require_shared_cache()
+
+    def test_revocation_survives_default_cache_eviction(self):
+        from django.core.cache import cache
+
+        self.use_token(self.login('user', 'user123')['access'])
+        self.regular_user.is_active = False
+        self.regular_user.save()
+        # More keys than the default cache's MAX_ENTRIES, so it culls its oldest entries.
+        for index in range(400):
+            cache.set(f'filler:{index}', index)
+        self.assertEqual(self.client.get(reverse('wallet-list')).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_refresh_reloads_claims(self):
+        tokens = self.login('user', 'user123')
+        user = CustomUser.objects.get(pk=self.regular_user.pk)
+        user.is_staff = True
+        user.save()
+        self.use_token(tokens['access'])
+        self.assertEqual(self.client.get(reverse('wallet-list')).status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.client.post(reverse('token_refresh'), {'refresh': tokens['refresh']})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(AccessToken(response.data['access'])['is_staff'])
+
+# GoldPriceStream Tests
+class GoldPriceStreamTests(BaseTestCase):
+    def read_stream(self, token, during_stream):
+        """
+        Open the stream, read the first event, run `during_stream` and read the next event.
+        """
+        async def read():
+            response = await AsyncClient().get(reverse('gold-price-stream'), headers={'Authorization': f'Bearer {token}'})
+            events = response.streaming_content
+            first = (await anext(events)).decode()
+            # Let the broadcaster start listening before anything is published.
+            await asyncio.sleep(0)
+            await sync_to_async(during_stream)()
+            second = (await anext(events)).decode()
+            await events.aclose()
+            return response, first, second
+
+        return async_to_sync(read)()
+
+    def activate_price(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return GoldPrice.objects.create(sale_price=Decimal('2600000.00'), total_gold_stock=Decimal('500.0000'), active=True)
+
+    def test_stream_sends_current_then_activated_prices(self):
+        response, first, second = self.read_stream(self.user_token, self.activate_price)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertTrue(first.startswith('event: price\ndata: '))
+        self.assertEqual(json.loads(first.split('data: ')[1])['id'], self.gold_price.id)
+        self.assertEqual(json.loads(second.split('data: ')[1])['sale_price'], '2600000.00')
+
+    def test_stream_requires_authentication(self):
+        async def read():
+            return await AsyncClient().get(reverse('gold-price-stream'))
+
+        self.assertEqual(async_to_sync(read)().status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_stream_requires_asgi(self):
+        self.authenticate_user()
+        self.assertEqual(self.client.get(reverse('gold-price-stream')).status_code, status.HTTP_501_NOT_IMPLEMENTED)
+
+# GoldPriceCandleAPIView Tests
+class GoldPriceCandleAPIViewTests(BaseTestCase):
+    def test_candles_serve_buckets_in_range(self):
+        self.authenticate_user()
+        hour = self.gold_price.date.replace(minute=0, second=0, microsecond=0)
+        GoldPrice.objects.create(date=hour - timedelta(hours=1), sale_price=Decimal('2400000.00'), active=False)
+        GoldPrice.objects.create(date=hour - timedelta(hours=5), sale_price=Decimal('2300000.00'), active=False)
+        url = reverse('gold-price-candles')
+        # The authenticated user and the candles.
+        with self.assertNumQueries(2):
+            response = self.client.get(url, {'interval': '1h', 'from': (hour - timedelta(hours=2)).isoformat()})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([candle['close'] for candle in response.data], ['2400000.00', '2500000.00'])
+        self.assertEqual(response.data[1]['tick_count'], 1)
+
+    def test_candles_reject_invalid_ranges(self):
+        self.authenticate_user()
+        url = reverse('gold-price-candles')
+        now = timezone.now()
+        self.assertEqual(self.client.get(url, {'interval': '5m'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(url, {'from': now.isoformat(), 'to': (now - timedelta(hours=1)).isoformat()}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(url, {'interval': '1m', 'from': (now - timedelta(days=30)).isoformat()}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_as_of_serves_price_in_effect(self):
+        self.authenticate_user()
+        earlier = GoldPrice.objects.create(date=self.gold_price.date - timedelta(hours=1), sale_price=Decimal('2400000.00'), active=False)
+        url = reverse('gold-price-as-of')
+        response = self.client.get(url, {'at': (self.gold_price.date - timedelta(minutes=1)).isoformat()})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['id'], earlier.id)
+        self.assertEqual(self.client.get(url, {'at': timezone.now().isoformat()}).data['id'], self.gold_price.id)
+        self.assertEqual(self.client.get(url, {'at': (earlier.date - timedelta(days=1)).isoformat()}).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_candles_require_authentication(self):
+        self.assertEqual(self.client.get(reverse('gold-price-candles')).status_code, status.HTTP_401_UNAUTHORIZED)
+
+# ActivityAPIView Tests
+class ActivityAPIViewTests(BaseTestCase):
+    def create_activity(self, user=None):
+        user = user or self.regular_user
+        now = timezone.now()
+        PaymentTransaction.objects.create(user=user, money_amount=Decimal('100.00'), payment_date=now - timedelta(minutes=5))
+        GoldSaleTransaction.objects.create(user=user, money_amount=Decimal('200.00'), gold_amount=Decimal('1.0000'), gold_price=self.gold_price, create_date=now - timedelta(minutes=4))
+        GoldPurchaseTransaction.objects.create(user=user, money_amount=Decimal('300.00'), gold_amount=Decimal('2.0000'), gold_price=self.gold_price, create_date=now - timedelta(minutes=3))
+        MoneyWithdrawalRequest.objects.create(user=user, money_amount=Decimal('400.00'), create_date=now - timedelta(minutes=2))
+        GoldWithdrawalRequest.objects.create(user=user, gold_amount=Decimal('3.0000'), create_date=now - timedelta(minutes=1))
+
+    def test_activity_merges_all_kinds_newest_first(self):
+        self.authenticate_user()
+        self.create_activity()
+        self.create_activity(user=self.admin_user)
+        response = self.client.get(reverse('activity-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [row['kind'] for row in response.data['results']],
+            ['gold_withdrawal', 'money_withdrawal', 'gold_purchase', 'gold_sale', 'payment'],
+        )
+        self.assertEqual(response.data['results'][0]['money_amount'], None)
+        self.assertEqual(response.data['results'][0]['gold_amount'], '3.0000')
+        self.assertEqual(response.data['results'][4]['money_amount'], '100.00')
+
+    def test_activity_is_a_single_query(self):
+        self.authenticate_user()
+        self.create_activity()
+        # One query loads the authenticated user, one reads the whole feed.
+        with self.assertNumQueries(2):
+            self.client.get(reverse('activity-list'))
+
+    def test_activity_cursor_pagination(self):
+        self.authenticate_user()
+        self.create_activity()
+        self.create_activity()
+        kinds = []
+        url = reverse('activity-list') + '?page_size=3'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            kinds.extend(row['kind'] for row in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(len(kinds), 10)
+        self.assertEqual(kinds[:2], ['gold_withdrawal', 'gold_withdrawal'])
+        self.assertEqual(kinds[-2:], ['payment', 'payment'])
+
+        back = self.client.get(response.data['previous'])
+        self.assertEqual(len(back.data['results']), 3)
+        self.assertIsNotNone(back.data['previous'])
+
+    def test_activity_unauthenticated(self):
+        response = self.client.get(reverse('activity-list'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+# Idempotency Tests
+class IdempotentPaymentView(APIView):
+    @idempotent
+    def post(self, request):
+        if 'money_amount' not in request.data:
+            raise ValidationError({'money_amount': ['This field is required.']})
+        payment = PaymentTransaction.objects.create(user=request.user, money_amount=Decimal(request.data['money_amount']))
+        return Response({'id': payment.id, 'money_amount': payment.money_amount}, status=status.HTTP_201_CREATED)
+
+class IdempotencyTests(BaseTestCase):
+    def post(self, data, key=None):
+        headers = {'HTTP_IDEMPOTENCY_KEY': key} if key is not None else {}
+        request = APIRequestFactory().post('/payments/', data, format='json', **headers)
+        force_authenticate(request, user=self.regular_user)
+        return IdempotentPaymentView.as_view()(request)
+
+    def test_retry_replays_stored_response(self):
+        first = self.post({'money_amount': '100.00'}, key='retry-1')
+        second = self.post({'money_amount': '100.00'}, key='retry-1')
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.data['id'], first.data['id'])
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+        self.assertEqual(PaymentTransaction.objects.count(), 1)
+
+    def test_without_key_every_request_runs(self):
+        self.post({'money_amount': '100.00'})
+        self.post({'money_amount': '100.00'})
+        self.assertEqual(PaymentTransaction.objects.count(), 2)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+    def test_key_reused_with_different_body(self):
+        self.post({'money_amount': '100.00'}, key='reused')
+        response = self.post({'money_amount': '200.00'}, key='reused')
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(PaymentTransaction.objects.count(), 1)
+
+    def test_keys_are_scoped_per_user(self):
+        self.post({'money_amount': '100.00'}, key='shared')
+        request = APIRequestFactory().post('/payments/', {'money_amount': '100.00'}, format='json', HTTP_IDEMPOTENCY_KEY='shared')
+        force_authenticate(request, user=self.admin_user)
+        response = IdempotentPaymentView.as_view()(request)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(PaymentTransaction.objects.count(), 2)
+
+    def test_failed_request_is_not_stored(self):
+        response = self.post({}, key='failed')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+    def test_in_progress_key_conflicts(self):
+        self.post({'money_amount': '100.00'}, key='busy')
+        IdempotencyKey.objects.update(status_code=None, response_body=None)
+        response = self.post({'money_amount': '100.00'}, key='busy')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+    def test_expired_key_runs_again(self):
+        self.post({'money_amount': '100.00'}, key='expired')
+        IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        response = self.post({'money_amount': '100.00'}, key='expired')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn('Idempotent-Replayed', response)
+        self.assertEqual(PaymentTransaction.objects.count(), 2)
+
+    def test_purge_command_deletes_expired_keys(self):
+        self.post({'money_amount': '100.00'}, key='old')
+        self.post({'money_amount': '100.00'}, key='fresh')
+        IdempotencyKey.objects.filter(key='old').update(expires_at=timezone.now() - timedelta(seconds=1))
+        call_command('purge_idempotency_keys', stdout=StringIO())
+        self.assertEqual(list(IdempotencyKey.objects.values_list('key', flat=True)), ['fresh'])
+
+# SparseFieldset Tests
+class SparseFieldsetTests(BaseTestCase):
+    def create_sale(self, user=None):
+        return GoldSaleTransaction.objects.create(user=user or self.regular_user, money_amount=Decimal('500.00'), gold_amount=Decimal('1.0000'), gold_price=self.gold_price)
+
+    def test_list_returns_requested_fields_and_relation_ids(self):
+        self.authenticate_admin()
+        sale = self.create_sale()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('admin-gold-sale-transaction-list'), {'fields': 'id,status,gold_price', 'expand': ''})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'], [{'id': sale.id, 'gold_price': self.gold_price.id, 'status': 'WAITING'}])
+        page_sql = queries.captured_queries[-1]['sql']
+        self.assertNotIn('JOIN', page_sql)
+        self.assertNotIn('money_amount', page_sql)
+
+    def test_expand_embeds_only_the_named_relations(self):
+        self.authenticate_admin()
+        sale = self.create_sale()
+        response = self.client.get(reverse('admin-gold-sale-transaction-list'), {'expand': 'user'})
+        row = response.data['results'][0]
+        self.assertEqual(row['user']['username'], self.regular_user.username)
+        self.assertEqual(row['gold_price'], self.gold_price.id)
+        self.assertEqual(row['money_amount'], '500.00')
+
+    def test_detail_loads_only_requested_columns(self):
+        self.authenticate_admin()
+        sale = self.create_sale()
+        url = reverse('admin-gold-sale-transaction-detail', kwargs={'id': sale.id})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'fields': 'id,user,money_amount', 'expand': 'user'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data), {'id', 'user', 'money_amount'})
+        self.assertEqual(response.data['user']['username'], self.regular_user.username)
+        sql = queries.captured_queries[-1]['sql']
+        self.assertIn('JOIN', sql)
+        self.assertNotIn('gold_amount', sql)
+        self.assertNotIn('sale_price', sql)
+
+    def test_owner_scoped_list_renders_owner_as_id(self):
+        self.authenticate_user()
+        self.create_sale()
+        self.create_sale(user=self.admin_user)
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('gold-sale-transaction-list'), {'fields': 'user,gold_price', 'expand': 'gold_price'})
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['user'], self.regular_user.id)
+        self.assertEqual(response.data['results'][0]['gold_price']['id'], self.gold_price.id)
+
+    def test_wallet_fields_can_leave_out_the_latest_price(self):
+        self.authenticate_user()
+        wallet = Wallet.objects.create(user=self.regular_user, money_stock=Decimal('100.00'), gold_stock=Decimal('1.0000'))
+        url = reverse('wallet-detail', kwargs={'id': wallet.id})
+        self.assertEqual(self.client.get(url, {'fields': 'money_stock'}).data, {'money_stock': '100.00'})
+        self.assertIn('latest_gold_price', self.client.get(url, {'fields': 'money_stock,latest_gold_price'}).data)
+
+    def test_unknown_names_are_rejected(self):
+        self.authenticate_admin()
+        response = self.client.get(reverse('admin-gold-sale-transaction-list'), {'fields': 'id,secret'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('fields', response.data)
+        response = self.client.get(reverse('admin-gold-sale-transaction-list'), {'expand': 'status'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('expand', response.data)
+
+# FastJSON Tests
+class FastJSONTests(BaseTestCase):
+    def test_renderer_matches_drf_output(self):
+        from uuid import UUID
+        from django.utils.translation import gettext_lazy
+        data = {
+            'money_amount': '1234.50',
+            'raw_decimal': Decimal('0.1000'),
+            'date': timezone.now(),
+            'naive': timezone.now().replace(tzinfo=None),
+            'day': timezone.now().date(),
+            'elapsed': timedelta(seconds=90),
+            'label': gettext_lazy('Waiting'),
+            'id': UUID('12345678-1234-5678-1234-567812345678'),
+            'text': 'طلا \u2028 gold',
+            'big': 2 ** 70,
+            'nested': [{1: None, 'ok': True}],
+        }
+        for accepted in (None, 'application/json; indent=4'):
+            self.assertEqual(
+                FastJSONRenderer().render(data, accepted, {}),
+                JSONRenderer().render(data, accepted, {}),
+            )
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+    def test_parser_matches_drf_output(self):
+        body = b'{"amount": 1.5, "ids": [1, 2], "name": "\xd8\xb7\xd9\x84\xd8\xa7"}'
+        self.assertEqual(FastJSONParser().parse(BytesIO(body)), JSONParser().parse(BytesIO(body)))
+        body = '{"name": "طلا"}'.encode('utf-16')
+        self.assertEqual(FastJSONParser().parse(BytesIO(body), parser_context={'encoding': 'utf-16'}), {'name': 'طلا'})
+        with self.assertRaisesMessage(ParseError, 'JSON parse error - '):
+            FastJSONParser().parse(BytesIO(b'{"amount": NaN}'))
+
+    def test_responses_are_rendered_like_drf(self):
+        self.authenticate_admin()
+        GoldSaleTransaction.objects.create(user=self.regular_user, money_amount=Decimal('500.00'), gold_amount=Decimal('1.2345'), gold_price=self.gold_price)
+        response = self.client.get(reverse('admin-gold-sale-transaction-list'))
+        self.assertEqual(response.content, JSONRenderer().render(response.data))
+        self.authenticate_user()
+        response = self.client.post(reverse('payment-transaction-list'), {'money_amount': 12.5, 'status': 'PENDING'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['money_amount'], '12.50')
+
+# Export Tests
+class ExportTests(BaseTestCase):
+    def export(self, name, params=None):
+        response = self.client.get(reverse(f'admin-{name}-export'), params or {})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_payments_stream_as_ndjson_in_payment_date_order(self):
+        self.authenticate_admin()
+        payments = [PaymentTransaction.objects.create(user=self.regular_user, money_amount=Decimal(amount)) for amount in ('10.00', '20.00', '30.00')]
+        with override_settings(EXPORT_CHUNK_SIZE=2):
+            response = self.client.get(reverse('admin-payment-transaction-export'))
+            chunks = list(response.streaming_content)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertIn('attachment; filename="payment-transactions.ndjson"', response['Content-Disposition'])
+        self.assertEqual(len(chunks), 2)
+        rows = [json.loads(line) for line in b''.join(chunks).decode().splitlines()]
+        self.assertEqual(rows, json.loads(JSONRenderer().render(PaymentTransactionSerializer(payments, many=True).data)))
+
+    def test_date_range_filters_on_create_date(self):
+        self.authenticate_admin()
+        now = timezone.now()
+        sales = [
+            GoldSaleTransaction.objects.create(user=self.regular_user, money_amount=Decimal('500.00'), gold_amount=Decimal('1.0000'), gold_price=self.gold_price)
+            for _ in range(3)
+        ]
+        for days, sale in enumerate(sales):
+            GoldSaleTransaction.objects.filter(pk=sale.pk).update(create_date=now - timedelta(days=days))
+        params = {'from': (now - timedelta(days=1, hours=1)).isoformat(), 'to': (now - timedelta(hours=1)).isoformat(), 'fields': 'id'}
+        _response, content = self.export('gold-sale-transaction', params)
+        self.assertEqual([json.loads(line) for line in content.splitlines()], [{'id': sales[1].id}])
+        response = self.client.get(reverse('admin-gold-sale-transaction-export'), {'from': now.isoformat(), 'to': now.isoformat()})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_csv_flattens_nested_fields(self):
+        self.authenticate_admin()
+        purchase = GoldPurchaseTransaction.objects.create(user=self.regular_user, money_amount=Decimal('500.00'), gold_amount=Decimal('1.0000'), gold_price=self.gold_price)
+        response, content = self.export('gold-purchase-transaction', {'output': 'csv', 'fields': 'id,user,money_amount', 'expand': 'user'})
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        rows = list(csv.DictReader(StringIO(content)))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['id'], str(purchase.id))
+        self.assertEqual(rows[0]['user.username'], self.regular_user.username)
+        self.assertEqual(rows[0]['money_amount'], '500.00')
+
+    def test_csv_quotes_cells_that_look_like_formulas(self):
+        self.authenticate_admin()
+        user = CustomUser.objects.create_user(username='=HYPERLINK("http://example.com")', password='pass123', first_name='@SUM(A1)', last_name='-2+3')
+        PaymentTransaction.objects.create(user=user, money_amount=Decimal('10.00'))
+        _response, content = self.export('payment-transaction', {'output': 'csv', 'fields': 'id,user,money_amount', 'expand': 'user'})
+        rows = list(csv.DictReader(StringIO(content)))
+        self.assertEqual(rows[0]['user.username'], '\'=HYPERLINK("http://example.com")')
+        self.assertEqual(rows[0]['user.first_name'], "'@SUM(A1)")
+        self.assertEqual(rows[0]['user.last_name'], "'-2+3")
+        self.assertEqual(rows[0]['money_amount'], '10.00')
+
+    def test_csv_keeps_negative_amounts_as_numbers(self):
+        self.authenticate_admin()
+        payment = PaymentTransaction.objects.create(user=self.regular_user, money_amount=Decimal('10.00'))
+        PaymentTransaction.objects.filter(pk=payment.pk).update(money_amount=Decimal('-5.00'))
+        _response, content = self.export('payment-transaction', {'output': 'csv', 'fields': 'id,money_amount'})
+        rows = list(csv.DictReader(StringIO(content)))
+        self.assertEqual(rows[0]['money_amount'], '-5.00')
+        self.assertEqual(csv_cell('+12'), '+12')
+        self.assertEqual(csv_cell('-5.00+1'), "'-5.00+1")
+        self.assertEqual(csv_cell('-1e3'), "'-1e3")
+
+    def test_empty_csv_still_has_a_header(self):
+        self.authenticate_admin()
+        _response, content = self.export('gold-purchase-transaction', {'output': 'csv', 'fields': 'id,user,money_amount', 'expand': 'user'})
+        self.assertEqual(list(csv.reader(StringIO(content))), [
+            ['id', 'user.username', 'user.first_name', 'user.last_name', 'user.email', 'user.user_role', 'money_amount'],
+        ])
+
+    def test_withdrawals_honour_search(self):
+        self.authenticate_admin()
+        MoneyWithdrawalRequest.objects.create(user=self.regular_user, money_amount=Decimal('100.00'))
+        MoneyWithdrawalRequest.objects.create(user=self.admin_user, money_amount=Decimal('200.00'))
+        _response, content = self.export('money-withdrawal-request', {'search': self.regular_user.username})
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual([row['user']['username'] for row in rows], [self.regular_user.username])
+
+    def test_wallets_export_from_instances_without_date_range(self):
+        self.authenticate_admin()
+        Wallet.objects.create(user=self.regular_user, money_stock=Decimal('1000.00'), gold_stock=Decimal('2.0000'))
+        _response, content = self.export('wallet')
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['total_value'], '5001000.00')
+        self.assertEqual(rows[0]['latest_gold_price']['id'], self.gold_price.id)
+        response = self.client.get(reverse('admin-wallet-export'), {'from': timezone.now().isoformat()})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_requires_admin(self):
+        self.authenticate_user()
+        response = self.client.get(reverse('admin-payment-transaction-export'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+# AdminFilter Tests
+class AdminFilterTests(BaseTestCase):
+    def create_sale(self, user=None, status='WAITING', money_amount='500.00', days_ago=0):
+        sale = GoldSaleTransaction.objects.create(user=user or self.regular_user, money_amount=Decimal(money_amount), gold_amount=Decimal('1.0000'), gold_price=self.gold_price, status=status)
+        GoldSaleTransaction.objects.filter(pk=sale.pk).update(create_date=timezone.now() - timedelta(days=days_ago))
+        return sale
+
+    def list_ids(self, name, params):
+        response = self.client.get(reverse(f'admin-{name}-list'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [row['id'] for row in response.data['results']]
+
+    def test_status_date_and_amount_filters_combine(self):
+        self.authenticate_admin()
+        match = self.create_sale(money_amount='500.00', days_ago=1)
+        self.create_sale(money_amount='500.00', days_ago=1, status='ACCEPTED')
+        self.create_sale(money_amount='50.00', days_ago=1)
+        self.create_sale(money_amount='500.00', days_ago=10)
+        params = {
+            'status': 'WAITING',
+            'create_date_after': (timezone.now() - timedelta(days=2)).isoformat(),
+            'create_date_before': timezone.now().isoformat(),
+            'money_amount_min': '100',
+            'money_amount_max': '1000',
+        }
+        self.assertEqual(self.list_ids('gold-sale-transaction', params), [match.id])
+
+    def test_user_filter_matches_owner_id(self):
+        self.authenticate_admin()
+        payment = PaymentTransaction.objects.create(user=self.regular_user, money_amount=Decimal('10.00'))
+        PaymentTransaction.objects.create(user=self.admin_user, money_amount=Decimal('10.00'))
+        self.assertEqual(self.list_ids('payment-transaction', {'user': self.regular_user.id}), [payment.id])
+        request = GoldWithdrawalRequest.objects.create(user=self.regular_user, gold_amount=Decimal('5.0000'))
+        GoldWithdrawalRequest.objects.create(user=self.regular_user, gold_amount=Decimal('0.5000'))
+        self.assertEqual(self.list_ids('gold-withdrawal-request', {'user': self.regular_user.id, 'gold_amount_min': '1'}), [request.id])
+
+    def test_search_matches_username_only(self):
+        self.authenticate_admin()
+        sale = self.create_sale()
+        self.create_sale(user=self.admin_user)
+        self.assertEqual(self.list_ids('gold-sale-transaction', {'search': 'USE'}), [sale.id])
+        self.assertEqual(self.list_ids('gold-sale-transaction', {'search': 'WAITING'}), [])
+
+    def test_short_search_and_invalid_values_are_rejected(self):
+        self.authenticate_admin()
+        for name, params, field in (
+            ('payment-transaction', {'search': 'us'}, 'search'),
+            ('payment-transaction', {'status': 'PAID'}, 'status'),
+            ('payment-transaction', {'user': 'me'}, 'user'),
+            ('wallet', {'money_stock_min': 'lots'}, 'money_stock'),
+        ):
+            response = self.client.get(reverse(f'admin-{name}-list'), params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+            self.assertIn(field, response.data)
+
+    def test_filters_apply_to_exports(self):
+        self.authenticate_admin()
+        accepted = self.create_sale(status='ACCEPTED')
+        self.create_sale()
+        response = self.client.get(reverse('admin-gold-sale-transaction-export'), {'status': 'ACCEPTED', 'fields': 'id'})
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual(rows, [{'id': accepted.id}])
+
 # Edge Case Tests
 class EdgeCaseTests(BaseTestCase):
     def test_wallet_admin_create_invalid_data(self):
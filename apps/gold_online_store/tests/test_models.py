@@ -1,6 +1,7 @@
 import pytest
+from datetime import timedelta
 from django.utils import timezone
-from django.db import models
+from django.db import IntegrityError, models, transaction
 from decimal import Decimal
 import factory
 from faker import Faker
@@ -168,7 +169,41 @@ def test_gold_price_model_negative_total_gold_stock():
 def test_gold_price_model_index_on_date_and_active():
     gold_price = GoldPriceFactory()
     assert 'date' in [index.fields[0] for index in GoldPrice._meta.indexes]
-    assert 'active' in [index.fields[0] for index in GoldPrice._meta.indexes]
+    assert ('active',) in [constraint.fields for constraint in GoldPrice._meta.constraints]
+
+@pytest.mark.django_db
+def test_gold_price_model_database_allows_one_active_price():
+    first = GoldPriceFactory(active=True)
+    second = GoldPriceFactory(active=False)
+    with pytest.raises(IntegrityError), transaction.atomic():
+        GoldPrice.objects.filter(pk=second.pk).update(active=True)
+    second.active = True
+    second.save()
+    assert list(GoldPrice.objects.filter(active=True).values_list('id', flat=True)) == [second.id]
+    first.refresh_from_db()
+    assert first.active is False
+
+@pytest.mark.django_db
+def test_gold_price_model_as_of_resolves_price_in_effect():
+    now = timezone.now()
+    older = GoldPriceFactory(date=now - timedelta(hours=2), active=False)
+    newer = GoldPriceFactory(date=now - timedelta(hours=1))
+    assert GoldPrice.objects.as_of(now - timedelta(hours=3)) is None
+    assert GoldPrice.objects.as_of(now - timedelta(hours=2)) == older
+    assert GoldPrice.objects.as_of(now - timedelta(minutes=90)) == older
+    assert GoldPrice.objects.as_of(now) == newer
+
+@pytest.mark.django_db
+def test_gold_price_model_as_of_transactions():
+    now = timezone.now()
+    older = GoldPriceFactory(date=now - timedelta(hours=2), active=False)
+    newer = GoldPriceFactory(date=now - timedelta(hours=1))
+    early = GoldSaleTransactionFactory(create_date=now - timedelta(hours=3), gold_price=newer)
+    disputed = GoldSaleTransactionFactory(create_date=now - timedelta(minutes=90), gold_price=newer)
+    recent = GoldSaleTransactionFactory(create_date=now, gold_price=newer)
+    prices = GoldPrice.objects.as_of_transactions(GoldSaleTransaction, [early.pk, disputed.pk, recent.pk, 0])
+    assert prices == {disputed.pk: older, recent.pk: newer}
+    assert GoldPrice.objects.as_of_transactions(GoldSaleTransaction, []) == {}
 
 # PaymentTransaction Model Tests
 @pytest.mark.django_db
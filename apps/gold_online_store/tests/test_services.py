@@ -0,0 +1,712 @@
+import asyncio
+import json
+import threading
+from io import StringIO
+
+import pytest
+from datetime import timedelta
+from decimal import Decimal
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.core.models import CustomUser
+from apps.gold_online_store.models.candle import GoldPriceCandle
+from apps.gold_online_store.models.gold import Wallet, GoldPrice
+from apps.gold_online_store.models.job import Job
+from apps.gold_online_store.models.ledger import LedgerEntry, WalletBalanceCheckpoint
+from apps.gold_online_store.models.payment import PaymentTransaction
+from apps.gold_online_store.models.transaction import GoldSaleTransaction, GoldPurchaseTransaction
+from apps.gold_online_store.models.withdrawal_requests import GoldWithdrawalRequest, MoneyWithdrawalRequest
+from apps.gold_online_store.serializers.gold import GoldPriceSerializer
+from apps.gold_online_store.services.candles import rebuild_candles
+from apps.gold_online_store.services.jobs import JOB_SERVICES, claim_jobs, enqueue, requeue_stale_jobs, run_worker
+from apps.gold_online_store.services.price_ingest import PriceIngestError, ingest_ticks
+from apps.gold_online_store.services.ledger import LedgerError, checkpoint_wallet, post, post_adjustment, wallet_balance
+from apps.gold_online_store.services.price_provider import get_active_gold_price, get_price_version
+from apps.gold_online_store.services.price_stream import InMemoryPriceBroker, PriceBroadcaster
+from apps.gold_online_store.services.settlement import (
+    SettlementError,
+    settle_gold_price_batch,
+    settle_gold_transaction,
+    settle_payment,
+    settle_withdrawal,
+)
+
+
+def create_gold_price(**kwargs):
+    data = {
+        'date': timezone.now(),
+        'sale_price': Decimal('2500000.00'),
+        'price_difference': Decimal('10000.00'),
+        'total_gold_stock': Decimal('1000.0000'),
+        'stock_status': True,
+        'active': True,
+    }
+    data.update(kwargs)
+    return GoldPrice.objects.create(**data)
+
+
+# Active Price Provider Tests
+@pytest.mark.django_db
+def test_price_provider_returns_active_price():
+    create_gold_price(active=False)
+    gold_price = create_gold_price()
+    assert get_active_gold_price() == gold_price
+
+@pytest.mark.django_db
+def test_price_provider_no_active_price():
+    create_gold_price(active=False)
+    assert get_active_gold_price() is None
+    with CaptureQueriesContext(connection) as queries:
+        assert get_active_gold_price() is None
+    assert len(queries) == 0
+
+@pytest.mark.django_db
+def test_price_provider_caches_between_reads():
+    create_gold_price()
+    get_active_gold_price()
+    with CaptureQueriesContext(connection) as queries:
+        for _ in range(10):
+            get_active_gold_price()
+    assert len(queries) == 0
+
+@pytest.mark.django_db
+def test_price_provider_invalidated_on_save():
+    gold_price = create_gold_price(sale_price=Decimal('2500000.00'))
+    version = get_price_version()
+    assert get_active_gold_price().sale_price == Decimal('2500000.00')
+    gold_price.sale_price = Decimal('2600000.00')
+    gold_price.save()
+    assert get_price_version() != version
+    assert get_active_gold_price().sale_price == Decimal('2600000.00')
+
+@pytest.mark.django_db
+def test_price_version_does_not_expire():
+    from unittest import mock
+    from django.core.cache import cache
+    from apps.gold_online_store.services.price_provider import PRICE_VERSION_CACHE_KEY
+
+    cache.delete(PRICE_VERSION_CACHE_KEY)
+    version = get_price_version()
+    later = timezone.now().timestamp() + 60 * 60 * 24
+    with mock.patch('django.core.cache.backends.locmem.time.time', return_value=later):
+        assert cache.get(PRICE_VERSION_CACHE_KEY) == version
+
+@pytest.mark.django_db
+def test_price_provider_invalidated_on_delete():
+    gold_price = create_gold_price()
+    assert get_active_gold_price() == gold_price
+    gold_price.delete()
+    assert get_active_gold_price() is None
+
+@pytest.mark.django_db
+def test_price_provider_invalidated_on_serializer_create():
+    old_price = create_gold_price()
+    assert get_active_gold_price() == old_price
+    serializer = GoldPriceSerializer(data={
+        'sale_price': '2700000.00',
+        'price_difference': '10000.00',
+        'total_gold_stock': '500.0000',
+        'stock_status': True,
+        'active': True,
+    })
+    assert serializer.is_valid(), serializer.errors
+    new_price = serializer.save()
+    assert get_active_gold_price() == new_price
+
+@pytest.mark.django_db
+def test_wallet_total_value_reads_cached_price():
+    create_gold_price(sale_price=Decimal('100.00'))
+    user = CustomUser.objects.create_user(username='walletuser', password='pass123')
+    wallet = Wallet.objects.create(user=user, money_stock=Decimal('50.00'), gold_stock=Decimal('2.0000'))
+    get_active_gold_price()
+    with CaptureQueriesContext(connection) as queries:
+        assert wallet.total_value == Decimal('250.00')
+    assert len(queries) == 0
+
+
+# Settlement Engine Tests
+def create_wallet(username='trader', money_stock='10000.00', gold_stock='10.0000'):
+    user = CustomUser.objects.create_user(username=username, password='pass123')
+    return Wallet.objects.create(user=user, money_stock=Decimal(money_stock), gold_stock=Decimal(gold_stock))
+
+@pytest.mark.django_db
+def test_settle_purchase_moves_money_and_gold():
+    gold_price = create_gold_price(total_gold_stock=Decimal('100.0000'))
+    wallet = create_wallet()
+    purchase = GoldPurchaseTransaction.objects.create(user=wallet.user, gold_price=gold_price, money_amount=Decimal('4000.00'), gold_amount=Decimal('2.0000'))
+    settle_gold_transaction(purchase)
+    wallet.refresh_from_db()
+    gold_price.refresh_from_db()
+    purchase.refresh_from_db()
+    assert purchase.status == 'ACCEPTED'
+    assert wallet.money_stock == Decimal('6000.00')
+    assert wallet.gold_stock == Decimal('12.0000')
+    assert gold_price.total_gold_stock == Decimal('98.0000')
+
+@pytest.mark.django_db
+def test_settle_sale_moves_money_and_gold():
+    gold_price = create_gold_price(total_gold_stock=Decimal('100.0000'))
+    wallet = create_wallet()
+    sale = GoldSaleTransaction.objects.create(user=wallet.user, gold_price=gold_price, money_amount=Decimal('4000.00'), gold_amount=Decimal('2.0000'))
+    settle_gold_transaction(sale)
+    wallet.refresh_from_db()
+    gold_price.refresh_from_db()
+    assert wallet.money_stock == Decimal('14000.00')
+    assert wallet.gold_stock == Decimal('8.0000')
+    assert gold_price.total_gold_stock == Decimal('102.0000')
+
+@pytest.mark.django_db
+def test_settle_purchase_insufficient_money_rolls_back():
+    gold_price = create_gold_price(total_gold_stock=Decimal('100.0000'))
+    wallet = create_wallet(money_stock='100.00')
+    purchase = GoldPurchaseTransaction.objects.create(user=wallet.user, gold_price=gold_price, money_amount=Decimal('4000.00'), gold_amount=Decimal('2.0000'))
+    with pytest.raises(SettlementError, match='Insufficient money'):
+        settle_gold_transaction(purchase)
+    purchase.refresh_from_db()
+    wallet.refresh_from_db()
+    assert purchase.status == 'WAITING'
+    assert wallet.money_stock == Decimal('100.00')
+
+@pytest.mark.django_db
+def test_settle_purchase_insufficient_house_stock_rolls_back():
+    gold_price = create_gold_price(total_gold_stock=Decimal('1.0000'))
+    wallet = create_wallet()
+    purchase = GoldPurchaseTransaction.objects.create(user=wallet.user, gold_price=gold_price, money_amount=Decimal('4000.00'), gold_amount=Decimal('2.0000'))
+    with pytest.raises(SettlementError, match='Insufficient gold stock'):
+        settle_gold_transaction(purchase)
+    wallet.refresh_from_db()
+    assert wallet.money_stock == Decimal('10000.00')
+    assert wallet.gold_stock == Decimal('10.0000')
+
+@pytest.mark.django_db
+def test_settle_sale_insufficient_gold():
+    gold_price = create_gold_price()
+    wallet = create_wallet(gold_stock='1.0000')
+    sale = GoldSaleTransaction.objects.create(user=wallet.user, gold_price=gold_price, money_amount=Decimal('4000.00'), gold_amount=Decimal('2.0000'))
+    with pytest.raises(SettlementError, match='Insufficient gold in wallet'):
+        settle_gold_transaction(sale)
+
+@pytest.mark.django_db
+def test_settle_without_wallet():
+    gold_price = create_gold_price()
+    user = CustomUser.objects.create_user(username='nowallet', password='pass123')
+    sale = GoldSaleTransaction.objects.create(user=user, gold_price=gold_price, money_amount=Decimal('1.00'), gold_amount=Decimal('1.0000'))
+    with pytest.raises(SettlementError, match='no wallet'):
+        settle_gold_transaction(sale)
+
+@pytest.mark.django_db
+def test_settle_twice_is_rejected():
+    gold_price = create_gold_price()
+    wallet = create_wallet()
+    purchase = GoldPurchaseTransaction.objects.create(user=wallet.user, gold_price=gold_price, money_amount=Decimal('100.00'), gold_amount=Decimal('1.0000'))
+    settle_gold_transaction(purchase)
+    with pytest.raises(SettlementError, match='Only waiting'):
+        settle_gold_transaction(GoldPurchaseTransaction.objects.get(pk=purchase.pk))
+    wallet.refresh_from_db()
+    assert wallet.money_stock == Decimal('9900.00')
+
+@pytest.mark.django_db
+def test_settle_refreshes_cached_house_stock():
+    gold_price = create_gold_price(total_gold_stock=Decimal('100.0000'))
+    wallet = create_wallet()
+    assert get_active_gold_price().total_gold_stock == Decimal('100.0000')
+    purchase = GoldPurchaseTransaction.objects.create(user=wallet.user, gold_price=gold_price, money_amount=Decimal('100.00'), gold_amount=Decimal('1.0000'))
+    settle_gold_transaction(purchase)
+    assert get_active_gold_price().total_gold_stock == Decimal('99.0000')
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_settlements_have_no_lost_updates():
+    if connection.vendor != 'postgresql':
+        pytest.skip('Concurrent settlement needs a database with row-level locking.')
+    gold_price = create_gold_price(total_gold_stock=Decimal('1000.0000'))
+    wallet = create_wallet(money_stock='1000.00')
+    purchases = [
+        GoldPurchaseTransaction.objects.create(user=wallet.user, gold_price=gold_price, money_amount=Decimal('30.00'), gold_amount=Decimal('0.5000'))
+        for _ in range(40)
+    ]
+    results = []
+
+    def settle(purchase):
+        try:
+            settle_gold_transaction(purchase)
+            results.append(True)
+        except SettlementError:
+            results.append(False)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=settle, args=(purchase,)) for purchase in purchases]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    accepted = results.count(True)
+    wallet.refresh_from_db()
+    gold_price.refresh_from_db()
+    assert accepted == 33
+    assert wallet.money_stock == Decimal('1000.00') - accepted * Decimal('30.00')
+    assert wallet.gold_stock == Decimal('10.0000') + accepted * Decimal('0.5000')
+    assert gold_price.total_gold_stock == Decimal('1000.0000') - accepted * Decimal('0.5000')
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_activations_leave_one_active_price():
+    if connection.vendor != 'postgresql':
+        pytest.skip('Concurrent activation needs a database with row-level locking.')
+    prices = [create_gold_price(active=False) for _ in range(20)]
+    errors = []
+    barrier = threading.Barrier(len(prices))
+
+    def activate(gold_price):
+        try:
+            barrier.wait()
+            gold_price.active = True
+            gold_price.save()
+        except Exception as exc:
+            errors.append(exc)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=activate, args=(gold_price,)) for gold_price in prices]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert GoldPrice.objects.filter(active=True).count() == 1
+
+
+# Ledger Tests
+def create_ledger_wallet(username='ledger', money_stock='10000.00', gold_stock='10.0000'):
+    wallet = create_wallet(username=username, money_stock=money_stock, gold_stock=gold_stock)
+    post_adjustment(wallet.pk, wallet.money_stock, wallet.gold_stock, reference_type='OPENING')
+    return wallet
+
+def age_ledger_entries(wallet):
+    LedgerEntry.objects.filter(wallet=wallet).update(create_date=timezone.now() - timedelta(hours=1))
+
+@pytest.mark.django_db
+def test_ledger_rejects_unbalanced_posting():
+    wallet = create_wallet()
+    with pytest.raises(LedgerError):
+        post('ADJUSTMENT', wallet.pk, [('WALLET', wallet.pk, 'MONEY', Decimal('10.00'))])
+    assert not LedgerEntry.objects.exists()
+
+@pytest.mark.django_db
+def test_ledger_entries_are_append_only():
+    wallet = create_ledger_wallet()
+    entry = LedgerEntry.objects.filter(wallet=wallet).first()
+    entry.amount = Decimal('0')
+    with pytest.raises(ValidationError):
+        entry.save()
+    with pytest.raises(ValidationError):
+        entry.delete()
+
+@pytest.mark.django_db
+def test_ledger_balance_follows_settlements():
+    gold_price = create_gold_price(total_gold_stock=Decimal('100.0000'))
+    wallet = create_ledger_wallet()
+    purchase = GoldPurchaseTransaction.objects.create(user=wallet.user, gold_price=gold_price, money_amount=Decimal('4000.00'), gold_amount=Decimal('2.0000'))
+    sale = GoldSaleTransaction.objects.create(user=wallet.user, gold_price=gold_price, money_amount=Decimal('1000.00'), gold_amount=Decimal('0.5000'))
+    payment = PaymentTransaction.objects.create(user=wallet.user, money_amount=Decimal('500.00'))
+    withdrawal = GoldWithdrawalRequest.objects.create(user=wallet.user, gold_amount=Decimal('1.0000'))
+    settle_gold_transaction(purchase)
+    settle_gold_transaction(sale)
+    settle_payment(payment)
+    settle_withdrawal(withdrawal)
+    wallet.refresh_from_db()
+    assert wallet.money_stock == Decimal('7500.00')
+    assert wallet.gold_stock == Decimal('10.5000')
+    assert wallet_balance(wallet.pk) == {'MONEY': wallet.money_stock, 'GOLD': wallet.gold_stock}
+    assert LedgerEntry.objects.filter(reference_type='GOLD_PURCHASE', reference_id=purchase.pk).count() == 4
+
+@pytest.mark.django_db
+def test_ledger_postings_balance_per_asset():
+    gold_price = create_gold_price()
+    wallet = create_ledger_wallet()
+    purchase = GoldPurchaseTransaction.objects.create(user=wallet.user, gold_price=gold_price, money_amount=Decimal('100.00'), gold_amount=Decimal('1.0000'))
+    settle_gold_transaction(purchase)
+    for posting in LedgerEntry.objects.values_list('posting', flat=True).distinct():
+        for asset in ('MONEY', 'GOLD'):
+            amounts = LedgerEntry.objects.filter(posting=posting, asset=asset).values_list('amount', flat=True)
+            assert sum(amounts, Decimal('0')) == 0
+
+@pytest.mark.django_db
+def test_settle_withdrawal_insufficient_balance_rolls_back():
+    wallet = create_ledger_wallet(money_stock='100.00')
+    withdrawal = MoneyWithdrawalRequest.objects.create(user=wallet.user, money_amount=Decimal('500.00'))
+    with pytest.raises(SettlementError, match='Insufficient balance'):
+        settle_withdrawal(withdrawal)
+    withdrawal.refresh_from_db()
+    assert withdrawal.status == 'WAITING'
+    assert wallet_balance(wallet.pk)['MONEY'] == Decimal('100.00')
+
+@pytest.mark.django_db
+def test_checkpoint_wallet_summarizes_aged_entries():
+    wallet = create_ledger_wallet()
+    assert checkpoint_wallet(wallet.pk) is None
+    age_ledger_entries(wallet)
+    checkpoint = checkpoint_wallet(wallet.pk)
+    assert checkpoint.money_balance == Decimal('10000.00')
+    assert checkpoint.gold_balance == Decimal('10.0000')
+    post_adjustment(wallet.pk, Decimal('-250.00'), Decimal('1.0000'))
+    assert wallet_balance(wallet.pk) == {'MONEY': Decimal('9750.00'), 'GOLD': Decimal('11.0000')}
+    assert checkpoint_wallet(wallet.pk) is None
+
+@pytest.mark.django_db
+def test_checkpoint_ledger_command_opens_and_verifies_wallets():
+    wallet = create_wallet()
+    call_command('checkpoint_ledger', '--verify')
+    assert wallet_balance(wallet.pk) == {'MONEY': Decimal('10000.00'), 'GOLD': Decimal('10.0000')}
+    age_ledger_entries(wallet)
+    call_command('checkpoint_ledger')
+    assert WalletBalanceCheckpoint.objects.filter(wallet=wallet).count() == 1
+    Wallet.objects.filter(pk=wallet.pk).update(money_stock=Decimal('1.00'))
+    with pytest.raises(CommandError):
+        call_command('checkpoint_ledger', '--verify')
+
+
+# Batch Settlement Tests
+@pytest.mark.django_db
+def test_batch_settlement_fills_oldest_first_and_rejects_the_rest():
+    gold_price = create_gold_price(total_gold_stock=Decimal('100.0000'))
+    rich = create_wallet(username='rich', money_stock='10000.00', gold_stock='0.0000')
+    poor = create_wallet(username='poor', money_stock='150.00', gold_stock='0.0000')
+    first = GoldPurchaseTransaction.objects.create(user=poor.user, gold_price=gold_price, money_amount=Decimal('100.00'), gold_amount=Decimal('1.0000'))
+    second = GoldPurchaseTransaction.objects.create(user=poor.user, gold_price=gold_price, money_amount=Decimal('100.00'), gold_amount=Decimal('1.0000'))
+    third = GoldPurchaseTransaction.objects.create(user=rich.user, gold_price=gold_price, money_amount=Decimal('1000.00'), gold_amount=Decimal('10.0000'))
+    result = settle_gold_price_batch(gold_price.pk)
+    assert result == {'accepted': [first.pk, third.pk], 'rejected': [second.pk]}
+    rich.refresh_from_db()
+    poor.refresh_from_db()
+    gold_price.refresh_from_db()
+    assert poor.money_stock == Decimal('50.00')
+    assert poor.gold_stock == Decimal('1.0000')
+    assert rich.money_stock == Decimal('9000.00')
+    assert rich.gold_stock == Decimal('10.0000')
+    assert gold_price.total_gold_stock == Decimal('89.0000')
+    assert GoldPurchaseTransaction.objects.get(pk=second.pk).status == 'REJECTED'
+    assert LedgerEntry.objects.filter(reference_type='GOLD_PURCHASE').count() == 8
+
+@pytest.mark.django_db
+def test_batch_settlement_respects_house_stock():
+    gold_price = create_gold_price(total_gold_stock=Decimal('1.5000'))
+    wallet = create_wallet()
+    purchases = [
+        GoldPurchaseTransaction.objects.create(user=wallet.user, gold_price=gold_price, money_amount=Decimal('10.00'), gold_amount=Decimal('1.0000'))
+        for _ in range(2)
+    ]
+    result = settle_gold_price_batch(gold_price.pk)
+    assert result == {'accepted': [purchases[0].pk], 'rejected': [purchases[1].pk]}
+    gold_price.refresh_from_db()
+    assert gold_price.total_gold_stock == Decimal('0.5000')
+
+@pytest.mark.django_db
+def test_batch_settlement_of_sales():
+    gold_price = create_gold_price(total_gold_stock=Decimal('100.0000'))
+    wallet = create_wallet(gold_stock='1.0000')
+    sale = GoldSaleTransaction.objects.create(user=wallet.user, gold_price=gold_price, money_amount=Decimal('500.00'), gold_amount=Decimal('1.0000'))
+    oversold = GoldSaleTransaction.objects.create(user=wallet.user, gold_price=gold_price, money_amount=Decimal('500.00'), gold_amount=Decimal('1.0000'))
+    result = settle_gold_price_batch(gold_price.pk, model=GoldSaleTransaction)
+    assert result == {'accepted': [sale.pk], 'rejected': [oversold.pk]}
+    wallet.refresh_from_db()
+    gold_price.refresh_from_db()
+    assert wallet.money_stock == Decimal('10500.00')
+    assert wallet.gold_stock == Decimal('0.0000')
+    assert gold_price.total_gold_stock == Decimal('101.0000')
+
+@pytest.mark.django_db
+def test_batch_settlement_query_count_is_constant():
+    gold_price = create_gold_price()
+    for index in range(20):
+        wallet = create_wallet(username=f'trader{index}')
+        GoldPurchaseTransaction.objects.create(user=wallet.user, gold_price=gold_price, money_amount=Decimal('10.00'), gold_amount=Decimal('0.1000'))
+    with CaptureQueriesContext(connection) as queries:
+        result = settle_gold_price_batch(gold_price.pk)
+    assert len(result['accepted']) == 20
+    # select trades, wallets and price, then update statuses, wallets and stock, then insert the ledger entries
+    statements = [query for query in queries.captured_queries if not query['sql'].startswith(('SAVEPOINT', 'RELEASE'))]
+    assert len(statements) == 7
+
+@pytest.mark.django_db
+def test_settle_gold_price_command():
+    gold_price = create_gold_price()
+    wallet = create_wallet(gold_stock='1.0000')
+    GoldSaleTransaction.objects.create(user=wallet.user, gold_price=gold_price, money_amount=Decimal('10.00'), gold_amount=Decimal('1.0000'))
+    GoldPurchaseTransaction.objects.create(user=wallet.user, gold_price=gold_price, money_amount=Decimal('10.00'), gold_amount=Decimal('1.0000'))
+    call_command('settle_gold_price', str(gold_price.pk))
+    assert not GoldSaleTransaction.objects.filter(status='WAITING').exists()
+    assert not GoldPurchaseTransaction.objects.filter(status='WAITING').exists()
+    with pytest.raises(CommandError):
+        call_command('settle_gold_price', str(gold_price.pk + 100))
+
+
+# Load Data Tests
+@pytest.mark.django_db
+def test_generate_load_data_command():
+    create_gold_price()
+    call_command(
+        'generate_load_data',
+        '--users', '5', '--ticks', '10', '--trades', '20', '--payments', '8', '--withdrawals', '6', '--batch-size', '7',
+        stdout=StringIO(),
+    )
+    users = CustomUser.objects.filter(username__startswith='load-')
+    assert users.count() == 5
+    assert users.first().check_password('load-password')
+    assert Wallet.objects.filter(user__in=users).count() == 5
+    assert GoldPrice.objects.filter(active=True).count() == 1
+    assert GoldPrice.objects.filter(active=True).get().date == GoldPrice.objects.latest('date').date
+    assert GoldSaleTransaction.objects.count() + GoldPurchaseTransaction.objects.count() == 20
+    assert PaymentTransaction.objects.count() == 8
+    assert MoneyWithdrawalRequest.objects.count() + GoldWithdrawalRequest.objects.count() == 6
+    wallet = Wallet.objects.filter(user__in=users).first()
+    assert wallet_balance(wallet.pk) == {'MONEY': wallet.money_stock, 'GOLD': wallet.gold_stock}
+    with pytest.raises(CommandError):
+        call_command('generate_load_data', '--users', '1', stdout=StringIO())
+
+
+# Price Stream Tests
+def test_price_broadcaster_fans_out_from_one_listener():
+    broker = InMemoryPriceBroker()
+
+    async def run():
+        broadcaster = PriceBroadcaster(broker)
+        first, second = broadcaster.subscribe(), broadcaster.subscribe()
+        await asyncio.sleep(0)
+        assert len(broker.listeners) == 1
+        broker.publish('{"id": 1}')
+        messages = [await first.next(1), await second.next(1)]
+        broadcaster.unsubscribe(first)
+        broadcaster.unsubscribe(second)
+        await asyncio.sleep(0)
+        return messages
+
+    assert asyncio.run(run()) == ['{"id": 1}', '{"id": 1}']
+    assert not broker.listeners
+
+
+# Candle Tests
+def candle_rows():
+    return list(
+        GoldPriceCandle.objects
+        .order_by('interval', 'bucket')
+        .values_list('interval', 'bucket', 'open', 'high', 'low', 'close', 'tick_count')
+    )
+
+@pytest.mark.django_db
+def test_candles_follow_saved_prices_in_any_order():
+    day = timezone.now().replace(hour=10, minute=0, second=0, microsecond=0)
+    for minutes, price in [(1, '100.00'), (0, '90.00'), (2, '120.00'), (1, '80.00'), (61, '110.00')]:
+        create_gold_price(date=day + timedelta(minutes=minutes, seconds=5), sale_price=Decimal(price))
+    hour = GoldPriceCandle.objects.get(interval='1h', bucket=day)
+    assert (hour.open, hour.high, hour.low, hour.close, hour.tick_count) == (
+        Decimal('90.00'), Decimal('120.00'), Decimal('80.00'), Decimal('120.00'), 4
+    )
+    minute = GoldPriceCandle.objects.get(interval='1m', bucket=day + timedelta(minutes=1))
+    assert (minute.open, minute.close, minute.tick_count) == (Decimal('100.00'), Decimal('80.00'), 2)
+    assert GoldPriceCandle.objects.get(interval='1d', bucket=day.replace(hour=0)).tick_count == 5
+    incremental = candle_rows()
+    rebuild_candles(day, day)
+    assert candle_rows() == incremental
+
+@pytest.mark.django_db
+def test_candles_are_rebuilt_when_a_price_changes_or_goes():
+    day = timezone.now().replace(hour=10, minute=0, second=0, microsecond=0)
+    low = create_gold_price(date=day, sale_price=Decimal('50.00'))
+    create_gold_price(date=day + timedelta(minutes=5), sale_price=Decimal('100.00'))
+    low = GoldPrice.objects.get(pk=low.pk)
+    low.sale_price = Decimal('70.00')
+    low.save()
+    assert GoldPriceCandle.objects.get(interval='1h', bucket=day).low == Decimal('70.00')
+    low.delete()
+    hour = GoldPriceCandle.objects.get(interval='1h', bucket=day)
+    assert (hour.open, hour.low, hour.tick_count) == (Decimal('100.00'), Decimal('100.00'), 1)
+    assert not GoldPriceCandle.objects.filter(interval='1m', bucket=day).exists()
+
+@pytest.mark.django_db
+def test_candles_of_compacted_days_survive_a_reprice():
+    minute = (timezone.now() - timedelta(days=settings.GOLD_PRICE_RAW_RETENTION_DAYS + 3)).replace(second=0, microsecond=0)
+    prices = [
+        create_gold_price(date=minute + timedelta(seconds=index * 10), sale_price=Decimal(price), active=False)
+        for index, price in enumerate(['100.00', '150.00', '50.00', '120.00'])
+    ]
+    create_gold_price()
+    call_command('compact_gold_prices', stdout=StringIO())
+    compacted = candle_rows()
+    kept = GoldPrice.objects.get(pk=prices[-1].pk)
+    kept.sale_price = Decimal('130.00')
+    kept.save()
+    assert candle_rows() == compacted
+    kept.delete()
+    assert candle_rows() == compacted
+    assert GoldPriceCandle.objects.get(interval='1m', bucket=minute).tick_count == 4
+
+@pytest.mark.django_db
+def test_backfill_gold_price_candles_command():
+    day = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=2)
+    GoldPrice.objects.bulk_create(
+        GoldPrice(date=day + timedelta(hours=hours), sale_price=Decimal(100 + hours), active=False)
+        for hours in range(48)
+    )
+    assert not GoldPriceCandle.objects.exists()
+    call_command('backfill_gold_price_candles', '--batch-size', '10', stdout=StringIO())
+    assert GoldPriceCandle.objects.filter(interval='1d').count() == 2
+    second_day = GoldPriceCandle.objects.get(interval='1d', bucket=day + timedelta(days=1))
+    assert (second_day.open, second_day.high, second_day.close, second_day.tick_count) == (
+        Decimal('124.00'), Decimal('147.00'), Decimal('147.00'), 24
+    )
+    with pytest.raises(CommandError):
+        call_command('backfill_gold_price_candles', '--from', 'yesterday', stdout=StringIO())
+
+@pytest.mark.django_db
+def test_ingest_ticks_merges_candles_once_per_bucket():
+    current = create_gold_price(date=timezone.now().replace(second=0, microsecond=0) - timedelta(minutes=30))
+    ticks = [
+        {'date': current.date + timedelta(seconds=index + 1), 'sale_price': Decimal(2500000 + index)}
+        for index in range(120)
+    ]
+    with CaptureQueriesContext(connection) as queries:
+        gold_prices = ingest_ticks(ticks)
+    assert len(gold_prices) == 120
+    assert GoldPrice.objects.get(active=True).pk == gold_prices[-1].pk
+    assert len(queries) < 20
+    incremental = candle_rows()
+    rebuild_candles(current.date, ticks[-1]['date'])
+    assert candle_rows() == incremental
+    with pytest.raises(PriceIngestError):
+        ingest_ticks(ticks[-1:])
+
+@pytest.mark.django_db
+def test_ingest_gold_prices_command(tmp_path):
+    current = create_gold_price()
+    path = tmp_path / 'ticks.ndjson'
+    path.write_text(''.join(
+        json.dumps({'date': (current.date + timedelta(seconds=index + 1)).isoformat(), 'sale_price': f'{2600000 + index}.00'}) + '\n'
+        for index in range(25)
+    ))
+    out = StringIO()
+    call_command('ingest_gold_prices', str(path), '--batch-size', '10', stdout=out)
+    assert 'Stored 25' in out.getvalue()
+    assert GoldPrice.objects.get(active=True).sale_price == Decimal('2600024.00')
+    with pytest.raises(CommandError):
+        call_command('ingest_gold_prices', str(path), stdout=StringIO())
+
+@pytest.mark.django_db
+def test_compact_gold_prices_command_keeps_one_price_per_bucket():
+    now = timezone.now()
+    old_hour = (now - timedelta(days=100)).replace(minute=0, second=0, microsecond=0)
+    old_minute = (now - timedelta(days=10)).replace(second=0, microsecond=0)
+    old_hour_prices = [create_gold_price(date=old_hour + timedelta(minutes=index * 10), active=False) for index in range(4)]
+    old_minute_prices = [create_gold_price(date=old_minute + timedelta(seconds=index * 10), active=False) for index in range(4)]
+    recent_prices = [create_gold_price(date=now - timedelta(seconds=index), active=False) for index in range(3)]
+    booked = old_hour_prices[1]
+    user = CustomUser.objects.create_user(username='auditor', password='password')
+    GoldSaleTransaction.objects.create(user=user, money_amount=Decimal('1.00'), gold_amount=Decimal('1.0000'), gold_price=booked)
+    out = StringIO()
+    call_command('compact_gold_prices', '--batch-size', '2', stdout=out)
+    assert 'Deleted 5 gold prices' in out.getvalue()
+    remaining = set(GoldPrice.objects.values_list('pk', flat=True))
+    assert remaining == {booked.pk, old_hour_prices[-1].pk, old_minute_prices[-1].pk, *[price.pk for price in recent_prices]}
+    assert GoldPrice.objects.as_of(old_minute + timedelta(seconds=59)) == old_minute_prices[-1]
+    call_command('compact_gold_prices', stdout=out)
+    assert 'Deleted 0 gold prices' in out.getvalue()
+    with pytest.raises(CommandError):
+        call_command('compact_gold_prices', '--raw-days', '30', '--minute-days', '7', stdout=StringIO())
+    # Fewer raw days than the setting would thin days candle rebuilds still read as raw.
+    with pytest.raises(CommandError, match='GOLD_PRICE_RAW_RETENTION_DAYS'):
+        call_command('compact_gold_prices', '--raw-days', str(settings.GOLD_PRICE_RAW_RETENTION_DAYS - 1), stdout=StringIO())
+
+# Job Queue Tests
+@pytest.mark.django_db
+def test_run_workers_command_settles_queued_records():
+    create_gold_price()
+    wallet = create_wallet(money_stock='100.00')
+    payment = PaymentTransaction.objects.create(user=wallet.user, money_amount=Decimal('50.00'))
+    withdrawal = MoneyWithdrawalRequest.objects.create(user=wallet.user, money_amount=Decimal('500.00'))
+    enqueue('post_payment', payment)
+    enqueue('process_withdrawal', withdrawal)
+    out = StringIO()
+    call_command('run_workers', '--burst', stdout=out)
+    assert 'Ran 1 dead, 1 succeeded; 0 queued.' in out.getvalue()
+    wallet.refresh_from_db()
+    assert wallet.money_stock == Decimal('150.00')
+    succeeded, dead = Job.objects.order_by('id')
+    assert (succeeded.status, succeeded.attempts) == ('SUCCEEDED', 1)
+    assert succeeded.duration_ms is not None and succeeded.finished_at is not None
+    # Insufficient balance cannot be fixed by a retry, so it is dead-lettered at once.
+    assert (dead.status, dead.attempts, dead.last_error) == ('DEAD', 1, 'Insufficient balance in wallet.')
+
+@pytest.mark.django_db
+def test_failed_jobs_back_off_then_dead_letter(monkeypatch):
+    payment = PaymentTransaction.objects.create(user=create_wallet().user, money_amount=Decimal('50.00'))
+    job = enqueue('post_payment', payment, max_attempts=2)
+    monkeypatch.setitem(JOB_SERVICES, 'post_payment', lambda record: 1 / 0)
+    assert run_worker('test', burst=True) == {'QUEUED': 1}
+    job.refresh_from_db()
+    assert job.status == 'QUEUED' and job.attempts == 1 and 'ZeroDivisionError' in job.last_error
+    assert timezone.now() + timedelta(seconds=0.9) <= job.run_after <= timezone.now() + timedelta(seconds=2)
+    # Not due yet, so a burst worker leaves it alone.
+    assert run_worker('test', burst=True) == {}
+    Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+    assert run_worker('test', burst=True) == {'DEAD': 1}
+
+@pytest.mark.django_db
+def test_stale_running_jobs_are_requeued():
+    payment = PaymentTransaction.objects.create(user=create_wallet().user, money_amount=Decimal('50.00'))
+    job = enqueue('post_payment', payment)
+    assert [claimed.pk for claimed in claim_jobs('lost-worker', 10)] == [job.pk]
+    assert claim_jobs('other-worker', 10) == []
+    Job.objects.filter(pk=job.pk).update(started_at=timezone.now() - timedelta(hours=1))
+    assert requeue_stale_jobs() == 1
+    assert run_worker('other-worker', burst=True) == {'SUCCEEDED': 1}
+
+@pytest.mark.django_db
+def test_requeued_job_of_a_settled_record_succeeds():
+    wallet = create_wallet(money_stock='100.00')
+    payment = PaymentTransaction.objects.create(user=wallet.user, money_amount=Decimal('50.00'))
+    job = enqueue('post_payment', payment)
+    claim_jobs('slow-worker', 10)
+    # The slow worker settles the payment after its lease has run out.
+    Job.objects.filter(pk=job.pk).update(started_at=timezone.now() - timedelta(hours=1))
+    assert requeue_stale_jobs() == 1
+    settle_payment(PaymentTransaction.objects.get(pk=payment.pk))
+    assert run_worker('other-worker', burst=True) == {'SUCCEEDED': 1}
+    job.refresh_from_db()
+    assert (job.status, job.attempts, job.last_error) == ('SUCCEEDED', 2, '')
+    wallet.refresh_from_db()
+    assert wallet.money_stock == Decimal('150.00')
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_workers_claim_each_job_once():
+    if connection.vendor != 'postgresql':
+        pytest.skip('SKIP LOCKED needs PostgreSQL.')
+    user = create_wallet().user
+    payments = PaymentTransaction.objects.bulk_create(
+        PaymentTransaction(user=user, money_amount=Decimal('1.00')) for _ in range(60)
+    )
+    for payment in PaymentTransaction.objects.filter(user=user):
+        enqueue('post_payment', payment)
+    outcomes = []
+
+    def work(index):
+        try:
+            outcomes.append(run_worker(f'worker-{index}', batch_size=3, burst=True))
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=work, args=(index,)) for index in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(outcome['SUCCEEDED'] for outcome in outcomes) == len(payments)
+    assert set(Job.objects.values_list('attempts', flat=True)) == {1}
+    assert Wallet.objects.get(user=user).money_stock == Decimal('10000.00') + len(payments)
@@ -0,0 +1,107 @@
+"""
+Compare settling a price tick's waiting purchases one by one with one batch.
+
+Usage:
+    python benchmarks/batch_settlement.py --trades 500 --wallets 100
+
+Both runs settle the same set of purchases spread over many wallets; one
+wallet in ten cannot afford its trades, so rejections are part of the load.
+The run fails if the two strategies leave different balances behind.
+"""
+import argparse
+import time
+from decimal import Decimal
+
+from common import benchmark_database, report, setup_django
+
+
+def seed(trades, wallets, label):
+    from django.utils import timezone
+
+    from apps.core.models import CustomUser
+    from apps.gold_online_store.models.gold import Wallet, GoldPrice
+    from apps.gold_online_store.models.transaction import GoldPurchaseTransaction
+
+    gold_price = GoldPrice.objects.create(date=timezone.now(), total_gold_stock=Decimal('1000000.0000'), active=False)
+    CustomUser.objects.bulk_create(
+        CustomUser(username=f'bench-{label}-{index}') for index in range(wallets)
+    )
+    users = list(CustomUser.objects.filter(username__startswith=f'bench-{label}-').order_by('id'))
+    Wallet.objects.bulk_create(
+        Wallet(user=user, money_stock=Decimal('0.00') if index % 10 == 0 else Decimal('1000000.00'))
+        for index, user in enumerate(users)
+    )
+    GoldPurchaseTransaction.objects.bulk_create(
+        GoldPurchaseTransaction(
+            user=users[index % wallets],
+            gold_price=gold_price,
+            money_amount=Decimal('100.00'),
+            gold_amount=Decimal('0.0400'),
+        )
+        for index in range(trades)
+    )
+    return gold_price
+
+
+def balances(label):
+    from apps.gold_online_store.models.gold import Wallet
+
+    return list(
+        Wallet.objects
+        .filter(user__username__startswith=f'bench-{label}-')
+        .order_by('user__username')
+        .values_list('money_stock', 'gold_stock')
+    )
+
+
+def run(trades, wallets):
+    from apps.gold_online_store.models.transaction import GoldPurchaseTransaction
+    from apps.gold_online_store.services.settlement import (
+        SettlementError,
+        settle_gold_price_batch,
+        settle_gold_transaction,
+    )
+
+    gold_price = seed(trades, wallets, 'single')
+    purchases = list(GoldPurchaseTransaction.objects.filter(gold_price=gold_price).order_by('create_date', 'id'))
+    started = time.perf_counter()
+    for purchase in purchases:
+        try:
+            settle_gold_transaction(purchase)
+        except SettlementError:
+            pass
+    single_elapsed = time.perf_counter() - started
+
+    gold_price = seed(trades, wallets, 'batch')
+    started = time.perf_counter()
+    result = settle_gold_price_batch(gold_price.pk)
+    batch_elapsed = time.perf_counter() - started
+
+    return {
+        'trades': trades,
+        'wallets': wallets,
+        'accepted': len(result['accepted']),
+        'rejected': len(result['rejected']),
+        'single_elapsed_seconds': round(single_elapsed, 4),
+        'batch_elapsed_seconds': round(batch_elapsed, 4),
+        'speedup': round(single_elapsed / batch_elapsed, 2) if batch_elapsed else None,
+        'consistent': balances('single') == balances('batch'),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--trades', type=int, default=500)
+    parser.add_argument('--wallets', type=int, default=100)
+    args = parser.parse_args()
+
+    setup_django()
+    with benchmark_database():
+        results = run(args.trades, args.wallets)
+    report('batch_settlement', results)
+    if not results['consistent']:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
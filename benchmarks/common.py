@@ -0,0 +1,60 @@
+import contextlib
+import json
+import os
+import sys
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def setup_django():
+    """
+    Make the project importable and configure Django for a benchmark script.
+    """
+    if PROJECT_DIR not in sys.path:
+        sys.path.insert(0, PROJECT_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'configs.settings.dev')
+
+    import django
+    django.setup()
+
+    # The gold store models are registered through the imports made by the
+    # URLconf, exactly as they are when the server starts.
+    from importlib import import_module
+    from django.conf import settings
+    import_module(settings.ROOT_URLCONF)
+
+
+@contextlib.contextmanager
+def benchmark_database():
+    """
+    Run the benchmark against a throwaway test database that is dropped afterwards.
+    """
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def percentile(samples, fraction):
+    """
+    Return the nearest-rank percentile of a list of samples.
+    """
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def report(name, results):
+    """
+    Print benchmark results as JSON so runs can be compared across commits.
+    """
+    print(json.dumps({'benchmark': name, **results}, indent=2, default=str))
@@ -0,0 +1,88 @@
+"""
+Measure the CPU that conditional GETs save for clients polling unchanged wallets and prices.
+
+Usage:
+    python benchmarks/conditional_get.py --polls 2000 --prices 50
+
+A user polls their wallet and an admin polls the first page of gold prices,
+first without validators, then replaying the ETag of the last response as
+If-None-Match. Nothing changes between polls, so every conditional poll is
+answered 304 without serializing. CPU time is process time per request.
+The run fails if a conditional poll is not answered 304.
+"""
+import argparse
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from common import benchmark_database, percentile, report, setup_django
+
+
+def poll(client, url, polls, conditional):
+    cpu, wall, statuses = [], [], set()
+    etag = client.get(url)['ETag']
+    headers = {'HTTP_IF_NONE_MATCH': etag} if conditional else {}
+    for _ in range(polls):
+        cpu_started, wall_started = time.process_time(), time.perf_counter()
+        response = client.get(url, **headers)
+        cpu.append(time.process_time() - cpu_started)
+        wall.append(time.perf_counter() - wall_started)
+        statuses.add(response.status_code)
+    return {
+        'statuses': sorted(statuses),
+        'cpu_ms_total': round(sum(cpu) * 1000, 1),
+        'cpu_ms_per_request': round(sum(cpu) * 1000 / polls, 3),
+        'p50_ms': round(percentile(wall, 0.50) * 1000, 3),
+        'p99_ms': round(percentile(wall, 0.99) * 1000, 3),
+    }
+
+
+def run(polls, prices):
+    from django.urls import reverse
+    from django.utils import timezone
+    from rest_framework.test import APIClient
+
+    from apps.core.authentication import ClaimsRefreshToken
+    from apps.core.models import CustomUser
+    from apps.gold_online_store.models.gold import Wallet, GoldPrice
+
+    now = timezone.now()
+    for index in range(prices):
+        GoldPrice.objects.create(date=now - timedelta(minutes=prices - index), sale_price=Decimal('2500000.00') + index)
+    user = CustomUser.objects.create_user(username='bench-poller', password='bench-poller')
+    admin = CustomUser.objects.create_superuser(username='bench-admin', password='bench-admin')
+    wallet = Wallet.objects.create(user=user, money_stock=Decimal('1000.00'), gold_stock=Decimal('10.0000'))
+
+    results = {'polls': polls, 'prices': prices}
+    for name, account, url in (
+        ('wallet_retrieve', user, reverse('wallet-detail', kwargs={'id': wallet.id})),
+        ('gold_price_admin_list', admin, reverse('admin-gold-price-list')),
+    ):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {ClaimsRefreshToken.for_user(account).access_token}')
+        full = poll(client, url, polls, conditional=False)
+        conditional = poll(client, url, polls, conditional=True)
+        results[name] = {
+            'full': full,
+            'conditional': conditional,
+            'cpu_saved_percent': round(100 * (1 - conditional['cpu_ms_total'] / full['cpu_ms_total']), 1),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--polls', type=int, default=2000)
+    parser.add_argument('--prices', type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django()
+    with benchmark_database():
+        results = run(args.polls, args.prices)
+    report('conditional_get', results)
+    if any(results[name]['conditional']['statuses'] != [304] for name in ('wallet_retrieve', 'gold_price_admin_list')):
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Measure peak memory of streaming the payments export against rendering the same records as one response.
+
+Usage:
+    python benchmarks/export.py --rows 5000 20000 50000
+
+For each row count, payments are seeded and exported through the admin
+`export/` action, consuming the stream chunk by chunk, and then serialized
+and rendered whole, as the unpaginated list did. Peak memory is traced with
+tracemalloc for both. The run fails if the export's peak grows with the
+row count by more than `--tolerance` or the streamed line count is wrong;
+row counts are best kept above EXPORT_CHUNK_SIZE, which bounds the peak.
+"""
+import argparse
+import time
+import tracemalloc
+from decimal import Decimal
+
+from common import benchmark_database, report, setup_django
+
+
+def seed_users():
+    from apps.core.models import CustomUser
+
+    CustomUser.objects.bulk_create(
+        CustomUser(username=f'bench-{index}', email=f'bench-{index}@example.com') for index in range(100)
+    )
+    return list(CustomUser.objects.filter(username__startswith='bench-'))
+
+
+def seed_payments(users, rows):
+    from apps.gold_online_store.models.payment import PaymentTransaction
+
+    PaymentTransaction.objects.all().delete()
+    PaymentTransaction.objects.bulk_create(
+        (PaymentTransaction(user=users[index % len(users)], money_amount=Decimal('10.00') + index) for index in range(rows)),
+        batch_size=5000,
+    )
+
+
+def traced(func):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, {'seconds': round(elapsed, 3), 'peak_kib': round(peak / 1024)}
+
+
+def run(row_counts):
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+
+    from apps.core.models import CustomUser
+    from apps.core.renderers import FastJSONRenderer
+    from apps.gold_online_store.models.payment import PaymentTransaction
+    from apps.gold_online_store.serializers.payment import PaymentTransactionSerializer
+
+    users = seed_users()
+    client = APIClient()
+    client.force_authenticate(CustomUser.objects.create_user(username='bench-admin', password='bench', is_staff=True))
+    results = {'ok': True}
+    for rows in row_counts:
+        seed_payments(users, rows)
+
+        def stream():
+            response = client.get(reverse('admin-payment-transaction-export'))
+            return sum(chunk.count(b'\n') for chunk in response.streaming_content)
+
+        def whole():
+            queryset = PaymentTransaction.objects.select_related('user').order_by('payment_date', 'id')
+            return len(FastJSONRenderer().render(PaymentTransactionSerializer(queryset, many=True).data))
+
+        lines, export = traced(stream)
+        _size, rendered = traced(whole)
+        results['ok'] &= lines == rows
+        results[rows] = {'export': export, 'whole_response': rendered}
+
+    peaks = [results[rows]['export']['peak_kib'] for rows in row_counts]
+    results['export_peak_growth'] = round(max(peaks) / min(peaks), 2)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[5000, 20000, 50000])
+    parser.add_argument('--tolerance', type=float, default=1.5)
+    args = parser.parse_args()
+
+    setup_django()
+    with benchmark_database():
+        results = run(args.rows)
+    report('export', results)
+    if not results['ok'] or results['export_peak_growth'] > args.tolerance:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Measure gold price activation and current-price lookup latency over a large price history.
+
+Usage:
+    python benchmarks/gold_price_activation.py --history 100000 --activations 200
+
+The history is bulk loaded with one active price. The run then alternates
+between re-activating an old price and adding a new active one, and times
+the uncached lookup of the current price after each. The run fails if more
+than one price is active at the end.
+"""
+import argparse
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from common import benchmark_database, percentile, report, setup_django
+
+
+def seed(history):
+    from django.utils import timezone
+
+    from apps.gold_online_store.models.gold import GoldPrice
+    from apps.gold_online_store.services.bulk import insert_objects
+
+    start = timezone.now() - timedelta(minutes=history)
+    insert_objects(GoldPrice, (
+        GoldPrice(
+            date=start + timedelta(minutes=index),
+            sale_price=Decimal('2500000.00') + index % 1000,
+            total_gold_stock=Decimal('1000.0000'),
+            active=index == history - 1,
+        )
+        for index in range(history)
+    ))
+    return list(GoldPrice.objects.order_by('?').values_list('id', flat=True)[:1000])
+
+
+def summarize(samples):
+    milliseconds = [seconds * 1000 for seconds in samples]
+    return {
+        'count': len(samples),
+        'p50_ms': round(percentile(milliseconds, 0.50), 3),
+        'p95_ms': round(percentile(milliseconds, 0.95), 3),
+        'p99_ms': round(percentile(milliseconds, 0.99), 3),
+    }
+
+
+def run(history, activations):
+    from django.db import connection
+
+    from apps.gold_online_store.models.gold import GoldPrice
+
+    price_ids = seed(history)
+    reactivations, creations, lookups = [], [], []
+    for index in range(activations):
+        if index % 2:
+            started = time.perf_counter()
+            GoldPrice.objects.create(sale_price=Decimal('2600000.00'), total_gold_stock=Decimal('1000.0000'), active=True)
+            creations.append(time.perf_counter() - started)
+        else:
+            gold_price = GoldPrice.objects.get(pk=price_ids[index % len(price_ids)])
+            started = time.perf_counter()
+            gold_price.active = True
+            gold_price.save()
+            reactivations.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        GoldPrice.objects.filter(active=True).first()
+        lookups.append(time.perf_counter() - started)
+
+    results = {
+        'history': history,
+        'reactivation': summarize(reactivations),
+        'creation': summarize(creations),
+        'current_price_lookup': summarize(lookups),
+        'active_prices': GoldPrice.objects.filter(active=True).count(),
+    }
+    if connection.vendor == 'postgresql':
+        results['current_price_plan'] = GoldPrice.objects.filter(active=True).explain()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--history', type=int, default=100000)
+    parser.add_argument('--activations', type=int, default=200)
+    args = parser.parse_args()
+
+    setup_django()
+    with benchmark_database():
+        results = run(args.history, args.activations)
+    report('gold_price_activation', results)
+    if results['active_prices'] != 1:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
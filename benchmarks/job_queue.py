@@ -0,0 +1,100 @@
+"""
+Measure how settlement job throughput grows with the number of worker processes.
+
+Usage:
+    python benchmarks/job_queue.py --jobs 2000 --wallets 200 --workers 1 2 4 8
+
+For each worker count, queue one post_payment job per pending payment and
+drain the queue with `run_workers --burst`. Workers claim with SKIP LOCKED,
+so on PostgreSQL throughput should grow close to linearly until the
+database runs out of cores. SQLite serialises writers and runs in one
+process here, so only the single worker figure means anything on it.
+The run fails if a job does not succeed or a wallet ends up with the
+wrong balance.
+"""
+import argparse
+import time
+from decimal import Decimal
+from io import StringIO
+
+from common import benchmark_database, percentile, report, setup_django
+
+
+def seed(jobs, wallets, label):
+    from django.db import transaction
+
+    from apps.core.models import CustomUser
+    from apps.gold_online_store.models.gold import Wallet
+    from apps.gold_online_store.models.payment import PaymentTransaction
+    from apps.gold_online_store.services.jobs import enqueue
+
+    CustomUser.objects.bulk_create(
+        CustomUser(username=f'bench-{label}-{index}') for index in range(wallets)
+    )
+    users = list(CustomUser.objects.filter(username__startswith=f'bench-{label}-').order_by('id'))
+    Wallet.objects.bulk_create(Wallet(user=user) for user in users)
+    PaymentTransaction.objects.bulk_create(
+        PaymentTransaction(user=users[index % wallets], money_amount=Decimal('10.00'), status='PENDING')
+        for index in range(jobs)
+    )
+    with transaction.atomic():
+        for payment in PaymentTransaction.objects.filter(user__in=users, status='PENDING'):
+            enqueue('post_payment', payment)
+
+
+def run(jobs, wallets, worker_counts):
+    from django.core.management import call_command
+    from django.db import connection
+    from django.db.models import Sum
+
+    from apps.gold_online_store.models.gold import Wallet
+    from apps.gold_online_store.models.job import Job
+
+    if connection.vendor != 'postgresql':
+        worker_counts = [1]
+
+    results = {'jobs': jobs, 'wallets': wallets, 'vendor': connection.vendor, 'runs': {}, 'ok': True}
+    for workers in worker_counts:
+        label = f'w{workers}'
+        Job.objects.all().delete()
+        seed(jobs, wallets, label)
+        started = time.perf_counter()
+        call_command('run_workers', '--burst', '--workers', str(workers), '--batch-size', '20', stdout=StringIO())
+        elapsed = time.perf_counter() - started
+
+        succeeded = Job.objects.filter(status='SUCCEEDED')
+        credited = Wallet.objects.filter(user__username__startswith=f'bench-{label}-').aggregate(
+            total=Sum('money_stock')
+        )['total']
+        run = {
+            'seconds': round(elapsed, 3),
+            'jobs_per_second': round(jobs / elapsed, 1),
+            'p50_job_ms': round(percentile(list(succeeded.values_list('duration_ms', flat=True)), 0.50) or 0, 3),
+            'succeeded': succeeded.count(),
+        }
+        results['ok'] &= run['succeeded'] == jobs and credited == Decimal('10.00') * jobs
+        results['runs'][workers] = run
+
+    baseline = results['runs'][worker_counts[0]]['jobs_per_second']
+    for run in results['runs'].values():
+        run['speedup'] = round(run['jobs_per_second'] / baseline, 2)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--jobs', type=int, default=2000)
+    parser.add_argument('--wallets', type=int, default=200)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    setup_django()
+    with benchmark_database():
+        results = run(args.jobs, args.wallets, args.workers)
+    report('job_queue', results)
+    if not results['ok']:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""
+Compare rendering large wallet and transaction list payloads with DRF's JSONRenderer and FastJSONRenderer.
+
+Usage:
+    python benchmarks/json_rendering.py --rows 10000 --repeat 5
+
+Each payload is serialized once, as a list endpoint would, and then only
+the rendering to bytes is timed, best of `--repeat` runs. Request parsing
+is timed the same way on a bulk body of gold price ticks. The run fails
+if the two renderers produce different bytes or the parsers different data.
+"""
+import argparse
+import io
+import json
+import time
+from decimal import Decimal
+
+from common import benchmark_database, report, setup_django
+
+
+def best_of(repeat, func):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def seed(rows):
+    from django.utils import timezone
+
+    from apps.core.models import CustomUser
+    from apps.gold_online_store.models.gold import GoldPrice, Wallet
+    from apps.gold_online_store.models.transaction import GoldSaleTransaction
+
+    CustomUser.objects.bulk_create(
+        CustomUser(username=f'bench-{index}', email=f'bench-{index}@example.com') for index in range(rows)
+    )
+    users = list(CustomUser.objects.filter(username__startswith='bench-'))
+    Wallet.objects.bulk_create(
+        Wallet(user=user, money_stock=Decimal('1000.00') + index, gold_stock=Decimal('1.2345'))
+        for index, user in enumerate(users)
+    )
+    gold_price = GoldPrice.objects.create(date=timezone.now(), sale_price=Decimal('2500000.00'), active=True)
+    GoldSaleTransaction.objects.bulk_create(
+        GoldSaleTransaction(
+            user=users[index % len(users)],
+            gold_price=gold_price,
+            money_amount=Decimal('100.00') + index,
+            gold_amount=Decimal('0.0400'),
+        )
+        for index in range(rows)
+    )
+    return gold_price
+
+
+def run(rows, repeat):
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+
+    from apps.core.parsers import FastJSONParser
+    from apps.core.renderers import FastJSONRenderer
+    from apps.gold_online_store.models.gold import Wallet
+    from apps.gold_online_store.models.transaction import GoldSaleTransaction
+    from apps.gold_online_store.serializers.gold import WalletSerializer
+    from apps.gold_online_store.serializers.transaction import GoldSaleTransactionSerializer
+
+    gold_price = seed(rows)
+    payloads = {
+        'wallet_list': WalletSerializer(
+            Wallet.objects.with_total_value(gold_price).select_related('user')[:rows],
+            many=True,
+            context={'active_gold_price': gold_price},
+        ).data,
+        'gold_sale_list': GoldSaleTransactionSerializer(
+            GoldSaleTransaction.objects.select_related('user', 'gold_price')[:rows], many=True
+        ).data,
+    }
+
+    results = {'rows': rows, 'ok': True}
+    for name, data in payloads.items():
+        stdlib, stdlib_seconds = best_of(repeat, lambda: JSONRenderer().render(data))
+        fast, fast_seconds = best_of(repeat, lambda: FastJSONRenderer().render(data))
+        results['ok'] &= stdlib == fast
+        results[name] = {
+            'bytes': len(fast),
+            'json_renderer_ms': round(stdlib_seconds * 1000, 2),
+            'fast_renderer_ms': round(fast_seconds * 1000, 2),
+            'speedup': round(stdlib_seconds / fast_seconds, 2),
+        }
+
+    body = json.dumps([
+        {'date': f'2030-01-01T00:00:{index % 60:02d}Z', 'sale_price': '2500000.00', 'total_gold_stock': '1000.0000'}
+        for index in range(rows)
+    ]).encode()
+    stdlib, stdlib_seconds = best_of(repeat, lambda: JSONParser().parse(io.BytesIO(body)))
+    fast, fast_seconds = best_of(repeat, lambda: FastJSONParser().parse(io.BytesIO(body)))
+    results['ok'] &= stdlib == fast
+    results['tick_body_parse'] = {
+        'bytes': len(body),
+        'json_parser_ms': round(stdlib_seconds * 1000, 2),
+        'fast_parser_ms': round(fast_seconds * 1000, 2),
+        'speedup': round(stdlib_seconds / fast_seconds, 2),
+    }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    with benchmark_database():
+        results = run(args.rows, args.repeat)
+    report('json_rendering', results)
+    if not results['ok']:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+"""
+Replay a weighted mix of gold store API reads against a running server.
+
+Usage:
+    python manage.py generate_load_data --users 1000 --trades 1000000
+    python benchmarks/load_driver.py --base-url http://localhost:8000 --users 100 --duration 60
+
+Each worker thread logs in as one of the users made by generate_load_data,
+then picks routes at random by weight until the duration or request budget
+runs out. Latency percentiles and throughput are reported per route.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from collections import defaultdict
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+
+from common import percentile, report
+
+LOGIN_PATH = '/api/v1/core/accounts/login/'
+STORE_PATH = '/api/v1/gold-online-shop/'
+
+# (route, weight): the mix leans on the wallet and the activity feed, which
+# back the app's home screen, with the per-kind history lists behind them.
+ROUTES = (
+    ('wallets/', 30),
+    ('activity/', 25),
+    ('gold-purchase-transactions/', 15),
+    ('gold-sale-transactions/', 10),
+    ('payment-transactions/', 10),
+    ('money-withdrawal-requests/', 5),
+    ('gold-withdrawal-requests/', 5),
+)
+
+
+def login(base_url, username, password):
+    """
+    Return an access token for one generated user.
+    """
+    body = json.dumps({'username': username, 'password': password}).encode('utf-8')
+    request = Request(base_url + LOGIN_PATH, data=body, headers={'Content-Type': 'application/json'})
+    with urlopen(request) as response:
+        return json.load(response)['access']
+
+
+def fetch(base_url, route, token):
+    """
+    GET one route and return (status, seconds).
+    """
+    request = Request(base_url + STORE_PATH + route, headers={'Authorization': f'Bearer {token}'})
+    started = time.perf_counter()
+    try:
+        with urlopen(request) as response:
+            response.read()
+            status = response.status
+    except HTTPError as exc:
+        status = exc.code
+    except URLError:
+        status = None
+    return status, time.perf_counter() - started
+
+
+class Worker(threading.Thread):
+    def __init__(self, base_url, token, deadline, budget, seed):
+        super().__init__(daemon=True)
+        self.base_url = base_url
+        self.token = token
+        self.deadline = deadline
+        self.budget = budget
+        self.random = random.Random(seed)
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def run(self):
+        routes = [route for route, _weight in ROUTES]
+        weights = [weight for _route, weight in ROUTES]
+        while time.perf_counter() < self.deadline and self.budget.take():
+            route = self.random.choices(routes, weights)[0]
+            status, seconds = fetch(self.base_url, route, self.token)
+            self.samples[route].append(seconds)
+            if status is None or status >= 400:
+                self.errors[route] += 1
+
+
+class Budget:
+    """
+    A request counter shared by the workers; unlimited when total is None.
+    """
+
+    def __init__(self, total):
+        self.remaining = total
+        self.lock = threading.Lock()
+
+    def take(self):
+        if self.remaining is None:
+            return True
+        with self.lock:
+            if self.remaining <= 0:
+                return False
+            self.remaining -= 1
+            return True
+
+
+def summarize(samples, errors, elapsed):
+    milliseconds = [seconds * 1000 for seconds in samples]
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'throughput_per_second': round(len(samples) / elapsed, 2),
+        'p50_ms': round(percentile(milliseconds, 0.50), 2),
+        'p95_ms': round(percentile(milliseconds, 0.95), 2),
+        'p99_ms': round(percentile(milliseconds, 0.99), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default='http://localhost:8000')
+    parser.add_argument('--prefix', default='load', help='Username prefix passed to generate_load_data.')
+    parser.add_argument('--password', default='load-password')
+    parser.add_argument('--users', type=int, default=50, help='Number of users to log in as, one per worker.')
+    parser.add_argument('--duration', type=float, default=30.0, help='Seconds to run for.')
+    parser.add_argument('--requests', type=int, default=None, help='Stop after this many requests in total.')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    base_url = args.base_url.rstrip('/')
+    tokens = [login(base_url, f'{args.prefix}-{index}', args.password) for index in range(args.users)]
+
+    started = time.perf_counter()
+    budget = Budget(args.requests)
+    workers = [
+        Worker(base_url, token, started + args.duration, budget, args.seed + index)
+        for index, token in enumerate(tokens)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+
+    samples = defaultdict(list)
+    errors = defaultdict(int)
+    for worker in workers:
+        for route, route_samples in worker.samples.items():
+            samples[route].extend(route_samples)
+        for route, count in worker.errors.items():
+            errors[route] += count
+
+    everything = [seconds for route_samples in samples.values() for seconds in route_samples]
+    report('load_driver', {
+        'users': args.users,
+        'elapsed_seconds': round(elapsed, 2),
+        'total': summarize(everything, sum(errors.values()), elapsed) if everything else None,
+        'routes': {route: summarize(samples[route], errors[route], elapsed) for route in sorted(samples)},
+    })
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+Compare rendering large list pages with the DRF serializers and with their `.values()` fast path.
+
+Usage:
+    python benchmarks/serialization.py --rows 10000 --repeat 3
+
+For gold sales (nested user and gold price) and payments (nested user),
+load a page of `--rows` records and serialize it both ways: model instances
+through the ModelSerializer, and `.values()` rows through the compiled
+ValuesSerializer. The gold sales are also rendered with the sparse
+fieldset of a list screen (`?fields=id,money_amount,gold_amount,status,gold_price&expand=`),
+reporting payload bytes as well. Timings include the query. The run fails
+if the model and values payloads differ.
+"""
+import argparse
+import time
+from decimal import Decimal
+
+from common import benchmark_database, report, setup_django
+
+
+def seed(rows):
+    from django.utils import timezone
+
+    from apps.core.models import CustomUser
+    from apps.gold_online_store.models.gold import GoldPrice
+    from apps.gold_online_store.models.payment import PaymentTransaction
+    from apps.gold_online_store.models.transaction import GoldSaleTransaction
+
+    CustomUser.objects.bulk_create(
+        CustomUser(username=f'bench-{index}', email=f'bench-{index}@example.com') for index in range(100)
+    )
+    users = list(CustomUser.objects.filter(username__startswith='bench-'))
+    gold_price = GoldPrice.objects.create(date=timezone.now(), sale_price=Decimal('2500000.00'), active=False)
+    GoldSaleTransaction.objects.bulk_create(
+        GoldSaleTransaction(
+            user=users[index % len(users)],
+            gold_price=gold_price,
+            money_amount=Decimal('100.00') + index,
+            gold_amount=Decimal('0.0400'),
+            status=('WAITING', 'ACCEPTED', 'REJECTED')[index % 3],
+        )
+        for index in range(rows)
+    )
+    PaymentTransaction.objects.bulk_create(
+        PaymentTransaction(user=users[index % len(users)], money_amount=Decimal('10.00') + index)
+        for index in range(rows)
+    )
+
+
+def measure(render, rows, repeat):
+    best, data = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        data = render()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return data, {'seconds': round(best, 4), 'rows_per_second': round(rows / best)}
+
+
+def run(rows, repeat):
+    from rest_framework.renderers import JSONRenderer
+
+    from apps.core.serializers import ValuesSerializer
+    from apps.gold_online_store.models.payment import PaymentTransaction
+    from apps.gold_online_store.models.transaction import GoldSaleTransaction
+    from apps.gold_online_store.serializers.payment import PaymentTransactionSerializer
+    from apps.gold_online_store.serializers.transaction import GoldSaleTransactionSerializer
+
+    seed(rows)
+    results = {'rows': rows, 'ok': True}
+    for name, serializer_class, queryset in (
+        ('gold_sale', GoldSaleTransactionSerializer, GoldSaleTransaction.objects.select_related('user', 'gold_price')),
+        ('payment', PaymentTransactionSerializer, PaymentTransaction.objects.select_related('user')),
+    ):
+        queryset = queryset.order_by('-id')[:rows]
+        values = ValuesSerializer.for_serializer(serializer_class)
+        model_data, model = measure(lambda: serializer_class(list(queryset), many=True).data, rows, repeat)
+        values_data, fast = measure(
+            lambda: values.to_representation(list(queryset.values(*values.get_lookups()))), rows, repeat
+        )
+        results['ok'] &= JSONRenderer().render(model_data) == JSONRenderer().render(values_data)
+        results[name] = {
+            'model_serializer': model,
+            'values_serializer': fast,
+            'speedup': round(fast['rows_per_second'] / model['rows_per_second'], 2),
+            'payload_bytes': len(JSONRenderer().render(values_data)),
+        }
+
+    fields = frozenset({'id', 'money_amount', 'gold_amount', 'status', 'gold_price'})
+    sparse = ValuesSerializer.for_serializer(GoldSaleTransactionSerializer, fields, frozenset())
+    queryset = GoldSaleTransaction.objects.order_by('-id')[:rows]
+    sparse_data, timing = measure(lambda: sparse.to_representation(list(queryset.values(*sparse.get_lookups()))), rows, repeat)
+    results['gold_sale_sparse'] = {
+        'values_serializer': timing,
+        'columns': len(sparse.get_lookups()),
+        'payload_bytes': len(JSONRenderer().render(sparse_data)),
+    }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    setup_django()
+    with benchmark_database():
+        results = run(args.rows, args.repeat)
+    report('serialization', results)
+    if not results['ok']:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Throughput benchmark for concurrent trade settlement against one wallet.
+
+Usage:
+    python benchmarks/settlement.py --threads 8 --settlements 400
+
+Every worker thread settles purchases for the same wallet. The wallet only
+holds enough money for half of them, so the balance guards are exercised
+under contention. The run fails if any update is lost or a deadlock surfaces.
+"""
+import argparse
+import threading
+import time
+from decimal import Decimal
+
+from common import benchmark_database, report, setup_django
+
+
+def run(threads, settlements):
+    from django.db import DatabaseError, connection
+    from django.utils import timezone
+
+    from apps.core.models import CustomUser
+    from apps.gold_online_store.models.gold import Wallet, GoldPrice
+    from apps.gold_online_store.models.transaction import GoldPurchaseTransaction
+    from apps.gold_online_store.services.settlement import SettlementError, settle_gold_transaction
+
+    money_amount = Decimal('10.00')
+    gold_amount = Decimal('0.0100')
+    initial_money = money_amount * (settlements // 2)
+    initial_stock = gold_amount * settlements
+
+    user = CustomUser.objects.create_user(username='bench-settlement', password='bench-settlement')
+    wallet = Wallet.objects.create(user=user, money_stock=initial_money, gold_stock=Decimal('0.0000'))
+    gold_price = GoldPrice.objects.create(date=timezone.now(), total_gold_stock=initial_stock, active=True)
+    GoldPurchaseTransaction.objects.bulk_create(
+        GoldPurchaseTransaction(user=user, gold_price=gold_price, money_amount=money_amount, gold_amount=gold_amount)
+        for _ in range(settlements)
+    )
+    purchases = list(GoldPurchaseTransaction.objects.filter(user=user))
+    connection.close()
+
+    outcomes = {'accepted': 0, 'rejected': 0, 'errors': 0}
+    lock = threading.Lock()
+
+    def worker(batch):
+        try:
+            for purchase in batch:
+                try:
+                    settle_gold_transaction(purchase)
+                    outcome = 'accepted'
+                except SettlementError:
+                    outcome = 'rejected'
+                except DatabaseError:
+                    outcome = 'errors'
+                with lock:
+                    outcomes[outcome] += 1
+        finally:
+            connection.close()
+
+    batches = [purchases[index::threads] for index in range(threads)]
+    workers = [threading.Thread(target=worker, args=(batch,)) for batch in batches]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    wallet.refresh_from_db()
+    gold_price.refresh_from_db()
+    accepted = outcomes['accepted']
+    consistent = (
+        wallet.money_stock == initial_money - accepted * money_amount
+        and wallet.gold_stock == accepted * gold_amount
+        and gold_price.total_gold_stock == initial_stock - accepted * gold_amount
+        and GoldPurchaseTransaction.objects.filter(status='ACCEPTED').count() == accepted
+    )
+    return {
+        'threads': threads,
+        'settlements': settlements,
+        **outcomes,
+        'elapsed_seconds': round(elapsed, 4),
+        'settlements_per_second': round(settlements / elapsed, 2) if elapsed else None,
+        'consistent': consistent,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--settlements', type=int, default=400)
+    args = parser.parse_args()
+
+    setup_django()
+    with benchmark_database():
+        results = run(args.threads, args.settlements)
+    report('settlement', results)
+    if not results['consistent'] or results['errors']:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -11,6 +11,7 @@ import os
 
 from django.core.asgi import get_asgi_application
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'configs.settings')
+environment = os.environ.get('ENVIRONMENT', 'dev')
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', f'configs.settings.{environment}')
 
 application = get_asgi_application()
@@ -133,3 +133,72 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # add Custom User
 AUTH_USER_MODEL = 'core.CustomUser'
+
+# Caches: the active gold price version, ETag responses and other state every
+# process must agree on use the default cache; serialized wallet payloads get
+# their own bounded cache, evicted least recently used first. Token
+# revocations get a cache of their own that must never evict: a lost entry
+# would let a revoked token through, so the revocations alias has to point at
+# a store that keeps every entry until it expires, such as a Redis instance
+# with maxmemory-policy noeviction, and MAX_ENTRIES has to exceed the number of
+# users revoked within an access token lifetime.
+# LocMemCache is private to each process, so it is only valid when the site
+# runs as a single process; deployments with several web or worker processes
+# must point DEFAULT_CACHE_BACKEND and REVOCATION_CACHE_BACKEND at a shared
+# backend such as django.core.cache.backends.redis.RedisCache or
+# PyMemcacheCache. Token revocations depend on this, so outside DEBUG the site
+# refuses to start with LocMemCache unless SINGLE_PROCESS is set.
+SINGLE_PROCESS = os.environ.get('SINGLE_PROCESS', 'False') == 'True'
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('DEFAULT_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('DEFAULT_CACHE_LOCATION', ''),
+    },
+    'wallets': {
+        'BACKEND': os.environ.get('WALLET_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('WALLET_CACHE_LOCATION', 'wallets'),
+        'TIMEOUT': int(os.environ.get('WALLET_CACHE_TIMEOUT', 60 * 10)),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('WALLET_CACHE_MAX_ENTRIES', 10000)),
+        },
+    },
+    'revocations': {
+        'BACKEND': os.environ.get('REVOCATION_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('REVOCATION_CACHE_LOCATION', 'revocations'),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('REVOCATION_CACHE_MAX_ENTRIES', 1000000)),
+        },
+    },
+}
+
+# Django REST framework
+REST_FRAMEWORK = {
+    'DEFAULT_PAGINATION_CLASS': 'apps.core.pagination.KeysetPagination',
+    'PAGE_SIZE': int(os.environ.get('PAGINATION_PAGE_SIZE', 50)),
+    # orjson-backed JSON when it is installed, the stdlib encoder otherwise
+    'DEFAULT_RENDERER_CLASSES': [
+        'apps.core.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'apps.core.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+}
+
+# Upper bound for the ?page_size= query parameter on paginated endpoints
+PAGINATION_MAX_PAGE_SIZE = int(os.environ.get('PAGINATION_MAX_PAGE_SIZE', 500))
+
+# Rows fetched per round trip from the server-side cursor of the streaming export endpoints
+EXPORT_CHUNK_SIZE = int(os.environ.get('EXPORT_CHUNK_SIZE', 2000))
+
+# How long, in seconds, a stored Idempotency-Key response is replayed to retries
+IDEMPOTENCY_KEY_TTL = int(os.environ.get('IDEMPOTENCY_KEY_TTL', 60 * 60 * 24))
+
+# Days of raw gold price ticks kept before compact_gold_prices thins them to one per minute
+GOLD_PRICE_RAW_RETENTION_DAYS = int(os.environ.get('GOLD_PRICE_RAW_RETENTION_DAYS', 7))
+
+# Days of per-minute gold prices kept before compact_gold_prices thins them to one per hour
+GOLD_PRICE_MINUTE_RETENTION_DAYS = int(os.environ.get('GOLD_PRICE_MINUTE_RETENTION_DAYS', 90))
@@ -20,6 +20,22 @@ DATABASES = {
     }
 }
 
+# The default cache holds state every web and worker process must share (the
+# active gold price version and changed-at stamp, ETag responses), so production
+# runs it on Redis instead of the per-process LocMemCache.
+CACHES['default'] = {
+    'BACKEND': os.environ.get('DEFAULT_CACHE_BACKEND', 'django.core.cache.backends.redis.RedisCache'),
+    'LOCATION': os.environ.get('DEFAULT_CACHE_LOCATION', 'redis://127.0.0.1:6379/0'),
+}
+
+# Token revocations must never be evicted, so they get a Redis instance of
+# their own, to be configured with maxmemory-policy noeviction; its keys all
+# expire with the access tokens they revoke.
+CACHES['revocations'] = {
+    'BACKEND': os.environ.get('REVOCATION_CACHE_BACKEND', 'django.core.cache.backends.redis.RedisCache'),
+    'LOCATION': os.environ.get('REVOCATION_CACHE_LOCATION', 'redis://127.0.0.1:6380/0'),
+}
+
 # CORS Configuration
 CORS_ALLOW_ALL_ORIGINS = os.environ.get('PRODUCTION_CORS_ALLOW_ALL_ORIGINS', 'False') == 'True'
 
@@ -47,4 +63,6 @@ CORS_ALLOW_METHODS = [
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=1),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=5),
+    'TOKEN_OBTAIN_SERIALIZER': 'apps.core.authentication.ClaimsTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'apps.core.authentication.ClaimsTokenRefreshSerializer',
 }
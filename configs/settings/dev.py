@@ -47,4 +47,6 @@ CORS_ALLOW_METHODS = [
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=1),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=5),
+    'TOKEN_OBTAIN_SERIALIZER': 'apps.core.authentication.ClaimsTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'apps.core.authentication.ClaimsTokenRefreshSerializer',
 }
@@ -16,6 +16,7 @@ def run_all_tests():
         'apps/gold_online_store/tests/test_api_views.py',
         'apps/gold_online_store/tests/test_serializers.py',
         'apps/gold_online_store/tests/test_models.py',
+        'apps/gold_online_store/tests/test_services.py',
     ]
 
     # Run pytest with verbose output and coverage